@@ -14,10 +14,19 @@ import datetime as _dt
 # Asegurar que el directorio raíz esté en el path
 sys.path.insert(0, os.path.dirname(__file__))
 
+# Perfil de imports (SAC_IMPORT_PROFILE=1): tabla de costo por módulo en consola
+from shared import import_profiler
+_perfil_imports = import_profiler.desde_entorno()
+
 from shared.css import inject_css
 from shared.state import init_session_state, is_data_loaded
 from shared.auth import require_auth
 from data_processor import filter_by_date_range
+from shared.chart_cache import start_warm_up
+
+# Precarga de fuentes de matplotlib en segundo plano (una vez por proceso):
+# el primer gráfico de un reporte no paga el escaneo de fuentes.
+start_warm_up()
 
 # ═══════════════════════════════════════════════════════════════
 # CONFIGURACIÓN DE PÁGINA
@@ -156,4 +165,8 @@ if is_data_loaded():
 # EJECUTAR PÁGINA SELECCIONADA
 # ═══════════════════════════════════════════════════════════════
 
-pg.run()
+try:
+    pg.run()
+finally:
+    if _perfil_imports:
+        import_profiler.reportar(f"app.py + {pg.title}")
@@ -4,61 +4,475 @@ Genera un ZIP con todos los reportes departamentales + nacional del SAC.
 """
 
 import io
+import json
+import multiprocessing
+import os
+import time
 import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
+from functools import partial
 
 import streamlit as st
 
-from gen_word_bridge_py import generate_nacional_docx, generate_departamental_docx
+from gen_word_bridge_py import (
+    build_departamental_payload,
+    build_nacional_payload,
+    generate_departamental_docx,
+    generate_nacional_docx,
+    render_docx,
+)
 from data_processor import get_departamento_data
 
+NACIONAL_FILENAME = "Ayuda_Memoria_Nacional_SAC.docx"
+MANIFEST_FILENAME = "manifiesto.json"
+
+
+def _depto_filename(depto):
+    return f"Ayuda_Memoria_{depto.replace(' ', '_')}_SAC.docx"
+
 
 # ---------------------------------------------------------------------------
 # Core: ZIP generation
 # ---------------------------------------------------------------------------
 
-def generate_batch_zip(datos, progress_callback=None):
+def generate_batch_zip(datos, progress_callback=None, parallel=False, max_workers=None):
     """
     Generates a ZIP containing:
       1. Ayuda_Memoria_Nacional_SAC.docx
       2. One DOCX per department: Ayuda_Memoria_{DEPTO}_SAC.docx
+      3. manifiesto.json with generated files and per-report errors
 
     progress_callback(current, total, label) is called for UI updates.
+    parallel=True renders the DOCX files in a process pool (see build_batch_zip).
     Returns bytes of the ZIP file.
     """
+    zip_bytes, _ = build_batch_zip(datos, progress_callback, parallel=parallel,
+                                   max_workers=max_workers)
+    return zip_bytes
+
+
+def build_batch_zip(datos, progress_callback=None, incluir_nacional=True,
+                    parallel=False, max_workers=None):
+    """
+    Core of generate_batch_zip. Returns (zip_bytes, manifest).
+
+    Sequential mode renders each document inline. Parallel mode first builds
+    every payload in this process (pandas work on `datos`, which is not sent
+    to the workers), then renders the DOCX files in a ProcessPoolExecutor —
+    python-docx is CPU-bound and holds the GIL — and writes each document
+    into the ZIP as soon as it completes.
+
+    Failures never abort the batch: they are collected per report in the
+    manifest (also written inside the ZIP as manifiesto.json).
+    """
     deptos = datos.get("departamentos_list", [])
-    total = 1 + len(deptos)  # nacional + each department
+    total = (1 if incluir_nacional else 0) + len(deptos)
+    manifest = {
+        "generado": datetime.now().isoformat(timespec="seconds"),
+        "fecha_corte": str(datos.get("fecha_corte", "")),
+        "modo": "paralelo" if parallel else "secuencial",
+        "archivos": [],
+        "errores": [],
+    }
+
+    def _report(step, label):
+        if progress_callback:
+            progress_callback(step, total, label)
+
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        if parallel:
+            _render_parallel(datos, deptos, incluir_nacional, zf, manifest,
+                             _report, max_workers)
+        else:
+            _render_sequential(datos, deptos, incluir_nacional, zf, manifest, _report)
+        zf.writestr(MANIFEST_FILENAME, json.dumps(manifest, ensure_ascii=False, indent=2))
+
+    _report(total, "Listo!")
+    return buf.getvalue(), manifest
+
+
+def _render_sequential(datos, deptos, incluir_nacional, zf, manifest, report):
     step = 0
+    if incluir_nacional:
+        report(step, "Generando reporte nacional...")
+        try:
+            zf.writestr(NACIONAL_FILENAME, generate_nacional_docx(datos))
+            manifest["archivos"].append(NACIONAL_FILENAME)
+        except Exception as e:
+            manifest["errores"].append({"reporte": "Nacional", "error": str(e)})
+        step += 1
+
+    for depto in deptos:
+        report(step, f"Generando reporte: {depto}...")
+        try:
+            depto_data = get_departamento_data(datos, depto)
+            fname = _depto_filename(depto)
+            zf.writestr(fname, generate_departamental_docx(depto_data))
+            manifest["archivos"].append(fname)
+        except Exception as e:
+            manifest["errores"].append({"reporte": depto, "error": str(e)})
+        step += 1
+
+
+def _render_parallel(datos, deptos, incluir_nacional, zf, manifest, report, max_workers):
+    # 1. Payloads up front (needs `datos`; stays in this process)
+    jobs = []  # (label, filename, kind, payload)
+    report(0, "Preparando datos de los reportes...")
+    if incluir_nacional:
+        try:
+            jobs.append(("Nacional", NACIONAL_FILENAME, "nacional",
+                         build_nacional_payload(datos)))
+        except Exception as e:
+            manifest["errores"].append({"reporte": "Nacional", "error": str(e)})
+    for depto in deptos:
+        try:
+            payload = build_departamental_payload(get_departamento_data(datos, depto))
+            jobs.append((depto, _depto_filename(depto), "departamental", payload))
+        except Exception as e:
+            manifest["errores"].append({"reporte": depto, "error": str(e)})
+
+    # 2. Render in worker processes, stream results into the ZIP
+    _render_pool(render_docx, [(label, fname, (kind, payload))
+                               for label, fname, kind, payload in jobs],
+                 zf, manifest, report, max_workers, step=len(manifest["errores"]))
+
+
+def _timed(render, *args):
+    """render(*args) → (bytes, seconds spent rendering)."""
+    t0 = time.perf_counter()
+    data = render(*args)
+    return data, time.perf_counter() - t0
+
+
+def _mp_context():
+    """forkserver (spawn where unavailable), never plain fork.
+
+    The pool runs from the ReportJobQueue thread inside the multi-threaded
+    Streamlit server; a fork taken while another thread holds a lock
+    (logging, chart_cache._RENDER_LOCK, the job queue) can deadlock the child.
+    """
+    if "forkserver" not in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("spawn")
+    ctx = multiprocessing.get_context("forkserver")
+    # The (single-threaded) server imports this module once; workers fork
+    # from it already warm instead of re-importing pandas/streamlit each.
+    ctx.set_forkserver_preload([__name__])
+    return ctx
+
+
+def _render_pool(render, jobs, zf, manifest, report, max_workers, step=0):
+    """Runs render(*args) for each (label, filename, args) job in a process
+    pool and writes each file into the ZIP as soon as it completes.
+
+    Falls back to rendering in this process when the platform has no
+    process support, or when a worker dies mid-run (BrokenProcessPool, e.g.
+    OOM kill): the jobs not finished yet are rendered inline. Errors are
+    recorded per job in the manifest; render seconds (measured in the
+    worker) go to manifest["tiempos"][label].
+    """
+    workers = max_workers or min(len(jobs), os.cpu_count() or 1) or 1
+    tiempos = manifest.setdefault("tiempos", {})
+    done = set()  # filenames written or failed on their own
+    try:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=_mp_context()) as pool:
+            futures = {pool.submit(_timed, render, *args): (label, fname)
+                       for label, fname, args in jobs}
+            for fut in as_completed(futures):
+                label, fname = futures[fut]
+                try:
+                    data, secs = fut.result()
+                    zf.writestr(fname, data)
+                    manifest["archivos"].append(fname)
+                    tiempos[label] = round(secs, 3)
+                except BrokenProcessPool:
+                    raise
+                except Exception as e:
+                    manifest["errores"].append({"reporte": label, "error": str(e)})
+                done.add(fname)
+                step += 1
+                report(step, f"Listo: {label}")
+    except BrokenProcessPool as e:
+        # Un worker murió: lo pendiente se renderiza en este proceso
+        manifest["modo"] = f"secuencial (pool interrumpido: {e})"
+        _render_inline(render, [j for j in jobs if j[1] not in done],
+                       zf, manifest, report, step)
+    except (OSError, RuntimeError, NotImplementedError) as e:
+        # Sin soporte de procesos (sandbox / plataforma): render en este proceso
+        manifest["modo"] = f"secuencial (pool no disponible: {e})"
+        _render_inline(render, [j for j in jobs if j[1] not in done],
+                       zf, manifest, report, step)
+
+
+def _render_inline(render, jobs, zf, manifest, report, step=0):
+    """Sequential counterpart of _render_pool (same manifest entries)."""
+    tiempos = manifest.setdefault("tiempos", {})
+    for label, fname, args in jobs:
+        report(step, f"Generando reporte: {label}...")
+        try:
+            data, secs = _timed(render, *args)
+            zf.writestr(fname, data)
+            manifest["archivos"].append(fname)
+            tiempos[label] = round(secs, 3)
+        except Exception as err:
+            manifest["errores"].append({"reporte": label, "error": str(err)})
+        step += 1
+
+
+# ---------------------------------------------------------------------------
+# Historical PPT decks (one per department)
+# ---------------------------------------------------------------------------
+
+def generate_historico_zip(datos, primas_hist=None, progress_callback=None,
+                           parallel=True, max_workers=None):
+    """
+    Generates a ZIP with the historical siniestralidad deck
+    (gen_ppt_historico) of every department in datos["departamentos_list"],
+    plus manifiesto.json. Returns bytes of the ZIP file.
+    """
+    zip_bytes, _ = build_historico_zip(datos, primas_hist, progress_callback,
+                                       parallel=parallel, max_workers=max_workers)
+    return zip_bytes
+
+
+def build_historico_zip(datos, primas_hist=None, progress_callback=None,
+                        parallel=True, max_workers=None):
+    """
+    Core of generate_historico_zip. Returns (zip_bytes, manifest).
+
+    The current-campaign metrics of all departments come from a single pass
+    over midagri (extract_current_campaigns: department names normalized
+    once, one groupby) instead of one full-column filter per deck. Rendering
+    only needs those small dicts plus primas_hist, so in parallel mode each
+    deck is built in a worker process; resumen_departamental.json is read
+    once per process when gen_ppt_historico is imported.
+    """
+    from gen_ppt_historico import extract_current_campaigns, render_ppt_historico
+    if primas_hist is None:
+        from data_processor import load_primas_historicas
+        primas_hist = load_primas_historicas()
+
+    deptos = datos.get("departamentos_list", [])
+    total = len(deptos)
+    manifest = {
+        "generado": datetime.now().isoformat(timespec="seconds"),
+        "fecha_corte": str(datos.get("fecha_corte", "")),
+        "modo": "paralelo" if parallel else "secuencial",
+        "archivos": [],
+        "errores": [],
+    }
+
+    def _report(step, label):
+        if progress_callback:
+            progress_callback(step, total, label)
+
+    _report(0, "Preparando datos de la campaña actual...")
+    actuales = extract_current_campaigns(datos, deptos)
+    jobs = [(depto, _historico_filename(depto),
+             (depto, actuales[depto], primas_hist))
+            for depto in deptos]
 
     buf = io.BytesIO()
     with zipfile.ZipFile(buf, "w", compression=zipfile.ZIP_DEFLATED) as zf:
-        # --- Nacional ---
+        if parallel:
+            _render_pool(render_ppt_historico, jobs, zf, manifest, _report, max_workers)
+        else:
+            for step, (label, fname, args) in enumerate(jobs):
+                _report(step, f"Generando PPT: {label}...")
+                try:
+                    zf.writestr(fname, render_ppt_historico(*args))
+                    manifest["archivos"].append(fname)
+                except Exception as e:
+                    manifest["errores"].append({"reporte": label, "error": str(e)})
+        zf.writestr(MANIFEST_FILENAME, json.dumps(manifest, ensure_ascii=False, indent=2))
+
+    _report(total, "Listo!")
+    return buf.getvalue(), manifest
+
+
+def _historico_filename(depto):
+    return f"Historico_SAC_{depto.replace(' ', '_')}.pptx"
+
+
+# ---------------------------------------------------------------------------
+# Department-scoped executive PDFs (one per department)
+# ---------------------------------------------------------------------------
+
+def generate_pdf_zip(datos, progress_callback=None, parallel=False, max_workers=None):
+    """
+    Generates a ZIP with the department-scoped executive PDF
+    (gen_pdf_resumen) of every department in datos["departamentos_list"],
+    plus manifiesto.json. Returns bytes of the ZIP file.
+    """
+    zip_bytes, _ = build_pdf_zip(datos, progress_callback, parallel=parallel,
+                                 max_workers=max_workers)
+    return zip_bytes
+
+
+def build_pdf_zip(datos, progress_callback=None, parallel=False, max_workers=None):
+    """
+    Core of generate_pdf_zip. Returns (zip_bytes, manifest).
+
+    Sequential by default: gen_pdf_resumen caches the pie chart, the image
+    parsed by fpdf2 and the observations per process, so each PDF is a few
+    tens of ms of FPDF layout — less than pickling its inputs to a worker.
+    """
+    from gen_pdf_resumen import departamental_pdf_datos, generate_executive_pdf
+
+    deptos = datos.get("departamentos_list", [])
+    total = len(deptos)
+    manifest = {
+        "generado": datetime.now().isoformat(timespec="seconds"),
+        "fecha_corte": str(datos.get("fecha_corte", "")),
+        "modo": "paralelo" if parallel else "secuencial",
+        "archivos": [],
+        "errores": [],
+    }
+
+    def _report(step, label):
         if progress_callback:
-            progress_callback(step, total, "Generando reporte nacional...")
+            progress_callback(step, total, label)
+
+    _report(0, "Preparando datos de los departamentos...")
+    jobs = []
+    for depto in deptos:
         try:
-            nac_bytes = generate_nacional_docx(datos)
-            zf.writestr("Ayuda_Memoria_Nacional_SAC.docx", nac_bytes)
+            pdf_datos = departamental_pdf_datos(get_departamento_data(datos, depto))
+            jobs.append((depto, _pdf_filename(depto), (pdf_datos,)))
         except Exception as e:
-            print(f"[batch] Error generando reporte nacional: {e}")
-        step += 1
+            manifest["errores"].append({"reporte": depto, "error": str(e)})
+
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        if parallel:
+            _render_pool(generate_executive_pdf, jobs, zf, manifest, _report, max_workers)
+        else:
+            _render_inline(generate_executive_pdf, jobs, zf, manifest, _report)
+        zf.writestr(MANIFEST_FILENAME, json.dumps(manifest, ensure_ascii=False, indent=2))
+
+    _report(total, "Listo!")
+    return buf.getvalue(), manifest
+
+
+def _pdf_filename(depto):
+    return f"Resumen_Ejecutivo_{depto.replace(' ', '_')}_SAC.pdf"
+
+
+# ---------------------------------------------------------------------------
+# Department bundle (every format for one department)
+# ---------------------------------------------------------------------------
+
+# formato → (manifest label, filename pattern)
+BUNDLE_FORMATOS = {
+    "word": ("Word", "Ayuda_Memoria_{}_SAC.docx"),
+    "ppt_historico": ("PPT histórico", "Historico_SAC_{}.pptx"),
+    "pdf": ("PDF ejecutivo", "Resumen_Ejecutivo_{}_SAC.pdf"),
+    "semaforo": ("Semáforo", "Semaforo_{}_SAC.xlsx"),
+}
+
+
+def generate_departamento_bundle(datos, depto, primas_hist=None, progress_callback=None,
+                                 parallel=True, max_workers=None):
+    """
+    Generates a ZIP with every report of one department: Word ayuda
+    memoria, historical PPT, department-scoped executive PDF and the
+    semáforo Excel filtered to the department, plus manifiesto.json with
+    per-format render times. Returns bytes of the ZIP file.
+    """
+    zip_bytes, _ = build_departamento_bundle(datos, depto, primas_hist, progress_callback,
+                                             parallel=parallel, max_workers=max_workers)
+    return zip_bytes
+
+
+def build_departamento_bundle(datos, depto, primas_hist=None, progress_callback=None,
+                              parallel=True, max_workers=None):
+    """
+    Core of generate_departamento_bundle. Returns (zip_bytes, manifest).
+
+    The department slice (get_departamento_data) is computed once and every
+    format is derived from it: the Word payload, the current-campaign
+    metrics of the historical deck, the PDF KPIs and the semáforo rows.
+    Those small inputs are then rendered concurrently (one worker per
+    format). manifest["tiempos"] has the seconds per format plus
+    "Preparación" (slice + payloads, in this process).
+    """
+    from gen_pdf_resumen import departamental_pdf_datos
+    from gen_ppt_historico import current_campaign_from_depto
+    if primas_hist is None:
+        from data_processor import load_primas_historicas
+        primas_hist = load_primas_historicas()
+
+    total = len(BUNDLE_FORMATOS) + 1
+    manifest = {
+        "generado": datetime.now().isoformat(timespec="seconds"),
+        "fecha_corte": str(datos.get("fecha_corte", "")),
+        "departamento": depto,
+        "modo": "paralelo" if parallel else "secuencial",
+        "archivos": [],
+        "errores": [],
+        "tiempos": {},
+    }
+
+    def _report(step, label):
+        if progress_callback:
+            progress_callback(step, total, label)
+
+    _report(0, f"Preparando datos de {depto.title()}...")
+    t0 = time.perf_counter()
+    depto_data = get_departamento_data(datos, depto)
+    inputs = {
+        "word": lambda: (build_departamental_payload(depto_data),),
+        "ppt_historico": lambda: (depto, current_campaign_from_depto(depto_data), primas_hist),
+        "pdf": lambda: (departamental_pdf_datos(depto_data),),
+        "semaforo": lambda: (depto_data["df_depto"],),
+    }
+    jobs = []
+    for formato, (label, patron) in BUNDLE_FORMATOS.items():
+        try:
+            jobs.append((label, patron.format(depto.replace(" ", "_")),
+                         (formato, *inputs[formato]())))
+        except Exception as e:
+            manifest["errores"].append({"reporte": label, "error": str(e)})
+    manifest["tiempos"]["Preparación"] = round(time.perf_counter() - t0, 3)
+
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        if parallel:
+            _render_pool(_render_formato, jobs, zf, manifest, _report, max_workers, step=1)
+        else:
+            _render_inline(_render_formato, jobs, zf, manifest, _report, step=1)
+        zf.writestr(MANIFEST_FILENAME, json.dumps(manifest, ensure_ascii=False, indent=2))
+
+    _report(total, "Listo!")
+    return buf.getvalue(), manifest
 
-        # --- Departamentales ---
-        for depto in deptos:
-            if progress_callback:
-                progress_callback(step, total, f"Generando reporte: {depto}...")
-            try:
-                depto_data = get_departamento_data(datos, depto)
-                doc_bytes = generate_departamental_docx(depto_data)
-                safe_name = depto.replace(" ", "_")
-                zf.writestr(f"Ayuda_Memoria_{safe_name}_SAC.docx", doc_bytes)
-            except Exception as e:
-                print(f"[batch] Error generando reporte de {depto}: {e}")
-            step += 1
 
-    if progress_callback:
-        progress_callback(total, total, "Listo!")
+def _render_formato(formato, *args):
+    """Renders one bundle format in a worker (module-level: picklable)."""
+    if formato == "word":
+        return render_docx("departamental", *args)
+    if formato == "ppt_historico":
+        from gen_ppt_historico import render_ppt_historico
+        return render_ppt_historico(*args)
+    if formato == "pdf":
+        from gen_pdf_resumen import generate_executive_pdf
+        return generate_executive_pdf(*args)
+    if formato == "semaforo":
+        return _semaforo_excel(*args)
+    raise ValueError(f"formato desconocido: {formato}")
 
-    return buf.getvalue()
+
+def _semaforo_excel(df):
+    from semaforo_alertas import (
+        check_semaforo_columns, compute_semaforo, export_semaforo_excel,
+        get_kpi_summary, get_pipeline_summary,
+    )
+    if df is None or df.empty or not check_semaforo_columns(df):
+        raise ValueError("sin avisos o sin las columnas mínimas del semáforo")
+    df_sem = compute_semaforo(df)
+    return export_semaforo_excel(df_sem, get_pipeline_summary(df_sem), get_kpi_summary(df_sem))
 
 
 # ---------------------------------------------------------------------------
@@ -81,84 +495,51 @@ def render_batch_tab(datos):
     inc_deptos = col2.checkbox("Todos los departamentales", value=True)
     inc_excel = col3.checkbox("Excel consolidado", value=False, disabled=True)
 
-    if st.button("Generar paquete completo"):
-        if not inc_nacional and not inc_deptos:
-            st.warning("Selecciona al menos una opcion.")
-            return
+    if not inc_nacional and not inc_deptos:
+        st.warning("Selecciona al menos una opcion.")
+        return
 
-        progress_bar = st.progress(0)
-        status_text = st.empty()
+    # Filtered datos copy based on checkboxes
+    batch_datos = dict(datos)
+    if not inc_deptos:
+        batch_datos["departamentos_list"] = []
 
-        # Build a filtered datos copy based on checkboxes
-        batch_datos = dict(datos)
-        if not inc_deptos:
-            batch_datos["departamentos_list"] = []
-        if not inc_nacional:
-            # Still iterate departments; nacional step will be skipped below
-            pass
+    # Runs in the shared job queue; progress comes from build_batch_zip
+    from shared.components import report_job_panel
+    from shared.jobs import LISTO, dataset_fingerprint, get_job_queue, job_key
 
-        def _progress(current, total, label):
-            pct = current / total if total else 1.0
-            progress_bar.progress(min(pct, 1.0))
-            status_text.text(label)
+    key = job_key(dataset_fingerprint(datos), "batch_zip",
+                  {"nacional": inc_nacional, "deptos": inc_deptos})
+    ts = datetime.now().strftime("%Y%m%d_%H%M")
+    status = report_job_panel(
+        "batch", key, partial(_batch_zip_job, batch_datos, inc_nacional),
+        "Generar paquete completo", f"Reportes_SAC_{ts}.zip", "application/zip",
+        descarga="Descargar ZIP", progress_kw="progress_callback",
+    )
+    if status and status["estado"] == LISTO:
+        errors = _manifest_errors(get_job_queue().result(key))
+        if errors:
+            st.warning(
+                f"{len(errors)} reporte(s) con error (omitidos): " + "; ".join(errors)
+            )
 
-        try:
-            # --- build zip manually to respect checkboxes ---
-            depto_list = batch_datos.get("departamentos_list", [])
-            total_steps = (1 if inc_nacional else 0) + len(depto_list)
-            step = 0
-            buf = io.BytesIO()
-            errors = []
-
-            with zipfile.ZipFile(buf, "w", compression=zipfile.ZIP_DEFLATED) as zf:
-                if inc_nacional:
-                    _progress(step, total_steps, "Generando reporte nacional...")
-                    try:
-                        zf.writestr(
-                            "Ayuda_Memoria_Nacional_SAC.docx",
-                            generate_nacional_docx(datos),
-                        )
-                    except Exception as e:
-                        errors.append(f"Nacional: {e}")
-                    step += 1
-
-                for depto in depto_list:
-                    _progress(step, total_steps, f"Generando: {depto}...")
-                    try:
-                        d = get_departamento_data(datos, depto)
-                        safe = depto.replace(" ", "_")
-                        zf.writestr(
-                            f"Ayuda_Memoria_{safe}_SAC.docx",
-                            generate_departamental_docx(d),
-                        )
-                    except Exception as e:
-                        errors.append(f"{depto}: {e}")
-                    step += 1
-
-            _progress(total_steps, total_steps, "Listo!")
-            zip_bytes = buf.getvalue()
-
-            ts = datetime.now().strftime("%Y%m%d_%H%M")
-            zip_name = f"Reportes_SAC_{ts}.zip"
-            st.session_state["batch_zip"] = zip_bytes
-            st.session_state["batch_zip_name"] = zip_name
-
-            if errors:
-                st.warning(
-                    f"{len(errors)} reporte(s) con error (omitidos): "
-                    + "; ".join(errors)
-                )
-
-            st.success(f"ZIP generado: **{zip_name}** ({len(zip_bytes)/1024:.0f} KB)")
 
-        except Exception as e:
-            st.error(f"Error inesperado: {e}")
-
-    # Persistent download button
-    if st.session_state.get("batch_zip"):
-        st.download_button(
-            label="Descargar ZIP",
-            data=st.session_state["batch_zip"],
-            file_name=st.session_state.get("batch_zip_name", "reportes.zip"),
-            mime="application/zip",
-        )
+def _batch_zip_job(datos, incluir_nacional, progress_callback=None):
+    zip_bytes, _ = build_batch_zip(datos, progress_callback,
+                                   incluir_nacional=incluir_nacional, parallel=True)
+    return zip_bytes
+
+
+def read_manifest(zip_bytes):
+    """manifiesto.json of a ZIP built here (None if there are no bytes)."""
+    if not zip_bytes:
+        return None
+    with zipfile.ZipFile(io.BytesIO(zip_bytes)) as zf:
+        return json.loads(zf.read(MANIFEST_FILENAME))
+
+
+def _manifest_errors(zip_bytes):
+    manifest = read_manifest(zip_bytes)
+    if manifest is None:
+        return []
+    return [f"{e['reporte']}: {e['error']}" for e in manifest["errores"]]
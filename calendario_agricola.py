@@ -7,8 +7,6 @@ Data source: static_data/calendario_cultivos_historico.json
 Methodology: static_data/METODOLOGIA_DATOS.md
 """
 
-import json
-import os
 from datetime import datetime
 
 import numpy as np
@@ -16,18 +14,15 @@ import pandas as pd
 import plotly.graph_objects as go
 import streamlit as st
 
+from shared import static_assets
 
-# ── Load historical calendar from JSON ─────────────────────────────────────
-_STATIC_DIR = os.path.join(os.path.dirname(__file__), "static_data")
-_CAL_PATH = os.path.join(_STATIC_DIR, "calendario_cultivos_historico.json")
 
-_CALENDARIO_RAW = {}
-if os.path.exists(_CAL_PATH):
-    with open(_CAL_PATH, "r", encoding="utf-8") as f:
-        _CALENDARIO_RAW = json.load(f)
+# ── Historical calendar (static_data JSON, loaded on first use) ───────────
+# The 508 KB JSON used to be parsed at import time; now it is read through
+# shared/static_assets the first time a function needs it.
 
 
-def _build_calendario_cultivos():
+def _build_calendario_cultivos(raw):
     """Convert JSON historical data to the format used by the rest of the module.
 
     Input JSON format (per dept/crop):
@@ -47,7 +42,7 @@ def _build_calendario_cultivos():
         - meses_riesgo: from avisos.meses_riesgo (when events occurred)
     """
     cal = {}
-    for dept, crops in _CALENDARIO_RAW.items():
+    for dept, crops in raw.items():
         cal[dept] = {}
         for cult, layers in crops.items():
             avisos = layers.get("avisos", {})
@@ -77,7 +72,20 @@ def _build_calendario_cultivos():
     return cal
 
 
-CALENDARIO_CULTIVOS = _build_calendario_cultivos()
+def calendario_cultivos():
+    """Calendar {dept: {crop: entry}}, built once per process on first access.
+
+    Cached in shared/static_assets, so static_assets.limpiar() refreshes it.
+    """
+    return static_assets.derivado("calendario_cultivos", _build_calendario_cultivos)
+
+
+def __getattr__(name):
+    # Legacy module attribute, kept lazy
+    if name == "CALENDARIO_CULTIVOS":
+        return calendario_cultivos()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 MONTH_NAMES = ["Ene", "Feb", "Mar", "Abr", "May", "Jun",
                "Jul", "Ago", "Sep", "Oct", "Nov", "Dic"]
@@ -108,7 +116,7 @@ def _normalize_dept(name):
 
 def get_department_list():
     """Return sorted list of departments available in the calendar."""
-    return sorted(CALENDARIO_CULTIVOS.keys())
+    return sorted(calendario_cultivos().keys())
 
 
 def get_current_risk_crops(depto, month=None):
@@ -136,7 +144,7 @@ def get_current_risk_crops(depto, month=None):
         month = datetime.now().month
 
     depto = _normalize_dept(depto)
-    crops = CALENDARIO_CULTIVOS.get(depto, {})
+    crops = calendario_cultivos().get(depto, {})
 
     at_risk = []
     for crop_name, info in crops.items():
@@ -176,7 +184,7 @@ def generate_calendar_chart(depto):
     plotly.graph_objects.Figure or None
     """
     depto = _normalize_dept(depto)
-    crops = CALENDARIO_CULTIVOS.get(depto)
+    crops = calendario_cultivos().get(depto)
     if not crops:
         return None
 
@@ -343,7 +351,7 @@ def _cross_reference_siniestros(datos, depto):
     if df_dept.empty:
         return pd.DataFrame()
 
-    calendar_crops = CALENDARIO_CULTIVOS.get(depto, {})
+    calendar_crops = calendario_cultivos().get(depto, {})
 
     # Group by cultivo and siniestro type
     group_cols = []
@@ -414,7 +422,7 @@ def render_calendario_tab(datos):
     # Normalize for matching with calendar keys
     dept_list_normalized = sorted(set(
         _normalize_dept(d) for d in dept_list
-        if _normalize_dept(d) in CALENDARIO_CULTIVOS
+        if _normalize_dept(d) in calendario_cultivos()
     ))
 
     if not dept_list_normalized:
@@ -10,7 +10,6 @@ Fallback automático a nivel departamental si no hay datos distritales.
 """
 
 import json
-import os
 import time
 import urllib.request
 import urllib.error
@@ -22,6 +21,8 @@ import plotly.graph_objects as go
 import streamlit as st
 
 from gen_mapa_calor import DEPT_COORDS, _jitter_coords
+from shared import static_assets
+from shared.geo import coords_distrito
 from calendario_agricola import get_current_risk_crops
 from data_processor import LLUVIA_TYPES
 
@@ -30,13 +31,8 @@ from data_processor import LLUVIA_TYPES
 # Ver METODOLOGIA_DATOS.md para detalles de normalizacion
 # ═══════════════════════════════════════════════════════════════════
 
-_STATIC_DIR = os.path.join(os.path.dirname(__file__), "static_data")
-_PERFIL_PATH = os.path.join(_STATIC_DIR, "perfil_riesgo_distrital.json")
-
-_PERFIL_DISTRITAL = {}
-if os.path.exists(_PERFIL_PATH):
-    with open(_PERFIL_PATH, "r", encoding="utf-8") as f:
-        _PERFIL_DISTRITAL = json.load(f)
+# perfil_riesgo_distrital.json (1.5 MB) se lee en la primera consulta vía
+# shared/static_assets, no al importar el módulo.
 
 
 def _get_district_historical_profile(dept, prov=None, dist=None):
@@ -48,7 +44,7 @@ def _get_district_historical_profile(dept, prov=None, dist=None):
     """
     if dist and prov:
         key = f"{dept}|{prov}|{dist}"
-        profile = _PERFIL_DISTRITAL.get(key, {})
+        profile = static_assets.cargar("perfil_riesgo_distrital").get(key, {})
         # Prefer indemnizados (certified), fallback to avisos (general)
         layer = profile.get("indemnizados", profile.get("avisos", {}))
         if layer:
@@ -131,7 +127,12 @@ def _clamp(val, vmin, vmax):
 
 @st.cache_data(ttl=None, show_spinner=False)
 def _build_district_coords(_df_hash: str, districts: tuple) -> dict:
-    """Genera coordenadas aproximadas para cada distrito.
+    """Coordenadas de cada distrito para el Grid-Snap.
+
+    Usa el centroide real del índice precomputado (shared/geo.py), así el
+    distrito cae en su celda de 0.25° y los distritos vecinos comparten una
+    sola consulta a la API. Solo los distritos que no están en el índice
+    reciben una posición aproximada (jitter desde el centroide del depto).
 
     Args:
         _df_hash: hash para cache invalidation
@@ -145,11 +146,13 @@ def _build_district_coords(_df_hash: str, districts: tuple) -> dict:
         base = DEPT_COORDS.get(dept)
         if not base:
             continue
-        spread = DEPT_SPREAD.get(dept, 0.8)
-        key_str = f"{dept}_{prov}_{dist}"
-        lat, lon = _jitter_coords(key_str, base[0], base[1], spread=spread)
-        lat = _clamp(lat, PERU_LAT_MIN, PERU_LAT_MAX)
-        lon = _clamp(lon, PERU_LON_MIN, PERU_LON_MAX)
+        c = coords_distrito(dept, prov, dist)
+        if c is None:
+            spread = DEPT_SPREAD.get(dept, 0.8)
+            key_str = f"{dept}_{prov}_{dist}"
+            c = _jitter_coords(key_str, base[0], base[1], spread=spread)
+        lat = _clamp(c[0], PERU_LAT_MIN, PERU_LAT_MAX)
+        lon = _clamp(c[1], PERU_LON_MIN, PERU_LON_MAX)
         coords[(dept, prov, dist)] = (round(lat, 4), round(lon, 4))
     return coords
 
@@ -16,10 +16,13 @@ Metodología (toda en hectáreas; monto = ha × S/1000, tasa 2026):
 import os
 import json
 import unicodedata
+from functools import lru_cache
 
 import pandas as pd
 import streamlit as st
 
+from shared.geo import load_sector_geojson
+
 
 def _keynorm(*parts):
     out = []
@@ -64,13 +67,29 @@ def _load_sector_metrics():
         return json.load(f)
 
 
-@_cache(show_spinner=False)
-def _load_dep_geojson(fname):
-    path = os.path.join(os.path.dirname(__file__), "static_data", "sectores", fname)
-    if not os.path.exists(path):
+@lru_cache(maxsize=32)
+def _sector_layer(fname):
+    """(filas, GeoJSON liviano) del mapa de sectores de un departamento.
+
+    La geometría sale de shared/geo.py (TopoJSON simplificado y cuantizado,
+    nivel elegido según la extensión del departamento). Al navegador solo
+    viaja la propiedad `key`; los nombres van en las filas del DataFrame.
+    Cacheado por proceso: cambiar de departamento no relee ni decodifica.
+    """
+    gj = load_sector_geojson(fname)
+    if gj is None:
         return None
-    with open(path, encoding="utf-8") as f:
-        return json.load(f)
+    metrics = _load_sector_metrics()
+    rows, feats = [], []
+    for f in gj["features"]:
+        k = f["properties"].get("key", "")
+        m = metrics.get(k)
+        rows.append({"key": k, "Sector": f["properties"].get("NOM_SE", "").title(),
+                     "Distrito": f["properties"].get("NOMBDIST", "").title(),
+                     "ha": m["ha"] if m else 0, "avisos": m["avisos"] if m else 0})
+        feats.append({"type": "Feature", "properties": {"key": k},
+                      "geometry": f["geometry"]})
+    return rows, {"type": "FeatureCollection", "features": feats}
 
 
 def _M(v):
@@ -177,36 +196,16 @@ def _geojson_disponible():
 
 def _choropleth(d):
     try:
-        import plotly.express as px
-        from gen_mapa_coropleta import _load_geojson, _normalize_dept
+        from gen_mapa_coropleta import choropleth_figure
     except Exception:
         return
-    gj = _load_geojson()
-    if gj is None:
+    deps = [x["departamento"] for x in d["por_departamento"]]
+    vals = [x["siniestralidad"] or 0 for x in d["por_departamento"]]
+    fig = choropleth_figure(deps, vals, color_scale="YlOrRd",
+                            colorbar_title="Siniestr. %", value_label="Siniestralidad %",
+                            value_format=".1f", height=560, margin_top=10)
+    if fig is None:
         return
-    rows = [{"DEPARTAMENTO": _normalize_dept(x["departamento"]),
-             "siniestralidad": x["siniestralidad"] or 0,
-             "monto": x["monto_envolvente"]} for x in d["por_departamento"]]
-    dfm = pd.DataFrame(rows)
-    prop = None
-    fp = gj["features"][0]["properties"] if gj["features"] else {}
-    for k in ["DEPARTAMEN", "NOMBDEP", "DEPARTAMENTO", "NAME_1", "name"]:
-        if k in fp:
-            prop = k
-            break
-    for feat in gj["features"]:
-        feat["properties"]["_m"] = _normalize_dept(feat["properties"].get(prop, ""))
-    fig = px.choropleth(
-        dfm, geojson=gj, locations="DEPARTAMENTO", featureidkey="properties._m",
-        color="siniestralidad", color_continuous_scale="YlOrRd",
-        hover_name="DEPARTAMENTO",
-        hover_data={"siniestralidad": ":.1f", "DEPARTAMENTO": False},
-        labels={"siniestralidad": "Siniestralidad %"},
-    )
-    fig.update_geos(fitbounds="locations", visible=False, bgcolor="rgba(0,0,0,0)")
-    fig.update_layout(margin=dict(l=0, r=0, t=10, b=0), height=560,
-                      paper_bgcolor="rgba(0,0,0,0)",
-                      coloraxis_colorbar=dict(title="Siniestr. %", thickness=14, len=0.7))
     st.plotly_chart(fig, use_container_width=True, key="esc_choropleth")
     st.caption("Siniestralidad = hectáreas indemnizadas (envolvente histórica) ÷ superficie asegurada 2025-2026.")
 
@@ -283,18 +282,11 @@ def _mapa_sector(d):
     sel = st.selectbox("Departamento", deps, index=default, key="esc_sec_dep",
                        format_func=lambda s: s.title())
     fname = _keynorm(sel).replace(" ", "_") + ".geojson"
-    gj = _load_dep_geojson(fname)
-    if gj is None:
+    layer = _sector_layer(fname)
+    if layer is None:
         st.info("Sin geometría de sectores para este departamento.")
         return
-    metrics = _load_sector_metrics()
-    rows = []
-    for f in gj["features"]:
-        k = f["properties"].get("key", "")
-        m = metrics.get(k)
-        rows.append({"key": k, "Sector": f["properties"].get("NOM_SE", "").title(),
-                     "Distrito": f["properties"].get("NOMBDIST", "").title(),
-                     "ha": m["ha"] if m else 0, "avisos": m["avisos"] if m else 0})
+    rows, gj = layer
     dfm = pd.DataFrame(rows)
     con_datos = int((dfm["ha"] > 0).sum())
     fig = px.choropleth(
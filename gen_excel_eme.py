@@ -4,10 +4,12 @@ Replica la estructura del archivo formato_reporte_EME.
 """
 
 import io
+from functools import lru_cache
+
 import pandas as pd
 import numpy as np
-from openpyxl import Workbook
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
+from openpyxl import Workbook, load_workbook
+from openpyxl.styles import Font, PatternFill, Alignment, Border, Side, NamedStyle
 from openpyxl.utils import get_column_letter
 
 
@@ -20,9 +22,13 @@ def _fmt_num(val, decimals=2):
         return 0
 
 
-def generate_reporte_eme(datos):
+def generate_reporte_eme(datos, nivel="region"):
     """
     Genera el Excel del reporte EME (formato_reporte_EME).
+
+    nivel="region": DISTRITOS resume cuántos distritos hay por provincia.
+    nivel="distrito": DISTRITOS lista los distritos de cada provincia
+    (variante para eventos El Niño, con detalle distrital).
     Retorna bytes del archivo .xlsx.
     """
     midagri = datos["midagri"]
@@ -39,14 +45,8 @@ def generate_reporte_eme(datos):
 
     # Distritos por departamento
     if "DISTRITO" in midagri.columns and "PROVINCIA" in midagri.columns:
-        # include_groups=False: pandas>=2.2 deprecó que apply opere sobre la
-        # columna de agrupación. _build_district_text solo usa PROVINCIA/DISTRITO
-        # (no DEPARTAMENTO), así que excluirla no cambia el resultado.
-        dist_info = midagri.groupby("DEPARTAMENTO").apply(
-            lambda g: _build_district_text(g), include_groups=False
-        ).reset_index()
-        dist_info.columns = ["DEPARTAMENTO", "DISTRITOS"]
-        dept_data = dept_data.merge(dist_info, on="DEPARTAMENTO", how="left")
+        textos = _district_names(midagri) if nivel == "distrito" else _district_text(midagri)
+        dept_data["DISTRITOS"] = dept_data["DEPARTAMENTO"].map(textos).fillna("")
     else:
         dept_data["DISTRITOS"] = ""
 
@@ -58,60 +58,20 @@ def generate_reporte_eme(datos):
 
     # Tipo siniestro predominante por departamento
     if "TIPO_SINIESTRO" in midagri.columns:
-        tipo_dict = {}
-        for depto_name, group in midagri.groupby("DEPARTAMENTO"):
-            tipo_dict[depto_name] = group["TIPO_SINIESTRO"].value_counts().head(3).to_dict()
-        tipo_info = pd.DataFrame([
-            {"DEPARTAMENTO": k, "TOP_SINIESTROS": v} for k, v in tipo_dict.items()
-        ])
+        tipo_info = _top_siniestros(midagri).rename("TOP_SINIESTROS").reset_index()
     else:
         tipo_info = pd.DataFrame(columns=["DEPARTAMENTO", "TOP_SINIESTROS"])
 
     dept_data = dept_data.merge(tipo_info, on="DEPARTAMENTO", how="left")
 
-    # ═══ Crear Workbook ═══
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Hoja1"
-
-    # Estilos
-    header_font = Font(name="Calibri", bold=True, size=10, color="FFFFFF")
-    header_fill = PatternFill(start_color="1F4E79", end_color="1F4E79", fill_type="solid")
-    data_font = Font(name="Calibri", size=9)
-    number_format_soles = '#,##0.00'
-    number_format_int = '#,##0'
-    thin_border = Border(
-        left=Side(style="thin"),
-        right=Side(style="thin"),
-        top=Side(style="thin"),
-        bottom=Side(style="thin"),
-    )
-
-    # Headers
-    headers = [
-        "REGIÓN",
-        "DISTRITOS",
-        "BENEFICIARIOS",
-        "ACCIÓN IMPLEMENTADA\n- MONTO DESEMBOLSADO",
-        "ACCION EN IMPLEMENTACIÓN\n - MONTO INDEMNIZADO ",
-        "ACCION POR IMPLEMENTAR - PRIMA TOTAL",
-        "DESCRIPCIÓN",
-        "UNIDAD RESPONSABLE",
-        "CUANTIFICACIÓN/ TOTAL - HAS INDEMNIZADAS",
-        "OBSERVACIONES",
-    ]
-
-    for col_idx, header in enumerate(headers, 1):
-        cell = ws.cell(row=1, column=col_idx, value=header)
-        cell.font = header_font
-        cell.fill = header_fill
-        cell.alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
-        cell.border = thin_border
+    # ═══ Workbook desde la plantilla (encabezados, anchos y estilos ya definidos) ═══
+    wb = load_workbook(io.BytesIO(_template_bytes()))
+    ws = wb["Hoja1"]
 
     # Data rows
     dept_data = dept_data.sort_values("DEPARTAMENTO")
 
-    for row_idx, (_, row) in enumerate(dept_data.iterrows(), 2):
+    for row_idx, row in enumerate(dept_data.to_dict("records"), 2):
         depto = row["DEPARTAMENTO"]
         depto_upper = depto.strip().upper()
 
@@ -154,27 +114,8 @@ def generate_reporte_eme(datos):
             obs,
         ]
 
-        for col_idx, val in enumerate(values, 1):
-            cell = ws.cell(row=row_idx, column=col_idx, value=val)
-            cell.font = data_font
-            cell.border = thin_border
-            cell.alignment = Alignment(wrap_text=True, vertical="top")
-
-            # Formato numérico
-            if col_idx in [3]:
-                cell.number_format = number_format_int
-                cell.alignment = Alignment(horizontal="right", vertical="top")
-            elif col_idx in [4, 5, 6, 9]:
-                cell.number_format = number_format_soles
-                cell.alignment = Alignment(horizontal="right", vertical="top")
-
-    # Anchos de columna
-    col_widths = [15, 50, 13, 18, 18, 18, 50, 18, 18, 40]
-    for i, w in enumerate(col_widths, 1):
-        ws.column_dimensions[get_column_letter(i)].width = w
-
-    # Altura de fila header
-    ws.row_dimensions[1].height = 40
+        for col_idx, (val, style) in enumerate(zip(values, _ESTILOS_COLUMNA), 1):
+            ws.cell(row=row_idx, column=col_idx, value=val).style = style
 
     # Guardar
     buffer = io.BytesIO()
@@ -183,15 +124,112 @@ def generate_reporte_eme(datos):
     return buffer.getvalue()
 
 
-def _build_district_text(group):
-    """Construye texto resumen de distritos por provincia."""
-    try:
-        prov_dist = group.groupby("PROVINCIA")["DISTRITO"].nunique()
-        parts = []
-        for prov, n in prov_dist.sort_values(ascending=False).items():
-            parts.append(f"{str(prov).title()} ({n})")
-        n_dist = group["DISTRITO"].nunique()
-        n_prov = group["PROVINCIA"].nunique()
-        return f"{n_dist} distritos en {n_prov} provincias: {', '.join(parts)}"
-    except Exception:
-        return ""
+# ═══ Plantilla ═══
+# Encabezados, anchos y estilos con nombre se arman una vez por proceso; cada
+# reporte abre una copia y asigna a cada celda un estilo ya registrado (una
+# asignación en vez de fuente + borde + alineación + formato por celda).
+
+HEADERS = [
+    "REGIÓN",
+    "DISTRITOS",
+    "BENEFICIARIOS",
+    "ACCIÓN IMPLEMENTADA\n- MONTO DESEMBOLSADO",
+    "ACCION EN IMPLEMENTACIÓN\n - MONTO INDEMNIZADO ",
+    "ACCION POR IMPLEMENTAR - PRIMA TOTAL",
+    "DESCRIPCIÓN",
+    "UNIDAD RESPONSABLE",
+    "CUANTIFICACIÓN/ TOTAL - HAS INDEMNIZADAS",
+    "OBSERVACIONES",
+]
+COL_WIDTHS = [15, 50, 13, 18, 18, 18, 50, 18, 18, 40]
+
+# Estilo de cada columna de datos: 3 = entero, 4/5/6/9 = soles, resto texto
+_ESTILOS_COLUMNA = ["eme_texto", "eme_texto", "eme_entero", "eme_soles", "eme_soles",
+                    "eme_soles", "eme_texto", "eme_texto", "eme_soles", "eme_texto"]
+
+
+def _named_styles():
+    thin = Side(style="thin")
+    border = Border(left=thin, right=thin, top=thin, bottom=thin)
+    data_font = Font(name="Calibri", size=9)
+    numero = Alignment(horizontal="right", vertical="top")
+    return [
+        NamedStyle("eme_header", font=Font(name="Calibri", bold=True, size=10, color="FFFFFF"),
+                   fill=PatternFill(start_color="1F4E79", end_color="1F4E79", fill_type="solid"),
+                   alignment=Alignment(horizontal="center", vertical="center", wrap_text=True),
+                   border=border),
+        NamedStyle("eme_texto", font=data_font, border=border,
+                   alignment=Alignment(wrap_text=True, vertical="top")),
+        NamedStyle("eme_entero", font=data_font, border=border, alignment=numero,
+                   number_format="#,##0"),
+        NamedStyle("eme_soles", font=data_font, border=border, alignment=numero,
+                   number_format="#,##0.00"),
+    ]
+
+
+@lru_cache(maxsize=1)
+def _template_bytes():
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "Hoja1"
+    for style in _named_styles():
+        wb.add_named_style(style)
+    for col_idx, header in enumerate(HEADERS, 1):
+        ws.cell(row=1, column=col_idx, value=header).style = "eme_header"
+    for i, w in enumerate(COL_WIDTHS, 1):
+        ws.column_dimensions[get_column_letter(i)].width = w
+    ws.row_dimensions[1].height = 40
+    buf = io.BytesIO()
+    wb.save(buf)
+    return buf.getvalue()
+
+
+# ═══ Agregaciones por departamento (una pasada sobre midagri) ═══
+
+def _prov_dist(midagri):
+    """Distritos únicos por (DEPARTAMENTO, PROVINCIA), ordenados por departamento,
+    cantidad de distritos (desc.) y provincia (empates por nombre)."""
+    pares = midagri[["DEPARTAMENTO", "PROVINCIA", "DISTRITO"]]
+    n = pares.groupby(["DEPARTAMENTO", "PROVINCIA"])["DISTRITO"].nunique().rename("N").reset_index()
+    return n.sort_values(["DEPARTAMENTO", "N"], ascending=[True, False], kind="stable")
+
+
+def _district_text(midagri):
+    """"N distritos en M provincias: Prov (n), ..." por departamento (Series)."""
+    por_prov = _prov_dist(midagri)
+    partes = (por_prov["PROVINCIA"].astype(str).str.title()
+              + " (" + por_prov["N"].astype(str) + ")")
+    partes = partes.groupby(por_prov["DEPARTAMENTO"], sort=False).agg(", ".join)
+    g = midagri.groupby("DEPARTAMENTO")
+    n_dist = g["DISTRITO"].nunique()
+    n_prov = g["PROVINCIA"].nunique()
+    partes = partes.reindex(n_dist.index).fillna("")
+    return (n_dist.astype(str) + " distritos en " + n_prov.astype(str)
+            + " provincias: " + partes)
+
+
+def _district_names(midagri):
+    """"Prov: Dist1, Dist2; Prov2: ..." por departamento (variante distrital)."""
+    orden = _prov_dist(midagri)[["DEPARTAMENTO", "PROVINCIA"]]
+    pares = (midagri[["DEPARTAMENTO", "PROVINCIA", "DISTRITO"]].dropna()
+             .drop_duplicates()
+             .sort_values(["DEPARTAMENTO", "PROVINCIA", "DISTRITO"], kind="stable"))
+    dist = (pares["DISTRITO"].astype(str).str.title()
+            .groupby([pares["DEPARTAMENTO"], pares["PROVINCIA"]], sort=False).agg(", ".join)
+            .rename("DISTRITOS").reset_index())
+    por_prov = orden.merge(dist, on=["DEPARTAMENTO", "PROVINCIA"])
+    texto = por_prov["PROVINCIA"].astype(str).str.title() + ": " + por_prov["DISTRITOS"]
+    return texto.groupby(por_prov["DEPARTAMENTO"], sort=False).agg("; ".join)
+
+
+def _top_siniestros(midagri):
+    """{tipo: avisos} de los 3 tipos de siniestro más frecuentes por departamento
+    (empates en orden de aparición, como value_counts)."""
+    conteo = (midagri.groupby(["DEPARTAMENTO", "TIPO_SINIESTRO"], sort=False)
+              .size().rename("N").reset_index())
+    conteo = conteo.sort_values(["DEPARTAMENTO", "N"], ascending=[True, False], kind="stable")
+    top = conteo.groupby("DEPARTAMENTO", sort=False).head(3)
+    out = {}
+    for depto, tipo, n in top.itertuples(index=False, name=None):
+        out.setdefault(depto, {})[tipo] = int(n)
+    return pd.Series(out, dtype=object).rename_axis("DEPARTAMENTO")
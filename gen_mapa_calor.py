@@ -7,10 +7,14 @@ provincial y distrital, con métricas SAC coloreadas por intensidad.
 Usa plotly scatter_mapbox (OpenStreetMap) para el mapa interactivo.
 """
 
+import zlib
+
 import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
 
+from shared.geo import coords_distrito, coords_provincia
+
 try:
     import streamlit as st
     _cache_data = st.cache_data
@@ -152,13 +156,18 @@ def get_metricas_for_nivel(nivel_key):
 # COORDENADAS APROXIMADAS POR PROVINCIA/DISTRITO
 # ═══════════════════════════════════════════════════════════════════
 
-# Para provincias y distritos generamos coordenadas a partir del
-# centroide del departamento + un pequeño jitter determinístico.
-# Esto evita que todos los puntos del mismo departamento se apilen.
+# Provincias y distritos usan el centroide real de shared/geo.py. Para las
+# unidades que no están en el índice (nombres no reconocidos) se genera una
+# posición a partir del centroide del departamento + un pequeño jitter, así
+# no se apilan todas en el mismo punto.
 
 def _jitter_coords(name_str, base_lat, base_lon, spread=0.35):
-    """Genera coordenadas con dispersión determinística basada en el nombre."""
-    h = hash(name_str) % 10000
+    """Genera coordenadas con dispersión determinística basada en el nombre.
+
+    Usa crc32 (estable entre procesos); hash() de str cambia con cada
+    arranque por PYTHONHASHSEED y movía los puntos entre reinicios.
+    """
+    h = zlib.crc32(str(name_str).encode("utf-8")) % 10000
     dlat = (h % 100 - 50) / 50.0 * spread
     dlon = ((h // 100) % 100 - 50) / 50.0 * spread
     return base_lat + dlat, base_lon + dlon
@@ -229,9 +238,13 @@ def _build_metrics_impl(datos, nivel_key="Departamental", depto_filter=None):
             df["_PROD_BENEF"] = df["_PROD_BENEF"].where(_ind > 0, 0)
         agg_dict["productores"] = ("_PROD_BENEF", "sum")
 
-    # Para provincial/distrital, incluir departamento como contexto
+    # Para provincial/distrital, incluir departamento como contexto (y la
+    # provincia en distrital: hay distritos homónimos dentro de un depto y
+    # la provincia es parte de la clave del centroide)
     if nivel_key != "Departamental" and "DEPARTAMENTO" in df.columns:
         group_cols = ["DEPARTAMENTO", group_col]
+        if nivel_key == "Distrital" and "PROVINCIA" in df.columns:
+            group_cols = ["DEPARTAMENTO", "PROVINCIA", group_col]
     else:
         group_cols = [group_col]
 
@@ -294,20 +307,26 @@ def _build_metrics_impl(datos, nivel_key="Departamental", depto_filter=None):
         agg["lon"] = agg["DEPARTAMENTO"].map(lambda d: DEPT_COORDS.get(d, (-10, -75))[1])
         agg["nombre"] = agg["DEPARTAMENTO"].str.title()
     else:
-        # Provincial / Distrital: jitter desde centroide del departamento
-        lats, lons, nombres = [], [], []
-        for _, row in agg.iterrows():
-            depto = row.get("DEPARTAMENTO", "LIMA")
-            base_lat, base_lon = DEPT_COORDS.get(depto, (-10, -75))
-            entity_name = str(row[group_col])
-            jlat, jlon = _jitter_coords(entity_name, base_lat, base_lon,
-                                         spread=0.30 if nivel_key == "Provincial" else 0.45)
-            lats.append(jlat)
-            lons.append(jlon)
-            nombres.append(entity_name.title())
+        # Provincial / Distrital: centroide real desde el índice precomputado
+        # (shared/geo.py); jitter desde el centroide del depto solo si la
+        # unidad no está indexada.
+        deptos = agg["DEPARTAMENTO"] if "DEPARTAMENTO" in agg.columns else pd.Series("LIMA", index=agg.index)
+        provs = agg["PROVINCIA"] if "PROVINCIA" in agg.columns else pd.Series(None, index=agg.index)
+        spread = 0.30 if nivel_key == "Provincial" else 0.45
+        lats, lons = [], []
+        for depto, prov, entity_name in zip(deptos, provs, agg[group_col].astype(str)):
+            if nivel_key == "Provincial":
+                c = coords_provincia(depto, entity_name)
+            else:
+                c = coords_distrito(depto, prov, entity_name)
+            if c is None:
+                base_lat, base_lon = DEPT_COORDS.get(depto, (-10, -75))
+                c = _jitter_coords(entity_name, base_lat, base_lon, spread=spread)
+            lats.append(c[0])
+            lons.append(c[1])
         agg["lat"] = lats
         agg["lon"] = lons
-        agg["nombre"] = nombres
+        agg["nombre"] = agg[group_col].astype(str).str.title()
 
     return agg
 
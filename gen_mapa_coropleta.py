@@ -3,13 +3,16 @@ Choropleth map of Peru departments for SAC agricultural insurance metrics.
 Renders an interactive Plotly map and optional Streamlit UI tab.
 """
 
-import json
 import os
+from functools import lru_cache
+
 import numpy as np
 import pandas as pd
-import plotly.express as px
+import plotly.graph_objects as go
 import streamlit as st
 
+from shared.geo import load_departamentos_geojson
+
 
 # ── Metric definitions ─────────────────────────────────────────────────────
 METRIC_OPTIONS = {
@@ -69,12 +72,82 @@ def _normalize_dept(name):
 
 
 def _load_geojson():
-    """Load Peru department boundaries GeoJSON."""
-    path = os.path.join(os.path.dirname(__file__), "static_data", "peru_departamentos.geojson")
-    if not os.path.exists(path):
+    """Peru department boundaries (pre-simplified, cached per process).
+
+    Each feature carries ``id`` = normalized department name, so figures use
+    the default featureidkey and never mutate the shared object.
+    """
+    return _base_geojson()
+
+
+@lru_cache(maxsize=1)
+def _base_geojson():
+    gj = load_departamentos_geojson()
+    if gj is None:
+        return None
+    feat_props = gj["features"][0]["properties"] if gj["features"] else {}
+    dept_prop = next((k for k in ["DEPARTAMEN", "NOMBDEP", "DEPARTAMENTO", "NAME_1", "name"]
+                      if k in feat_props), None)
+    if dept_prop is None:
+        dept_prop = list(feat_props.keys())[0] if feat_props else "DEPARTAMEN"
+    features = [{"type": "Feature", "id": _normalize_dept(f["properties"].get(dept_prop, "")),
+                 "properties": {}, "geometry": f["geometry"]}
+                for f in gj["features"] if f.get("geometry")]
+    return {"type": "FeatureCollection", "features": features}
+
+
+@lru_cache(maxsize=1)
+def _base_figure():
+    """Trace style + geo layout, built (and validated by plotly) once.
+
+    The GeoJSON is not stored in the figure: copying a figure deep-copies
+    its traces, so choropleth_figure attaches the shared GeoJSON to each
+    copy instead.
+    """
+    gj = _base_geojson()
+    if gj is None:
+        return None
+    ids = [f["id"] for f in gj["features"]]
+    fig = go.Figure(go.Choropleth(
+        locations=ids, z=[0] * len(ids),
+        marker_line_width=0.6, marker_line_color="#ffffff",
+    ))
+    fig.update_geos(fitbounds="locations", visible=False, bgcolor="rgba(0,0,0,0)")
+    fig.update_layout(paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)")
+    return fig
+
+
+def choropleth_figure(locations, z, color_scale="YlOrRd", colorbar_title="",
+                      value_label=None, value_format=",.1f", height=600,
+                      title=None, margin_top=40):
+    """Department choropleth reusing the cached base layer.
+
+    Only the data-bearing attributes (locations, z, colour scale, colorbar
+    and hover) change between metrics. The base figure (without geometry)
+    is copied and the cached GeoJSON is attached by reference, so it is
+    neither deep-copied nor re-validated; callers must not mutate it.
+
+    Returns None if the GeoJSON is not available.
+    """
+    base = _base_figure()
+    if base is None:
         return None
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
+    fig = go.Figure(base)
+    label = value_label or colorbar_title
+    fig.update_traces(
+        geojson=_base_geojson(),
+        locations=[_normalize_dept(x) for x in locations],
+        z=list(z),
+        colorscale=color_scale,
+        colorbar=dict(title=colorbar_title, thickness=15, len=0.7),
+        hovertemplate=f"<b>%{{location}}</b><br>{label}: %{{z:{value_format}}}<extra></extra>",
+    )
+    fig.update_layout(
+        height=height,
+        margin=dict(l=0, r=0, t=margin_top, b=0),
+        title=title,
+    )
+    return fig
 
 
 def _find_column(df, candidates):
@@ -164,10 +237,6 @@ def generate_choropleth(datos, metric_key="avisos"):
     plotly.graph_objects.Figure or None
         None if GeoJSON is not available.
     """
-    geojson = _load_geojson()
-    if geojson is None:
-        return None
-
     dept_df = _build_dept_metrics(datos)
     if dept_df.empty:
         return None
@@ -178,57 +247,15 @@ def generate_choropleth(datos, metric_key="avisos"):
     if metric_key not in dept_df.columns:
         return None
 
-    # Detect GeoJSON property for department name
-    feat_props = geojson["features"][0]["properties"] if geojson["features"] else {}
-    dept_prop = None
-    for key in ["DEPARTAMEN", "NOMBDEP", "DEPARTAMENTO", "NAME_1", "name"]:
-        if key in feat_props:
-            dept_prop = key
-            break
-    if dept_prop is None:
-        dept_prop = list(feat_props.keys())[0] if feat_props else "DEPARTAMEN"
-
-    # Normalize GeoJSON names for matching
-    for feat in geojson["features"]:
-        original = feat["properties"].get(dept_prop, "")
-        feat["properties"]["_dept_match"] = _normalize_dept(original)
-
-    fig = px.choropleth(
-        dept_df,
-        geojson=geojson,
-        locations="DEPARTAMENTO",
-        featureidkey="properties._dept_match",
-        color=metric_key,
-        color_continuous_scale=metric_info["color_scale"],
-        hover_name="DEPARTAMENTO",
-        hover_data={
-            metric_key: f":{metric_info['format']}",
-            "DEPARTAMENTO": False,
-        },
-        labels={metric_key: metric_info["label"]},
-        title=f"{metric_info['label']} por Departamento",
-    )
-
-    fig.update_geos(
-        fitbounds="locations",
-        visible=False,
-        bgcolor="rgba(0,0,0,0)",
-    )
-
-    fig.update_layout(
-        margin=dict(l=0, r=0, t=40, b=0),
+    return choropleth_figure(
+        dept_df["DEPARTAMENTO"], dept_df[metric_key],
+        color_scale=metric_info["color_scale"],
+        colorbar_title=metric_info["label"],
+        value_format=metric_info["format"],
         height=600,
-        coloraxis_colorbar=dict(
-            title=metric_info["label"],
-            thickness=15,
-            len=0.7,
-        ),
-        paper_bgcolor="rgba(0,0,0,0)",
-        plot_bgcolor="rgba(0,0,0,0)",
+        title=f"{metric_info['label']} por Departamento",
     )
 
-    return fig
-
 
 def render_choropleth_tab(datos):
     """Render Streamlit UI for the choropleth map tab.
@@ -2,13 +2,22 @@
 gen_pdf_resumen.py — Generador de PDF ejecutivo para el Seguro Agrícola Catastrófico
 Produce un resumen de 1-2 páginas con KPIs, tablas y gráficos embebidos.
 Requiere: fpdf2, matplotlib
+
+Lo que no depende del documento se prepara una vez por proceso: el PNG del
+gráfico se cachea por contenido (shared.chart_cache), la imagen ya
+decodificada y comprimida por fpdf2 por PNG (_png_info) y las
+observaciones por valores de entrada (_observations). Con eso cada PDF es
+sólo layout de FPDF, y batch_reports.build_pdf_zip arma los 24
+departamentales en una pasada. Las fuentes son las core de PDF
+(Helvetica): no hay nada que registrar.
 """
 
+import hashlib
 import io
 from datetime import datetime
+from functools import lru_cache
 
-import matplotlib
-matplotlib.use("Agg")
+from shared.chart_cache import cached_png  # fija el backend Agg antes de pyplot
 import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
@@ -65,7 +74,8 @@ def _fmt_number(value, prefix="", suffix="", decimals=0):
 def _create_pie_chart_png(siniestros_por_tipo):
     """Create a pie chart PNG in memory from siniestros_por_tipo Series.
 
-    Returns bytes of the PNG image, or None if no data.
+    Returns bytes of the PNG image, or None if no data. The PNG is cached by
+    content (shared.chart_cache), so identical data is drawn only once.
     """
     if siniestros_por_tipo is None or len(siniestros_por_tipo) == 0:
         return None
@@ -79,6 +89,11 @@ def _create_pie_chart_png(siniestros_por_tipo):
     else:
         data = siniestros_por_tipo
 
+    return cached_png({"chart": "pie_siniestros", "dpi": 150}, (data,),
+                      lambda: _render_pie_chart(data))
+
+
+def _render_pie_chart(data):
     labels = [str(l).title() for l in data.index]
     sizes = data.values.astype(float)
     colors = PIE_COLORS[:len(labels)]
@@ -120,20 +135,75 @@ def _create_pie_chart_png(siniestros_por_tipo):
     return buf.getvalue()
 
 
+@lru_cache(maxsize=64)
+def _png_info(png):
+    """(name, info) of a PNG as parsed by fpdf2: decoded and compressed once.
+
+    name is the same md5 FPDF.image computes, so seeding a document's
+    image_cache with this info keeps fpdf2 from re-opening and
+    re-compressing the image (see _image).
+    """
+    from fpdf.image_parsing import get_img_info
+
+    name = hashlib.md5(png.strip(), usedforsecurity=False).hexdigest()
+    return name, get_img_info(name, io.BytesIO(png), "AUTO")
+
+
+def _image_cache(pdf):
+    """fpdf2's {name: info} image dict (pdf.image_cache.images, fpdf2 >= 2.8).
+
+    None when the installed fpdf2 keeps images some other way (2.7 uses
+    pdf.images): _image then falls back to a plain pdf.image.
+    """
+    images = getattr(getattr(pdf, "image_cache", None), "images", None)
+    return images if isinstance(images, dict) else None
+
+
+def _image(pdf, png, **kwargs):
+    """pdf.image(png) reusing the image already processed by _png_info.
+
+    Seeding relies on fpdf2 internals; if the cache or the parsed info
+    don't look like the tested layout, fpdf2 just processes the PNG itself.
+    """
+    images = _image_cache(pdf)
+    if images is not None:
+        try:
+            name, info = _png_info(png)
+            if isinstance(info, dict) and name not in images and info.get("iccp") is None:
+                seeded = type(info)(info)
+                seeded.update(i=len(images) + 1, usages=0, iccp_i=None)
+                images[name] = seeded
+        except Exception:
+            pass
+    pdf.image(io.BytesIO(png), **kwargs)
+
+
 def _generate_observations(datos):
     """Auto-generate key observations text from datos."""
+    top3 = datos.get("top3_siniestros", None)
+    top3 = tuple(top3.items()) if top3 is not None and len(top3) > 0 else ()
+    return list(_observations(
+        _safe_val(datos, "total_avisos"),
+        _safe_val(datos, "indice_siniestralidad"),
+        _safe_val(datos, "pct_desembolso"),
+        _safe_val(datos, "monto_indemnizado"),
+        _safe_val(datos, "monto_desembolsado"),
+        _safe_val(datos, "productores_desembolso"),
+        datos.get("ambito"),
+        top3,
+    ))
+
+
+@lru_cache(maxsize=256)
+def _observations(total_avisos, siniestralidad, pct_desembolso, monto_indemn,
+                  monto_desemb, productores, ambito, top3):
+    """Observation lines for these values (cached: same data → same text)."""
     lines = []
 
-    total_avisos = _safe_val(datos, "total_avisos")
-    siniestralidad = _safe_val(datos, "indice_siniestralidad")
-    pct_desembolso = _safe_val(datos, "pct_desembolso")
-    monto_indemn = _safe_val(datos, "monto_indemnizado")
-    monto_desemb = _safe_val(datos, "monto_desembolsado")
-    productores = _safe_val(datos, "productores_desembolso")
-
     if total_avisos > 0:
+        donde = f"en {ambito}" if ambito else "a nivel nacional"
         lines.append(
-            f"Se han registrado {int(total_avisos):,} avisos de siniestro a nivel nacional."
+            f"Se han registrado {int(total_avisos):,} avisos de siniestro {donde}."
         )
 
     if siniestralidad > 0:
@@ -170,9 +240,8 @@ def _generate_observations(datos):
         )
 
     # Top siniestros
-    top3 = datos.get("top3_siniestros", None)
-    if top3 is not None and len(top3) > 0:
-        tipos = [f"{str(t).title()} ({int(c):,})" for t, c in top3.items()]
+    if top3:
+        tipos = [f"{str(t).title()} ({int(c):,})" for t, c in top3]
         lines.append(
             f"Los principales tipos de siniestro son: {', '.join(tipos)}."
         )
@@ -180,7 +249,47 @@ def _generate_observations(datos):
     if not lines:
         lines.append("No se dispone de datos suficientes para generar observaciones automaticas.")
 
-    return lines
+    return tuple(lines)
+
+
+def departamental_pdf_datos(depto_data):
+    """Map get_departamento_data() output to the keys generate_executive_pdf reads.
+
+    KPIs and pie chart come from the department slice; the top-10 table
+    lists its provinces (dist_provincia).
+    """
+    indemn = depto_data.get("monto_indemnizado", 0) or 0
+    desemb = depto_data.get("monto_desembolsado", 0) or 0
+    prima = depto_data.get("prima_neta", 0) or 0
+
+    dist = depto_data.get("dist_provincia")
+    if dist is not None and not dist.empty:
+        cuadro2 = pd.DataFrame({
+            "Provincia": dist["PROVINCIA"].astype(str).str.title(),
+            "Hectareas Indemnizadas": dist["sup_indemn"],
+            "Monto Indemnizado (S/)": dist["indemniz"],
+            "Monto Desembolsado (S/)": dist["desembolso"],
+            "Productores con Desembolso": dist["productores"],
+        })
+    else:
+        cuadro2 = pd.DataFrame()
+
+    avisos_tipo = depto_data.get("avisos_tipo")
+    return {
+        "ambito": depto_data.get("departamento", ""),
+        "fecha_corte": depto_data.get("fecha_corte"),
+        "total_avisos": depto_data.get("total_avisos", 0),
+        "ha_indemnizadas": depto_data.get("ha_indemnizadas", 0),
+        "monto_indemnizado": indemn,
+        "monto_desembolsado": desemb,
+        "productores_desembolso": depto_data.get("productores_desembolso", 0),
+        "indice_siniestralidad": indemn / prima * 100 if prima > 0 else 0,
+        "pct_desembolso": desemb / indemn * 100 if indemn > 0 else 0,
+        "prima_total": prima,
+        "cuadro2": cuadro2,
+        "siniestros_por_tipo": avisos_tipo,
+        "top3_siniestros": avisos_tipo.head(3) if avisos_tipo is not None else None,
+    }
 
 
 class _SacPDF(FPDF):
@@ -214,7 +323,9 @@ def generate_executive_pdf(datos):
     Parameters
     ----------
     datos : dict
-        Output from process_dynamic_data.
+        Output from process_dynamic_data, or departamental_pdf_datos(...)
+        for a department-scoped summary (datos["ambito"] = department name;
+        the table then lists its provinces).
 
     Returns
     -------
@@ -241,7 +352,9 @@ def generate_executive_pdf(datos):
     pdf.set_font("Helvetica", "", 10)
     pdf.set_text_color(200, 220, 240)
     fecha_corte = _safe_str(datos, "fecha_corte", datetime.now().strftime("%d/%m/%Y"))
-    pdf.cell(page_w, 6, f"Resumen Ejecutivo  |  SAC 2025-2026  |  Corte al {fecha_corte}", align="C")
+    ambito = datos.get("ambito")
+    subtitulo = f"Resumen Ejecutivo  |  {ambito}  |  SAC 2025-2026" if ambito else "Resumen Ejecutivo  |  SAC 2025-2026"
+    pdf.cell(page_w, 6, f"{subtitulo}  |  Corte al {fecha_corte}", align="C")
 
     pdf.set_y(38)
 
@@ -292,11 +405,12 @@ def generate_executive_pdf(datos):
 
         pdf.set_y(y + box_h + 1)
 
-    # ─── Top 10 departments table ───
+    # ─── Top 10 departments (provinces, department-scoped) table ───
+    col_nombre = "Provincia" if ambito else "Departamento"
     pdf.set_y(pdf.get_y() + 6)
     pdf.set_font("Helvetica", "B", 11)
     pdf.set_text_color(*NAVY)
-    pdf.cell(page_w, 7, "Top 10 Departamentos por Avisos de Siniestro", new_x="LMARGIN", new_y="NEXT")
+    pdf.cell(page_w, 7, f"Top 10 {col_nombre}s por Avisos de Siniestro", new_x="LMARGIN", new_y="NEXT")
 
     pdf.set_y(pdf.get_y() + 2)
 
@@ -304,8 +418,8 @@ def generate_executive_pdf(datos):
     if cuadro2 is not None and not cuadro2.empty:
         # Exclude TOTAL row, sort by avisos or first numeric col
         df_table = cuadro2.copy()
-        if "Departamento" in df_table.columns:
-            df_table = df_table[df_table["Departamento"] != "TOTAL"]
+        if col_nombre in df_table.columns:
+            df_table = df_table[df_table[col_nombre] != "TOTAL"]
 
         # Determine sort column
         sort_col = None
@@ -320,11 +434,11 @@ def generate_executive_pdf(datos):
 
         # Table headers
         col_widths = [40, 30, 38, 38, 38]
-        headers = ["Departamento", "Ha Indemn.", "Monto Indemn.", "Monto Desemb.", "Productores"]
+        headers = [col_nombre, "Ha Indemn.", "Monto Indemn.", "Monto Desemb.", "Productores"]
 
         # Map actual columns
         col_keys = []
-        for h in ["Departamento", "Hectareas Indemnizadas", "Monto Indemnizado (S/)",
+        for h in [col_nombre, "Hectareas Indemnizadas", "Monto Indemnizado (S/)",
                    "Monto Desembolsado (S/)", "Productores con Desembolso"]:
             # Try exact match first, then partial
             if h in df_table.columns:
@@ -399,8 +513,7 @@ def generate_executive_pdf(datos):
     pie_png = _create_pie_chart_png(siniestros_por_tipo)
 
     if pie_png:
-        img_stream = io.BytesIO(pie_png)
-        pdf.image(img_stream, x=25, w=160)
+        _image(pdf, pie_png, x=25, w=160)
         pdf.set_y(pdf.get_y() + 5)
     else:
         pdf.set_font("Helvetica", "I", 9)
@@ -15,7 +15,6 @@ import pandas as pd
 import numpy as np
 from functools import lru_cache
 from datetime import datetime
-from pptx import Presentation
 from pptx.util import Inches, Pt, Emu
 from pptx.dml.color import RGBColor
 from pptx.enum.text import PP_ALIGN, MSO_ANCHOR
@@ -24,42 +23,17 @@ from pptx.chart.data import CategoryChartData
 from pptx.enum.shapes import MSO_SHAPE
 from pptx.oxml.ns import qn
 
+from shared import pptx_template as tpl
+
 
 # ══════════════════════════════════════════════════════════════════
-# FUNCIONES DE FILTRADO Y CÁLCULO (usadas por app.py para preview)
+# FUNCIONES DE FILTRADO Y CÁLCULO POR DataFrame (una sección)
 # ══════════════════════════════════════════════════════════════════
 
 def _safe_col(df, col):
     return col in df.columns
 
 
-def _aplicar_filtros(df, filtros):
-    """Aplica todos los filtros al DataFrame (sin copia innecesaria)."""
-    mask = pd.Series(True, index=df.index)
-    empresa = filtros.get("empresa", "ambas")
-    if empresa != "ambas" and _safe_col(df, "EMPRESA"):
-        mask &= df["EMPRESA"].astype(str).str.upper().str.contains(empresa.upper(), na=False)
-    tipos = filtros.get("tipos_siniestro", [])
-    if tipos and _safe_col(df, "TIPO_SINIESTRO"):
-        mask &= df["TIPO_SINIESTRO"].isin(tipos)
-    fecha_inicio = filtros.get("fecha_inicio")
-    fecha_fin = filtros.get("fecha_fin")
-    col_fecha = filtros.get("col_fecha", "FECHA_AVISO")
-    if fecha_inicio and fecha_fin and _safe_col(df, col_fecha):
-        dt_col = pd.to_datetime(df[col_fecha], errors="coerce")
-        mask &= (dt_col >= pd.Timestamp(fecha_inicio)) & (dt_col <= pd.Timestamp(fecha_fin))
-    deptos = filtros.get("departamentos", [])
-    provs = filtros.get("provincias", [])
-    dists = filtros.get("distritos", [])
-    if deptos and _safe_col(df, "DEPARTAMENTO"):
-        mask &= df["DEPARTAMENTO"].isin(deptos)
-    if provs and _safe_col(df, "PROVINCIA"):
-        mask &= df["PROVINCIA"].isin(provs)
-    if dists and _safe_col(df, "DISTRITO"):
-        mask &= df["DISTRITO"].isin(dists)
-    return df[mask]
-
-
 def _calcular_metricas(df):
     """Calcula métricas principales del DataFrame (optimizado)."""
     n = len(df)
@@ -88,105 +62,12 @@ def _calcular_metricas(df):
     }
 
 
-def _calcular_pipeline(df):
-    """Calcula pipeline del proceso SAC."""
-    if not _safe_col(df, "ESTADO_INSPECCION"):
-        return []
-    raw = df["ESTADO_INSPECCION"].astype(str).str.upper().value_counts().to_dict()
-    order = ["NOTIFICADO", "PROGRAMADO", "REPROGRAMADO", "CERRADO"]
-    result = []
-    for estado in order:
-        val = raw.get(estado, 0)
-        if val > 0:
-            result.append({"label": estado.title(), "val": int(val)})
-    for k, v in raw.items():
-        if k not in order and v > 0:
-            result.append({"label": k.title(), "val": int(v)})
-    return result
-
-
-def _top_breakdown(df, col, n=10):
-    """Top N por columna geográfica (optimizado sin copy)."""
-    if not _safe_col(df, col):
-        return []
-    agg = {"Avisos": (col, "count")}
-    if _safe_col(df, "INDEMNIZACION"):
-        agg["Indemnización"] = ("INDEMNIZACION", "sum")
-    if _safe_col(df, "MONTO_DESEMBOLSADO"):
-        agg["Desembolso"] = ("MONTO_DESEMBOLSADO", "sum")
-    if _safe_col(df, "SUP_INDEMNIZADA"):
-        agg["Ha"] = ("SUP_INDEMNIZADA", "sum")
-
-    has_prod = _safe_col(df, "N_PRODUCTORES")
-    if has_prod:
-        _prods = pd.to_numeric(df["N_PRODUCTORES"], errors="coerce").fillna(0)
-        if _safe_col(df, "INDEMNIZACION"):
-            _ind = pd.to_numeric(df["INDEMNIZACION"], errors="coerce").fillna(0)
-            _prods = _prods.where(_ind > 0, 0)
-        prod_by_geo = _prods.groupby(df[col]).sum()
-
-    result = df.groupby(col).agg(**agg).reset_index()
-    result = result.sort_values("Avisos", ascending=False).head(n)
-    rows = []
-    for _, r in result.iterrows():
-        row = {"name": str(r[col]), "avisos": int(r["Avisos"])}
-        if "Indemnización" in r:
-            row["indem"] = float(r["Indemnización"])
-        if "Desembolso" in r:
-            row["desemb"] = float(r["Desembolso"])
-        if "Ha" in r:
-            row["ha"] = round(float(r["Ha"]), 2)
-        if has_prod and r[col] in prod_by_geo.index:
-            row["prod"] = int(prod_by_geo[r[col]])
-        rows.append(row)
-    return rows
-
-
-def _tipo_breakdown(df):
-    """Distribución por tipo de siniestro."""
-    if not _safe_col(df, "TIPO_SINIESTRO"):
-        return []
-    agg = {"Avisos": ("TIPO_SINIESTRO", "count")}
-    if _safe_col(df, "INDEMNIZACION"):
-        agg["Indemnización"] = ("INDEMNIZACION", "sum")
-    result = df.groupby("TIPO_SINIESTRO").agg(**agg).reset_index()
-    result = result.sort_values("Avisos", ascending=False)
-    rows = []
-    for _, r in result.iterrows():
-        row = {"tipo": str(r["TIPO_SINIESTRO"]), "avisos": int(r["Avisos"])}
-        if "Indemnización" in r:
-            row["indem"] = float(r["Indemnización"])
-        rows.append(row)
-    return rows
-
-
-def _empresa_breakdown(df):
-    """Breakdown por empresa."""
-    if not _safe_col(df, "EMPRESA"):
-        return []
-    results = []
-    for emp in df["EMPRESA"].dropna().unique():
-        df_emp = df[df["EMPRESA"] == emp]
-        m = _calcular_metricas(df_emp)
-        results.append({"empresa": str(emp), **m})
-    return results
-
-
-def _dictamen_breakdown(df):
-    """Breakdown por resultado de dictamen."""
-    for col in ["DICTAMEN", "RESULTADO_AJUSTE", "RESULTADO_INSPECCION"]:
-        if _safe_col(df, col):
-            counts = df[col].astype(str).str.upper().value_counts().to_dict()
-            return {k: int(v) for k, v in counts.items() if k not in ("NAN", "NONE", "")}
-    return {}
-
-
 LLUVIA_TYPES = {"INUNDACION", "INUNDACIÓN", "HUAYCO", "HUAICO",
                 "LLUVIAS EXCESIVAS", "DESLIZAMIENTO", "DESLIZAMIENTOS"}
 
 
-def _generar_insights(df, metricas, tipos, provincias_o_distritos=None,
-                      col_geo="PROVINCIA", provs_seleccionadas=None):
+def _generar_insights(metricas, tipos, provincias_o_distritos=None,
+                      provs_seleccionadas=None):
     """Genera insights automáticos basados en los datos."""
     insights = []
     m = metricas
@@ -258,21 +139,6 @@ def _generar_insights(df, metricas, tipos, provincias_o_distritos=None,
     return insights[:4]
 
 
-def _empresa_composition(df):
-    """Describe composición de empresa."""
-    if not _safe_col(df, "EMPRESA"):
-        return ""
-    counts = df["EMPRESA"].value_counts()
-    total = counts.sum()
-    if len(counts) == 1:
-        return f"Opera exclusivamente con {counts.index[0]}"
-    parts = []
-    for emp, cnt in counts.items():
-        pct = cnt / total * 100
-        parts.append(f"{emp}: {pct:.0f}%")
-    return " · ".join(parts)
-
-
 def _fmt_money_py(n):
     """Format money in Python."""
     if n is None or n == 0:
@@ -282,6 +148,229 @@ def _fmt_money_py(n):
     return f"S/ {n:,.0f}"
 
 
+# ══════════════════════════════════════════════════════════════════
+# PLANIFICADOR DE SECCIONES (una sola pasada)
+# ══════════════════════════════════════════════════════════════════
+# Las funciones de arriba calculan UNA sección sobre un DataFrame ya
+# filtrado; llamadas por cada sección de Nivel 1 y Nivel 2 repetían los
+# casts (.astype(str).str.upper(), pd.to_datetime, to_numeric) y los
+# group-by fila a fila. El planificador normaliza las columnas una vez,
+# apila las filas de todas las secciones pedidas con un id de sección
+# (_SEC) y resuelve cada agregado con un único group-by. El costo por
+# sección queda en recortar resultados ya agregados.
+
+# Columna geográfica que define cada tipo de sección y columna hija
+# que se desglosa en su tabla/top.
+_SECCION_GEO = {"nacional": None, "departamental": "DEPARTAMENTO",
+                "provincial": "PROVINCIA", "distrital": "DISTRITO"}
+_SECCION_HIJO = {"nacional": "DEPARTAMENTO", "departamental": "PROVINCIA",
+                 "provincial": "DISTRITO", "distrital": None}
+_DICTAMEN_COLS = ["DICTAMEN", "RESULTADO_AJUSTE", "RESULTADO_INSPECCION"]
+_SUMAS = [("INDEMNIZACION", "indem"), ("MONTO_DESEMBOLSADO", "desemb"),
+          ("SUP_INDEMNIZADA", "ha")]
+
+
+def _base_secciones(df, filtros, hay_nivel2):
+    """Filas de Nivel 1 (filtro de empresa) con las columnas derivadas.
+
+    Agrega _ESTADO/_DICT (texto en mayúsculas), _CERR, _PROD (productores
+    con indemnización) y _N2 (la fila pasa los filtros de Nivel 2).
+    """
+    cols = {c: df[c] for c in ("DEPARTAMENTO", "PROVINCIA", "DISTRITO", "EMPRESA",
+                               "TIPO_SINIESTRO", "INDEMNIZACION",
+                               "MONTO_DESEMBOLSADO", "SUP_INDEMNIZADA")
+            if _safe_col(df, c)}
+    if _safe_col(df, "ESTADO_INSPECCION"):
+        cols["_ESTADO"] = df["ESTADO_INSPECCION"].astype(str).str.upper()
+        cols["_CERR"] = (cols["_ESTADO"] == "CERRADO").astype(np.int64)
+    if _safe_col(df, "N_PRODUCTORES"):
+        prods = pd.to_numeric(df["N_PRODUCTORES"], errors="coerce").fillna(0)
+        if _safe_col(df, "INDEMNIZACION"):
+            indem = pd.to_numeric(df["INDEMNIZACION"], errors="coerce").fillna(0)
+            prods = prods.where(indem > 0, 0)
+        cols["_PROD"] = prods
+    dict_col = next((c for c in _DICTAMEN_COLS if _safe_col(df, c)), None)
+    if dict_col:
+        cols["_DICT"] = df[dict_col].astype(str).str.upper()
+    base = pd.DataFrame(cols, index=df.index)
+
+    if hay_nivel2:
+        n2 = pd.Series(True, index=df.index)
+        tipos = filtros.get("tipos_siniestro", [])
+        if tipos and _safe_col(df, "TIPO_SINIESTRO"):
+            n2 &= df["TIPO_SINIESTRO"].isin(tipos)
+        fecha_inicio, fecha_fin = filtros.get("fecha_inicio"), filtros.get("fecha_fin")
+        col_fecha = filtros.get("col_fecha", "FECHA_AVISO")
+        if fecha_inicio and fecha_fin and _safe_col(df, col_fecha):
+            dt_col = pd.to_datetime(df[col_fecha], errors="coerce")
+            n2 &= (dt_col >= pd.Timestamp(fecha_inicio)) & (dt_col <= pd.Timestamp(fecha_fin))
+        base["_N2"] = n2
+
+    empresa = filtros.get("empresa", "ambas")
+    if empresa != "ambas" and _safe_col(df, "EMPRESA"):
+        base = base[df["EMPRESA"].astype(str).str.upper().str.contains(empresa.upper(), na=False)]
+    return base
+
+
+def _apilar_secciones(base, specs):
+    """Concatena las filas de cada sección pedida, etiquetadas con _SEC/_HIJO.
+
+    specs: [(nivel, tipo, nombres|None)]. Devuelve (apilado, claves) donde
+    claves[_SEC] = (nivel, tipo, nombre).
+    """
+    partes, claves = [], []
+    for nivel, tipo, nombres in specs:
+        rows = base if nivel == 1 else base[base["_N2"]]
+        geo = _SECCION_GEO[tipo]
+        if geo is None:
+            ids = np.full(len(rows), len(claves))
+            claves.append((nivel, tipo, None))
+        else:
+            if geo not in rows.columns:
+                continue
+            unicos = list(dict.fromkeys(nombres))
+            pos = pd.Index(unicos).get_indexer(rows[geo])
+            rows = rows[pos >= 0]
+            ids = pos[pos >= 0] + len(claves)
+            claves.extend((nivel, tipo, n) for n in unicos)
+        hijo = _SECCION_HIJO[tipo]
+        partes.append(rows.assign(_SEC=ids,
+                                  _HIJO=rows[hijo] if hijo in rows.columns else None))
+    if not partes:
+        return pd.DataFrame(columns=list(base.columns) + ["_SEC", "_HIJO"]), claves
+    return pd.concat(partes, ignore_index=True), claves
+
+
+def _por_seccion(agg, orden=None):
+    """{_SEC: [registros]} de un agregado indexado por (_SEC, ...).
+
+    orden: columna a ordenar de mayor a menor dentro de cada sección. El
+    orden es estable (empates en el orden del group-by), igual que
+    sort_values/value_counts sobre el DataFrame de la sección.
+    """
+    agg = agg.reset_index()
+    if orden:
+        agg = agg.sort_values(["_SEC", orden], ascending=[True, False], kind="stable")
+    else:
+        agg = agg.sort_values("_SEC", kind="stable")
+    out = {}
+    for rec in agg.to_dict("records"):
+        out.setdefault(rec["_SEC"], []).append(rec)
+    return out
+
+
+def _sumar(stack, keys, sort=True):
+    """Avisos + sumas de métricas por `keys` en un solo group-by."""
+    num = [c for c in ("_CERR", "INDEMNIZACION", "MONTO_DESEMBOLSADO",
+                       "SUP_INDEMNIZADA", "_PROD") if c in stack.columns]
+    g = stack.groupby(keys, sort=sort)
+    out = g[num].sum() if num else pd.DataFrame(index=g.size().index)
+    out["_N"] = g.size()
+    return out
+
+
+def _metricas_registro(r):
+    """Dict de métricas (mismo formato que _calcular_metricas) desde un registro agregado."""
+    n = int(r["_N"])
+    cerrados = int(r.get("_CERR", 0))
+    indem = float(r["INDEMNIZACION"]) if "INDEMNIZACION" in r else 0
+    desemb = float(r["MONTO_DESEMBOLSADO"]) if "MONTO_DESEMBOLSADO" in r else 0
+    ha = float(r["SUP_INDEMNIZADA"]) if "SUP_INDEMNIZADA" in r else 0
+    pct_desemb = (desemb / indem * 100) if indem > 0 else 0
+    return {
+        "avisos": n, "cerrados": cerrados, "pct_eval": round(cerrados / n * 100, 1),
+        "indemnizacion": indem, "desembolso": desemb,
+        "pct_desembolso": round(pct_desemb, 1),
+        "ha_indemnizadas": round(ha, 2),
+        "productores": int(r.get("_PROD", 0)),
+    }
+
+
+def _planificar_secciones(df, filtros, specs, hay_nivel2):
+    """Payload base de cada sección pedida, con un group-by por agregado.
+
+    Devuelve {(nivel, tipo, nombre): payload} sólo para las secciones con
+    filas (la nacional siempre). El payload trae las mismas estructuras que
+    las funciones por DataFrame de arriba: metricas, pipeline, dictamen,
+    empresas, tipos, hijos (top completo de la columna hija, ya ordenado),
+    empresa_comp, n_hijos, depto y prov (de la primera fila).
+    """
+    base = _base_secciones(df, filtros, hay_nivel2)
+    stack, claves = _apilar_secciones(base, specs)
+    cols = set(stack.columns)
+
+    metricas = {r["_SEC"]: r for r in _sumar(stack, "_SEC").reset_index().to_dict("records")}
+    hijos = _por_seccion(_sumar(stack, ["_SEC", "_HIJO"]), "_N")
+    tipos = (_por_seccion(_sumar(stack, ["_SEC", "TIPO_SINIESTRO"]), "_N")
+             if "TIPO_SINIESTRO" in cols else {})
+    empresas = (_por_seccion(_sumar(stack, ["_SEC", "EMPRESA"], sort=False))
+                if "EMPRESA" in cols else {})
+    estados = (_por_seccion(stack.groupby(["_SEC", "_ESTADO"], sort=False).size().rename("_C"), "_C")
+               if "_ESTADO" in cols else {})
+    dictamen = (_por_seccion(stack.groupby(["_SEC", "_DICT"], sort=False).size().rename("_C"), "_C")
+                if "_DICT" in cols else {})
+    n_hijos = stack.groupby("_SEC")["_HIJO"].nunique().to_dict()
+    primeras = {r["_SEC"]: r for r in stack.drop_duplicates("_SEC").to_dict("records")}
+
+    order = ["NOTIFICADO", "PROGRAMADO", "REPROGRAMADO", "CERRADO"]
+    planes = {}
+    for sec, clave in enumerate(claves):
+        if sec not in metricas and clave[1] != "nacional":
+            continue
+        plan = {"metricas": (_metricas_registro(metricas[sec]) if sec in metricas
+                             else _calcular_metricas(pd.DataFrame()))}
+
+        plan["pipeline"] = []
+        if "_ESTADO" in cols:
+            raw = {r["_ESTADO"]: r["_C"] for r in estados.get(sec, [])}
+            plan["pipeline"] = [{"label": e.title(), "val": int(raw[e])}
+                                for e in order if raw.get(e, 0) > 0]
+            plan["pipeline"] += [{"label": k.title(), "val": int(v)}
+                                 for k, v in raw.items() if k not in order and v > 0]
+
+        plan["dictamen"] = {r["_DICT"]: int(r["_C"]) for r in dictamen.get(sec, [])
+                            if r["_DICT"] not in ("NAN", "NONE", "")}
+
+        plan["empresas"] = [{"empresa": str(r["EMPRESA"]), **_metricas_registro(r)}
+                            for r in empresas.get(sec, [])]
+
+        plan["tipos"] = []
+        for r in tipos.get(sec, []):
+            row = {"tipo": str(r["TIPO_SINIESTRO"]), "avisos": int(r["_N"])}
+            if "INDEMNIZACION" in r:
+                row["indem"] = float(r["INDEMNIZACION"])
+            plan["tipos"].append(row)
+
+        plan["hijos"] = []
+        for r in hijos.get(sec, []):
+            row = {"name": str(r["_HIJO"]), "avisos": int(r["_N"])}
+            for col, k in _SUMAS:
+                if col in r:
+                    row[k] = float(r[col])
+            if "ha" in row:
+                row["ha"] = round(row["ha"], 2)
+            if "_PROD" in r:
+                row["prod"] = int(r["_PROD"])
+            plan["hijos"].append(row)
+
+        plan["empresa_comp"] = ""
+        counts = sorted(((r["EMPRESA"], r["_N"]) for r in empresas.get(sec, [])),
+                        key=lambda x: -x[1])
+        if len(counts) == 1:
+            plan["empresa_comp"] = f"Opera exclusivamente con {counts[0][0]}"
+        elif counts:
+            total = sum(c for _, c in counts)
+            plan["empresa_comp"] = " · ".join(f"{emp}: {cnt / total * 100:.0f}%"
+                                              for emp, cnt in counts)
+
+        plan["n_hijos"] = int(n_hijos.get(sec, 0))
+        primera = primeras.get(sec, {})
+        plan["depto"] = str(primera["DEPARTAMENTO"]) if "DEPARTAMENTO" in primera else ""
+        plan["prov"] = str(primera["PROVINCIA"]) if "PROVINCIA" in primera else ""
+        planes[clave] = plan
+    return planes
+
+
 # ══════════════════════════════════════════════════════════════════
 # PREPARAR DATA
 # ══════════════════════════════════════════════════════════════════
@@ -297,6 +386,9 @@ def _prepare_data(df, filtros, fecha_corte):
         fechas de ocurrencia, etc.) que generan secciones complementarias.
         - Si se activa, se aplican los filtros de tipo + fecha sobre el mismo
           alcance geográfico y se agregan slides adicionales.
+
+    Los payloads de todas las secciones salen de _planificar_secciones
+    (una pasada sobre los datos); acá sólo se arman los dicts por sección.
     """
     scope = filtros.get("scope", "nacional")
     incluir_nacional = filtros.get("incluir_nacional", True)
@@ -304,28 +396,11 @@ def _prepare_data(df, filtros, fecha_corte):
     provs = filtros.get("provincias", [])
     dists = filtros.get("distritos", [])
 
-    # ── NIVEL 1: solo filtro de empresa (base geográfica limpia) ──
-    filtros_nivel1 = {
-        "empresa": filtros.get("empresa", "ambas"),
-    }
-    df_nivel1 = _aplicar_filtros(df, filtros_nivel1)
-
-    # ── NIVEL 2: empresa + tipos de siniestro + fechas ──
     tipos_sel = filtros.get("tipos_siniestro", [])
     fecha_inicio = filtros.get("fecha_inicio")
     fecha_fin = filtros.get("fecha_fin")
-    col_fecha = filtros.get("col_fecha", "FECHA_AVISO")
     hay_nivel2 = bool(tipos_sel) or bool(fecha_inicio and fecha_fin)
 
-    filtros_nivel2 = {
-        "empresa": filtros.get("empresa", "ambas"),
-        "tipos_siniestro": tipos_sel,
-        "fecha_inicio": fecha_inicio,
-        "fecha_fin": fecha_fin,
-        "col_fecha": col_fecha,
-    }
-    df_nivel2 = _aplicar_filtros(df, filtros_nivel2) if hay_nivel2 else pd.DataFrame()
-
     # Etiqueta descriptiva para Nivel 2
     nivel2_label_parts = []
     if tipos_sel:
@@ -350,179 +425,138 @@ def _prepare_data(df, filtros, fecha_corte):
         "hay_nivel2": hay_nivel2,
     }
 
+    con_nacional = incluir_nacional or not deptos
+    specs = []
+    for nivel in ((1, 2) if hay_nivel2 else (1,)):
+        if con_nacional:
+            specs.append((nivel, "nacional", None))
+        if deptos:
+            specs.append((nivel, "departamental", deptos))
+        if provs:
+            specs.append((nivel, "provincial", provs))
+        if dists and nivel == 1:
+            specs.append((nivel, "distrital", dists[:5]))
+    planes = _planificar_secciones(df, filtros, specs, hay_nivel2)
+
     # ─────────────────────────────────────────────
     # NIVEL 1: Secciones geográficas (base limpia)
     # ─────────────────────────────────────────────
 
-    if incluir_nacional or not deptos:
-        m = _calcular_metricas(df_nivel1)
-        tipos_nac = _tipo_breakdown(df_nivel1)
-        top_deptos_nac = _top_breakdown(df_nivel1, "DEPARTAMENTO", 10)
-        n_deptos = df_nivel1["DEPARTAMENTO"].nunique() if _safe_col(df_nivel1, "DEPARTAMENTO") else 0
+    if con_nacional:
+        p = planes[(1, "nacional", None)]
+        top_deptos = p["hijos"][:10]
         data["nivel1_sections"].append({
             "type": "nacional",
-            "metricas": m,
-            "pipeline": _calcular_pipeline(df_nivel1),
-            "dictamen": _dictamen_breakdown(df_nivel1),
-            "empresas": _empresa_breakdown(df_nivel1),
-            "top_deptos": top_deptos_nac,
-            "tipos": tipos_nac,
-            "n_deptos": n_deptos,
-            "insights": _generar_insights(df_nivel1, m, tipos_nac, top_deptos_nac, "DEPARTAMENTO"),
+            "metricas": p["metricas"],
+            "pipeline": p["pipeline"],
+            "dictamen": p["dictamen"],
+            "empresas": p["empresas"],
+            "top_deptos": top_deptos,
+            "tipos": p["tipos"],
+            "n_deptos": p["n_hijos"],
+            "insights": _generar_insights(p["metricas"], p["tipos"], top_deptos),
         })
 
-    # Pre-agrupar por departamento para evitar filtrados repetidos
-    _dept_groups = {}
-    if deptos and _safe_col(df_nivel1, "DEPARTAMENTO"):
-        for d_name, d_df in df_nivel1[df_nivel1["DEPARTAMENTO"].isin(deptos)].groupby("DEPARTAMENTO"):
-            _dept_groups[d_name] = d_df
-
-    if deptos:
-        for depto in deptos:
-            df_d = _dept_groups.get(depto, pd.DataFrame())
-            if len(df_d) == 0:
-                continue
-            m = _calcular_metricas(df_d)
-            tipos_d = _tipo_breakdown(df_d)
-            provs_d = _top_breakdown(df_d, "PROVINCIA", 20)
-            emp_comp = _empresa_composition(df_d)
-            n_provs = df_d["PROVINCIA"].nunique() if _safe_col(df_d, "PROVINCIA") else 0
-            data["nivel1_sections"].append({
-                "type": "departamental",
-                "name": depto,
-                "metricas": m,
-                "pipeline": _calcular_pipeline(df_d),
-                "dictamen": _dictamen_breakdown(df_d),
-                "provincias": provs_d,
-                "tipos": tipos_d,
-                "empresa_comp": emp_comp,
-                "n_provincias": n_provs,
-                "insights": _generar_insights(df_d, m, tipos_d, provs_d, "PROVINCIA", provs),
-                "provs_seleccionadas": provs,
-            })
-
-    # Pre-agrupar por provincia
-    _prov_groups = {}
-    if provs and _safe_col(df_nivel1, "PROVINCIA"):
-        for p_name, p_df in df_nivel1[df_nivel1["PROVINCIA"].isin(provs)].groupby("PROVINCIA"):
-            _prov_groups[p_name] = p_df
-
-    if provs:
-        for prov in provs:
-            df_p = _prov_groups.get(prov, pd.DataFrame())
-            if len(df_p) == 0:
-                continue
-            m = _calcular_metricas(df_p)
-            depto_name = str(df_p["DEPARTAMENTO"].iloc[0]) if _safe_col(df_p, "DEPARTAMENTO") and len(df_p) > 0 else ""
-            tipos_p = _tipo_breakdown(df_p)
-            dists_p = _top_breakdown(df_p, "DISTRITO", 20)
-            emp_comp = _empresa_composition(df_p)
-            data["nivel1_sections"].append({
-                "type": "provincial",
-                "name": prov,
-                "depto": depto_name,
-                "metricas": m,
-                "pipeline": _calcular_pipeline(df_p),
-                "dictamen": _dictamen_breakdown(df_p),
-                "distritos": dists_p,
-                "tipos": tipos_p,
-                "empresa_comp": emp_comp,
-                "insights": _generar_insights(df_p, m, tipos_p, dists_p, "DISTRITO"),
-            })
+    for depto in deptos:
+        p = planes.get((1, "departamental", depto))
+        if p is None:
+            continue
+        provs_d = p["hijos"][:20]
+        data["nivel1_sections"].append({
+            "type": "departamental",
+            "name": depto,
+            "metricas": p["metricas"],
+            "pipeline": p["pipeline"],
+            "dictamen": p["dictamen"],
+            "provincias": provs_d,
+            "tipos": p["tipos"],
+            "empresa_comp": p["empresa_comp"],
+            "n_provincias": p["n_hijos"],
+            "insights": _generar_insights(p["metricas"], p["tipos"], provs_d, provs),
+            "provs_seleccionadas": provs,
+        })
 
-    # Pre-agrupar por distrito
-    _dist_groups = {}
-    if dists and _safe_col(df_nivel1, "DISTRITO"):
-        for dt_name, dt_df in df_nivel1[df_nivel1["DISTRITO"].isin(dists[:5])].groupby("DISTRITO"):
-            _dist_groups[dt_name] = dt_df
+    for prov in provs:
+        p = planes.get((1, "provincial", prov))
+        if p is None:
+            continue
+        dists_p = p["hijos"][:20]
+        data["nivel1_sections"].append({
+            "type": "provincial",
+            "name": prov,
+            "depto": p["depto"],
+            "metricas": p["metricas"],
+            "pipeline": p["pipeline"],
+            "dictamen": p["dictamen"],
+            "distritos": dists_p,
+            "tipos": p["tipos"],
+            "empresa_comp": p["empresa_comp"],
+            "insights": _generar_insights(p["metricas"], p["tipos"], dists_p),
+        })
 
-    if dists:
-        for dist in dists[:5]:
-            df_dist = _dist_groups.get(dist, pd.DataFrame())
-            if len(df_dist) == 0:
-                continue
-            m = _calcular_metricas(df_dist)
-            prov_name = str(df_dist["PROVINCIA"].iloc[0]) if _safe_col(df_dist, "PROVINCIA") and len(df_dist) > 0 else ""
-            depto_name = str(df_dist["DEPARTAMENTO"].iloc[0]) if _safe_col(df_dist, "DEPARTAMENTO") and len(df_dist) > 0 else ""
-            data["nivel1_sections"].append({
-                "type": "distrital",
-                "name": dist,
-                "prov": prov_name,
-                "depto": depto_name,
-                "metricas": m,
-                "pipeline": _calcular_pipeline(df_dist),
-                "tipos": _tipo_breakdown(df_dist),
-            })
+    for dist in dists[:5]:
+        p = planes.get((1, "distrital", dist))
+        if p is None:
+            continue
+        data["nivel1_sections"].append({
+            "type": "distrital",
+            "name": dist,
+            "prov": p["prov"],
+            "depto": p["depto"],
+            "metricas": p["metricas"],
+            "pipeline": p["pipeline"],
+            "tipos": p["tipos"],
+        })
 
     # ─────────────────────────────────────────────
     # NIVEL 2: Secciones complementarias (filtradas)
     # ─────────────────────────────────────────────
 
-    if hay_nivel2 and len(df_nivel2) > 0:
+    if hay_nivel2:
+        nac2 = planes.get((2, "nacional", None))
         # Nacional filtrado
-        if incluir_nacional or not deptos:
-            m2 = _calcular_metricas(df_nivel2)
-            tipos_n2 = _tipo_breakdown(df_nivel2)
-            top_deptos_n2 = _top_breakdown(df_nivel2, "DEPARTAMENTO", 10)
+        if nac2 is not None and nac2["metricas"]["avisos"] > 0:
+            top_deptos_n2 = nac2["hijos"][:10]
             data["nivel2_sections"].append({
                 "type": "nacional",
-                "metricas": m2,
-                "pipeline": _calcular_pipeline(df_nivel2),
-                "tipos": tipos_n2,
+                "metricas": nac2["metricas"],
+                "pipeline": nac2["pipeline"],
+                "tipos": nac2["tipos"],
                 "top_deptos": top_deptos_n2,
-                "empresas": _empresa_breakdown(df_nivel2),
-                "insights": _generar_insights(df_nivel2, m2, tipos_n2, top_deptos_n2, "DEPARTAMENTO"),
+                "empresas": nac2["empresas"],
+                "insights": _generar_insights(nac2["metricas"], nac2["tipos"], top_deptos_n2),
             })
 
-        # Departamentos filtrados (pre-agrupado)
-        _dept_groups2 = {}
-        if deptos and _safe_col(df_nivel2, "DEPARTAMENTO"):
-            for d2n, d2f in df_nivel2[df_nivel2["DEPARTAMENTO"].isin(deptos)].groupby("DEPARTAMENTO"):
-                _dept_groups2[d2n] = d2f
-
-        if deptos:
-            for depto in deptos:
-                df_d2 = _dept_groups2.get(depto, pd.DataFrame())
-                if len(df_d2) == 0:
-                    continue
-                m2 = _calcular_metricas(df_d2)
-                tipos_d2 = _tipo_breakdown(df_d2)
-                provs_d2 = _top_breakdown(df_d2, "PROVINCIA", 20)
-                data["nivel2_sections"].append({
-                    "type": "departamental",
-                    "name": depto,
-                    "metricas": m2,
-                    "pipeline": _calcular_pipeline(df_d2),
-                    "provincias": provs_d2,
-                    "tipos": tipos_d2,
-                    "empresa_comp": _empresa_composition(df_d2),
-                    "insights": _generar_insights(df_d2, m2, tipos_d2, provs_d2, "PROVINCIA", provs),
-                })
-
-        # Provincias filtradas (pre-agrupado)
-        _prov_groups2 = {}
-        if provs and _safe_col(df_nivel2, "PROVINCIA"):
-            for p2n, p2f in df_nivel2[df_nivel2["PROVINCIA"].isin(provs)].groupby("PROVINCIA"):
-                _prov_groups2[p2n] = p2f
+        for depto in deptos:
+            p = planes.get((2, "departamental", depto))
+            if p is None:
+                continue
+            provs_d2 = p["hijos"][:20]
+            data["nivel2_sections"].append({
+                "type": "departamental",
+                "name": depto,
+                "metricas": p["metricas"],
+                "pipeline": p["pipeline"],
+                "provincias": provs_d2,
+                "tipos": p["tipos"],
+                "empresa_comp": p["empresa_comp"],
+                "insights": _generar_insights(p["metricas"], p["tipos"], provs_d2, provs),
+            })
 
-        if provs:
-            for prov in provs:
-                df_p2 = _prov_groups2.get(prov, pd.DataFrame())
-                if len(df_p2) == 0:
-                    continue
-                m2 = _calcular_metricas(df_p2)
-                depto_name = str(df_p2["DEPARTAMENTO"].iloc[0]) if _safe_col(df_p2, "DEPARTAMENTO") and len(df_p2) > 0 else ""
-                tipos_p2 = _tipo_breakdown(df_p2)
-                dists_p2 = _top_breakdown(df_p2, "DISTRITO", 20)
-                data["nivel2_sections"].append({
-                    "type": "provincial",
-                    "name": prov,
-                    "depto": depto_name,
-                    "metricas": m2,
-                    "distritos": dists_p2,
-                    "tipos": tipos_p2,
-                    "insights": _generar_insights(df_p2, m2, tipos_p2, dists_p2, "DISTRITO"),
-                })
+        for prov in provs:
+            p = planes.get((2, "provincial", prov))
+            if p is None:
+                continue
+            dists_p2 = p["hijos"][:20]
+            data["nivel2_sections"].append({
+                "type": "provincial",
+                "name": prov,
+                "depto": p["depto"],
+                "metricas": p["metricas"],
+                "distritos": dists_p2,
+                "tipos": p["tipos"],
+                "insights": _generar_insights(p["metricas"], p["tipos"], dists_p2),
+            })
 
     return data
 
@@ -656,6 +690,13 @@ def _add_shadow(shape, alpha_val=15000):
 
 
 def _make_logo(slide, x, y, w, h):
+    """Logo MIDAGRI/SAC: clon del prototipo (se dibuja una vez por tamaño)."""
+    proto = tpl.shape_prototype(("logo", int(w), int(h)),
+                                lambda s: _draw_logo(s, 0, 0, w, h))
+    tpl.place(slide, proto, x, y)
+
+
+def _draw_logo(slide, x, y, w, h):
     """Create MIDAGRI/SAC logo using shapes: white rounded rect with two teal rects inside."""
     logo_bg = slide.shapes.add_shape(
         MSO_SHAPE.ROUNDED_RECTANGLE,
@@ -690,7 +731,27 @@ def _make_logo(slide, x, y, w, h):
 
 
 def _add_kpi_card(slide, left, top, w, h, label, value, sublabel, accent_color, icon_text):
-    """Add enhanced metric card with colored top bar, icon circle, and large number."""
+    """Add enhanced metric card with colored top bar, icon circle, and large number.
+
+    La tarjeta se dibuja una vez por (tamaño, color, fuente del valor) con
+    _draw_kpi_card y cada uso es un clon con los textos reemplazados.
+    """
+    # Auto-size value font based on text length
+    val_str = str(value)
+    if len(val_str) > 10:
+        val_font = Pt(18)
+    elif len(val_str) > 7:
+        val_font = Pt(22)
+    else:
+        val_font = Pt(26)
+    key = ("kpi", int(w), int(h), str(accent_color), val_font)
+    proto = tpl.shape_prototype(key, lambda s: _draw_kpi_card(s, 0, 0, w, h, accent_color, val_font))
+    tpl.place(slide, proto, left, top,
+              [icon_text, val_str, str(sublabel) if sublabel else "", str(label)])
+
+
+def _draw_kpi_card(slide, left, top, w, h, accent_color, val_font):
+    """Tarjeta KPI con textos provisorios (prototipo de _add_kpi_card)."""
     bg = slide.shapes.add_shape(
         MSO_SHAPE.ROUNDED_RECTANGLE,
         left, top, w, h
@@ -725,19 +786,10 @@ def _add_kpi_card(slide, left, top, w, h, label, value, sublabel, accent_color,
     icon_frame = icon_tf.text_frame
     icon_frame.vertical_anchor = MSO_ANCHOR.MIDDLE
     icon_p = icon_frame.paragraphs[0]
-    icon_p.text = icon_text
+    icon_p.text = tpl.PLACEHOLDER
     icon_p.font.size = Pt(20)
     icon_p.alignment = PP_ALIGN.CENTER
 
-    # Auto-size value font based on text length
-    val_str = str(value)
-    if len(val_str) > 10:
-        val_font = Pt(18)
-    elif len(val_str) > 7:
-        val_font = Pt(22)
-    else:
-        val_font = Pt(26)
-
     value_tf = slide.shapes.add_textbox(
         left + Inches(0.08), top + Inches(0.88),
         w - Inches(0.16), Inches(0.45)
@@ -747,7 +799,7 @@ def _add_kpi_card(slide, left, top, w, h, label, value, sublabel, accent_color,
     value_frame.margin_top = Pt(0)
     value_frame.margin_bottom = Pt(0)
     value_p = value_frame.paragraphs[0]
-    value_p.text = val_str
+    value_p.text = tpl.PLACEHOLDER
     value_p.font.size = val_font
     value_p.font.bold = True
     value_p.font.color.rgb = C["navy"]
@@ -763,7 +815,7 @@ def _add_kpi_card(slide, left, top, w, h, label, value, sublabel, accent_color,
     sub_frame.margin_top = Pt(0)
     sub_frame.margin_bottom = Pt(0)
     sub_p = sub_frame.paragraphs[0]
-    sub_p.text = str(sublabel) if sublabel else ""
+    sub_p.text = tpl.PLACEHOLDER
     sub_p.font.size = Pt(8)
     sub_p.font.color.rgb = C["gray"]
     sub_p.alignment = PP_ALIGN.CENTER
@@ -777,14 +829,19 @@ def _add_kpi_card(slide, left, top, w, h, label, value, sublabel, accent_color,
     label_frame.margin_top = Pt(0)
     label_frame.margin_bottom = Pt(0)
     label_p = label_frame.paragraphs[0]
-    label_p.text = str(label)
+    label_p.text = tpl.PLACEHOLDER
     label_p.font.size = Pt(9)
     label_p.font.color.rgb = C["gray"]
     label_p.alignment = PP_ALIGN.CENTER
 
 
 def _add_header_bar(slide, title, color, y_pos=Inches(0.3)):
-    """Add colored rectangle header bar with title."""
+    """Add colored rectangle header bar with title (clon del prototipo por color)."""
+    proto = tpl.shape_prototype(("header", str(color)), lambda s: _draw_header_bar(s, color, 0))
+    tpl.place(slide, proto, 0, y_pos, [title])
+
+
+def _draw_header_bar(slide, color, y_pos):
     shape = slide.shapes.add_shape(
         MSO_SHAPE.RECTANGLE,
         Inches(0), y_pos,
@@ -797,7 +854,7 @@ def _add_header_bar(slide, title, color, y_pos=Inches(0.3)):
     text_frame = shape.text_frame
     text_frame.word_wrap = True
     p = text_frame.paragraphs[0]
-    p.text = title
+    p.text = tpl.PLACEHOLDER
     p.font.size = Pt(24)
     p.font.bold = True
     p.font.color.rgb = C["white"]
@@ -809,7 +866,29 @@ def _add_header_bar(slide, title, color, y_pos=Inches(0.3)):
 
 def _add_styled_table(slide, headers, rows, left=Inches(0.3), top=Inches(1.2),
                      col_widths=None, has_total=False, max_rows=12):
-    """Add professional table with alternating rows, header styling, optional total row."""
+    """Add professional table with alternating rows, header styling, optional total row.
+
+    La tabla formateada se dibuja una vez por forma (columnas, anchos, filas,
+    total) y cada uso es un clon con el texto de las celdas reemplazado.
+    """
+    cols = len(headers)
+    body = rows[:max_rows]
+    if not body or any(len(r) != cols for r in body):
+        _draw_styled_table(slide, headers, rows, left, top, col_widths, has_total, max_rows)
+        return
+    key = ("tabla", cols, len(body), has_total,
+           tuple(int(w) for w in col_widths) if col_widths else None)
+    proto = tpl.shape_prototype(key, lambda s: _draw_styled_table(
+        s, [tpl.PLACEHOLDER] * cols, [[tpl.PLACEHOLDER] * cols] * len(body),
+        0, 0, col_widths, has_total, len(body)))
+    texts = list(headers)
+    texts += ["" if v is None else v for r in body for v in r]
+    if has_total:
+        texts.append("TOTAL")
+    tpl.place(slide, proto, left, top, texts)
+
+
+def _draw_styled_table(slide, headers, rows, left, top, col_widths, has_total, max_rows):
     rows_to_add = min(len(rows), max_rows)
     if has_total:
         rows_to_add += 1
@@ -1011,33 +1090,7 @@ def _add_alert_box(slide, text, left, top, width):
 
 
 def _add_resumen_ejecutivo_slide(slide, prs, dept_name, text, fecha_corte):
-    """Add dark background resumen ejecutivo slide with narrative text."""
-    background = slide.shapes.add_shape(
-        MSO_SHAPE.RECTANGLE,
-        Inches(0), Inches(0),
-        prs.slide_width, prs.slide_height
-    )
-    background.fill.solid()
-    background.fill.fore_color.rgb = C["navy"]
-    background.line.fill.background()
-
-    line_top = slide.shapes.add_shape(
-        MSO_SHAPE.RECTANGLE,
-        Inches(0), Inches(0.2),
-        prs.slide_width, Inches(0.06)
-    )
-    line_top.fill.solid()
-    line_top.fill.fore_color.rgb = C["teal"]
-    line_top.line.fill.background()
-
-    line_bottom = slide.shapes.add_shape(
-        MSO_SHAPE.RECTANGLE,
-        Inches(0), Inches(5.42),
-        prs.slide_width, Inches(0.06)
-    )
-    line_bottom.fill.solid()
-    line_bottom.fill.fore_color.rgb = C["teal"]
-    line_bottom.line.fill.background()
+    """Add resumen ejecutivo narrative text (fondo navy y marco teal: LAYOUT_RESUMEN)."""
 
     badge = slide.shapes.add_shape(
         MSO_SHAPE.ROUNDED_RECTANGLE,
@@ -1176,15 +1229,7 @@ def _generar_resumen_texto(section_data, scope_type):
 
 def _add_pipeline_slide(prs, pipeline, dictamen, metricas):
     """Add pipeline process flow slide — sin alerta, centrado verticalmente."""
-    slide = prs.slides.add_slide(prs.slide_layouts[6])
-    background = slide.shapes.add_shape(
-        MSO_SHAPE.RECTANGLE,
-        Inches(0), Inches(0),
-        prs.slide_width, prs.slide_height
-    )
-    background.fill.solid()
-    background.fill.fore_color.rgb = C["cream"]
-    background.line.fill.background()
+    slide = prs.slides.add_slide(tpl.layout(prs, LAYOUT_CREMA))
 
     tf_title = slide.shapes.add_textbox(
         Inches(0.4), Inches(0.35),
@@ -1215,21 +1260,13 @@ def _add_pipeline_slide(prs, pipeline, dictamen, metricas):
 
 def _add_resumen_ejecutivo(prs, section_name, resumen_text, scope_label, fecha_corte):
     """Add resumen ejecutivo slide with dark background and narrative text."""
-    slide = prs.slides.add_slide(prs.slide_layouts[6])
+    slide = prs.slides.add_slide(tpl.layout(prs, LAYOUT_RESUMEN))
     _add_resumen_ejecutivo_slide(slide, prs, section_name, resumen_text, fecha_corte)
 
 
 def _add_tipo_siniestro_slide(prs, tipos):
     """Add tipo de siniestro: tabla compacta a la izquierda + chart de barras a la derecha."""
-    slide = prs.slides.add_slide(prs.slide_layouts[6])
-    background = slide.shapes.add_shape(
-        MSO_SHAPE.RECTANGLE,
-        Inches(0), Inches(0),
-        prs.slide_width, prs.slide_height
-    )
-    background.fill.solid()
-    background.fill.fore_color.rgb = C["cream"]
-    background.line.fill.background()
+    slide = prs.slides.add_slide(tpl.layout(prs, LAYOUT_CREMA))
 
     tf_title = slide.shapes.add_textbox(
         Inches(0.4), Inches(0.35),
@@ -1329,15 +1366,7 @@ def _add_tipo_siniestro_slide(prs, tipos):
 
 def _add_top_deptos_chart(prs, top_deptos):
     """Add top departamentos bar chart slide."""
-    slide = prs.slides.add_slide(prs.slide_layouts[6])
-    background = slide.shapes.add_shape(
-        MSO_SHAPE.RECTANGLE,
-        Inches(0), Inches(0),
-        prs.slide_width, prs.slide_height
-    )
-    background.fill.solid()
-    background.fill.fore_color.rgb = C["cream"]
-    background.line.fill.background()
+    slide = prs.slides.add_slide(tpl.layout(prs, LAYOUT_CREMA))
 
     tf_title = slide.shapes.add_textbox(
         Inches(0.4), Inches(0.35),
@@ -1395,33 +1424,7 @@ def _add_top_deptos_chart(prs, top_deptos):
 
 def _add_portada(prs, data):
     """Add cover slide with dark navy background and teal accents."""
-    slide = prs.slides.add_slide(prs.slide_layouts[6])
-    background = slide.shapes.add_shape(
-        MSO_SHAPE.RECTANGLE,
-        Inches(0), Inches(0),
-        prs.slide_width, prs.slide_height
-    )
-    background.fill.solid()
-    background.fill.fore_color.rgb = C["navy"]
-    background.line.fill.background()
-
-    line_top = slide.shapes.add_shape(
-        MSO_SHAPE.RECTANGLE,
-        Inches(0), Inches(0.35),
-        prs.slide_width, Inches(0.06)
-    )
-    line_top.fill.solid()
-    line_top.fill.fore_color.rgb = C["teal"]
-    line_top.line.fill.background()
-
-    line_bottom = slide.shapes.add_shape(
-        MSO_SHAPE.RECTANGLE,
-        Inches(0), Inches(5.22),
-        prs.slide_width, Inches(0.06)
-    )
-    line_bottom.fill.solid()
-    line_bottom.fill.fore_color.rgb = C["teal"]
-    line_bottom.line.fill.background()
+    slide = prs.slides.add_slide(tpl.layout(prs, LAYOUT_SEPARADOR))
 
     _make_logo(slide, Inches(4.0), Inches(0.55), Inches(2.0), Inches(1.6))
 
@@ -1530,33 +1533,7 @@ def _add_portada(prs, data):
 
 def _add_cierre(prs, fecha_corte):
     """Add closing slide."""
-    slide = prs.slides.add_slide(prs.slide_layouts[6])
-    background = slide.shapes.add_shape(
-        MSO_SHAPE.RECTANGLE,
-        Inches(0), Inches(0),
-        prs.slide_width, prs.slide_height
-    )
-    background.fill.solid()
-    background.fill.fore_color.rgb = C["navy"]
-    background.line.fill.background()
-
-    line_top = slide.shapes.add_shape(
-        MSO_SHAPE.RECTANGLE,
-        Inches(0), Inches(0.35),
-        prs.slide_width, Inches(0.06)
-    )
-    line_top.fill.solid()
-    line_top.fill.fore_color.rgb = C["teal"]
-    line_top.line.fill.background()
-
-    line_bottom = slide.shapes.add_shape(
-        MSO_SHAPE.RECTANGLE,
-        Inches(0), Inches(5.22),
-        prs.slide_width, Inches(0.06)
-    )
-    line_bottom.fill.solid()
-    line_bottom.fill.fore_color.rgb = C["teal"]
-    line_bottom.line.fill.background()
+    slide = prs.slides.add_slide(tpl.layout(prs, LAYOUT_SEPARADOR))
 
     _make_logo(slide, Inches(4.0), Inches(0.55), Inches(2.0), Inches(1.3))
 
@@ -1635,15 +1612,7 @@ def _add_nacional_section(prs, section):
     deptos = section.get("departamentos", [])
 
     # Slide 1: Indicadores Clave
-    slide = prs.slides.add_slide(prs.slide_layouts[6])
-    background = slide.shapes.add_shape(
-        MSO_SHAPE.RECTANGLE,
-        Inches(0), Inches(0),
-        prs.slide_width, prs.slide_height
-    )
-    background.fill.solid()
-    background.fill.fore_color.rgb = C["cream"]
-    background.line.fill.background()
+    slide = prs.slides.add_slide(tpl.layout(prs, LAYOUT_CREMA))
 
     _make_logo(slide, Inches(0.4), Inches(0.35), Inches(0.6), Inches(0.65))
 
@@ -1731,33 +1700,7 @@ def _add_departamental_section(prs, section, fecha_corte="S.F."):
     pipeline = section.get("pipeline", [])
     insights = section.get("insights", [])
 
-    slide = prs.slides.add_slide(prs.slide_layouts[6])
-    background = slide.shapes.add_shape(
-        MSO_SHAPE.RECTANGLE,
-        Inches(0), Inches(0),
-        prs.slide_width, prs.slide_height
-    )
-    background.fill.solid()
-    background.fill.fore_color.rgb = C["navy"]
-    background.line.fill.background()
-
-    line_top = slide.shapes.add_shape(
-        MSO_SHAPE.RECTANGLE,
-        Inches(0), Inches(0.35),
-        prs.slide_width, Inches(0.06)
-    )
-    line_top.fill.solid()
-    line_top.fill.fore_color.rgb = C["teal"]
-    line_top.line.fill.background()
-
-    line_bottom = slide.shapes.add_shape(
-        MSO_SHAPE.RECTANGLE,
-        Inches(0), Inches(5.22),
-        prs.slide_width, Inches(0.06)
-    )
-    line_bottom.fill.solid()
-    line_bottom.fill.fore_color.rgb = C["teal"]
-    line_bottom.line.fill.background()
+    slide = prs.slides.add_slide(tpl.layout(prs, LAYOUT_SEPARADOR))
 
     circle = slide.shapes.add_shape(
         MSO_SHAPE.OVAL,
@@ -1815,15 +1758,7 @@ def _add_departamental_section(prs, section, fecha_corte="S.F."):
     p2.space_before = Pt(4)
 
     # ── Slide 2: KPIs + Tablas ──
-    slide = prs.slides.add_slide(prs.slide_layouts[6])
-    background = slide.shapes.add_shape(
-        MSO_SHAPE.RECTANGLE,
-        Inches(0), Inches(0),
-        prs.slide_width, prs.slide_height
-    )
-    background.fill.solid()
-    background.fill.fore_color.rgb = C["cream"]
-    background.line.fill.background()
+    slide = prs.slides.add_slide(tpl.layout(prs, LAYOUT_CREMA))
 
     badge = slide.shapes.add_shape(
         MSO_SHAPE.ROUNDED_RECTANGLE,
@@ -1921,33 +1856,7 @@ def _add_provincial_section(prs, section, fecha_corte="S.F."):
     tipos = section.get("tipos", [])
 
     # ── Slide 1: Separador provincial ──
-    slide = prs.slides.add_slide(prs.slide_layouts[6])
-    background = slide.shapes.add_shape(
-        MSO_SHAPE.RECTANGLE,
-        Inches(0), Inches(0),
-        prs.slide_width, prs.slide_height
-    )
-    background.fill.solid()
-    background.fill.fore_color.rgb = C["forest"]
-    background.line.fill.background()
-
-    line_top = slide.shapes.add_shape(
-        MSO_SHAPE.RECTANGLE,
-        Inches(0), Inches(0.35),
-        prs.slide_width, Inches(0.06)
-    )
-    line_top.fill.solid()
-    line_top.fill.fore_color.rgb = C["sage"]
-    line_top.line.fill.background()
-
-    line_bottom = slide.shapes.add_shape(
-        MSO_SHAPE.RECTANGLE,
-        Inches(0), Inches(5.22),
-        prs.slide_width, Inches(0.06)
-    )
-    line_bottom.fill.solid()
-    line_bottom.fill.fore_color.rgb = C["sage"]
-    line_bottom.line.fill.background()
+    slide = prs.slides.add_slide(tpl.layout(prs, LAYOUT_SEPARADOR_PROV))
 
     circle = slide.shapes.add_shape(
         MSO_SHAPE.OVAL,
@@ -2005,15 +1914,7 @@ def _add_provincial_section(prs, section, fecha_corte="S.F."):
     p2.space_before = Pt(4)
 
     # ── Slide 2: KPIs + Tablas (tipo siniestro y distritos) ──
-    slide = prs.slides.add_slide(prs.slide_layouts[6])
-    background = slide.shapes.add_shape(
-        MSO_SHAPE.RECTANGLE,
-        Inches(0), Inches(0),
-        prs.slide_width, prs.slide_height
-    )
-    background.fill.solid()
-    background.fill.fore_color.rgb = C["cream"]
-    background.line.fill.background()
+    slide = prs.slides.add_slide(tpl.layout(prs, LAYOUT_CREMA))
 
     badge = slide.shapes.add_shape(
         MSO_SHAPE.ROUNDED_RECTANGLE,
@@ -2111,33 +2012,7 @@ def _add_distrital_section(prs, section, fecha_corte="S.F."):
     tipos = section.get("tipos", [])
 
     # ── Slide 1: Separador distrital ──
-    slide = prs.slides.add_slide(prs.slide_layouts[6])
-    background = slide.shapes.add_shape(
-        MSO_SHAPE.RECTANGLE,
-        Inches(0), Inches(0),
-        prs.slide_width, prs.slide_height
-    )
-    background.fill.solid()
-    background.fill.fore_color.rgb = C["navy"]
-    background.line.fill.background()
-
-    line_top = slide.shapes.add_shape(
-        MSO_SHAPE.RECTANGLE,
-        Inches(0), Inches(0.35),
-        prs.slide_width, Inches(0.06)
-    )
-    line_top.fill.solid()
-    line_top.fill.fore_color.rgb = C["teal"]
-    line_top.line.fill.background()
-
-    line_bottom = slide.shapes.add_shape(
-        MSO_SHAPE.RECTANGLE,
-        Inches(0), Inches(5.22),
-        prs.slide_width, Inches(0.06)
-    )
-    line_bottom.fill.solid()
-    line_bottom.fill.fore_color.rgb = C["teal"]
-    line_bottom.line.fill.background()
+    slide = prs.slides.add_slide(tpl.layout(prs, LAYOUT_SEPARADOR))
 
     circle = slide.shapes.add_shape(
         MSO_SHAPE.OVAL,
@@ -2201,15 +2076,7 @@ def _add_distrital_section(prs, section, fecha_corte="S.F."):
     p2.space_before = Pt(4)
 
     # ── Slide 2: KPIs + Tabla de tipos de siniestro ──
-    slide = prs.slides.add_slide(prs.slide_layouts[6])
-    background = slide.shapes.add_shape(
-        MSO_SHAPE.RECTANGLE,
-        Inches(0), Inches(0),
-        prs.slide_width, prs.slide_height
-    )
-    background.fill.solid()
-    background.fill.fore_color.rgb = C["cream"]
-    background.line.fill.background()
+    slide = prs.slides.add_slide(tpl.layout(prs, LAYOUT_CREMA))
 
     badge = slide.shapes.add_shape(
         MSO_SHAPE.ROUNDED_RECTANGLE,
@@ -2292,33 +2159,7 @@ def _add_distrital_section(prs, section, fecha_corte="S.F."):
 
 def _add_nivel2_separator(prs, nivel2_label, fecha_corte):
     """Add dark separator slide that introduces Level 2 (complementary analysis)."""
-    slide = prs.slides.add_slide(prs.slide_layouts[6])
-    background = slide.shapes.add_shape(
-        MSO_SHAPE.RECTANGLE,
-        Inches(0), Inches(0),
-        prs.slide_width, prs.slide_height
-    )
-    background.fill.solid()
-    background.fill.fore_color.rgb = C["forest"]
-    background.line.fill.background()
-
-    line_top = slide.shapes.add_shape(
-        MSO_SHAPE.RECTANGLE,
-        Inches(0), Inches(0.35),
-        prs.slide_width, Inches(0.06)
-    )
-    line_top.fill.solid()
-    line_top.fill.fore_color.rgb = C["gold"]
-    line_top.line.fill.background()
-
-    line_bottom = slide.shapes.add_shape(
-        MSO_SHAPE.RECTANGLE,
-        Inches(0), Inches(5.22),
-        prs.slide_width, Inches(0.06)
-    )
-    line_bottom.fill.solid()
-    line_bottom.fill.fore_color.rgb = C["gold"]
-    line_bottom.line.fill.background()
+    slide = prs.slides.add_slide(tpl.layout(prs, LAYOUT_SEPARADOR_N2))
 
     # Icon circle
     circle = slide.shapes.add_shape(
@@ -2400,15 +2241,7 @@ def _add_nivel2_nacional(prs, section, nivel2_label):
     m = section["metricas"]
     tipos = section.get("tipos", [])
 
-    slide = prs.slides.add_slide(prs.slide_layouts[6])
-    background = slide.shapes.add_shape(
-        MSO_SHAPE.RECTANGLE,
-        Inches(0), Inches(0),
-        prs.slide_width, prs.slide_height
-    )
-    background.fill.solid()
-    background.fill.fore_color.rgb = C["cream"]
-    background.line.fill.background()
+    slide = prs.slides.add_slide(tpl.layout(prs, LAYOUT_CREMA))
 
     # Badge for Level 2
     badge = slide.shapes.add_shape(
@@ -2498,15 +2331,7 @@ def _add_nivel2_departamental(prs, section, nivel2_label, fecha_corte):
     tipos = section.get("tipos", [])
     provs = section.get("provincias", [])
 
-    slide = prs.slides.add_slide(prs.slide_layouts[6])
-    background = slide.shapes.add_shape(
-        MSO_SHAPE.RECTANGLE,
-        Inches(0), Inches(0),
-        prs.slide_width, prs.slide_height
-    )
-    background.fill.solid()
-    background.fill.fore_color.rgb = C["cream"]
-    background.line.fill.background()
+    slide = prs.slides.add_slide(tpl.layout(prs, LAYOUT_CREMA))
 
     # Badge: dept name + complementary tag
     badge = slide.shapes.add_shape(
@@ -2625,6 +2450,43 @@ def _add_nivel2_departamental(prs, section, nivel2_label, fecha_corte):
 # MAIN GENERATION FUNCTION
 # ══════════════════════════════════════════════════════════════════
 
+# ── Plantilla del mazo: layouts con fondo y marco (se arma una vez por proceso) ──
+LAYOUT_CREMA = "SAC crema"
+LAYOUT_SEPARADOR = "SAC separador"
+LAYOUT_SEPARADOR_PROV = "SAC separador provincial"
+LAYOUT_SEPARADOR_N2 = "SAC separador nivel 2"
+LAYOUT_RESUMEN = "SAC resumen ejecutivo"
+
+
+def _marco(y_top, y_bottom, color):
+    """Cromo de layout: líneas horizontales de ancho completo en y_top / y_bottom."""
+    def draw(slide):
+        for y in (y_top, y_bottom):
+            line = slide.shapes.add_shape(
+                MSO_SHAPE.RECTANGLE,
+                Inches(0), Inches(y),
+                Inches(10), Inches(0.06)
+            )
+            line.fill.solid()
+            line.fill.fore_color.rgb = C[color]
+            line.line.fill.background()
+    return draw
+
+
+def _setup_deck(prs):
+    prs.slide_width = Inches(10)
+    prs.slide_height = Inches(5.625)
+    prs.core_properties.author = "DSFFA — MIDAGRI"
+    prs.core_properties.title = "SAC 2025-2026 — Presentación Dinámica"
+    tpl.add_layout(prs, LAYOUT_CREMA, C["cream"])
+    tpl.add_layout(prs, LAYOUT_SEPARADOR, C["navy"], _marco(0.35, 5.22, "teal"))
+    tpl.add_layout(prs, LAYOUT_SEPARADOR_PROV, C["forest"], _marco(0.35, 5.22, "sage"))
+    tpl.add_layout(prs, LAYOUT_SEPARADOR_N2, C["forest"], _marco(0.35, 5.22, "gold"))
+    tpl.add_layout(prs, LAYOUT_RESUMEN, C["navy"], _marco(0.2, 5.42, "teal"))
+    tpl.prune_layouts(prs, [LAYOUT_CREMA, LAYOUT_SEPARADOR, LAYOUT_SEPARADOR_PROV,
+                            LAYOUT_SEPARADOR_N2, LAYOUT_RESUMEN])
+
+
 def generar_ppt_dinamico(df, filtros, fecha_corte):
     """
     Genera una presentación PPT dinámica con python-pptx.
@@ -2641,11 +2503,7 @@ def generar_ppt_dinamico(df, filtros, fecha_corte):
     Returns:
         bytes del archivo .pptx
     """
-    prs = Presentation()
-    prs.slide_width = Inches(10)
-    prs.slide_height = Inches(5.625)
-    prs.author = "DSFFA — MIDAGRI"
-    prs.title = "SAC 2025-2026 — Presentación Dinámica"
+    prs = tpl.deck_template("ppt_dinamico", _setup_deck)
 
     data = _prepare_data(df, filtros, fecha_corte)
 
@@ -22,7 +22,6 @@ from datetime import datetime
 
 import numpy as np
 import pandas as pd
-from pptx import Presentation
 from pptx.util import Inches, Pt
 from pptx.dml.color import RGBColor
 from pptx.enum.text import PP_ALIGN
@@ -30,6 +29,8 @@ from pptx.enum.shapes import MSO_SHAPE
 from pptx.enum.chart import XL_CHART_TYPE, XL_LEGEND_POSITION
 from pptx.chart.data import CategoryChartData
 
+from shared import pptx_template as tpl
+
 # ═══════════════════════════════════════════════════════════════
 # COLORES MIDAGRI
 # ═══════════════════════════════════════════════════════════════
@@ -61,9 +62,26 @@ if os.path.exists(_RESUMEN_PATH):
 # HELPERS
 # ═══════════════════════════════════════════════════════════════
 
-def _bg(slide, prs, color):
-    bg = slide.shapes.add_shape(MSO_SHAPE.RECTANGLE, 0, 0, prs.slide_width, prs.slide_height)
-    bg.fill.solid(); bg.fill.fore_color.rgb = color; bg.line.fill.background()
+LAYOUT_PORTADA = "SAC histórico portada"
+LAYOUT_CONTENIDO = "SAC histórico contenido"
+
+
+def _lines(slide):
+    for y in [0.4, 6.8]:
+        ln = slide.shapes.add_shape(MSO_SHAPE.RECTANGLE, 0, Inches(y), Inches(13.33), Inches(0.06))
+        ln.fill.solid(); ln.fill.fore_color.rgb = VERDE; ln.line.fill.background()
+
+
+def _setup_deck(prs):
+    """Plantilla del mazo: tamaño + layouts con fondo (y líneas en portada/cierre)."""
+    prs.slide_width = Inches(13.33); prs.slide_height = Inches(7.5)
+    tpl.add_layout(prs, LAYOUT_PORTADA, GRIS, _lines)
+    tpl.add_layout(prs, LAYOUT_CONTENIDO, CREMA)
+    tpl.prune_layouts(prs, [LAYOUT_PORTADA, LAYOUT_CONTENIDO])
+
+
+def _new_slide(prs, layout_name):
+    return prs.slides.add_slide(tpl.layout(prs, layout_name))
 
 
 def _text(slide, x, y, w, h, txt, size=14, bold=False, color=GRIS, align=PP_ALIGN.LEFT, font=FONT):
@@ -75,39 +93,46 @@ def _text(slide, x, y, w, h, txt, size=14, bold=False, color=GRIS, align=PP_ALIG
     return frame
 
 
-def _lines(slide, prs):
-    for y in [0.4, 6.8]:
-        ln = slide.shapes.add_shape(MSO_SHAPE.RECTANGLE, 0, Inches(y), prs.slide_width, Inches(0.06))
-        ln.fill.solid(); ln.fill.fore_color.rgb = VERDE; ln.line.fill.background()
-
+# Tarjetas y filas de tabla: se dibujan una vez por forma/color en el origen
+# (shared/pptx_template) y cada uso es un clon con los textos.
 
 def _kpi_card(slide, x, y, w, h, label, value, sub, accent):
-    card = slide.shapes.add_shape(MSO_SHAPE.ROUNDED_RECTANGLE, Inches(x), Inches(y), Inches(w), Inches(h))
+    key = ("hist_kpi", w, h, str(accent), bool(sub))
+    proto = tpl.shape_prototype(key, lambda s: _draw_kpi_card(s, w, h, accent, bool(sub)))
+    tpl.place(slide, proto, Inches(x), Inches(y), [label, value, sub])
+
+
+def _draw_kpi_card(slide, w, h, accent, with_sub):
+    card = slide.shapes.add_shape(MSO_SHAPE.ROUNDED_RECTANGLE, 0, 0, Inches(w), Inches(h))
     card.fill.solid(); card.fill.fore_color.rgb = BLANCO; card.line.fill.background()
-    bar = slide.shapes.add_shape(MSO_SHAPE.RECTANGLE, Inches(x), Inches(y), Inches(0.07), Inches(h))
+    bar = slide.shapes.add_shape(MSO_SHAPE.RECTANGLE, 0, 0, Inches(0.07), Inches(h))
     bar.fill.solid(); bar.fill.fore_color.rgb = accent; bar.line.fill.background()
-    _text(slide, x + 0.18, y + 0.08, w - 0.3, 0.25, label, 10, True, RGBColor(0x64, 0x74, 0x8B))
-    _text(slide, x + 0.18, y + 0.35, w - 0.3, 0.55, value, 24, True, GRIS)
-    if sub:
-        _text(slide, x + 0.18, y + h - 0.35, w - 0.3, 0.25, sub, 9, False, RGBColor(0x94, 0xA3, 0xB8))
+    _text(slide, 0.18, 0.08, w - 0.3, 0.25, tpl.PLACEHOLDER, 10, True, RGBColor(0x64, 0x74, 0x8B))
+    _text(slide, 0.18, 0.35, w - 0.3, 0.55, tpl.PLACEHOLDER, 24, True, GRIS)
+    if with_sub:
+        _text(slide, 0.18, h - 0.35, w - 0.3, 0.25, tpl.PLACEHOLDER, 9, False, RGBColor(0x94, 0xA3, 0xB8))
 
 
 def _table_header(slide, x, y, widths, labels, color):
-    for j, (lbl, w) in enumerate(zip(labels, widths)):
-        cx = x + sum(widths[:j])
-        cell = slide.shapes.add_shape(MSO_SHAPE.RECTANGLE, Inches(cx), Inches(y), Inches(w), Inches(0.35))
-        cell.fill.solid(); cell.fill.fore_color.rgb = color; cell.line.fill.background()
-        _text(slide, cx + 0.08, y, w - 0.16, 0.35, lbl, 10, True, BLANCO,
-              PP_ALIGN.LEFT if j == 0 else PP_ALIGN.CENTER)
+    proto = tpl.shape_prototype(("hist_th", tuple(widths), str(color)),
+                                lambda s: _draw_cells(s, widths, 0.35, color, 0, 0.35, 10, True, BLANCO))
+    tpl.place(slide, proto, Inches(x), Inches(y), labels)
 
 
 def _table_row(slide, x, y, widths, values, row_idx):
     bg_c = BLANCO if row_idx % 2 == 0 else CREMA
-    for j, (val, w) in enumerate(zip(values, widths)):
-        cx = x + sum(widths[:j])
-        cell = slide.shapes.add_shape(MSO_SHAPE.RECTANGLE, Inches(cx), Inches(y), Inches(w), Inches(0.38))
-        cell.fill.solid(); cell.fill.fore_color.rgb = bg_c; cell.line.fill.background()
-        _text(slide, cx + 0.08, y + 0.02, w - 0.16, 0.34, str(val), 11, False, GRIS,
+    proto = tpl.shape_prototype(("hist_tr", tuple(widths), str(bg_c)),
+                                lambda s: _draw_cells(s, widths, 0.38, bg_c, 0.02, 0.34, 11, False, GRIS))
+    tpl.place(slide, proto, Inches(x), Inches(y), [str(v) for v in values])
+
+
+def _draw_cells(slide, widths, cell_h, fill, text_dy, text_h, size, bold, color):
+    """Fila de celdas (rectángulo + cuadro de texto por columna) en el origen."""
+    for j, w in enumerate(widths):
+        cx = sum(widths[:j])
+        cell = slide.shapes.add_shape(MSO_SHAPE.RECTANGLE, Inches(cx), 0, Inches(w), Inches(cell_h))
+        cell.fill.solid(); cell.fill.fore_color.rgb = fill; cell.line.fill.background()
+        _text(slide, cx + 0.08, text_dy, w - 0.16, text_h, tpl.PLACEHOLDER, size, bold, color,
               PP_ALIGN.LEFT if j == 0 else PP_ALIGN.CENTER)
 
 
@@ -147,21 +172,59 @@ def _normalize_dept(name):
 # EXTRACCIÓN DE DATOS DE LA CAMPAÑA ACTUAL
 # ═══════════════════════════════════════════════════════════════
 
+def _normalize_col(col):
+    """_normalize_dept sobre una columna: se aplica una vez por valor distinto."""
+    col = col.astype(str).str.strip().str.upper()
+    return col.map({v: _normalize_dept(v) for v in col.unique()})
+
+
 def _extract_current_campaign(datos, depto):
     """Extrae métricas de la campaña actual desde datos['midagri'] (tiempo real)."""
+    return extract_current_campaigns(datos, [depto])[depto]
+
+
+def extract_current_campaigns(datos, deptos):
+    """Métricas de la campaña actual para varios departamentos en una pasada.
+
+    La columna DEPARTAMENTO de midagri/materia se normaliza una sola vez y
+    se agrupa; devuelve {depto: métricas o None} con los nombres recibidos.
+    """
+    out = dict.fromkeys(deptos)
     df = datos.get("midagri")
-    if df is None or df.empty:
-        return None
+    if df is None or df.empty or "DEPARTAMENTO" not in df.columns:
+        return out
 
-    depto_norm = _normalize_dept(depto)
-    dept_col = "DEPARTAMENTO"
-    if dept_col not in df.columns:
+    # Prima neta del departamento (primera fila de materia asegurada actual)
+    primas = {}
+    materia = datos.get("materia")
+    if materia is not None and not materia.empty and "DEPARTAMENTO" in materia.columns \
+            and "PRIMA_NETA" in materia.columns:
+        mat = materia[["PRIMA_NETA"]].assign(_DEP=_normalize_col(materia["DEPARTAMENTO"]))
+        mat = mat.drop_duplicates("_DEP")
+        for dep, prima in zip(mat["_DEP"], mat["PRIMA_NETA"]):
+            primas[dep] = float(pd.to_numeric(prima, errors="coerce") or 0)
+
+    grupos = df.groupby(_normalize_col(df["DEPARTAMENTO"]), sort=False).indices
+    for depto in out:
+        dep = _normalize_dept(depto)
+        idx = grupos.get(dep)
+        if idx is not None:
+            out[depto] = _campaign_metrics(df.iloc[idx], primas.get(dep, 0),
+                                           datos.get("fecha_corte", "S.F."))
+    return out
+
+
+def current_campaign_from_depto(depto_data):
+    """Métricas de la campaña actual desde get_departamento_data (ya filtrado)."""
+    df = depto_data.get("df_depto")
+    if df is None or df.empty:
         return None
+    return _campaign_metrics(df, float(depto_data.get("prima_neta", 0) or 0),
+                             depto_data.get("fecha_corte", "S.F."))
 
-    puno = df[df[dept_col].astype(str).str.strip().str.upper().apply(_normalize_dept) == depto_norm].copy()
-    if puno.empty:
-        return None
 
+def _campaign_metrics(puno, prima_neta, fecha_corte):
+    """Métricas de las filas de midagri de un departamento."""
     # Indemnización
     indemn = pd.to_numeric(puno.get("INDEMNIZACION", 0), errors="coerce").fillna(0)
     monto = float(indemn.sum())
@@ -174,14 +237,6 @@ def _extract_current_campaign(datos, depto):
     no_ind = dictamen.str.contains("NO INDEMNIZABLE", na=False).sum()
     pendientes = len(puno) - ind_mask.sum() - no_ind
 
-    # Prima neta del departamento (de materia asegurada actual)
-    materia = datos.get("materia")
-    prima_neta = 0
-    if materia is not None and not materia.empty and "DEPARTAMENTO" in materia.columns:
-        mat_dept = materia[materia["DEPARTAMENTO"].astype(str).str.strip().str.upper().apply(_normalize_dept) == depto_norm]
-        if not mat_dept.empty and "PRIMA_NETA" in mat_dept.columns:
-            prima_neta = float(pd.to_numeric(mat_dept["PRIMA_NETA"].iloc[0], errors="coerce") or 0)
-
     # Top cultivos
     cult_col = "TIPO_CULTIVO" if "TIPO_CULTIVO" in puno.columns else None
     top_cult = []
@@ -210,7 +265,7 @@ def _extract_current_campaign(datos, depto):
         "distritos": int(puno["DISTRITO"].nunique()) if "DISTRITO" in puno.columns else 0,
         "top_cultivos": top_cult,
         "top_siniestros": top_sin,
-        "fecha_corte": datos.get("fecha_corte", "S.F."),
+        "fecha_corte": fecha_corte,
     }
 
 
@@ -229,6 +284,16 @@ def generar_ppt_historico(depto, datos, primas_hist):
     Returns:
         bytes del archivo .pptx
     """
+    return render_ppt_historico(depto, _extract_current_campaign(datos, depto), primas_hist)
+
+
+def render_ppt_historico(depto, actual, primas_hist):
+    """Arma la PPT con las métricas de la campaña actual ya extraídas.
+
+    Sólo recibe dicts/listas (picklables): batch_reports.build_historico_zip
+    extrae `actual` para todos los departamentos con extract_current_campaigns
+    y renderiza cada mazo en un proceso aparte.
+    """
     depto_norm = _normalize_dept(depto)
     depto_display = depto.strip().title()
 
@@ -259,9 +324,6 @@ def generar_ppt_historico(depto, datos, primas_hist):
             "top_siniestros": h.get("top_siniestros", []),
         })
 
-    # Campaña actual
-    actual = _extract_current_campaign(datos, depto)
-
     # Totales históricos
     total_prima = sum(d["prima_neta"] for d in campanas_data)
     total_indem = sum(d["monto"] for d in campanas_data)
@@ -273,12 +335,10 @@ def generar_ppt_historico(depto, datos, primas_hist):
     # ══════════════════════════════════════════════════════════
     # CREAR PRESENTACIÓN
     # ══════════════════════════════════════════════════════════
-    prs = Presentation()
-    prs.slide_width = Inches(13.33); prs.slide_height = Inches(7.5)
+    prs = tpl.deck_template("ppt_historico", _setup_deck)
 
     # SLIDE 1: PORTADA
-    slide = prs.slides.add_slide(prs.slide_layouts[6])
-    _bg(slide, prs, GRIS); _lines(slide, prs)
+    slide = _new_slide(prs, LAYOUT_PORTADA)
     _text(slide, 0.8, 1.8, 11.7, 1.0, "SEGURO AGRÍCOLA CATASTRÓFICO", 40, True, BLANCO, PP_ALIGN.CENTER, "Georgia")
     _text(slide, 0.8, 2.7, 11.7, 0.5, "SAC — Análisis Histórico de Siniestralidad", 22, False, TEAL, PP_ALIGN.CENTER, "Georgia")
     sep = slide.shapes.add_shape(MSO_SHAPE.RECTANGLE, Inches(4.5), Inches(3.4), Inches(4.3), Inches(0.04))
@@ -294,8 +354,7 @@ def generar_ppt_historico(depto, datos, primas_hist):
           11, True, RGBColor(0xAA, 0xAA, 0xAA), PP_ALIGN.CENTER)
 
     # SLIDE 2: RESUMEN EJECUTIVO
-    slide = prs.slides.add_slide(prs.slide_layouts[6])
-    _bg(slide, prs, CREMA)
+    slide = _new_slide(prs, LAYOUT_CONTENIDO)
     _text(slide, 0.8, 0.35, 11.7, 0.5, f"Resumen Ejecutivo — {depto_display} (5 campañas)", 26, True, GRIS, PP_ALIGN.LEFT, "Georgia")
 
     _kpi_card(slide, 0.6, 1.1, 2.4, 1.3, "PRIMA NETA ACUMULADA", _fmt(total_prima), "5 campañas", AZUL)
@@ -315,8 +374,7 @@ def generar_ppt_historico(depto, datos, primas_hist):
         _table_row(slide, 0.6, 3.4 + i * 0.28, ws, vals, i)
 
     # SLIDE 3: GRÁFICO PRIMA vs INDEMNIZACIÓN
-    slide = prs.slides.add_slide(prs.slide_layouts[6])
-    _bg(slide, prs, CREMA)
+    slide = _new_slide(prs, LAYOUT_CONTENIDO)
     _text(slide, 0.8, 0.35, 11.7, 0.5, "Prima Neta vs. Indemnización — Siniestralidad", 26, True, GRIS, PP_ALIGN.LEFT, "Georgia")
 
     chart_data = CategoryChartData()
@@ -352,8 +410,7 @@ def generar_ppt_historico(depto, datos, primas_hist):
 
     # SLIDES 4-8: DETALLE POR CAMPAÑA HISTÓRICA
     for idx, d in enumerate(campanas_data):
-        slide = prs.slides.add_slide(prs.slide_layouts[6])
-        _bg(slide, prs, CREMA)
+        slide = _new_slide(prs, LAYOUT_CONTENIDO)
 
         badge = slide.shapes.add_shape(MSO_SHAPE.ROUNDED_RECTANGLE, Inches(0.5), Inches(0.3), Inches(2.5), Inches(0.45))
         badge.fill.solid(); badge.fill.fore_color.rgb = VERDE; badge.line.fill.background()
@@ -403,8 +460,7 @@ def generar_ppt_historico(depto, datos, primas_hist):
 
     # SLIDE 9: CAMPAÑA ACTUAL (datos dinámicos)
     if actual:
-        slide = prs.slides.add_slide(prs.slide_layouts[6])
-        _bg(slide, prs, CREMA)
+        slide = _new_slide(prs, LAYOUT_CONTENIDO)
 
         badge = slide.shapes.add_shape(MSO_SHAPE.ROUNDED_RECTANGLE, Inches(0.5), Inches(0.3), Inches(3.2), Inches(0.45))
         badge.fill.solid(); badge.fill.fore_color.rgb = DORADO; badge.line.fill.background()
@@ -455,8 +511,7 @@ def generar_ppt_historico(depto, datos, primas_hist):
 
     # SLIDE 10: TOP PROVINCIAS
     if top_provs:
-        slide = prs.slides.add_slide(prs.slide_layouts[6])
-        _bg(slide, prs, CREMA)
+        slide = _new_slide(prs, LAYOUT_CONTENIDO)
         _text(slide, 0.8, 0.35, 11.7, 0.5,
               f"Provincias de Mayor Impacto — {depto_display} (acumulado 5 campañas)", 22, True, GRIS, PP_ALIGN.LEFT, "Georgia")
 
@@ -470,8 +525,7 @@ def generar_ppt_historico(depto, datos, primas_hist):
 
     # SLIDE 11: ESTACIONALIDAD
     if estacionalidad:
-        slide = prs.slides.add_slide(prs.slide_layouts[6])
-        _bg(slide, prs, CREMA)
+        slide = _new_slide(prs, LAYOUT_CONTENIDO)
         _text(slide, 0.8, 0.35, 11.7, 0.5,
               f"Estacionalidad de Siniestros — {depto_display}", 22, True, GRIS, PP_ALIGN.LEFT, "Georgia")
 
@@ -499,8 +553,7 @@ def generar_ppt_historico(depto, datos, primas_hist):
                   12, False, GRIS)
 
     # SLIDE 12: CIERRE
-    slide = prs.slides.add_slide(prs.slide_layouts[6])
-    _bg(slide, prs, GRIS); _lines(slide, prs)
+    slide = _new_slide(prs, LAYOUT_PORTADA)
     _text(slide, 0.8, 2.0, 11.7, 0.8, "SEGURO AGRÍCOLA CATASTRÓFICO", 32, True, BLANCO, PP_ALIGN.CENTER, "Georgia")
     _text(slide, 0.8, 2.8, 11.7, 0.5, f"SAC 2020–2025 · Departamento: {depto_display}", 18, False, TEAL, PP_ALIGN.CENTER, "Georgia")
     sep = slide.shapes.add_shape(MSO_SHAPE.RECTANGLE, Inches(4.5), Inches(3.5), Inches(4.3), Inches(0.04))
@@ -7,8 +7,21 @@ Uses gen_word_nacional_py.py and gen_word_departamental_py.py for document gener
 Compatible with Streamlit Community Cloud (no Node.js required).
 """
 
-from gen_word_nacional_py import generate_nacional_docx as _gen_nacional
-from gen_word_departamental_py import generate_departamental_docx as _gen_departamental
+import importlib
+
+from shared import word_payload as wp
+
+# python-docx generators, imported on first render (python-docx is not
+# needed to build payloads, and importing this module stays cheap for pages).
+_RENDERERS = {
+    "nacional": ("gen_word_nacional_py", "generate_nacional_docx"),
+    "departamental": ("gen_word_departamental_py", "generate_departamental_docx"),
+}
+
+
+def _renderer(kind):
+    module, func = _RENDERERS[kind]
+    return getattr(importlib.import_module(module), func)
 
 
 def generate_nacional_docx(datos):
@@ -16,54 +29,38 @@ def generate_nacional_docx(datos):
     Generate Nacional document using pure Python.
     Accepts raw data from data_processor (with DataFrames) and converts to dicts.
     """
-    # Prepare cuadro1 from DataFrame if needed
-    cuadro1 = []
-    if hasattr(datos.get("cuadro1"), "iterrows"):
-        for _, row in datos["cuadro1"].iterrows():
-            depto = str(row.get("Departamento", ""))
-            if depto.upper() == "TOTAL":
-                continue  # Skip TOTAL rows — generator adds its own
-            cuadro1.append({
-                "departamento": depto,
-                "prima_total": float(row.get("Prima Total (S/)", 0) or 0),
-                "hectareas": float(row.get("Hectáreas Aseguradas", 0) or 0),
-                "suma_asegurada": float(row.get("Suma Asegurada Máxima (S/)", 0) or 0),
-            })
-    else:
-        cuadro1 = datos.get("cuadro1", [])
-
-    cuadro2 = []
-    if hasattr(datos.get("cuadro2"), "iterrows"):
-        for _, row in datos["cuadro2"].iterrows():
-            depto = str(row.get("Departamento", ""))
-            if depto.upper() == "TOTAL":
-                continue
-            cuadro2.append({
-                "departamento": depto,
-                "ha_indemnizadas": float(row.get("Hectáreas Indemnizadas", 0) or 0),
-                "monto_indemnizado": float(row.get("Monto Indemnizado (S/)", 0) or 0),
-                "monto_desembolsado": float(row.get("Monto Desembolsado (S/)", 0) or 0),
-                "productores": float(row.get("Productores con Desembolso", 0) or 0),
-            })
-    else:
-        cuadro2 = datos.get("cuadro2", [])
+    return _renderer("nacional")(build_nacional_payload(datos))
 
-    cuadro3 = []
-    if hasattr(datos.get("cuadro3"), "iterrows"):
-        for _, row in datos["cuadro3"].iterrows():
-            depto = str(row.get("Departamento", ""))
-            if depto.upper() == "TOTAL":
-                continue
-            cuadro3.append({
-                "departamento": depto,
-                "avisos": float(row.get("Avisos", 0) or 0),
-                "ha_indemn": float(row.get("Ha Indemn.", 0) or 0),
-                "monto_indemnizado": float(row.get("Monto Indemnizado (S/)", 0) or 0),
-                "monto_desembolsado": float(row.get("Monto Desembolsado (S/)", 0) or 0),
-                "productores": float(row.get("Productores", 0) or 0),
-            })
-    else:
-        cuadro3 = datos.get("cuadro3", [])
+
+def build_nacional_payload(datos):
+    """
+    Convert `datos` (DataFrames) into the plain, picklable payload that
+    gen_word_nacional_py renders. Split from the rendering so batch mode can
+    compute payloads up front and render them in worker processes.
+    """
+    # Cuadros: conversión columnar (shared.word_payload), sin filas TOTAL —
+    # el generador agrega las suyas
+    cuadro1 = _cuadro(datos, "cuadro1", {
+        "departamento": ("Departamento", str),
+        "prima_total": ("Prima Total (S/)", float),
+        "hectareas": ("Hectáreas Aseguradas", float),
+        "suma_asegurada": ("Suma Asegurada Máxima (S/)", float),
+    })
+    cuadro2 = _cuadro(datos, "cuadro2", {
+        "departamento": ("Departamento", str),
+        "ha_indemnizadas": ("Hectáreas Indemnizadas", float),
+        "monto_indemnizado": ("Monto Indemnizado (S/)", float),
+        "monto_desembolsado": ("Monto Desembolsado (S/)", float),
+        "productores": ("Productores con Desembolso", float),
+    })
+    cuadro3 = _cuadro(datos, "cuadro3", {
+        "departamento": ("Departamento", str),
+        "avisos": ("Avisos", float),
+        "ha_indemn": ("Ha Indemn.", float),
+        "monto_indemnizado": ("Monto Indemnizado (S/)", float),
+        "monto_desembolsado": ("Monto Desembolsado (S/)", float),
+        "productores": ("Productores", float),
+    })
 
     def _safe_int(v):
         """Safely convert value to int, handling Series and other types."""
@@ -108,7 +105,8 @@ def generate_nacional_docx(datos):
         c3_temp = datos["cuadro3"][datos["cuadro3"]["Departamento"] != "TOTAL"]
         if len(c3_temp) > 0:
             top3 = c3_temp.nlargest(3, "Avisos")
-            parts = [f"{r['Departamento'].title()} ({_safe_int(r['Avisos'])} avisos)" for _, r in top3.iterrows()]
+            parts = [f"{d.title()} ({_safe_int(n)} avisos)"
+                     for d, n in zip(top3["Departamento"], top3["Avisos"])]
             top3_lluvia_text = ", ".join(parts)
 
     # Top 3 siniestros text
@@ -148,7 +146,18 @@ def generate_nacional_docx(datos):
         "top3_siniestros_text": top3_sin_text,
     }
 
-    return _gen_nacional(payload)
+    return payload
+
+
+def _cuadro(datos, key, spec):
+    """datos[key] como lista de dicts del payload (ver word_payload.table_records).
+
+    Si ya viene como lista (payload armado en otro lado) se pasa tal cual.
+    """
+    df = datos.get(key)
+    if hasattr(df, "columns"):
+        return wp.table_records(df, spec)
+    return datos.get(key, [])
 
 
 def generate_departamental_docx(depto_data):
@@ -156,8 +165,14 @@ def generate_departamental_docx(depto_data):
     Generate Departamental document using pure Python.
     Accepts raw data from data_processor and converts to serializable format.
     """
-    import pandas as pd
+    return _renderer("departamental")(build_departamental_payload(depto_data))
 
+
+def build_departamental_payload(depto_data):
+    """
+    Convert get_departamento_data() output into the plain, picklable payload
+    that gen_word_departamental_py renders.
+    """
     def _safe_int_d(v):
         try:
             if hasattr(v, 'item'): return int(v.item())
@@ -211,36 +226,35 @@ def generate_departamental_docx(depto_data):
     # Distribución por provincia
     dist_prov = []
     dist_prov_headers = ["Provincia", "Avisos", "Sup. Indemn.", "Prod. Benef.", "Indemniz.", "Desembolso", "% Avance"]
-    if hasattr(d.get("dist_provincia"), "iterrows") and len(d["dist_provincia"]) > 0:
-        for _, row in d["dist_provincia"].iterrows():
-            prov_name = str(row.get("PROVINCIA", "")).title()
-            avisos = str(int(row.get("avisos", 0)))
-            sup = f"{float(row.get('sup_indemn', 0) or 0):,.2f} ha"
-            prod = str(int(float(row.get("productores", 0) or 0)))
-            indemn = f"S/ {float(row.get('indemniz', 0) or 0):,.0f}"
-            desemb = f"S/ {float(row.get('desembolso', 0) or 0):,.0f}"
-            pct = str(row.get("pct_avance", "0%"))
-            dist_prov.append([prov_name, avisos, sup, prod, indemn, desemb, pct])
+    dp = d.get("dist_provincia")
+    if hasattr(dp, "columns") and len(dp) > 0:
+        dist_prov = wp.rows(
+            [p.title() for p in wp.text(dp, "PROVINCIA")],
+            [str(int(v)) for v in wp.numeric(dp, "avisos")],
+            [f"{v:,.2f} ha" for v in wp.numeric(dp, "sup_indemn")],
+            [str(int(v)) for v in wp.numeric(dp, "productores")],
+            [f"S/ {v:,.0f}" for v in wp.numeric(dp, "indemniz")],
+            [f"S/ {v:,.0f}" for v in wp.numeric(dp, "desembolso")],
+            wp.text(dp, "pct_avance", "0%"),
+        )
 
     # Eventos recientes
     eventos = []
     eventos_headers = ["Fecha", "Provincia", "Distrito / Sector", "Cultivo", "Estado"]
-    if hasattr(d.get("eventos_recientes"), "iterrows") and len(d["eventos_recientes"]) > 0:
-        for _, row in d["eventos_recientes"].iterrows():
-            fecha = ""
-            if "_fecha" in row.index and pd.notna(row["_fecha"]):
-                try:
-                    fecha = row["_fecha"].strftime("%d/%m/%Y")
-                except Exception:
-                    fecha = str(row["_fecha"])
-            prov = str(row.get("PROVINCIA", "")).title()
-            dist = str(row.get("DISTRITO", "")).title()
-            sector = str(row.get("SECTOR_ESTADISTICO", ""))
-            if sector and sector not in ["", "nan", "-", "None"]:
-                dist = f"{dist} / {sector.title()}"
-            cultivo = str(row.get("TIPO_CULTIVO", "")).title()
-            estado = str(row.get("ESTADO_INSPECCION", "")).title()
-            eventos.append([fecha, prov, dist, cultivo, estado])
+    ev = d.get("eventos_recientes")
+    if hasattr(ev, "columns") and len(ev) > 0:
+        distritos = [
+            f"{dist.title()} / {sector.title()}" if sector not in ["", "nan", "-", "None"]
+            else dist.title()
+            for dist, sector in zip(wp.text(ev, "DISTRITO"), wp.text(ev, "SECTOR_ESTADISTICO"))
+        ]
+        eventos = wp.rows(
+            wp.dates(ev, "_fecha"),
+            [p.title() for p in wp.text(ev, "PROVINCIA")],
+            distritos,
+            [c.title() for c in wp.text(ev, "TIPO_CULTIVO")],
+            [e.title() for e in wp.text(ev, "ESTADO_INSPECCION")],
+        )
 
     payload = {
         "departamento": d.get("departamento", ""),
@@ -264,4 +278,12 @@ def generate_departamental_docx(depto_data):
         "resumen_desembolso": resumen_desemb,
     }
 
-    return _gen_departamental(payload)
+    return payload
+
+
+def render_docx(kind, payload):
+    """
+    Render a pre-built payload ("nacional" | "departamental") to DOCX bytes.
+    Module-level so it can be submitted to a ProcessPoolExecutor.
+    """
+    return _renderer(kind)(payload)
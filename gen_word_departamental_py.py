@@ -10,14 +10,14 @@ Usage:
     docx_bytes = generate_departamental_docx(depto_data_dict)
 """
 
-from docx import Document
 from docx.shared import Pt, RGBColor, Inches
 from docx.enum.text import WD_ALIGN_PARAGRAPH
 from docx.oxml.ns import qn, nsdecls
-from docx.oxml import parse_xml
 from docx.enum.section import WD_SECTION
 from io import BytesIO
 
+from shared import docx_template as tpl
+
 
 # ═══ Colors (Lambayeque palette) ═══
 C = {
@@ -48,31 +48,18 @@ def fmt_num(val, dec=2):
 
 def set_cell_background(cell, fill_color):
     """Set cell background color using XML shading."""
-    shading = parse_xml(f'<w:shd {nsdecls("w")} w:fill="{fill_color}" w:val="clear"/>')
-    cell._tc.get_or_add_tcPr().append(shading)
+    cell._tc.get_or_add_tcPr().append(tpl.fragment(tpl.shading_xml(fill_color)))
 
 
-def set_cell_border(cell):
+def set_cell_border(cell, color="BBBBBB"):
     """Add thin borders to cell."""
-    tcPr = cell._tc.get_or_add_tcPr()
-    tcBorders = parse_xml(
-        f'<w:tcBorders {nsdecls("w")}>'
-        f'<w:top w:val="single" w:sz="4" w:space="0" w:color="BBBBBB"/>'
-        f'<w:left w:val="single" w:sz="4" w:space="0" w:color="BBBBBB"/>'
-        f'<w:bottom w:val="single" w:sz="4" w:space="0" w:color="BBBBBB"/>'
-        f'<w:right w:val="single" w:sz="4" w:space="0" w:color="BBBBBB"/>'
-        f'</w:tcBorders>'
-    )
-    tcPr.append(tcBorders)
+    cell._tc.get_or_add_tcPr().append(tpl.fragment(tpl.borders_xml(color)))
 
 
 def set_paragraph_bottom_border(paragraph, color="C0392B", size="12"):
     """Add bottom border to paragraph."""
     pPr = paragraph._element.get_or_add_pPr()
-    pBdr = parse_xml(
-        f'<w:pBdr {nsdecls("w")}><w:bottom w:val="single" w:sz="{size}" w:space="1" w:color="{color}"/></w:pBdr>'
-    )
-    pPr.append(pBdr)
+    pPr.append(tpl.fragment(tpl.paragraph_border_xml(color, size)))
 
 
 def heading_1(doc, text):
@@ -108,68 +95,66 @@ def heading_2(doc, text):
     return h2
 
 
+TABLE_STYLE = "Light Grid Accent 1"
+
+
+def _format_table_row(row, kind):
+    """Format one create_table row. kind: header | total | alt | plain."""
+    for col_idx, cell in enumerate(row.cells):
+        cell.text = tpl.PLACEHOLDER
+        if kind in ("header", "total"):
+            set_cell_background(cell, C["DARK_BLUE"])
+        elif kind == "alt":
+            set_cell_background(cell, C["ALT_ROW"])
+
+        paragraph = cell.paragraphs[0]
+        if kind == "header":
+            paragraph.alignment = WD_ALIGN_PARAGRAPH.CENTER
+        else:
+            paragraph.alignment = WD_ALIGN_PARAGRAPH.RIGHT if col_idx > 0 else WD_ALIGN_PARAGRAPH.LEFT
+
+        for run in paragraph.runs:
+            run.font.bold = kind in ("header", "total")
+            run.font.size = Pt(9)
+            run.font.name = "Calibri"
+            if kind in ("header", "total"):
+                run.font.color.rgb = RGBColor(255, 255, 255)
+
+        set_cell_border(cell)
+
+
 def create_table(doc, headers, rows, col_widths_twips=None):
-    """Create a professional table."""
+    """Create a professional table.
+
+    Each row variant (header / total / alternate / plain) is formatted once
+    per process (shared.docx_template.row_prototype); rows are clones of the
+    prototype with only the text replaced.
+    """
     if not rows:
         return None
-    
-    table = doc.add_table(rows=len(rows) + 1, cols=len(headers))
-    table.style = "Light Grid Accent 1"
-    
+
+    n_cols = len(headers)
     # Auto width if not specified
     if col_widths_twips is None:
-        col_widths_twips = [9360 // len(headers)] * len(headers)
-    
-    # Set column widths
-    for i, width in enumerate(col_widths_twips):
-        table.columns[i].width = width
-    
+        col_widths_twips = [9360 // n_cols] * n_cols
+    widths = tuple(col_widths_twips)
+
+    table = tpl.new_table(doc, n_cols, widths, style=TABLE_STYLE)
+
+    def _proto(kind):
+        return tpl.row_prototype(("departamental", kind, widths), n_cols,
+                                 lambda r: _format_table_row(r, kind), widths, TABLE_STYLE)
+
     # Header row
-    header_cells = table.rows[0].cells
-    for i, header_text in enumerate(headers):
-        cell = header_cells[i]
-        cell.text = header_text
-        set_cell_background(cell, C["DARK_BLUE"])
-        
-        # Format header text
-        paragraph = cell.paragraphs[0]
-        paragraph.alignment = WD_ALIGN_PARAGRAPH.CENTER
-        for run in paragraph.runs:
-            run.font.bold = True
-            run.font.color.rgb = RGBColor(255, 255, 255)
-            run.font.size = Pt(9)
-            run.font.name = "Calibri"
-        
-        set_cell_border(cell)
-    
+    tpl.append_row(table, _proto("header"), headers)
+
     # Data rows
     for row_idx, row_data in enumerate(rows):
         is_total = row_data[0].upper() == "TOTAL" if row_data else False
-        is_alt = row_idx % 2 == 0
-        bg_color = C["DARK_BLUE"] if is_total else (C["ALT_ROW"] if is_alt else None)
-        text_color = C["WHITE"] if is_total else C["BLACK"]
-        
-        table_row = table.rows[row_idx + 1]
-        for col_idx, cell_text in enumerate(row_data):
-            cell = table_row.cells[col_idx]
-            cell.text = str(cell_text) if cell_text else ""
-            
-            if bg_color:
-                set_cell_background(cell, bg_color)
-            
-            # Format cell text
-            paragraph = cell.paragraphs[0]
-            paragraph.alignment = WD_ALIGN_PARAGRAPH.RIGHT if col_idx > 0 else WD_ALIGN_PARAGRAPH.LEFT
-            
-            for run in paragraph.runs:
-                run.font.bold = is_total
-                run.font.size = Pt(9)
-                run.font.name = "Calibri"
-                if text_color == C["WHITE"]:
-                    run.font.color.rgb = RGBColor(255, 255, 255)
-            
-            set_cell_border(cell)
-    
+        kind = "total" if is_total else ("alt" if row_idx % 2 == 0 else "plain")
+        tpl.append_row(table, _proto(kind),
+                       [str(v) if v else "" for v in row_data])
+
     return table
 
 
@@ -179,7 +164,7 @@ def create_metric_card_table(doc, metrics):
     metrics: list of 4 tuples (value, label)
     """
     table = doc.add_table(rows=2, cols=2)
-    table.style = "Light Grid Accent 1"
+    table.style = TABLE_STYLE
     
     card_width = 4680
     table.columns[0].width = card_width
@@ -215,55 +200,16 @@ def create_metric_card_table(doc, metrics):
         
         # Set padding/margins
         tcPr = cell._tc.get_or_add_tcPr()
-        tcMar = parse_xml(
-            f'<w:tcMar {nsdecls("w")}>'
-            f'<w:top w:w="120" w:type="dxa"/>'
-            f'<w:left w:w="160" w:type="dxa"/>'
-            f'<w:bottom w:w="120" w:type="dxa"/>'
-            f'<w:right w:w="160" w:type="dxa"/>'
-            f'</w:tcMar>'
-        )
-        tcPr.append(tcMar)
+        tcPr.append(tpl.fragment(tpl.margins_xml(120, 120, 160, 160)))
         
         # Light borders
-        tcBorders = parse_xml(
-            f'<w:tcBorders {nsdecls("w")}>'
-            f'<w:top w:val="single" w:sz="4" w:space="0" w:color="DDDDDD"/>'
-            f'<w:left w:val="single" w:sz="4" w:space="0" w:color="DDDDDD"/>'
-            f'<w:bottom w:val="single" w:sz="4" w:space="0" w:color="DDDDDD"/>'
-            f'<w:right w:val="single" w:sz="4" w:space="0" w:color="DDDDDD"/>'
-            f'</w:tcBorders>'
-        )
-        tcPr.append(tcBorders)
+        tcPr.append(tpl.fragment(tpl.borders_xml("DDDDDD")))
     
     return table
 
 
-def generate_departamental_docx(depto_data):
-    """
-    Generate DEPARTAMENTAL ayuda memoria document (Lambayeque style).
-    
-    Args:
-        depto_data (dict): Data dictionary with keys:
-            - departamento
-            - empresa
-            - prima_neta, sup_asegurada
-            - total_avisos, ha_indemnizadas, monto_indemnizado
-            - monto_desembolsado, productores_desembolso
-            - indemnizables, no_indemnizables
-            - fecha_corte
-            - avisos_tipo (list of [tipo, count, %])
-            - dist_provincia (list of rows)
-            - dist_provincia_headers
-            - eventos_recientes (list of rows)
-            - eventos_headers
-            - resumen_operativo, resumen_desembolso (text)
-    
-    Returns:
-        bytes: DOCX file content
-    """
-    doc = Document()
-    
+def _cover_skeleton(doc):
+    """Static part of the document: page setup and cover title (built once)."""
     # Set page margins: 1440 twips = 1 inch
     sections = doc.sections
     for section in sections:
@@ -272,9 +218,6 @@ def generate_departamental_docx(depto_data):
         section.left_margin = Inches(1)
         section.right_margin = Inches(1)
     
-    d = depto_data
-    depto = d.get("departamento", "Departamento")
-    
     # ═══ COVER PAGE ═══
     # Large top spacing
     for _ in range(3):
@@ -301,6 +244,35 @@ def generate_departamental_docx(depto_data):
     set_paragraph_bottom_border(sac_para, color=C["RED"], size="12")
     
     doc.add_paragraph()
+
+
+def generate_departamental_docx(depto_data):
+    """
+    Generate DEPARTAMENTAL ayuda memoria document (Lambayeque style).
+    
+    Args:
+        depto_data (dict): Data dictionary with keys:
+            - departamento
+            - empresa
+            - prima_neta, sup_asegurada
+            - total_avisos, ha_indemnizadas, monto_indemnizado
+            - monto_desembolsado, productores_desembolso
+            - indemnizables, no_indemnizables
+            - fecha_corte
+            - avisos_tipo (list of [tipo, count, %])
+            - dist_provincia (list of rows)
+            - dist_provincia_headers
+            - eventos_recientes (list of rows)
+            - eventos_headers
+            - resumen_operativo, resumen_desembolso (text)
+    
+    Returns:
+        bytes: DOCX file content
+    """
+    doc = tpl.skeleton_document("departamental", _cover_skeleton)
+    
+    d = depto_data
+    depto = d.get("departamento", "Departamento")
     
     # Department info
     dept_para = doc.add_paragraph()
@@ -507,43 +479,3 @@ def generate_departamental_docx(depto_data):
     doc.save(output)
     output.seek(0)
     return output.getvalue()
-
-
-if __name__ == "__main__":
-    # Quick test
-    sample_data = {
-        "departamento": "Lambayeque",
-        "empresa": "La Positiva",
-        "prima_neta": 1200000.00,
-        "sup_asegurada": 15000.00,
-        "total_avisos": 450,
-        "ha_indemnizadas": 8900.50,
-        "monto_indemnizado": 2500000.00,
-        "monto_desembolsado": 1900000.00,
-        "productores_desembolso": 280,
-        "indemnizables": 350,
-        "no_indemnizables": 100,
-        "fecha_corte": "27/02/2026",
-        "avisos_tipo": [
-            ["Inundación", "280", "62.2%"],
-            ["Lluvias Excesivas", "120", "26.7%"],
-            ["Huayco", "50", "11.1%"],
-        ],
-        "dist_provincia": [
-            ["Chiclayo", "250", "5600.50 ha", "150", "S/ 1800000", "S/ 1400000", "78%"],
-            ["Lambayeque", "150", "2400.00 ha", "90", "S/ 600000", "S/ 400000", "67%"],
-            ["Ferreñafe", "50", "800.00 ha", "40", "S/ 100000", "S/ 100000", "100%"],
-        ],
-        "dist_provincia_headers": ["Provincia", "Avisos", "Sup. Indemn.", "Prod. Benef.", "Indemniz.", "Desembolso", "% Avance"],
-        "eventos_recientes": [
-            ["20/02/2026", "Chiclayo", "Yotala / Talambo", "Arroz", "Cerrado"],
-            ["18/02/2026", "Lambayeque", "Mórrope", "Maíz", "Pendiente"],
-        ],
-        "eventos_headers": ["Fecha", "Provincia", "Distrito / Sector", "Cultivo", "Estado"],
-        "resumen_operativo": "Del total de 450 avisos registrados, se han evaluado y ajustado 350 (77.8%), quedando 100 pendientes (22.2%). De los 350 avisos cerrados, 320 resultaron indemnizables y 30 no indemnizables. El monto total de indemnizaciones reconocidas asciende a S/ 2,500,000.00 sobre una superficie indemnizada de 8,900.50 hectáreas.",
-        "resumen_desembolso": "Se han realizado desembolsos por S/ 1,900,000.00 a 280 productores.",
-    }
-    
-    docx_bytes = generate_departamental_docx(sample_data)
-    print(f"Generated DEPARTAMENTAL document: {len(docx_bytes)} bytes")
-    print("✓ No import errors, document structure valid")
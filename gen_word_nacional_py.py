@@ -9,14 +9,14 @@ Versión 3.0 — Diseño compacto profesional (máximo 2 páginas)
 - Sin filas TOTAL duplicadas
 """
 
-from docx import Document
 from docx.shared import Pt, RGBColor, Inches, Twips, Cm, Emu
 from docx.enum.text import WD_ALIGN_PARAGRAPH
 from docx.enum.table import WD_TABLE_ALIGNMENT
 from docx.oxml.ns import qn, nsdecls
-from docx.oxml import parse_xml
 from io import BytesIO
 
+from shared import docx_template as tpl
+
 
 # ═══════════════════════════════════════════════════════
 # PALETA DE COLORES
@@ -51,42 +51,24 @@ def fmt(val, dec=2):
 
 def _shading(cell, color):
     """Aplica fondo a celda."""
-    shd = parse_xml(f'<w:shd {nsdecls("w")} w:fill="{color}" w:val="clear"/>')
-    cell._tc.get_or_add_tcPr().append(shd)
+    cell._tc.get_or_add_tcPr().append(tpl.fragment(tpl.shading_xml(color)))
 
 
 def _borders(cell, color=BORDE, sz="3"):
     """Aplica bordes a celda."""
-    tcPr = cell._tc.get_or_add_tcPr()
-    xml = (f'<w:tcBorders {nsdecls("w")}>'
-           f'<w:top w:val="single" w:sz="{sz}" w:space="0" w:color="{color}"/>'
-           f'<w:left w:val="single" w:sz="{sz}" w:space="0" w:color="{color}"/>'
-           f'<w:bottom w:val="single" w:sz="{sz}" w:space="0" w:color="{color}"/>'
-           f'<w:right w:val="single" w:sz="{sz}" w:space="0" w:color="{color}"/>'
-           f'</w:tcBorders>')
-    tcPr.append(parse_xml(xml))
+    cell._tc.get_or_add_tcPr().append(tpl.fragment(tpl.borders_xml(color, sz)))
 
 
 def _cell_margins(cell, top=30, bottom=30, left=60, right=60):
     """Márgenes internos de celda."""
-    tcPr = cell._tc.get_or_add_tcPr()
-    margins = parse_xml(
-        f'<w:tcMar {nsdecls("w")}>'
-        f'<w:top w:w="{top}" w:type="dxa"/>'
-        f'<w:left w:w="{left}" w:type="dxa"/>'
-        f'<w:bottom w:w="{bottom}" w:type="dxa"/>'
-        f'<w:right w:w="{right}" w:type="dxa"/>'
-        f'</w:tcMar>'
-    )
-    tcPr.append(margins)
+    cell._tc.get_or_add_tcPr().append(tpl.fragment(tpl.margins_xml(top, bottom, left, right)))
 
 
 def _set_row_height(row, height_twips):
     """Fija altura de fila."""
     tr = row._tr
     trPr = tr.get_or_add_trPr()
-    trHeight = parse_xml(f'<w:trHeight {nsdecls("w")} w:val="{height_twips}" w:hRule="atLeast"/>')
-    trPr.append(trHeight)
+    trPr.append(tpl.fragment(f'<w:trHeight {nsdecls("w")} w:val="{height_twips}" w:hRule="atLeast"/>'))
 
 
 def _add_run(para, text, size=FONT_BODY, bold=False, color=NEGRO, font="Arial Narrow"):
@@ -109,64 +91,64 @@ def _heading(doc, text, level=1):
     _add_run(p, text, size=size, bold=True, color=AZUL)
     # Línea inferior
     pPr = p._element.get_or_add_pPr()
-    bdr = parse_xml(f'<w:pBdr {nsdecls("w")}><w:bottom w:val="single" w:sz="6" w:space="1" w:color="{AZUL_MED}"/></w:pBdr>')
-    pPr.append(bdr)
+    pPr.append(tpl.fragment(tpl.paragraph_border_xml(AZUL_MED, 6)))
     return p
 
 
-def _compact_table(doc, headers, rows, col_widths):
-    """Crea tabla compacta profesional."""
-    n_cols = len(headers)
-    n_rows = len(rows) + 1
-    table = doc.add_table(rows=n_rows, cols=n_cols)
-    table.alignment = WD_TABLE_ALIGNMENT.CENTER
-    table.autofit = False
-
-    # Anchos de columna
-    for i, w in enumerate(col_widths):
-        table.columns[i].width = Twips(w)
-
-    # Header
-    for i, h in enumerate(headers):
-        cell = table.rows[0].cells[i]
+def _format_compact_row(row, kind):
+    """Formato de una fila de _compact_table (header | total | alt | normal)."""
+    header = kind == "header"
+    _set_row_height(row, 260 if header else 220)
+    for c_idx, cell in enumerate(row.cells):
         cell.text = ""
         p = cell.paragraphs[0]
-        p.alignment = WD_ALIGN_PARAGRAPH.CENTER
+        if header:
+            p.alignment = WD_ALIGN_PARAGRAPH.CENTER
+        else:
+            p.alignment = WD_ALIGN_PARAGRAPH.RIGHT if c_idx > 0 else WD_ALIGN_PARAGRAPH.LEFT
         p.paragraph_format.space_before = Pt(0)
         p.paragraph_format.space_after = Pt(0)
-        _add_run(p, h, size=FONT_HEADER, bold=True, color=BLANCO)
-        _shading(cell, AZUL)
-        _borders(cell, AZUL)
-        _cell_margins(cell, 25, 25, 40, 40)
 
-    _set_row_height(table.rows[0], 260)
+        blanco = kind in ("header", "total")
+        _add_run(p, tpl.PLACEHOLDER, size=FONT_HEADER if header else FONT_TABLE,
+                 bold=blanco, color=BLANCO if blanco else NEGRO)
 
-    # Datos
-    for r_idx, row_data in enumerate(rows):
-        is_total = str(row_data[0]).upper() == "TOTAL"
-        is_alt = r_idx % 2 == 0
+        if blanco:
+            _shading(cell, AZUL)
+        elif kind == "alt":
+            _shading(cell, AZUL_CLARO)
 
-        table_row = table.rows[r_idx + 1]
-        _set_row_height(table_row, 220)
+        _borders(cell, AZUL if header else BORDE)
+        if header:
+            _cell_margins(cell, 25, 25, 40, 40)
+        else:
+            _cell_margins(cell, 20, 20, 40, 40)
 
-        for c_idx, val in enumerate(row_data):
-            cell = table_row.cells[c_idx]
-            cell.text = ""
-            p = cell.paragraphs[0]
-            p.alignment = WD_ALIGN_PARAGRAPH.RIGHT if c_idx > 0 else WD_ALIGN_PARAGRAPH.LEFT
-            p.paragraph_format.space_before = Pt(0)
-            p.paragraph_format.space_after = Pt(0)
 
-            txt_color = BLANCO if is_total else NEGRO
-            _add_run(p, str(val) if val else "", size=FONT_TABLE, bold=is_total, color=txt_color)
+def _compact_table(doc, headers, rows, col_widths):
+    """Crea tabla compacta profesional.
 
-            if is_total:
-                _shading(cell, AZUL)
-            elif is_alt:
-                _shading(cell, AZUL_CLARO)
+    Cada variante de fila se formatea una vez por proceso
+    (shared.docx_template); las filas son copias con el texto reemplazado.
+    """
+    n_cols = len(headers)
+    widths = tuple(Twips(w) for w in col_widths)
+    table = tpl.new_table(doc, n_cols, widths)
+    table.alignment = WD_TABLE_ALIGNMENT.CENTER
+    table.autofit = False
 
-            _borders(cell, BORDE)
-            _cell_margins(cell, 20, 20, 40, 40)
+    def _proto(kind):
+        return tpl.row_prototype(("nacional", kind, widths), n_cols,
+                                 lambda r: _format_compact_row(r, kind), widths)
+
+    # Header
+    tpl.append_row(table, _proto("header"), headers)
+
+    # Datos
+    for r_idx, row_data in enumerate(rows):
+        is_total = str(row_data[0]).upper() == "TOTAL"
+        kind = "total" if is_total else ("alt" if r_idx % 2 == 0 else "normal")
+        tpl.append_row(table, _proto(kind), [str(v) if v else "" for v in row_data])
 
     return table
 
@@ -175,10 +157,8 @@ def _compact_table(doc, headers, rows, col_widths):
 # GENERADOR PRINCIPAL
 # ═══════════════════════════════════════════════════════
 
-def generate_nacional_docx(datos):
-    """Genera Ayuda Memoria Nacional SAC — diseño compacto 2 páginas."""
-    doc = Document()
-
+def _skeleton(doc):
+    """Parte estática: márgenes y título (se arma una vez por proceso)."""
     # Márgenes estrechos para maximizar espacio
     for section in doc.sections:
         section.top_margin = Cm(1.5)
@@ -197,6 +177,11 @@ def generate_nacional_docx(datos):
     sub_p.paragraph_format.space_after = Pt(2)
     _add_run(sub_p, "RESUMEN OPERATIVIDAD SAC 2025-2026", size=Pt(12), bold=True, color=AZUL_MED)
 
+
+def generate_nacional_docx(datos):
+    """Genera Ayuda Memoria Nacional SAC — diseño compacto 2 páginas."""
+    doc = tpl.skeleton_document("nacional", _skeleton)
+
     date_p = doc.add_paragraph()
     date_p.alignment = WD_ALIGN_PARAGRAPH.CENTER
     date_p.paragraph_format.space_after = Pt(8)
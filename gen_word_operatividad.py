@@ -12,20 +12,19 @@ Incluye:
   - Texto narrativo completo
 """
 
-from docx import Document
 from docx.shared import Pt, RGBColor, Inches, Cm, Emu
 from docx.enum.text import WD_ALIGN_PARAGRAPH
 from docx.enum.section import WD_ORIENT
 from docx.oxml.ns import qn, nsdecls
-from docx.oxml import parse_xml
 from io import BytesIO
 import pandas as pd
 import numpy as np
-import matplotlib
-matplotlib.use("Agg")
+from shared.chart_cache import cached_png  # fija el backend Agg antes de pyplot
 import matplotlib.pyplot as plt
 import matplotlib.ticker as mticker
 
+from shared import docx_template as tpl
+
 
 # ═══ PALETA DE COLORES ═══
 AZUL_OSCURO = "#1F4E79"
@@ -95,7 +94,16 @@ def fmt_int(val):
 # ═══════════════════════════════════════════════════════════════════
 
 def _chart_avisos_departamento(avisos_by_depto):
-    """Gráfico de barras: Número de Avisos Reportados por Departamento."""
+    """Gráfico de barras: Número de Avisos Reportados por Departamento.
+
+    El PNG se cachea por contenido (shared.chart_cache).
+    """
+    png = cached_png({"chart": "avisos_departamento", "dpi": 180}, (avisos_by_depto,),
+                     lambda: _render_avisos_departamento(avisos_by_depto))
+    return BytesIO(png)
+
+
+def _render_avisos_departamento(avisos_by_depto):
     fig, ax = plt.subplots(figsize=(10, 4.5))
 
     deptos = [d.title() for d in avisos_by_depto.index]
@@ -128,12 +136,20 @@ def _chart_avisos_departamento(avisos_by_depto):
     fig.savefig(buf, format="png", dpi=180, bbox_inches="tight",
                 facecolor="white", edgecolor="none")
     plt.close(fig)
-    buf.seek(0)
-    return buf
+    return buf.getvalue()
 
 
 def _chart_avisos_tipo(avisos_by_tipo):
-    """Gráfico de barras: Número de Avisos Reportados por Tipo de Siniestro."""
+    """Gráfico de barras: Número de Avisos Reportados por Tipo de Siniestro.
+
+    El PNG se cachea por contenido (shared.chart_cache).
+    """
+    png = cached_png({"chart": "avisos_tipo", "dpi": 180}, (avisos_by_tipo,),
+                     lambda: _render_avisos_tipo(avisos_by_tipo))
+    return BytesIO(png)
+
+
+def _render_avisos_tipo(avisos_by_tipo):
     fig, ax = plt.subplots(figsize=(10, 4.5))
 
     tipos = [t.title() for t in avisos_by_tipo.index]
@@ -164,12 +180,20 @@ def _chart_avisos_tipo(avisos_by_tipo):
     fig.savefig(buf, format="png", dpi=180, bbox_inches="tight",
                 facecolor="white", edgecolor="none")
     plt.close(fig)
-    buf.seek(0)
-    return buf
+    return buf.getvalue()
 
 
 def _chart_desembolsos_empresa(indemn_lp, desemb_lp, indemn_rimac, desemb_rimac):
-    """Gráfico de barras agrupadas: Desembolsos vs Indemnización por Empresa."""
+    """Gráfico de barras agrupadas: Desembolsos vs Indemnización por Empresa.
+
+    El PNG se cachea por contenido (shared.chart_cache).
+    """
+    png = cached_png({"chart": "desembolsos_empresa", "dpi": 180}, (indemn_lp, desemb_lp, indemn_rimac, desemb_rimac),
+                     lambda: _render_desembolsos_empresa(indemn_lp, desemb_lp, indemn_rimac, desemb_rimac))
+    return BytesIO(png)
+
+
+def _render_desembolsos_empresa(indemn_lp, desemb_lp, indemn_rimac, desemb_rimac):
     fig, ax = plt.subplots(figsize=(8, 4))
 
     empresas = ["La Positiva", "Rímac"]
@@ -214,8 +238,7 @@ def _chart_desembolsos_empresa(indemn_lp, desemb_lp, indemn_rimac, desemb_rimac)
     fig.savefig(buf, format="png", dpi=180, bbox_inches="tight",
                 facecolor="white", edgecolor="none")
     plt.close(fig)
-    buf.seek(0)
-    return buf
+    return buf.getvalue()
 
 
 # ═══════════════════════════════════════════════════════════════════
@@ -223,27 +246,16 @@ def _chart_desembolsos_empresa(indemn_lp, desemb_lp, indemn_rimac, desemb_rimac)
 # ═══════════════════════════════════════════════════════════════════
 
 def _set_bg(cell, color):
-    shading = parse_xml(f'<w:shd {nsdecls("w")} w:fill="{color}" w:val="clear"/>')
-    cell._tc.get_or_add_tcPr().append(shading)
+    cell._tc.get_or_add_tcPr().append(tpl.fragment(tpl.shading_xml(color)))
 
 
 def _set_borders(cell, color="AAAAAA"):
-    tcPr = cell._tc.get_or_add_tcPr()
-    borders = parse_xml(
-        f'<w:tcBorders {nsdecls("w")}>'
-        f'<w:top w:val="single" w:sz="4" w:space="0" w:color="{color}"/>'
-        f'<w:left w:val="single" w:sz="4" w:space="0" w:color="{color}"/>'
-        f'<w:bottom w:val="single" w:sz="4" w:space="0" w:color="{color}"/>'
-        f'<w:right w:val="single" w:sz="4" w:space="0" w:color="{color}"/>'
-        f'</w:tcBorders>'
-    )
-    tcPr.append(borders)
+    cell._tc.get_or_add_tcPr().append(tpl.fragment(tpl.borders_xml(color)))
 
 
 def _set_cell_width(cell, width_twips):
     tcPr = cell._tc.get_or_add_tcPr()
-    tcW = parse_xml(f'<w:tcW {nsdecls("w")} w:w="{width_twips}" w:type="dxa"/>')
-    tcPr.append(tcW)
+    tcPr.append(tpl.fragment(f'<w:tcW {nsdecls("w")} w:w="{width_twips}" w:type="dxa"/>'))
 
 
 def _write_cell(cell, text, bold=False, size=8, align=WD_ALIGN_PARAGRAPH.LEFT,
@@ -372,57 +384,140 @@ def _add_image_centered(doc, image_buf, width_inches=6.0):
 # PREPARACIÓN DE DATOS
 # ═══════════════════════════════════════════════════════════════════
 
-def _prepare_operatividad_data(datos):
-    midagri = datos["midagri"].copy()
-    materia = datos["materia"]
+EMPRESAS = ["LA POSITIVA", "RÍMAC"]
+
+# Columna del agregado → columna de midagri que suma (0 si no viene)
+_SUMAS = {
+    "indemnizacion": "INDEMNIZACION",
+    "sup_indemnizada": "SUP_INDEMNIZADA",
+    "desembolso": "MONTO_DESEMBOLSADO",
+    "productores": "N_PRODUCTORES",
+}
+
 
-    # Mapeo departamento → empresa
+def _norm_emp(e):
+    eu = str(e).upper()
+    if "POSITIVA" in eu:
+        return "LA POSITIVA"
+    elif "RIMAC" in eu or "RÍMAC" in eu:
+        return "RÍMAC"
+    return eu
+
+
+def _empresa_por_depto(midagri, materia):
+    """EMPRESA de cada aviso según la aseguradora del departamento en materia."""
+    if "DEPARTAMENTO" not in midagri.columns:
+        return pd.Series("OTROS", index=midagri.index)
     depto_empresa = {}
     if "EMPRESA_ASEGURADORA" in materia.columns and "DEPARTAMENTO" in materia.columns:
-        for _, row in materia.iterrows():
-            d = str(row["DEPARTAMENTO"]).strip().upper()
-            e = str(row["EMPRESA_ASEGURADORA"]).strip().upper()
-            depto_empresa[d] = e
-
-    if "DEPARTAMENTO" in midagri.columns:
-        midagri["EMPRESA"] = midagri["DEPARTAMENTO"].map(depto_empresa).fillna("OTROS")
+        deptos = materia["DEPARTAMENTO"].astype(str).str.strip().str.upper()
+        empresas = materia["EMPRESA_ASEGURADORA"].astype(str).str.strip().str.upper()
+        # _norm_emp sobre los ~25 valores del mapeo, no sobre cada aviso
+        depto_empresa = {d: _norm_emp(e) for d, e in zip(deptos, empresas)}
+    return midagri["DEPARTAMENTO"].map(depto_empresa).fillna("OTROS")
+
+
+def _marca(serie, pred):
+    """pred(texto en mayúsculas) evaluado una vez por valor distinto de `serie`."""
+    codes, valores = pd.factorize(serie.astype(str))  # astype: None → "None", NaN → "nan"
+    return np.array([pred(v.upper()) for v in valores], dtype=bool)[codes]
+
+
+def _agregado_operatividad(midagri, empresa):
+    """Un solo groupby de midagri por (EMPRESA, DEPARTAMENTO, TIPO_SINIESTRO).
+
+    Cada fila del resultado trae avisos, ajustados, las sumas de _SUMAS y
+    la indemnización / superficie ya repartidas por cobertura
+    (complementaria, catastrófica) y por PRIORIZADO, así que todos los
+    cuadros y series del documento salen de sumar este agregado (un par de
+    cientos de filas) en vez de filtrar midagri empresa por empresa.
+    """
+    cols = midagri.columns
+    n = len(midagri)
+    ceros = np.zeros(n)
+
+    if "ESTADO_INSPECCION" in cols:
+        ajustado = _marca(midagri["ESTADO_INSPECCION"], lambda v: v == "CERRADO")
+    elif "ESTADO_SINIESTRO" in cols:
+        ajustado = _marca(midagri["ESTADO_SINIESTRO"], lambda v: v == "CONCRETADO")
     else:
-        midagri["EMPRESA"] = "OTROS"
+        ajustado = ceros.astype(bool)
+
+    w = {
+        "EMPRESA": empresa.to_numpy(),
+        "DEPARTAMENTO": midagri["DEPARTAMENTO"].to_numpy(),
+        "TIPO_SINIESTRO": (midagri["TIPO_SINIESTRO"].to_numpy() if "TIPO_SINIESTRO" in cols
+                           else np.full(n, np.nan, dtype=object)),
+        "avisos": np.ones(n, dtype=np.int64),
+        "ajustados": np.asarray(ajustado, dtype=np.int64),
+    }
+    for dst, src in _SUMAS.items():
+        w[dst] = midagri[src].to_numpy() if src in cols else ceros
+    indemn = pd.Series(w["indemnizacion"], copy=False)
+    sup = pd.Series(w["sup_indemnizada"], copy=False)
+
+    if "TIPO_COBERTURA" in cols:
+        cob = midagri["TIPO_COBERTURA"]
+        w["ind_comp"] = indemn.where(_marca(cob, lambda v: "COMPLEMENT" in v), 0).to_numpy()
+        w["ind_cat"] = indemn.where(_marca(cob, lambda v: "CATASTR" in v), 0).to_numpy()
+    if "PRIORIZADO" in cols:
+        no_prio = _marca(midagri["PRIORIZADO"], lambda v: "NO" in v)
+        w["ind_prio"] = indemn.where(~no_prio, 0).to_numpy()
+        w["sup_prio"] = sup.where(~no_prio, 0).to_numpy()
+        w["ind_noprio"] = indemn.where(no_prio, 0).to_numpy()
+        w["sup_noprio"] = sup.where(no_prio, 0).to_numpy()
+
+    claves = ["EMPRESA", "DEPARTAMENTO", "TIPO_SINIESTRO"]
+    return pd.DataFrame(w).groupby(claves, sort=False, dropna=False).sum()
+
+
+def _por_depto(por_emp_depto, empresa):
+    """Filas (departamento, sumas) de `empresa`, departamentos en orden alfabético."""
+    if empresa not in por_emp_depto.index.get_level_values("EMPRESA"):
+        return []
+    return list(por_emp_depto.loc[empresa].to_dict("index").items())
 
-    def _norm_emp(e):
-        eu = str(e).upper()
-        if "POSITIVA" in eu:
-            return "LA POSITIVA"
-        elif "RIMAC" in eu or "RÍMAC" in eu:
-            return "RÍMAC"
-        return eu
-    midagri["EMPRESA"] = midagri["EMPRESA"].apply(_norm_emp)
+
+def _prepare_operatividad_data(datos):
+    midagri = datos["midagri"]
+    materia = datos["materia"]
 
     # Prima neta por departamento
     prima_por_depto = {}
     if "PRIMA_NETA" in materia.columns and "DEPARTAMENTO" in materia.columns:
-        for _, row in materia.iterrows():
-            d = str(row["DEPARTAMENTO"]).strip().upper()
-            prima_por_depto[d] = float(row.get("PRIMA_NETA", 0) or 0)
+        deptos = materia["DEPARTAMENTO"].astype(str).str.strip().str.upper()
+        prima_por_depto = {d: float(p or 0) for d, p in zip(deptos, materia["PRIMA_NETA"])}
+
+    agg = _agregado_operatividad(midagri, _empresa_por_depto(midagri, materia))
+    por_empresa = agg.groupby(level="EMPRESA").sum().to_dict("index")
+    por_emp_depto = agg.groupby(level=["EMPRESA", "DEPARTAMENTO"]).sum()
+    vacio = dict.fromkeys(agg.columns, 0)
+    lp = por_empresa.get("LA POSITIVA", vacio)
+    rimac = por_empresa.get("RÍMAC", vacio)
+    tot = agg.sum()
 
     fecha_corte = datos["fecha_corte"]
     total_avisos = len(midagri)
 
     # Avisos por empresa
-    avisos_by_empresa = midagri.groupby("EMPRESA").size().to_dict()
-    avisos_lp = avisos_by_empresa.get("LA POSITIVA", 0)
-    avisos_rimac = avisos_by_empresa.get("RÍMAC", 0)
+    avisos_lp = int(lp["avisos"])
+    avisos_rimac = int(rimac["avisos"])
 
     # Avisos por departamento (todos)
-    avisos_by_depto = midagri.groupby("DEPARTAMENTO").size().sort_values(ascending=False)
+    avisos_by_depto = (agg["avisos"].groupby(level="DEPARTAMENTO").sum()
+                       .rename(None).sort_values(ascending=False))
 
     # Top 4 departamentos
     top4_deptos = avisos_by_depto.head(4)
     top4_total = top4_deptos.sum()
     top4_pct = (top4_total / total_avisos * 100) if total_avisos > 0 else 0
 
-    # Avisos por tipo de siniestro (todos)
-    avisos_by_tipo = midagri["TIPO_SINIESTRO"].value_counts() if "TIPO_SINIESTRO" in midagri.columns else pd.Series()
+    # Avisos por tipo de siniestro (todos); empates en orden de aparición, como value_counts
+    if "TIPO_SINIESTRO" in midagri.columns:
+        avisos_by_tipo = (agg["avisos"].groupby(level="TIPO_SINIESTRO", sort=False).sum()
+                          .rename("count").sort_values(ascending=False, kind="stable"))
+    else:
+        avisos_by_tipo = pd.Series()
 
     # Top 3 tipos
     top3_tipos = avisos_by_tipo.head(3)
@@ -430,63 +525,53 @@ def _prepare_operatividad_data(datos):
     top3_pct = (top3_total / total_avisos * 100) if total_avisos > 0 else 0
 
     # Ajustados
-    if "ESTADO_INSPECCION" in midagri.columns:
-        ajustados_mask = midagri["ESTADO_INSPECCION"].astype(str).str.upper() == "CERRADO"
-    elif "ESTADO_SINIESTRO" in midagri.columns:
-        ajustados_mask = midagri["ESTADO_SINIESTRO"].astype(str).str.upper() == "CONCRETADO"
-    else:
-        ajustados_mask = pd.Series([False] * len(midagri))
-
-    total_ajustados = int(ajustados_mask.sum())
+    total_ajustados = int(tot["ajustados"])
     pct_ajustados = (total_ajustados / total_avisos * 100) if total_avisos > 0 else 0
 
-    ajust_lp = int(ajustados_mask[midagri["EMPRESA"] == "LA POSITIVA"].sum())
-    ajust_rimac = int(ajustados_mask[midagri["EMPRESA"] == "RÍMAC"].sum())
+    ajust_lp = int(lp["ajustados"])
+    ajust_rimac = int(rimac["ajustados"])
     pct_ajust_lp = (ajust_lp / avisos_lp * 100) if avisos_lp > 0 else 0
     pct_ajust_rimac = (ajust_rimac / avisos_rimac * 100) if avisos_rimac > 0 else 0
 
     # Indemnización total
-    monto_indemnizado = midagri["INDEMNIZACION"].sum() if "INDEMNIZACION" in midagri.columns else 0
-    sup_ind_total = midagri["SUP_INDEMNIZADA"].sum() if "SUP_INDEMNIZADA" in midagri.columns else 0
+    monto_indemnizado = tot["indemnizacion"]
+    sup_ind_total = tot["sup_indemnizada"]
 
     # Siniestralidad por empresa
-    indemn_lp = midagri[midagri["EMPRESA"] == "LA POSITIVA"]["INDEMNIZACION"].sum() if "INDEMNIZACION" in midagri.columns else 0
-    indemn_rimac = midagri[midagri["EMPRESA"] == "RÍMAC"]["INDEMNIZACION"].sum() if "INDEMNIZACION" in midagri.columns else 0
-    prima_lp = sum(prima_por_depto.get(d, 0) for d in midagri[midagri["EMPRESA"] == "LA POSITIVA"]["DEPARTAMENTO"].unique())
-    prima_rimac = sum(prima_por_depto.get(d, 0) for d in midagri[midagri["EMPRESA"] == "RÍMAC"]["DEPARTAMENTO"].unique())
+    filas_depto = {emp: _por_depto(por_emp_depto, emp) for emp in EMPRESAS}
+    primas_emp = {emp: sum(prima_por_depto.get(d, 0) for d, _ in filas_depto[emp])
+                  for emp in EMPRESAS}
+    indemn_lp = lp["indemnizacion"]
+    indemn_rimac = rimac["indemnizacion"]
+    prima_lp = primas_emp["LA POSITIVA"]
+    prima_rimac = primas_emp["RÍMAC"]
     idx_lp = (indemn_lp / prima_lp * 100) if prima_lp > 0 else 0
     idx_rimac = (indemn_rimac / prima_rimac * 100) if prima_rimac > 0 else 0
     prima_total_neta = datos.get("prima_neta", 0)
     idx_general = (monto_indemnizado / prima_total_neta * 100) if prima_total_neta > 0 else 0
 
     # Desembolsos por empresa
-    desemb_lp = midagri[midagri["EMPRESA"] == "LA POSITIVA"]["MONTO_DESEMBOLSADO"].sum() if "MONTO_DESEMBOLSADO" in midagri.columns else 0
-    desemb_rimac = midagri[midagri["EMPRESA"] == "RÍMAC"]["MONTO_DESEMBOLSADO"].sum() if "MONTO_DESEMBOLSADO" in midagri.columns else 0
+    desemb_lp = lp["desembolso"]
+    desemb_rimac = rimac["desembolso"]
 
     # ─── TABLA SINIESTRALIDAD ───
     tabla_siniestralidad = []
-    for empresa in ["LA POSITIVA", "RÍMAC"]:
-        df_emp = midagri[midagri["EMPRESA"] == empresa]
-        deptos = sorted(df_emp["DEPARTAMENTO"].unique())
-        emp_indemn, emp_sup, emp_prima = 0, 0, 0
+    for empresa in EMPRESAS:
+        emp = por_empresa.get(empresa, vacio)
         filas = []
-        for depto in deptos:
-            df_d = df_emp[df_emp["DEPARTAMENTO"] == depto]
-            indemn = df_d["INDEMNIZACION"].sum() if "INDEMNIZACION" in df_d.columns else 0
-            sup = df_d["SUP_INDEMNIZADA"].sum() if "SUP_INDEMNIZADA" in df_d.columns else 0
+        for depto, s in filas_depto[empresa]:
             prima = prima_por_depto.get(depto, 0)
-            idx = (indemn / prima * 100) if prima > 0 else 0
-            emp_indemn += indemn
-            emp_sup += sup
-            emp_prima += prima
+            idx = (s["indemnizacion"] / prima * 100) if prima > 0 else 0
             filas.append({"empresa": empresa, "departamento": depto.title(),
-                          "indemnizacion": indemn, "sup_indemnizada": sup,
+                          "indemnizacion": s["indemnizacion"], "sup_indemnizada": s["sup_indemnizada"],
                           "prima_neta": prima, "indice": idx})
         filas.sort(key=lambda x: x["indice"], reverse=True)
         tabla_siniestralidad.extend(filas)
-        idx_emp = (emp_indemn / emp_prima * 100) if emp_prima > 0 else 0
+        emp_prima = primas_emp[empresa]
+        idx_emp = (emp["indemnizacion"] / emp_prima * 100) if emp_prima > 0 else 0
         tabla_siniestralidad.append({"empresa": f"Total {empresa}", "departamento": "",
-                                     "indemnizacion": emp_indemn, "sup_indemnizada": emp_sup,
+                                     "indemnizacion": emp["indemnizacion"],
+                                     "sup_indemnizada": emp["sup_indemnizada"],
                                      "prima_neta": emp_prima, "indice": idx_emp, "is_subtotal": True})
 
     tabla_siniestralidad.append({"empresa": "Total general", "departamento": "",
@@ -496,22 +581,16 @@ def _prepare_operatividad_data(datos):
     # ─── TABLA COBERTURAS ───
     tabla_coberturas = []
     if "TIPO_COBERTURA" in midagri.columns:
-        for empresa in ["LA POSITIVA", "RÍMAC"]:
-            df_emp = midagri[midagri["EMPRESA"] == empresa]
-            deptos = sorted(df_emp["DEPARTAMENTO"].unique())
-            emp_comp, emp_cat, emp_total = 0, 0, 0
-            for depto in deptos:
-                df_d = df_emp[df_emp["DEPARTAMENTO"] == depto]
-                comp = df_d.loc[df_d["TIPO_COBERTURA"].astype(str).str.upper().str.contains("COMPLEMENT", na=False), "INDEMNIZACION"].sum()
-                cat = df_d.loc[df_d["TIPO_COBERTURA"].astype(str).str.upper().str.contains("CATASTR", na=False), "INDEMNIZACION"].sum()
-                tot = df_d["INDEMNIZACION"].sum()
-                emp_comp += comp; emp_cat += cat; emp_total += tot
-                if tot > 0:
+        for empresa in EMPRESAS:
+            emp = por_empresa.get(empresa, vacio)
+            for depto, s in filas_depto[empresa]:
+                if s["indemnizacion"] > 0:
                     tabla_coberturas.append({"empresa": empresa, "departamento": depto.title(),
-                                             "complementaria": comp, "catastrofica": cat, "total": tot})
+                                             "complementaria": s["ind_comp"], "catastrofica": s["ind_cat"],
+                                             "total": s["indemnizacion"]})
             tabla_coberturas.append({"empresa": f"Total {empresa}", "departamento": "",
-                                     "complementaria": emp_comp, "catastrofica": emp_cat,
-                                     "total": emp_total, "is_subtotal": True})
+                                     "complementaria": emp["ind_comp"], "catastrofica": emp["ind_cat"],
+                                     "total": emp["indemnizacion"], "is_subtotal": True})
         tc_no_sub = [r for r in tabla_coberturas if not r.get("is_subtotal")]
         total_comp = sum(r["complementaria"] for r in tc_no_sub)
         total_cat = sum(r["catastrofica"] for r in tc_no_sub)
@@ -522,55 +601,39 @@ def _prepare_operatividad_data(datos):
     # ─── TABLA PRIORIZADOS ───
     tabla_priorizados = []
     total_prio_ind, total_noprio_ind = 0, 0
-    total_prio_sup, total_noprio_sup = 0, 0
     if "PRIORIZADO" in midagri.columns:
-        for empresa in ["LA POSITIVA", "RÍMAC"]:
-            df_emp = midagri[midagri["EMPRESA"] == empresa]
-            no_mask = df_emp["PRIORIZADO"].astype(str).str.upper().str.contains("NO", na=False)
-            si_mask = ~no_mask
-
-            for label, mask in [("PRIORIZADO", si_mask), ("NO PRIORIZADO", no_mask)]:
-                sup = df_emp.loc[mask, "SUP_INDEMNIZADA"].sum() if "SUP_INDEMNIZADA" in df_emp.columns else 0
-                ind = df_emp.loc[mask, "INDEMNIZACION"].sum() if "INDEMNIZACION" in df_emp.columns else 0
-                tabla_priorizados.append({"empresa": empresa, "cultivo": label,
-                                          "sup_indemnizada": sup, "indemnizacion": ind})
-                if label == "PRIORIZADO":
-                    total_prio_ind += ind; total_prio_sup += sup
-                else:
-                    total_noprio_ind += ind; total_noprio_sup += sup
-
-            emp_sup = df_emp["SUP_INDEMNIZADA"].sum() if "SUP_INDEMNIZADA" in df_emp.columns else 0
-            emp_ind = df_emp["INDEMNIZACION"].sum() if "INDEMNIZACION" in df_emp.columns else 0
+        for empresa in EMPRESAS:
+            emp = por_empresa.get(empresa, vacio)
+            tabla_priorizados.append({"empresa": empresa, "cultivo": "PRIORIZADO",
+                                      "sup_indemnizada": emp["sup_prio"], "indemnizacion": emp["ind_prio"]})
+            tabla_priorizados.append({"empresa": empresa, "cultivo": "NO PRIORIZADO",
+                                      "sup_indemnizada": emp["sup_noprio"], "indemnizacion": emp["ind_noprio"]})
+            total_prio_ind += emp["ind_prio"]
+            total_noprio_ind += emp["ind_noprio"]
             tabla_priorizados.append({"empresa": f"Total {empresa}", "cultivo": "",
-                                      "sup_indemnizada": emp_sup, "indemnizacion": emp_ind,
-                                      "is_subtotal": True})
+                                      "sup_indemnizada": emp["sup_indemnizada"],
+                                      "indemnizacion": emp["indemnizacion"], "is_subtotal": True})
         tabla_priorizados.append({"empresa": "Total general", "cultivo": "",
                                   "sup_indemnizada": sup_ind_total, "indemnizacion": monto_indemnizado,
                                   "is_total": True})
 
     # ─── TABLA DESEMBOLSOS ───
     tabla_desembolsos = []
-    for empresa in ["LA POSITIVA", "RÍMAC"]:
-        df_emp = midagri[midagri["EMPRESA"] == empresa]
-        deptos = sorted(df_emp["DEPARTAMENTO"].unique())
-        emp_indemn, emp_desemb, emp_prod = 0, 0, 0
+    for empresa in EMPRESAS:
+        emp = por_empresa.get(empresa, vacio)
         filas = []
-        for depto in deptos:
-            df_d = df_emp[df_emp["DEPARTAMENTO"] == depto]
-            indemn = df_d["INDEMNIZACION"].sum() if "INDEMNIZACION" in df_d.columns else 0
-            desemb = df_d["MONTO_DESEMBOLSADO"].sum() if "MONTO_DESEMBOLSADO" in df_d.columns else 0
-            prod = df_d["N_PRODUCTORES"].sum() if "N_PRODUCTORES" in df_d.columns else 0
+        for depto, s in filas_depto[empresa]:
+            indemn, desemb = s["indemnizacion"], s["desembolso"]
             pct = (desemb / indemn * 100) if indemn > 0 else 0
-            emp_indemn += indemn; emp_desemb += desemb; emp_prod += prod
             filas.append({"empresa": empresa, "departamento": depto.title(),
                           "indemnizacion": indemn, "desembolso": desemb,
-                          "pct_desembolso": pct, "productores": int(prod)})
+                          "pct_desembolso": pct, "productores": int(s["productores"])})
         filas.sort(key=lambda x: x["pct_desembolso"], reverse=True)
         tabla_desembolsos.extend(filas)
-        pct_emp = (emp_desemb / emp_indemn * 100) if emp_indemn > 0 else 0
+        pct_emp = (emp["desembolso"] / emp["indemnizacion"] * 100) if emp["indemnizacion"] > 0 else 0
         tabla_desembolsos.append({"empresa": f"Total {empresa}", "departamento": "",
-                                  "indemnizacion": emp_indemn, "desembolso": emp_desemb,
-                                  "pct_desembolso": pct_emp, "productores": int(emp_prod),
+                                  "indemnizacion": emp["indemnizacion"], "desembolso": emp["desembolso"],
+                                  "pct_desembolso": pct_emp, "productores": int(emp["productores"]),
                                   "is_subtotal": True})
 
     monto_desembolsado = datos.get("monto_desembolsado", 0)
@@ -610,20 +673,64 @@ def _prepare_operatividad_data(datos):
 # FUNCIÓN AUXILIAR PARA CREAR TABLAS PROFESIONALES
 # ═══════════════════════════════════════════════════════════════════
 
-def _build_table(doc, headers, data_rows, col_widths):
-    """Crea tabla profesional con header, filas alternas, subtotales y total."""
-    n_rows = len(data_rows) + 1
-    n_cols = len(headers)
-    table = doc.add_table(rows=n_rows, cols=n_cols)
-    table.autofit = False
+L, R, CTR = WD_ALIGN_PARAGRAPH.LEFT, WD_ALIGN_PARAGRAPH.RIGHT, WD_ALIGN_PARAGRAPH.CENTER
+
+# variante de fila → (fondo, color de fuente, negrita)
+_ROW_FMT = {
+    "total": (C["HEADER_BG"], C["WHITE"], True),
+    "subtotal": (C["SUBTOTAL_BG"], C["BLACK"], True),
+    "alt": (C["ALT_ROW"], C["BLACK"], False),
+    "normal": (None, C["BLACK"], False),
+}
+
 
-    # Header
-    for i, h in enumerate(headers):
-        cell = table.rows[0].cells[i]
-        _write_cell(cell, h, bold=True, size=7, align=WD_ALIGN_PARAGRAPH.CENTER,
+def _row_kind(row_data, row_idx):
+    if row_data.get("is_total", False):
+        return "total"
+    if row_data.get("is_subtotal", False):
+        return "subtotal"
+    return "alt" if row_idx % 2 == 0 else "normal"
+
+
+def _format_header_row(row, col_widths):
+    for i, cell in enumerate(row.cells):
+        _write_cell(cell, tpl.PLACEHOLDER, bold=True, size=7, align=CTR,
                     font_color=C["WHITE"], bg_color=C["HEADER_BG"])
         _set_cell_width(cell, col_widths[i])
 
+
+def _format_data_row(row, kind, aligns):
+    bg, fc, bold = _ROW_FMT[kind]
+    for cell, align in zip(row.cells, aligns):
+        _write_cell(cell, tpl.PLACEHOLDER, bold=bold, size=7, align=align,
+                    bg_color=bg, font_color=fc)
+
+
+def _build_table(doc, headers, data_rows, col_widths, aligns, row_values):
+    """Crea tabla profesional con header, filas alternas, subtotales y total.
+
+    row_values(row_data) devuelve los textos de una fila. El formato de cada
+    variante de fila se arma una vez por proceso (shared.docx_template) y
+    las filas son copias con el texto reemplazado.
+    """
+    n_cols = len(headers)
+    table = tpl.new_table(doc, n_cols)
+    table.autofit = False
+    # Ancho parejo que python-docx da a las celdas (los tcW del header se
+    # agregan encima, como antes)
+    grid = tuple(col.width for col in table.columns)
+    base = ("operatividad", grid, tuple(col_widths), tuple(aligns))
+
+    hdr = tpl.row_prototype(base + ("header",), n_cols,
+                            lambda r: _format_header_row(r, col_widths), grid)
+    tpl.append_row(table, hdr, headers)
+
+    for row_idx, row_data in enumerate(data_rows):
+        kind = _row_kind(row_data, row_idx)
+        proto = tpl.row_prototype(base + (kind,), n_cols,
+                                  lambda r: _format_data_row(r, kind, aligns), grid)
+        tpl.append_row(table, proto, row_values(row_data))
+
     return table
 
 
@@ -631,34 +738,40 @@ def _build_table(doc, headers, data_rows, col_widths):
 # GENERADOR PRINCIPAL
 # ═══════════════════════════════════════════════════════════════════
 
-def generate_operatividad_docx(datos):
-    d = _prepare_operatividad_data(datos)
-    doc = Document()
+def _add_title_line(doc, text):
+    p = doc.add_paragraph()
+    p.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    p.paragraph_format.space_after = Pt(2)
+    p.paragraph_format.space_before = Pt(0)
+    run = p.add_run(text)
+    run.font.name = "Arial"
+    run.font.size = Pt(13)
+    run.font.bold = True
+    run.underline = True
 
+
+def _skeleton(doc):
+    """Parte estática: márgenes y título fijo (se arma una vez por proceso)."""
     for section in doc.sections:
         section.top_margin = Inches(0.7)
         section.bottom_margin = Inches(0.6)
         section.left_margin = Inches(0.85)
         section.right_margin = Inches(0.85)
+    for text in ["AYUDA MEMORIA OPERATIVIDAD SAC", "CAMPAÑA AGRÍCOLA 2025-2026"]:
+        _add_title_line(doc, text)
+
+
+def generate_operatividad_docx(datos):
+    d = _prepare_operatividad_data(datos)
+    doc = tpl.skeleton_document("operatividad", _skeleton)
 
     cuadro_num = 0
     grafico_num = 0
 
     # ═══════════════════════════════════════════════════════════════
-    # TÍTULO
+    # TÍTULO (las dos primeras líneas vienen en el esqueleto)
     # ═══════════════════════════════════════════════════════════════
-    for text in ["AYUDA MEMORIA OPERATIVIDAD SAC",
-                 "CAMPAÑA AGRÍCOLA 2025-2026",
-                 f"(AL {d['fecha_corte']})"]:
-        p = doc.add_paragraph()
-        p.alignment = WD_ALIGN_PARAGRAPH.CENTER
-        p.paragraph_format.space_after = Pt(2)
-        p.paragraph_format.space_before = Pt(0)
-        run = p.add_run(text)
-        run.font.name = "Arial"
-        run.font.size = Pt(13)
-        run.font.bold = True
-        run.underline = True
+    _add_title_line(doc, f"(AL {d['fecha_corte']})")
 
     doc.add_paragraph()  # spacer
 
@@ -760,23 +873,11 @@ def generate_operatividad_docx(datos):
     headers_sin = ["EMPRESA DE SEGUROS", "DEPARTAMENTO", "INDEMNIZACIÓN (S/)",
                    "SUP. INDEMNIZADA (Has)", "PRIMA NETA (S/)", "ÍNDICE SINIESTRALIDAD (%)"]
     col_widths_sin = [1800, 1600, 1700, 1600, 1700, 1500]
-    table = _build_table(doc, headers_sin, d["tabla_siniestralidad"], col_widths_sin)
-
-    for row_idx, row_data in enumerate(d["tabla_siniestralidad"]):
-        is_sub = row_data.get("is_subtotal", False)
-        is_tot = row_data.get("is_total", False)
-        bg = C["HEADER_BG"] if is_tot else (C["SUBTOTAL_BG"] if is_sub else (C["ALT_ROW"] if row_idx % 2 == 0 else None))
-        fc = C["WHITE"] if is_tot else C["BLACK"]
-        b = is_sub or is_tot
-        r = table.rows[row_idx + 1]
-        vals = [row_data["empresa"], row_data["departamento"],
-                fmt(row_data["indemnizacion"]), fmt_n(row_data["sup_indemnizada"]),
-                fmt(row_data["prima_neta"]), fmt_pct(row_data["indice"])]
-        aligns = [WD_ALIGN_PARAGRAPH.LEFT, WD_ALIGN_PARAGRAPH.LEFT,
-                  WD_ALIGN_PARAGRAPH.RIGHT, WD_ALIGN_PARAGRAPH.RIGHT,
-                  WD_ALIGN_PARAGRAPH.RIGHT, WD_ALIGN_PARAGRAPH.CENTER]
-        for i, (val, align) in enumerate(zip(vals, aligns)):
-            _write_cell(r.cells[i], val, bold=b, size=7, align=align, bg_color=bg, font_color=fc)
+    _build_table(doc, headers_sin, d["tabla_siniestralidad"], col_widths_sin,
+                 [L, L, R, R, R, CTR],
+                 lambda r: [r["empresa"], r["departamento"],
+                            fmt(r["indemnizacion"]), fmt_n(r["sup_indemnizada"]),
+                            fmt(r["prima_neta"]), fmt_pct(r["indice"])])
 
     doc.add_paragraph()
 
@@ -800,23 +901,11 @@ def generate_operatividad_docx(datos):
         headers_cob = ["EMPRESA DE SEGUROS", "DEPARTAMENTO",
                        "COBERTURA COMPLEMENTARIA", "COBERTURA CATASTRÓFICA", "INDEMNIZACIÓN TOTAL"]
         col_widths_cob = [1800, 1500, 2000, 2000, 1800]
-        table_c = _build_table(doc, headers_cob, d["tabla_coberturas"], col_widths_cob)
-
-        for row_idx, row_data in enumerate(d["tabla_coberturas"]):
-            is_sub = row_data.get("is_subtotal", False)
-            is_tot = row_data.get("is_total", False)
-            bg = C["HEADER_BG"] if is_tot else (C["SUBTOTAL_BG"] if is_sub else (C["ALT_ROW"] if row_idx % 2 == 0 else None))
-            fc = C["WHITE"] if is_tot else C["BLACK"]
-            b = is_sub or is_tot
-            r = table_c.rows[row_idx + 1]
-            vals = [row_data["empresa"], row_data.get("departamento", ""),
-                    fmt(row_data["complementaria"]), fmt(row_data["catastrofica"]),
-                    fmt(row_data["total"])]
-            aligns = [WD_ALIGN_PARAGRAPH.LEFT, WD_ALIGN_PARAGRAPH.LEFT,
-                      WD_ALIGN_PARAGRAPH.RIGHT, WD_ALIGN_PARAGRAPH.RIGHT,
-                      WD_ALIGN_PARAGRAPH.RIGHT]
-            for i, (val, align) in enumerate(zip(vals, aligns)):
-                _write_cell(r.cells[i], val, bold=b, size=7, align=align, bg_color=bg, font_color=fc)
+        _build_table(doc, headers_cob, d["tabla_coberturas"], col_widths_cob,
+                     [L, L, R, R, R],
+                     lambda r: [r["empresa"], r.get("departamento", ""),
+                                fmt(r["complementaria"]), fmt(r["catastrofica"]),
+                                fmt(r["total"])])
 
         doc.add_paragraph()
 
@@ -832,21 +921,10 @@ def generate_operatividad_docx(datos):
 
         headers_p = ["EMPRESA DE SEGUROS", "CULTIVOS", "SUP. INDEMNIZADA (Has)", "INDEMNIZACIÓN (S/)"]
         col_widths_p = [2200, 1800, 2500, 2800]
-        table_p = _build_table(doc, headers_p, d["tabla_priorizados"], col_widths_p)
-
-        for row_idx, row_data in enumerate(d["tabla_priorizados"]):
-            is_sub = row_data.get("is_subtotal", False)
-            is_tot = row_data.get("is_total", False)
-            bg = C["HEADER_BG"] if is_tot else (C["SUBTOTAL_BG"] if is_sub else (C["ALT_ROW"] if row_idx % 2 == 0 else None))
-            fc = C["WHITE"] if is_tot else C["BLACK"]
-            b = is_sub or is_tot
-            r = table_p.rows[row_idx + 1]
-            vals = [row_data["empresa"], row_data.get("cultivo", ""),
-                    fmt_n(row_data["sup_indemnizada"]), fmt(row_data["indemnizacion"])]
-            aligns = [WD_ALIGN_PARAGRAPH.LEFT, WD_ALIGN_PARAGRAPH.LEFT,
-                      WD_ALIGN_PARAGRAPH.RIGHT, WD_ALIGN_PARAGRAPH.RIGHT]
-            for i, (val, align) in enumerate(zip(vals, aligns)):
-                _write_cell(r.cells[i], val, bold=b, size=7, align=align, bg_color=bg, font_color=fc)
+        _build_table(doc, headers_p, d["tabla_priorizados"], col_widths_p,
+                     [L, L, R, R],
+                     lambda r: [r["empresa"], r.get("cultivo", ""),
+                                fmt_n(r["sup_indemnizada"]), fmt(r["indemnizacion"])])
 
         doc.add_paragraph()
 
@@ -886,24 +964,12 @@ def generate_operatividad_docx(datos):
     headers_d = ["EMPRESA DE SEGUROS", "DEPARTAMENTO", "INDEMNIZACIÓN (S/)",
                  "DESEMBOLSO (S/)", "% DESEMBOLSO", "N° PRODUCTORES"]
     col_widths_d = [1700, 1500, 1700, 1700, 1200, 1400]
-    table_d = _build_table(doc, headers_d, d["tabla_desembolsos"], col_widths_d)
-
-    for row_idx, row_data in enumerate(d["tabla_desembolsos"]):
-        is_sub = row_data.get("is_subtotal", False)
-        is_tot = row_data.get("is_total", False)
-        bg = C["HEADER_BG"] if is_tot else (C["SUBTOTAL_BG"] if is_sub else (C["ALT_ROW"] if row_idx % 2 == 0 else None))
-        fc = C["WHITE"] if is_tot else C["BLACK"]
-        b = is_sub or is_tot
-        r = table_d.rows[row_idx + 1]
-        prod_text = fmt_int(row_data["productores"]) if row_data["productores"] > 0 else "-"
-        vals = [row_data["empresa"], row_data.get("departamento", ""),
-                fmt(row_data["indemnizacion"]), fmt(row_data["desembolso"]),
-                fmt_pct(row_data["pct_desembolso"]), prod_text]
-        aligns = [WD_ALIGN_PARAGRAPH.LEFT, WD_ALIGN_PARAGRAPH.LEFT,
-                  WD_ALIGN_PARAGRAPH.RIGHT, WD_ALIGN_PARAGRAPH.RIGHT,
-                  WD_ALIGN_PARAGRAPH.CENTER, WD_ALIGN_PARAGRAPH.CENTER]
-        for i, (val, align) in enumerate(zip(vals, aligns)):
-            _write_cell(r.cells[i], val, bold=b, size=7, align=align, bg_color=bg, font_color=fc)
+    _build_table(doc, headers_d, d["tabla_desembolsos"], col_widths_d,
+                 [L, L, R, R, CTR, CTR],
+                 lambda r: [r["empresa"], r.get("departamento", ""),
+                            fmt(r["indemnizacion"]), fmt(r["desembolso"]),
+                            fmt_pct(r["pct_desembolso"]),
+                            fmt_int(r["productores"]) if r["productores"] > 0 else "-"])
 
     doc.add_paragraph()
 
@@ -2,9 +2,6 @@
 import sys, os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 
-import json
-from datetime import datetime, timezone, timedelta
-
 import streamlit as st
 import pandas as pd
 import numpy as np
@@ -17,10 +14,9 @@ from shared.charts import (
     add_last_point_annotation, fmt_compact, PALETTE,
 )
 from shared.cache import load_json_cached
+from shared.series_comparativo import series_comparativo
 from data_processor import load_primas_historicas
 
-TZ_PERU = timezone(timedelta(hours=-5))
-
 require_data()
 datos = get_datos()
 df_actual = datos["midagri"]
@@ -279,14 +275,9 @@ with st.expander("Evolución Temporal Comparativa — series mensuales", expande
     st.markdown("### Evolución Temporal Comparativa")
     st.caption("Todas las campañas alineadas por mes agrícola (Ago → Jul) para facilitar la comparación")
 
-    SERIES_PATH = os.path.join(STATIC_DIR, "series_temporales.json")
-    series_data = load_json_cached(SERIES_PATH)
-
-    # Series temporales POR DEPARTAMENTO — generadas con gen_series_temporales_dept.py
-    # desde los Excel de la carpeta comportamiento_historico_sac_2020_xxxx/.
-    # Formato: {"por_dept": {DEPT: {"avisos": {camp: {YYYY-MM: n}}, "indemnizaciones": {camp: {YYYY-MM: {n,monto}}}}}}
-    SERIES_DEPT_PATH = os.path.join(STATIC_DIR, "series_temporales_dept.json")
-    series_dept_data = load_json_cached(SERIES_DEPT_PATH)
+    # 6 campañas × 12 meses (avisos, casos, montos), nacional y por dept,
+    # precomputadas una vez por dataset (shared/series_comparativo)
+    series_comp = series_comparativo(df_actual)
 
     # Orden de meses en campaña agrícola (Ago del año inicial → Jul del siguiente)
     MESES_CAMPANA = ["Ago", "Sep", "Oct", "Nov", "Dic", "Ene", "Feb", "Mar", "Abr", "May", "Jun", "Jul"]
@@ -302,157 +293,11 @@ with st.expander("Evolución Temporal Comparativa — series mensuales", expande
     }
 
 
-    def _period_to_campana_month(period_str, campana):
-        """Convierte '2021-03' → índice en la campaña agrícola (0=Ago, 11=Jul)."""
-        try:
-            year, month = int(period_str[:4]), int(period_str[5:7])
-        except (ValueError, IndexError):
-            return None
-        # Año inicio de la campaña
-        start_year = int(campana[:4])
-        # Ago(8)-Dic(12) del start_year → índices 0-4
-        # Ene(1)-Jul(7) del start_year+1 → índices 5-11
-        if year == start_year and 8 <= month <= 12:
-            return month - 8  # Ago=0, Sep=1, ..., Dic=4
-        elif year == start_year + 1 and 1 <= month <= 7:
-            return month + 4   # Ene=5, Feb=6, ..., Jul=11
-        return None
-
-
-    def build_campaign_series(raw_dict, campana, value_key=None):
-        """Convierte dict {'2021-03': valor, ...} a array de 12 meses alineados a campaña agrícola."""
-        values = [0.0] * 12
-        for period_str, val in raw_dict.items():
-            idx = _period_to_campana_month(period_str, campana)
-            if idx is not None:
-                if value_key and isinstance(val, dict):
-                    values[idx] = val.get(value_key, 0)
-                elif isinstance(val, (int, float)):
-                    values[idx] = val
-                elif isinstance(val, dict):
-                    values[idx] = val.get("n", 0)
-        return values
-
-
-    def _current_campaign_month_idx(campana, today=None):
-        """Devuelve el índice 0..11 del mes vigente dentro de la campaña si está en curso.
-        None si la campaña ya terminó o aún no empezó (usamos dato completo o nada).
-        """
-        if today is None:
-            today = datetime.now(TZ_PERU).date()
-        start_year = int(campana[:4])
-        if today.year == start_year and 8 <= today.month <= 12:
-            return today.month - 8
-        if today.year == start_year + 1 and 1 <= today.month <= 7:
-            return today.month + 4
-        return None
-
-
-    def _mask_future_months(series, campana):
-        """Para la campaña en curso, reemplaza meses posteriores al vigente con np.nan.
-        Así Plotly corta la línea y cumsum no inventa datos de meses que no ocurrieron.
-        """
-        idx = _current_campaign_month_idx(campana)
-        if idx is None:
-            return series  # histórica o futura: no truncar
-        out = list(series)
-        for i in range(idx + 1, 12):
-            out[i] = np.nan
-        return out
-
-
-    def build_current_series_avisos(df, campana):
-        """Construye serie de avisos por mes para campaña actual desde DataFrame.
-        Meses posteriores al mes vigente quedan como np.nan (aún no ocurrieron).
-        """
-        date_col = None
-        for col in ["FECHA_AVISO", "FECHA_SINIESTRO"]:
-            if col in df.columns:
-                date_col = col
-                break
-        if date_col is None:
-            return _mask_future_months([0.0] * 12, campana)
-        dates = pd.to_datetime(df[date_col], errors="coerce").dropna()
-        monthly = dates.dt.to_period("M").value_counts().sort_index()
-        raw = {str(p): int(c) for p, c in monthly.items()}
-        return _mask_future_months(build_campaign_series(raw, campana), campana)
-
-
-    def build_current_series_indemn(df, campana):
-        """Construye series de indemnizaciones por mes para campaña actual.
-        Meses posteriores al mes vigente quedan como np.nan (aún no ocurrieron).
-        """
-        # Buscar columna de fecha de ajuste
-        date_col = None
-        for col in ["FECHA_AJUSTE_ACTA_FINAL", "FECHA_AJUSTE_ACTA_1",
-                    "FECHA_PROGRAMACION_AJUSTE", "FECHA_SINIESTRO"]:
-            if col in df.columns:
-                date_col = col
-                break
-        if date_col is None:
-            empty = _mask_future_months([0.0] * 12, campana)
-            return empty, list(empty)
-
-        # Filtrar indemnizables
-        ind_mask = pd.Series(False, index=df.index)
-        if "DICTAMEN" in df.columns:
-            dict_col = df["DICTAMEN"].astype(str).str.strip().str.upper()
-            ind_mask = (dict_col.str.contains("INDEMNIZABLE", na=False) &
-                        ~dict_col.str.contains("NO INDEMNIZABLE", na=False))
-
-        df_ind = df[ind_mask].copy()
-        if df_ind.empty:
-            empty = _mask_future_months([0.0] * 12, campana)
-            return empty, list(empty)
-
-        df_ind[date_col] = pd.to_datetime(df_ind[date_col], errors="coerce")
-        df_ind = df_ind[df_ind[date_col].notna()]
-        if df_ind.empty:
-            empty = _mask_future_months([0.0] * 12, campana)
-            return empty, list(empty)
-
-        periods = df_ind[date_col].dt.to_period("M")
-        count_m = periods.value_counts().sort_index()
-        count_raw = {str(p): int(c) for p, c in count_m.items()}
-        counts = _mask_future_months(build_campaign_series(count_raw, campana), campana)
-
-        # Montos
-        monto_col = None
-        for mc in ["INDEMNIZACION", "MONTO_INDEMNIZADO"]:
-            if mc in df_ind.columns:
-                monto_col = mc
-                break
-
-        if monto_col:
-            df_ind["_monto"] = pd.to_numeric(df_ind[monto_col], errors="coerce").fillna(0)
-            monto_m = df_ind.groupby(periods)["_monto"].sum()
-            monto_raw = {str(p): float(v) for p, v in monto_m.items()}
-            montos = _mask_future_months(build_campaign_series(monto_raw, campana), campana)
-        else:
-            montos = _mask_future_months([0.0] * 12, campana)
-
-        return counts, montos
-
-
     # ── Construir datos para los gráficos ──
-
-    all_avisos_series = {}
-    all_indemn_count_series = {}
-    all_indemn_monto_series = {}
-
-    # Campañas históricas desde JSON
-    for camp in CAMPANAS_HIST:
-        raw_av = series_data.get("avisos", {}).get(camp, {})
-        raw_in = series_data.get("indemnizaciones", {}).get(camp, {})
-        all_avisos_series[camp] = build_campaign_series(raw_av, camp)
-        all_indemn_count_series[camp] = build_campaign_series(raw_in, camp, value_key="n")
-        all_indemn_monto_series[camp] = build_campaign_series(raw_in, camp, value_key="monto")
-
-    # Campaña actual desde datos dinámicos
-    all_avisos_series[CAMPANA_ACTUAL] = build_current_series_avisos(df_actual, CAMPANA_ACTUAL)
-    curr_counts, curr_montos = build_current_series_indemn(df_actual, CAMPANA_ACTUAL)
-    all_indemn_count_series[CAMPANA_ACTUAL] = curr_counts
-    all_indemn_monto_series[CAMPANA_ACTUAL] = curr_montos
+    # {campaña: array de 12 meses}; la campaña en curso trae NaN después del mes vigente
+    all_avisos_series = series_comp.por_campana(series_comp.nacional["avisos"])
+    all_indemn_count_series = series_comp.por_campana(series_comp.nacional["n"])
+    all_indemn_monto_series = series_comp.por_campana(series_comp.nacional["monto"])
 
 
     def make_evolution_chart(series_dict, title, yaxis_title, fmt_prefix="", cumulative=False,
@@ -460,9 +305,9 @@ with st.expander("Evolución Temporal Comparativa — series mensuales", expande
         """Crea un gráfico de líneas con 6 campañas superpuestas, tema SAC."""
         fig = go.Figure()
         for camp in all_camps:
-            vals = series_dict.get(camp, [0]*12)
+            vals = series_dict.get(camp, np.zeros(12))
             if cumulative:
-                vals = list(np.cumsum(vals))
+                vals = np.cumsum(vals)
             is_current = camp == CAMPANA_ACTUAL
             width = 4 if is_current else 1.8
             fig.add_trace(go.Scatter(
@@ -843,29 +688,12 @@ with st.expander("Comparativo por Departamento — análisis individual", expand
                    "el comportamiento del departamento año tras año. "
                    "La campaña en curso se corta en el mes vigente (Perú UTC-5).")
 
-        # Construir las 3 series (avisos, indemnizados count, indemnizados monto)
-        # para las 6 campañas del departamento seleccionado
-        _dept_hist_block = series_dept_data.get("por_dept", {}).get(dept_sel, {})
-        _hist_avisos = _dept_hist_block.get("avisos", {})
-        _hist_indemn = _dept_hist_block.get("indemnizaciones", {})
-
-        all_avisos_dept = {}
-        all_ind_count_dept = {}
-        all_ind_monto_dept = {}
-
-        # Campañas históricas desde el JSON por depto
-        for camp in CAMPANAS_HIST:
-            raw_av = _hist_avisos.get(camp, {})
-            raw_in = _hist_indemn.get(camp, {})
-            all_avisos_dept[camp] = build_campaign_series(raw_av, camp)
-            all_ind_count_dept[camp] = build_campaign_series(raw_in, camp, value_key="n")
-            all_ind_monto_dept[camp] = build_campaign_series(raw_in, camp, value_key="monto")
-
-        # Campaña actual desde el df filtrado al dept (con corte al mes vigente)
-        all_avisos_dept[CAMPANA_ACTUAL] = build_current_series_avisos(df_dept_sel, CAMPANA_ACTUAL)
-        _cact, _mact = build_current_series_indemn(df_dept_sel, CAMPANA_ACTUAL)
-        all_ind_count_dept[CAMPANA_ACTUAL] = _cact
-        all_ind_monto_dept[CAMPANA_ACTUAL] = _mact
+        # Las 3 series (avisos, indemnizados count, indemnizados monto) de las
+        # 6 campañas del departamento, ya precomputadas en series_comp
+        _series_dept = series_comp.dept(dept_sel)
+        all_avisos_dept = series_comp.por_campana(_series_dept["avisos"])
+        all_ind_count_dept = series_comp.por_campana(_series_dept["n"])
+        all_ind_monto_dept = series_comp.por_campana(_series_dept["monto"])
 
         _dept_slug = dept_sel.lower().replace(" ", "_")
 
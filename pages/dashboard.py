@@ -2,16 +2,15 @@
 import sys, os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 
-import io
-import pandas as pd
 import streamlit as st
 from datetime import datetime, timezone, timedelta
+from functools import partial
 
 TZ_PERU = timezone(timedelta(hours=-5))
 
 from shared.state import require_data, get_datos
 from shared.components import render_metric, page_header, footer
-from data_processor import get_departamento_data, reordenar_consolidado_export
+from data_processor import get_departamento_data
 
 require_data()
 datos = get_datos()
@@ -54,28 +53,20 @@ except Exception:
 col_spacer, col_dl, col_ref = st.columns([2, 1, 1])
 with col_dl:
     try:
-        # Unifica EMPRESA/EMPRESA DE SEGUROS en una sola columna y ordena los
-        # campos según el Anexo 12 oficial (solo para la descarga).
-        df_clean = reordenar_consolidado_export(datos["midagri"])
-        for col in df_clean.columns:
-            if df_clean[col].dtype == "object":
-                df_clean[col] = df_clean[col].astype(str).replace("nan", "")
-        col_emp = "EMPRESA DE SEGUROS"
-        buf = io.BytesIO()
-        with pd.ExcelWriter(buf, engine="openpyxl") as writer:
-            df_clean.to_excel(writer, index=False, sheet_name="Consolidado SAC")
-            if col_emp in df_clean.columns:
-                for emp in sorted(df_clean[col_emp].dropna().unique()):
-                    if str(emp).strip() in ("", "nan"):
-                        continue
-                    df_clean[df_clean[col_emp] == emp].to_excel(
-                        writer, index=False, sheet_name=str(emp)[:31])
-        buf.seek(0)
-        st.download_button(
-            "Descargar consolidado", data=buf.getvalue(),
-            file_name=f"Consolidado_SAC_2025-2026_{datos['fecha_corte'].replace('/', '-')}.xlsx",
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            key="dl_consolidado", use_container_width=True)
+        # Consolidado (orden Anexo 12, una hoja por aseguradora en xlsx) en la
+        # cola compartida: se arma sólo al pedirlo y queda cacheado por
+        # dataset + formato para todos los usuarios (shared/consolidado_export).
+        from shared.components import report_job_panel
+        from shared.consolidado_export import FORMATOS, export_consolidado, export_filename
+        from shared.jobs import dataset_fingerprint, job_key
+
+        fmt = st.selectbox("Formato", list(FORMATOS), format_func=lambda f: FORMATOS[f][2],
+                           key="consolidado_fmt", label_visibility="collapsed")
+        report_job_panel(
+            "consolidado", job_key(dataset_fingerprint(datos), "consolidado", {"formato": fmt}),
+            partial(export_consolidado, datos["midagri"], fmt), "Preparar consolidado",
+            export_filename(datos["fecha_corte"], fmt), FORMATOS[fmt][1],
+            descarga="Descargar consolidado", primary=False)
     except Exception as e:
         st.error(f"Error: {e}")
 
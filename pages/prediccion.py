@@ -3,8 +3,6 @@ import sys
 import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 
-import json
-
 import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
@@ -20,12 +18,14 @@ from prediccion_siniestralidad import (
     evaluar_intensidad_campana,
     proyectar_serie_mensual,
     serie_actual_desde_df,
+    curvas_nacionales,
     _mes_idx_int,
     CAMPANAS_HIST,
     MESES_CAMPANA,
     MAE_M5_POR_MES,
     UMBRAL_MAE_CONFIABLE,
 )
+from shared.series_campana import series_campana
 from data_processor import load_primas_historicas
 
 require_data()
@@ -90,15 +90,9 @@ elif mae_mes > 15:
 # INTENSIDAD DE LA CAMPAÑA ACTUAL (avisos vs histórico)
 # ═══════════════════════════════════════════════════════════════
 serie_avisos = []
-df_avisos = df_actual[df_actual.get("FECHA_AVISO").notna()] if "FECHA_AVISO" in df_actual.columns else None
-if df_avisos is not None and not df_avisos.empty:
-    fechas = pd.to_datetime(df_avisos["FECHA_AVISO"], errors="coerce").dropna()
-    serie_avisos = [0.0] * 12
-    for f in fechas:
-        from prediccion_siniestralidad import _period_to_idx
-        idx = _period_to_idx(f.strftime("%Y-%m"), "2025-2026")
-        if idx is not None:
-            serie_avisos[idx] += 1
+if "FECHA_AVISO" in df_actual.columns and df_actual["FECHA_AVISO"].notna().any():
+    # Avisos por mes de campaña: misma matriz dept × mes que comparativo
+    serie_avisos = series_campana(df_actual, "2025-2026").avisos_nacional.tolist()
 
 intensidad = evaluar_intensidad_campana(serie_avisos, mes_corte_idx) if serie_avisos else None
 
@@ -205,6 +199,22 @@ with p4:
         "purple"
     ), unsafe_allow_html=True)
 
+bandas = pred.get("bandas") or {}
+if bandas.get("casos") and bandas.get("monto"):
+    b_n, b_m, b_s = bandas["casos"], bandas["monto"], bandas.get("siniestralidad")
+    st.markdown(
+        f"**Bandas probabilísticas (P10 – P50 – P90):** "
+        f"casos {b_n['P10']:,.0f} – {b_n['P50']:,.0f} – {b_n['P90']:,.0f} · "
+        f"monto S/ {b_m['P10']:,.0f} – {b_m['P50']:,.0f} – {b_m['P90']:,.0f}"
+        + (f" · siniestralidad {b_s['P10']:.1f}% – {b_s['P50']:.1f}% – {b_s['P90']:.1f}%"
+           if b_s else "")
+    )
+    st.caption(
+        f"{bandas['n_simulaciones']:,} simulaciones bootstrap: se remuestrean con "
+        "reposición las campañas históricas y se vuelve a proyectar el avance con M5. "
+        "En 8 de cada 10 simulaciones el cierre queda entre P10 y P90."
+    )
+
 st.caption(
     f"**Modelo recomendado:** {pred['modelo_recomendado']} (regresión lineal sobre el "
     f"avance entre campañas). Error REAL al corte de **{pred['mes_corte']}**: "
@@ -280,29 +290,8 @@ st.caption(
     "del modelo (línea verde punteada, mes vigente → Jul)."
 )
 
-# Curvas históricas
-with open(os.path.join(os.path.dirname(__file__), "..", "static_data", "series_temporales.json"),
-          encoding="utf-8") as f:
-    nacional = json.load(f)
-
-
-def _serie_camp(camp, sub_key):
-    out = [0.0] * 12
-    raw = nacional["indemnizaciones"].get(camp, {})
-    for p, v in raw.items():
-        try:
-            y, m = int(p[:4]), int(p[5:7])
-        except Exception:
-            continue
-        sy = int(camp[:4])
-        idx = None
-        if y == sy and 8 <= m <= 12:
-            idx = m - 8
-        elif y == sy + 1 and 1 <= m <= 7:
-            idx = m + 4
-        if idx is not None and isinstance(v, dict):
-            out[idx] = v.get(sub_key, 0)
-    return out
+# Curvas históricas (almacén en memoria del modelo: el JSON se lee una vez)
+curvas_nac = curvas_nacionales()
 
 
 def make_advance_chart(metric_key: str, title: str, yaxis_title: str, fmt_prefix: str = ""):
@@ -311,9 +300,7 @@ def make_advance_chart(metric_key: str, title: str, yaxis_title: str, fmt_prefix
 
     # Históricas
     colors_hist = ["#636EFA", "#EF553B", "#00CC96", "#AB63FA", "#FFA15A"]
-    for camp, color in zip(CAMPANAS_HIST, colors_hist):
-        s = _serie_camp(camp, metric_key)
-        cum = np.cumsum(s)
+    for camp, color, cum in zip(CAMPANAS_HIST, colors_hist, curvas_nac.cum[metric_key]):
         fig.add_trace(go.Scatter(
             x=MESES_CAMPANA, y=cum,
             mode="lines+markers", name=camp,
@@ -335,7 +322,7 @@ def make_advance_chart(metric_key: str, title: str, yaxis_title: str, fmt_prefix
     ))
 
     # Proyección desde el mes vigente hasta Jul
-    curvas_hist = [_serie_camp(c, metric_key) for c in CAMPANAS_HIST]
+    curvas_hist = curvas_nac.series[metric_key].tolist()
     proyectada = proyectar_serie_mensual(
         serie_actual=serie,
         mes_corte_idx=mes_corte_idx,
@@ -485,11 +472,12 @@ st.caption(
 st.divider()
 st.markdown("### Predicción por departamento")
 st.caption(
-    "Estimación del cierre por departamento usando M4_dept (promedio de las "
-    "últimas 2 campañas del propio departamento, más estable que el modelo "
-    "nacional cuando hay pocos datos). El intervalo es el min/max histórico "
-    "del avance del propio departamento. La columna **Confiabilidad** indica "
-    "cuántas campañas históricas tenemos para cada dept."
+    "Estimación del cierre por departamento. Para cada departamento se usa el "
+    "modelo (M5 regresión, M4 última campaña o M3 promedio de las últimas 2) "
+    "con menor error en el backtesting leave-one-out sobre sus propias campañas "
+    "al corte actual; sin error medible se usa M3. El intervalo es el min/max "
+    "histórico del avance del propio departamento. La columna **Confiabilidad** "
+    "indica cuántas campañas históricas tenemos para cada dept."
 )
 
 # Primas por dept para la campaña actual
@@ -512,11 +500,18 @@ if dept_preds:
                      if sin_min is not None and sin_max is not None else "—")
         # Marcador de confiabilidad
         conf_emoji = {"alta": "●", "media": "◐", "baja": "○"}.get(d["confiabilidad"], "○")
+        modelo = (d.get("modelo_n") or "—").split("_")[0]
+        banda_n = (d.get("bandas") or {}).get("casos")
+        if d.get("mae_backtest_n") is not None:
+            modelo += f" (MAE {d['mae_backtest_n']:.0f}%)"
         rows.append({
             "Depto": d["departamento"].title(),
             "Acum. casos": f"{int(d['acumulado_n']):,}",
             "Pred. casos (cierre)": f"{int(d['predicho_n']):,}",
             "Rango casos": f"{int(d['predicho_n_min']):,} – {int(d['predicho_n_max']):,}",
+            "Modelo casos": modelo,
+            "P10–P90 casos": (f"{banda_n['P10']:,.0f} – {banda_n['P90']:,.0f}"
+                              if banda_n else "—"),
             "Pred. monto (S/)": f"S/ {d['predicho_monto']:,.0f}",
             "Siniestralidad proy.": sin_str,
             "Rango sin.": sin_range,
@@ -535,8 +530,8 @@ if dept_preds:
         "◐ media = 2-3 campañas · ○ baja = 0-1 campañas (predicción muy inestable). "
         "**Rango:** estimación min-max usando los % de avance históricos del propio "
         "departamento. Sumando los puntos centrales de los departamentos NO se "
-        "obtiene exactamente el total nacional porque cada dept usa M4 mientras que "
-        "el total nacional usa M5 (regresión lineal). Los modelos por dept son útiles "
+        "obtiene exactamente el total nacional porque cada dept usa su propio modelo "
+        "mientras que el total nacional usa M5 (regresión lineal). Los modelos por dept son útiles "
         "para gestión por dept, no para sustituir el agregado nacional."
     )
 
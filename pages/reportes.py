@@ -4,19 +4,54 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 
 import streamlit as st
 from datetime import datetime
+from functools import partial
 
 from shared.state import require_data, get_datos
-from shared.components import render_metric, page_header, footer
+from shared.components import render_metric, page_header, footer, report_job_panel
+from shared.jobs import LISTO, dataset_fingerprint, get_job_queue, job_key
 from data_processor import get_departamento_data, load_primas_historicas
 from gen_word_bridge_py import generate_nacional_docx, generate_departamental_docx
-from gen_excel_eme import generate_reporte_eme
-from gen_word_operatividad import generate_operatividad_docx
-from gen_ppt_dinamico import generar_ppt_dinamico
-from gen_ppt_historico import generar_ppt_historico
-from batch_reports import render_batch_tab
+from batch_reports import (
+    generate_departamento_bundle, generate_historico_zip, generate_pdf_zip, read_manifest,
+    render_batch_tab,
+)
 
 require_data()
 datos = get_datos()
+# Los reportes se generan en la cola compartida (shared/jobs.py): la página
+# sólo encola y consulta el estado. El fingerprint deduplica entre usuarios.
+fp = dataset_fingerprint(datos)
+hoy = datetime.now().strftime("%d_%m_%Y")
+DOCX_MIME = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+PPTX_MIME = "application/vnd.openxmlformats-officedocument.presentationml.presentation"
+
+
+# Los generadores con openpyxl / python-docx / python-pptx / matplotlib se
+# importan dentro del job: abrir la página no paga esas librerías.
+def _pdf_ejecutivo(datos):
+    from gen_pdf_resumen import generate_executive_pdf
+    return generate_executive_pdf(datos)
+
+
+def _operatividad_docx(datos):
+    from gen_word_operatividad import generate_operatividad_docx
+    return generate_operatividad_docx(datos)
+
+
+def _reporte_eme(datos, nivel):
+    from gen_excel_eme import generate_reporte_eme
+    return generate_reporte_eme(datos, nivel=nivel)
+
+
+def _ppt_dinamico(df, filtros, fecha_corte):
+    from gen_ppt_dinamico import generar_ppt_dinamico
+    return generar_ppt_dinamico(df, filtros, fecha_corte)
+
+
+def _ppt_historico(depto, datos):
+    from gen_ppt_historico import generar_ppt_historico
+    return generar_ppt_historico(depto, datos, load_primas_historicas())
+
 
 page_header("Generar Reportes",
             "Documentos Word, Excel y PowerPoint del Seguro Agrícola Catastrófico",
@@ -38,24 +73,9 @@ with tab_nac:
                 f'<div class="desc">Resumen nacional: primas, cobertura, indemnizaciones y eventos.</div></div>',
                 unsafe_allow_html=True)
 
-    c1, c2 = st.columns([1, 1])
-    with c1:
-        if st.button("Generar documento", type="primary", key="gen_nac", use_container_width=True):
-            with st.spinner("Generando Ayuda Memoria Nacional..."):
-                try:
-                    doc_bytes = generate_nacional_docx(datos)
-                    fecha_str = datetime.now().strftime("%d_%m_%Y")
-                    st.session_state["doc_nacional"] = doc_bytes
-                    st.session_state["doc_nacional_name"] = f"Ayuda_Memoria_Resumen_SAC_2025-2026_{fecha_str}.docx"
-                    st.success("Documento generado")
-                except Exception as e:
-                    st.error(f"Error: {e}")
-    with c2:
-        if st.session_state.get("doc_nacional"):
-            st.download_button(":material/download: Descargar", data=st.session_state["doc_nacional"],
-                               file_name=st.session_state["doc_nacional_name"],
-                               mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-                               use_container_width=True)
+    report_job_panel("nac", job_key(fp, "nacional"), partial(generate_nacional_docx, datos),
+                     "Generar documento",
+                     f"Ayuda_Memoria_Resumen_SAC_2025-2026_{hoy}.docx", DOCX_MIME)
 
     with st.expander("Cuadro 1 — Primas y Cobertura"):
         st.dataframe(datos["cuadro1"], use_container_width=True, hide_index=True)
@@ -66,23 +86,16 @@ with tab_nac:
 
     # PDF Ejecutivo
     st.divider()
-    cp1, cp2 = st.columns([1, 1])
-    with cp1:
-        if st.button("Generar PDF Ejecutivo", key="gen_pdf_exec"):
-            with st.spinner("Generando PDF..."):
-                try:
-                    from gen_pdf_resumen import generate_executive_pdf
-                    pdf_bytes = generate_executive_pdf(datos)
-                    st.session_state["pdf_exec"] = pdf_bytes
-                    st.session_state["pdf_exec_name"] = f"Resumen_Ejecutivo_SAC_{datetime.now().strftime('%d_%m_%Y')}.pdf"
-                    st.success("PDF generado")
-                except Exception as e:
-                    st.error(f"Error: {e}")
-    with cp2:
-        if st.session_state.get("pdf_exec"):
-            st.download_button(":material/download: Descargar PDF", data=st.session_state["pdf_exec"],
-                               file_name=st.session_state["pdf_exec_name"], mime="application/pdf",
-                               use_container_width=True)
+    report_job_panel("pdf_exec", job_key(fp, "pdf_ejecutivo"),
+                     partial(_pdf_ejecutivo, datos), "Generar PDF Ejecutivo",
+                     f"Resumen_Ejecutivo_SAC_{hoy}.pdf", "application/pdf",
+                     descarga=":material/download: Descargar PDF", primary=False)
+    st.caption(f"O uno por departamento ({len(datos['departamentos_list'])}) en un ZIP.")
+    report_job_panel("pdf_deptos", job_key(fp, "pdf_departamentos_zip"),
+                     partial(generate_pdf_zip, datos), "Generar PDF por departamento (ZIP)",
+                     f"Resumen_Ejecutivo_SAC_departamentos_{hoy}.zip", "application/zip",
+                     descarga=":material/download: Descargar ZIP",
+                     progress_kw="progress_callback", primary=False)
 
 # ═══ Departamental ═══
 with tab_depto:
@@ -98,69 +111,48 @@ with tab_depto:
 
         st.markdown(f"**Aseguradora:** {depto_data['empresa']} · **Prima:** S/ {depto_data['prima_neta']:,.2f} · **Ha aseguradas:** {depto_data['sup_asegurada']:,.0f}")
 
-        cg, cd = st.columns([1, 1])
-        with cg:
-            if st.button("Generar documento", type="primary", key="gen_depto", use_container_width=True):
-                with st.spinner(f"Generando reporte de {depto_sel.title()}..."):
-                    try:
-                        doc_bytes = generate_departamental_docx(depto_data)
-                        st.session_state["doc_depto"] = doc_bytes
-                        st.session_state["doc_depto_name"] = f"Ayuda_Memoria_SAC_{depto_sel.title()}_{datetime.now().strftime('%d_%m_%Y')}.docx"
-                        st.success(f"Documento de {depto_sel.title()} generado")
-                    except Exception as e:
-                        st.error(f"Error: {e}")
-        with cd:
-            if st.session_state.get("doc_depto"):
-                st.download_button(f":material/download: Descargar", data=st.session_state["doc_depto"],
-                                   file_name=st.session_state["doc_depto_name"],
-                                   mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-                                   use_container_width=True)
+        report_job_panel("depto", job_key(fp, "departamental", {"depto": depto_sel}),
+                         partial(generate_departamental_docx, depto_data), "Generar documento",
+                         f"Ayuda_Memoria_SAC_{depto_sel.title()}_{hoy}.docx", DOCX_MIME)
+
+        # Paquete: Word + PPT histórica + PDF + semáforo del departamento en un ZIP
+        st.caption("O el paquete del departamento: Word, PPT histórica, PDF ejecutivo y semáforo en un ZIP.")
+        bundle_key = job_key(fp, "depto_bundle", {"depto": depto_sel})
+        status = report_job_panel("depto_zip", bundle_key,
+                                  partial(generate_departamento_bundle, datos, depto_sel),
+                                  "Generar paquete (ZIP)",
+                                  f"Paquete_SAC_{depto_sel.title()}_{hoy}.zip", "application/zip",
+                                  descarga=":material/download: Descargar ZIP",
+                                  progress_kw="progress_callback", primary=False)
+        if status and status["estado"] == LISTO:
+            manifest = read_manifest(get_job_queue().result(bundle_key))
+            if manifest:
+                st.caption(" · ".join(f"{k}: {v:.2f} s" for k, v in manifest["tiempos"].items()))
+                for e in manifest["errores"]:
+                    st.warning(f"{e['reporte']}: {e['error']}")
 
 # ═══ Operatividad ═══
 with tab_oper:
     st.markdown(f'<div class="tab-intro"><div class="title">Operatividad SAC · Corte {datos["fecha_corte"]}</div>'
                 f'<div class="desc">Detalle por empresa: siniestralidad, coberturas, cultivos y desembolsos.</div></div>',
                 unsafe_allow_html=True)
-    cg, cd = st.columns([1, 1])
-    with cg:
-        if st.button("Generar Operatividad", type="primary", key="gen_oper", use_container_width=True):
-            with st.spinner("Generando..."):
-                try:
-                    doc_bytes = generate_operatividad_docx(datos)
-                    st.session_state["doc_operatividad"] = doc_bytes
-                    st.session_state["doc_operatividad_name"] = f"AM_Operatividad_SAC_{datetime.now().strftime('%d_%m_%Y')}.docx"
-                    st.success("Documento generado")
-                except Exception as e:
-                    st.error(f"Error: {e}")
-    with cd:
-        if st.session_state.get("doc_operatividad"):
-            st.download_button(":material/download: Descargar", data=st.session_state["doc_operatividad"],
-                               file_name=st.session_state["doc_operatividad_name"],
-                               mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-                               use_container_width=True)
+    report_job_panel("oper", job_key(fp, "operatividad"),
+                     partial(_operatividad_docx, datos), "Generar Operatividad",
+                     f"AM_Operatividad_SAC_{hoy}.docx", DOCX_MIME)
 
 # ═══ EME ═══
 with tab_eme:
     st.markdown('<div class="tab-intro"><div class="title">Reporte de Emergencia (EME)</div>'
                 '<div class="desc">Formato consolidado por región con acciones implementadas.</div></div>',
                 unsafe_allow_html=True)
-    cg, cd = st.columns([1, 1])
-    with cg:
-        if st.button("Generar Reporte EME", type="primary", key="gen_eme", use_container_width=True):
-            with st.spinner("Generando Excel..."):
-                try:
-                    xls_bytes = generate_reporte_eme(datos)
-                    st.session_state["xls_eme"] = xls_bytes
-                    st.session_state["xls_eme_name"] = f"formato_reporte_EME_{datetime.now().strftime('%d_%m_%Y')}.xlsx"
-                    st.success("Reporte EME generado")
-                except Exception as e:
-                    st.error(f"Error: {e}")
-    with cd:
-        if st.session_state.get("xls_eme"):
-            st.download_button(":material/download: Descargar EME", data=st.session_state["xls_eme"],
-                               file_name=st.session_state["xls_eme_name"],
-                               mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                               use_container_width=True)
+    eme_nivel = "distrito" if st.checkbox(
+        "Detalle distrital (distritos por provincia)", key="eme_distrital",
+        help="Variante para eventos El Niño: la columna DISTRITOS lista cada distrito.") else "region"
+    report_job_panel("eme", job_key(fp, "eme", {"nivel": eme_nivel}),
+                     partial(_reporte_eme, datos, nivel=eme_nivel),
+                     "Generar Reporte EME", f"formato_reporte_EME_{hoy}.xlsx",
+                     "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                     descarga=":material/download: Descargar EME")
 
 # ═══ PPT Dinámica ═══
 with tab_ppt:
@@ -210,25 +202,11 @@ with tab_ppt:
         "fecha_inicio": fecha_ini, "fecha_fin": fecha_fin, "col_fecha": "FECHA_AVISO",
     }
 
-    cg, cd = st.columns([1, 1])
-    with cg:
-        if st.button("Generar Presentación", type="primary", key="gen_ppt_din", use_container_width=True):
-            with st.spinner("Generando PowerPoint..."):
-                try:
-                    ppt_bytes = generar_ppt_dinamico(df_ppt, filtros, datos["fecha_corte"])
-                    geo_str = "_".join(deptos_sel[:2]) if deptos_sel else ""
-                    fname = f"SAC_{scope}_{geo_str}_{datetime.now().strftime('%d_%m_%Y')}.pptx"
-                    st.session_state["ppt_dinamico"] = ppt_bytes
-                    st.session_state["ppt_dinamico_name"] = fname
-                    st.success(f"Presentación generada ({len(ppt_bytes)/1024:.0f} KB)")
-                except Exception as e:
-                    st.error(f"Error: {e}")
-    with cd:
-        if st.session_state.get("ppt_dinamico"):
-            st.download_button(":material/download: Descargar PPT", data=st.session_state["ppt_dinamico"],
-                               file_name=st.session_state.get("ppt_dinamico_name", "SAC.pptx"),
-                               mime="application/vnd.openxmlformats-officedocument.presentationml.presentation",
-                               use_container_width=True)
+    geo_str = "_".join(deptos_sel[:2]) if deptos_sel else ""
+    report_job_panel("ppt_din", job_key(fp, "ppt_dinamico", filtros),
+                     partial(_ppt_dinamico, df_ppt, dict(filtros), datos["fecha_corte"]),
+                     "Generar Presentación", f"SAC_{scope}_{geo_str}_{hoy}.pptx", PPTX_MIME,
+                     descarga=":material/download: Descargar PPT")
 
 # ═══ Generar Todos ═══
 with tab_batch:
@@ -249,25 +227,16 @@ with tab_hist:
     dept_list_hist = datos.get("departamentos_list", [])
     if dept_list_hist:
         sel_hist = st.selectbox("Seleccione departamento:", sorted(dept_list_hist), key="hist_dept_select")
-        cg, cd = st.columns([1, 1])
-        with cg:
-            if st.button("Generar PPT Histórica", type="primary", key="gen_hist_ppt"):
-                with st.spinner(f"Generando análisis histórico de {sel_hist}..."):
-                    try:
-                        primas = load_primas_historicas()
-                        ppt_bytes = generar_ppt_historico(sel_hist, datos, primas)
-                        fname = f"Historico_SAC_{sel_hist}_{datetime.now().strftime('%d_%m_%Y')}.pptx"
-                        st.session_state["ppt_historico"] = ppt_bytes
-                        st.session_state["ppt_historico_name"] = fname
-                        st.success(f"PPT generada: {fname}")
-                    except Exception as e:
-                        st.error(f"Error: {e}")
-        with cd:
-            if st.session_state.get("ppt_historico"):
-                st.download_button(":material/download: Descargar PPT Histórica",
-                                   data=st.session_state["ppt_historico"],
-                                   file_name=st.session_state.get("ppt_historico_name", "historico.pptx"),
-                                   mime="application/vnd.openxmlformats-officedocument.presentationml.presentation",
-                                   use_container_width=True, key="dl_hist_ppt")
+        report_job_panel("hist_ppt", job_key(fp, "ppt_historico", {"depto": sel_hist}),
+                         partial(_ppt_historico, sel_hist, datos), "Generar PPT Histórica",
+                         f"Historico_SAC_{sel_hist}_{hoy}.pptx", PPTX_MIME,
+                         descarga=":material/download: Descargar PPT Histórica")
+
+        st.caption(f"O todas juntas: una PPT por departamento ({len(dept_list_hist)}) en un ZIP.")
+        report_job_panel("hist_zip", job_key(fp, "ppt_historico_zip"),
+                         partial(generate_historico_zip, datos), "Generar todas (ZIP)",
+                         f"Historico_SAC_todos_{hoy}.zip", "application/zip",
+                         descarga=":material/download: Descargar ZIP",
+                         progress_kw="progress_callback", primary=False)
 
 footer()
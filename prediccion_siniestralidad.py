@@ -31,10 +31,13 @@ LIMITACIONES IMPORTANTES:
 """
 import json
 import os
+import warnings
+from functools import lru_cache
 from typing import Dict, List, Optional, Tuple
 
 import numpy as np
-import pandas as pd
+
+from shared.series_campana import campana_de, series_campana
 
 STATIC_DIR = os.path.join(os.path.dirname(__file__), "static_data")
 PATH_NACIONAL = os.path.join(STATIC_DIR, "series_temporales.json")
@@ -114,16 +117,22 @@ def _avance_en_idx(serie: List[float], idx_float: float) -> float:
     Ej: idx_float=9.33 → interpola entre avance al fin de May (idx 9) y
         avance al fin de Jun (idx 10), tomando 33% del recorrido.
     """
-    avance_acu = _avance_acumulado(serie)
+    avance_acu = np.asarray(_avance_acumulado(serie), dtype=float)
+    return float(_interp_fin_de_mes(avance_acu, float(idx_float)))
+
+
+def _interp_fin_de_mes(tabla: np.ndarray, idx_float: float) -> np.ndarray:
+    """Interpola una tabla de valores a fin de mes (último eje = 12 meses)
+    en la posición fraccional idx_float; devuelve un array sin ese eje."""
     if idx_float >= 11:
-        return float(avance_acu[-1])
+        return tabla[..., -1].copy()
     if idx_float <= -1:
-        return 0.0
+        return np.zeros(tabla.shape[:-1])
     idx_lo = int(np.floor(idx_float))
     frac = float(idx_float - idx_lo)
-    avance_lo = float(avance_acu[idx_lo]) if idx_lo >= 0 else 0.0
-    avance_hi = float(avance_acu[idx_lo + 1]) if idx_lo + 1 < 12 else float(avance_acu[-1])
-    return avance_lo + frac * (avance_hi - avance_lo)
+    lo = tabla[..., idx_lo] if idx_lo >= 0 else 0.0
+    hi = tabla[..., idx_lo + 1]
+    return lo + frac * (hi - lo)
 
 
 def _mae_interpolado(idx_float: float) -> float:
@@ -143,11 +152,15 @@ def _mae_interpolado(idx_float: float) -> float:
     return mae_lo + frac * (mae_hi - mae_lo)
 
 
-def _load_serie(path: str, key: str, campana: str, sub_key: str) -> List[float]:
-    """Carga la serie mensual de una métrica desde el JSON nacional."""
+@lru_cache(maxsize=None)
+def _load_json(path: str) -> Dict:
+    """Lee un JSON de static_data una sola vez por proceso (solo lectura)."""
     with open(path, encoding="utf-8") as f:
-        data = json.load(f)
-    raw = data.get(key, {}).get(campana, {})
+        return json.load(f)
+
+
+def _serie_desde_raw(raw: Dict, campana: str, sub_key: str) -> List[float]:
+    """{'YYYY-MM': valor} → 12 floats Ago→Jul de la métrica sub_key."""
     out = [0.0] * 12
     for p, v in raw.items():
         idx = _period_to_idx(p, campana)
@@ -159,11 +172,17 @@ def _load_serie(path: str, key: str, campana: str, sub_key: str) -> List[float]:
     return out
 
 
+def _load_serie(path: str, key: str, campana: str, sub_key: str) -> List[float]:
+    """Carga la serie mensual de una métrica desde el JSON nacional."""
+    return _serie_desde_raw(_load_json(path).get(key, {}).get(campana, {}), campana, sub_key)
+
+
 def _curvas_historicas() -> Dict[str, Dict[str, List[float]]]:
     """Carga curvas históricas: serie mensual de count y monto por campaña."""
+    store = curvas_nacionales()
     return {
-        "n": {c: _load_serie(PATH_NACIONAL, "indemnizaciones", c, "n") for c in CAMPANAS_HIST},
-        "monto": {c: _load_serie(PATH_NACIONAL, "indemnizaciones", c, "monto") for c in CAMPANAS_HIST},
+        k: {c: store.series[k][i].tolist() for i, c in enumerate(CAMPANAS_HIST)}
+        for k in ("n", "monto")
     }
 
 
@@ -174,6 +193,86 @@ def _avance_acumulado(serie: List[float]) -> List[float]:
     return [v / total for v in cum]
 
 
+# ============================================================
+# Almacén de curvas históricas (una carga por proceso)
+# ============================================================
+# Antes cada llamada releía los JSON (diez aperturas por
+# _curvas_historicas, una por predecir_por_dept y por
+# evaluar_intensidad_campana) y el backtest recalculaba _avance_acumulado
+# y np.cumsum dentro de sus dos bucles. Ahora los JSON se leen una vez,
+# se pasan a arrays densos y las tablas acumuladas se calculan al armar
+# el almacén; predicción y backtest solo indexan.
+class CurvasHistoricas:
+    """Series mensuales densas con sus tablas acumuladas precomputadas.
+
+    series[metrica] es un array float (campañas × 12) para las curvas
+    nacionales o (deptos × campañas × 12) para las departamentales; cum,
+    total y avance se calculan sobre el último eje (mes Ago→Jul).
+    """
+
+    def __init__(self, series: Dict[str, np.ndarray], depts: Tuple[str, ...] = ()):
+        self.series = {k: np.asarray(v, dtype=float) for k, v in series.items()}
+        self.cum = {k: np.cumsum(v, axis=-1) for k, v in self.series.items()}
+        self.total = {k: c[..., -1] for k, c in self.cum.items()}
+        # Mismo criterio que _avance_acumulado: total ≤ 0 → divide por 1
+        self.avance = {k: self.cum[k] / np.where(t > 0, t, 1)[..., None]
+                       for k, t in self.total.items()}
+        self.depts = tuple(depts)
+        self.dept_idx = {d: i for i, d in enumerate(self.depts)}
+
+    @classmethod
+    def desde_dict(cls, curvas: Dict[str, Dict[str, List[float]]]) -> "CurvasHistoricas":
+        """Desde el formato {métrica: {campaña: [12]}} (tests / inyección)."""
+        return cls({k: [curvas[k][c] for c in CAMPANAS_HIST] for k in curvas})
+
+    def avance_en(self, metrica: str, idx_float: float) -> np.ndarray:
+        """Avance acumulado interpolado en idx_float, por campaña (y dept)."""
+        return _interp_fin_de_mes(self.avance[metrica], float(idx_float))
+
+    def acumulado_en(self, metrica: str, idx_float: float) -> np.ndarray:
+        """Acumulado absoluto interpolado en idx_float, por campaña (y dept)."""
+        return _interp_fin_de_mes(self.cum[metrica], float(idx_float))
+
+
+@lru_cache(maxsize=1)
+def curvas_nacionales() -> CurvasHistoricas:
+    """Curvas nacionales (avisos, n, monto) de las campañas históricas."""
+    nac = _load_json(PATH_NACIONAL)
+    ind = nac.get("indemnizaciones", {})
+    avisos = nac.get("avisos", {})
+    return CurvasHistoricas({
+        "avisos": [_serie_desde_raw(avisos.get(c, {}), c, "n") for c in CAMPANAS_HIST],
+        "n": [_serie_desde_raw(ind.get(c, {}), c, "n") for c in CAMPANAS_HIST],
+        "monto": [_serie_desde_raw(ind.get(c, {}), c, "monto") for c in CAMPANAS_HIST],
+    })
+
+
+@lru_cache(maxsize=1)
+def curvas_departamentales() -> CurvasHistoricas:
+    """Curvas por departamento (deptos × campañas × 12), deptos ordenados."""
+    por_dept = _curvas_dept()
+    depts = tuple(sorted(por_dept))
+    series = {k: np.zeros((len(depts), len(CAMPANAS_HIST), 12))
+              for k in ("avisos", "n", "monto")}
+    for i, dept in enumerate(depts):
+        block = por_dept[dept]
+        for j, c in enumerate(CAMPANAS_HIST):
+            raw_ind = block.get("indemnizaciones", {}).get(c, {})
+            series["avisos"][i, j] = _serie_desde_raw(block.get("avisos", {}).get(c, {}), c, "n")
+            series["n"][i, j] = _serie_desde_raw(raw_ind, c, "n")
+            series["monto"][i, j] = _serie_desde_raw(raw_ind, c, "monto")
+    return CurvasHistoricas(series, depts)
+
+
+def _curvas_store(curvas_hist=None) -> CurvasHistoricas:
+    """Almacén nacional por defecto, o uno armado con las curvas inyectadas."""
+    if curvas_hist is None:
+        return curvas_nacionales()
+    if isinstance(curvas_hist, CurvasHistoricas):
+        return curvas_hist
+    return CurvasHistoricas.desde_dict(curvas_hist)
+
+
 # ============================================================
 # Modelo: regresión lineal sobre el avance entre campañas
 # ============================================================
@@ -203,6 +302,55 @@ def _predecir_avance_ultimas_n(avances_por_camp: List[float], n: int = 2) -> flo
     return float(np.mean(avances_por_camp))
 
 
+# Versiones en lote de M5/M4/M3: operan sobre el último eje (campaña) de
+# arrays de cualquier forma, con pesos w ∈ {0,1} que marcan las campañas
+# disponibles. Sirven para el backtest (mes × holdout × depto en una sola
+# pasada) y para la predicción por departamento.
+MODELOS = ("M5_regresion", "M4_ultima", "M3_ultimas_2")
+
+
+def _ajuste_lineal(y: np.ndarray, w: np.ndarray, x_pred) -> np.ndarray:
+    """M5 en forma cerrada: regresión lineal de y sobre la posición de la
+    campaña (último eje) con pesos w, evaluada en x_pred y recortada a [0, 1].
+
+    Mínimos cuadrados en lote: n, Σx, Σx², Σy y Σxy se reducen sobre el
+    último eje, así que todos los ejes previos se resuelven juntos. Con
+    menos de 2 puntos devuelve el promedio de los disponibles (0 si no hay),
+    igual que _avance_loo.
+    """
+    x = np.arange(y.shape[-1], dtype=float)
+    n = w.sum(-1)
+    sx = (w * x).sum(-1)
+    sxx = (w * x * x).sum(-1)
+    wy = w * y
+    sy = wy.sum(-1)
+    sxy = (wy * x).sum(-1)
+    den = n * sxx - sx * sx
+    n1 = np.maximum(n, 1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        slope = np.where(den > 1e-12, (n * sxy - sx * sy) / den, 0.0)
+    pred = np.clip(slope * x_pred + (sy - slope * sx) / n1, 0.0, 1.0)
+    return np.where(n >= 2, pred, sy / n1)
+
+
+def _ultimas(y: np.ndarray, w: np.ndarray, k: int) -> np.ndarray:
+    """Promedio de las últimas k campañas disponibles (M4: k=1, M3: k=2);
+    0 si no hay ninguna."""
+    desde_el_final = np.cumsum(w[..., ::-1], axis=-1)[..., ::-1]
+    sel = w * (desde_el_final <= k)
+    n = sel.sum(-1)
+    return np.where(n > 0, (sel * y).sum(-1) / np.maximum(n, 1), 0.0)
+
+
+def _avances_modelos(y: np.ndarray, w: np.ndarray, x_pred) -> Dict[str, np.ndarray]:
+    """Avance proyectado por cada modelo de MODELOS."""
+    return {
+        "M5_regresion": _ajuste_lineal(y, w, x_pred),
+        "M4_ultima": _ultimas(y, w, 1),
+        "M3_ultimas_2": _ultimas(y, w, 2),
+    }
+
+
 # ============================================================
 # Backtesting — validación leave-one-out del modelo M5
 # ============================================================
@@ -221,6 +369,49 @@ def _avance_loo(avances_full: List[float], holdout_idx: int) -> float:
     return float(np.clip(slope * holdout_idx + intercept, 0.0, 1.0))
 
 
+@lru_cache(maxsize=4)
+def backtest_tabla(store: CurvasHistoricas) -> Dict:
+    """Backtest leave-one-out de los tres modelos, vectorizado.
+
+    Por métrica arma el tensor (…, mes, holdout, campaña): los pesos de
+    entrenamiento son las campañas con total > 0 salvo la excluida, y
+    _avances_modelos resuelve todas las regresiones en una operación. El
+    "…" es vacío para el almacén nacional y el eje de deptos para el
+    departamental. Se cachea por almacén (los arrays son de solo lectura).
+
+    Returns dict:
+      - pred: {modelo: {métrica: (…, 12, campañas)}} cierre predicho de
+              cada campaña excluida, por mes de corte
+      - err:  idem, % de error absoluto (NaN si la campaña no tiene total)
+      - mae:  {modelo: {métrica: (…, 12)}} promedio de err (inf sin datos)
+      - n:    {métrica: (…, 12)} campañas evaluadas por mes
+    """
+    n_camp = store.series["n"].shape[-2]
+    hold = np.arange(n_camp)
+    out = {"pred": {m: {} for m in MODELOS}, "err": {m: {} for m in MODELOS},
+           "mae": {m: {} for m in MODELOS}, "n": {}}
+    for metrica in ("n", "monto"):
+        real = store.total[metrica]                                  # (…, C)
+        valida = (real > 0).astype(float)
+        entren = valida[..., None, :] * (hold[:, None] != hold[None, :])  # (…, H, C)
+        av = np.swapaxes(store.avance[metrica], -1, -2)              # (…, 12, C)
+        cum = np.swapaxes(store.cum[metrica], -1, -2)
+        avances = _avances_modelos(av[..., None, :], entren[..., None, :, :], hold)
+        real_h = real[..., None, :]                                  # (…, 1, H)
+        evaluadas = np.broadcast_to(real_h > 0, cum.shape)
+        cuenta = evaluadas.sum(-1)
+        out["n"][metrica] = cuenta
+        for modelo, pa in avances.items():
+            with np.errstate(divide="ignore", invalid="ignore"):
+                pred = np.where(pa > 1e-9, cum / pa, 0.0)
+                err = np.where(evaluadas, np.abs(pred - real_h) / real_h * 100, np.nan)
+                mae = np.where(cuenta > 0, np.nansum(err, -1) / np.maximum(cuenta, 1), np.inf)
+            out["pred"][modelo][metrica] = pred
+            out["err"][modelo][metrica] = err
+            out["mae"][modelo][metrica] = mae
+    return out
+
+
 def backtest_modelo(curvas_hist: Optional[Dict] = None) -> Dict:
     """Backtesting leave-one-out del modelo M5 sobre las 5 campañas históricas.
 
@@ -228,50 +419,38 @@ def backtest_modelo(curvas_hist: Optional[Dict] = None) -> Dict:
     ESA campaña usando solo las otras 4 (regresión sobre sus avances al mismo
     mes) y se compara con el cierre REAL conocido (la campaña ya terminó). Es
     la base empírica de MAE_M5_POR_MES, ahora calculada en vivo y verificable.
+    El cálculo es el de backtest_tabla; acá solo se arma el detalle.
 
     Returns dict:
       - mae_por_mes: {mes_idx: {"casos": %MAE, "monto": %MAE, "n": nº válidas}}
       - detalle:     {mes_idx: [ {campana, real_n, pred_n, err_n,
                                   real_monto, pred_monto, err_monto} ]}
     """
-    if curvas_hist is None:
-        curvas_hist = _curvas_historicas()
+    store = _curvas_store(curvas_hist)
+    tabla = backtest_tabla(store)
+    mae = tabla["mae"]["M5_regresion"]
+    pred = tabla["pred"]["M5_regresion"]
+    err = tabla["err"]["M5_regresion"]
+    real_n = store.total["n"].tolist()
+    real_m = store.total["monto"].tolist()
+
+    def _err(v):
+        return None if np.isnan(v) else float(v)
 
     mae_por_mes: Dict[int, Dict] = {}
     detalle: Dict[int, List[Dict]] = {}
-
     for m in range(12):
-        av_n = [_avance_acumulado(curvas_hist["n"][c])[m] for c in CAMPANAS_HIST]
-        av_m = [_avance_acumulado(curvas_hist["monto"][c])[m] for c in CAMPANAS_HIST]
-        errs_n: List[float] = []
-        errs_m: List[float] = []
-        filas: List[Dict] = []
-        for i, c in enumerate(CAMPANAS_HIST):
-            real_n = float(sum(curvas_hist["n"][c]))
-            real_m = float(sum(curvas_hist["monto"][c]))
-            acu_n = float(np.cumsum(curvas_hist["n"][c])[m])
-            acu_m = float(np.cumsum(curvas_hist["monto"][c])[m])
-            pa_n = _avance_loo(av_n, i)
-            pa_m = _avance_loo(av_m, i)
-            pred_n = acu_n / pa_n if pa_n > 1e-9 else 0.0
-            pred_m = acu_m / pa_m if pa_m > 1e-9 else 0.0
-            e_n = abs(pred_n - real_n) / real_n * 100 if real_n > 0 else None
-            e_m = abs(pred_m - real_m) / real_m * 100 if real_m > 0 else None
-            if e_n is not None:
-                errs_n.append(e_n)
-            if e_m is not None:
-                errs_m.append(e_m)
-            filas.append({
-                "campana": c,
-                "real_n": real_n, "pred_n": pred_n, "err_n": e_n,
-                "real_monto": real_m, "pred_monto": pred_m, "err_monto": e_m,
-            })
         mae_por_mes[m] = {
-            "casos": float(np.mean(errs_n)) if errs_n else float("inf"),
-            "monto": float(np.mean(errs_m)) if errs_m else float("inf"),
-            "n": len(errs_n),
+            "casos": float(mae["n"][m]),
+            "monto": float(mae["monto"][m]),
+            "n": int(tabla["n"]["n"][m]),
         }
-        detalle[m] = filas
+        detalle[m] = [{
+            "campana": c,
+            "real_n": real_n[i], "pred_n": float(pred["n"][m, i]), "err_n": _err(err["n"][m, i]),
+            "real_monto": real_m[i], "pred_monto": float(pred["monto"][m, i]),
+            "err_monto": _err(err["monto"][m, i]),
+        } for i, c in enumerate(CAMPANAS_HIST)]
 
     return {"mae_por_mes": mae_por_mes, "detalle": detalle}
 
@@ -295,6 +474,114 @@ def _interp_backtest_mae(mae_por_mes: Dict, idx_float: float, metric: str = "cas
     return lo + frac * (hi - lo)
 
 
+# ============================================================
+# Bandas probabilísticas — bootstrap de las curvas históricas
+# ============================================================
+# Cada simulación remuestrea con reposición las campañas históricas
+# válidas (las que tienen total > 0) y vuelve a proyectar el avance al
+# corte con el modelo: M5 usa las repeticiones como pesos de la regresión
+# en forma cerrada; M4/M3 toman las últimas campañas presentes en la
+# muestra. Todas las simulaciones (y todos los deptos) se resuelven como
+# operaciones sobre arrays (n_sim, …, campañas). Las simulaciones
+# dependen solo del almacén, la métrica y el corte: se cachean por corte,
+# y cada dataset solo divide sus acumulados por ellas.
+N_SIMULACIONES = 4000
+SEMILLA_BOOTSTRAP = 2025
+PERCENTILES_BANDA = (10, 50, 90)
+
+
+def _pesos_bootstrap(valida: np.ndarray, u: np.ndarray) -> np.ndarray:
+    """Repeticiones de cada campaña en cada remuestreo.
+
+    valida: (…, C) bool; u: (n_sim, …, C) uniformes en [0, 1). Cada
+    remuestreo saca k = nº de campañas válidas con reposición entre ellas.
+    Returns: (n_sim, …, C) float con las repeticiones (suman k).
+    """
+    n_camp = valida.shape[-1]
+    k = valida.sum(-1)[..., None]                              # (…, 1)
+    orden = np.argsort(~valida, axis=-1, kind="stable")        # válidas primero
+    rango = np.minimum((u * k).astype(int), np.maximum(k - 1, 0))
+    sacadas = np.take_along_axis(np.broadcast_to(orden, u.shape), rango, axis=-1)
+    en_muestra = np.arange(n_camp) < k                         # solo k extracciones
+    una_hot = (sacadas[..., None] == np.arange(n_camp)) & en_muestra[..., None]
+    return una_hot.sum(-2).astype(float)
+
+
+@lru_cache(maxsize=32)
+def _avances_bootstrap(store: CurvasHistoricas, metrica: str, mes_corte_idx: float,
+                       n_sim: int = N_SIMULACIONES,
+                       semilla: int = SEMILLA_BOOTSTRAP) -> Dict[str, np.ndarray]:
+    """Avance proyectado al corte en cada simulación: {modelo: (n_sim, …)}.
+
+    Casos y monto usan la misma semilla → los mismos remuestreos de
+    campañas, así las bandas de ambas métricas son coherentes entre sí.
+    """
+    valida = store.total[metrica] > 0
+    u = np.random.default_rng(semilla).random((n_sim,) + valida.shape)
+    pesos = _pesos_bootstrap(valida, u)
+    y = store.avance_en(metrica, mes_corte_idx)
+    presentes = (pesos > 0).astype(float)
+    return {
+        "M5_regresion": _ajuste_lineal(y, pesos, float(valida.shape[-1])),
+        "M4_ultima": _ultimas(y, presentes, 1),
+        "M3_ultimas_2": _ultimas(y, presentes, 2),
+    }
+
+
+def _percentiles_cierre(acumulado, avances: np.ndarray) -> np.ndarray:
+    """(len(PERCENTILES_BANDA), …) percentiles del cierre acumulado / avance;
+    las simulaciones con avance ~0 no cuentan (NaN si no queda ninguna)."""
+    with np.errstate(divide="ignore", invalid="ignore"), warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        cierre = np.where(avances > 1e-9, acumulado / avances, np.nan)
+        return np.nanpercentile(cierre, PERCENTILES_BANDA, axis=0)
+
+
+def _banda(valores, escala: float = 1.0) -> Optional[Dict[str, float]]:
+    """{"P10", "P50", "P90"} de una columna de percentiles (None si NaN)."""
+    if np.isnan(valores).any():
+        return None
+    return {f"P{q}": float(v) * escala for q, v in zip(PERCENTILES_BANDA, valores)}
+
+
+@lru_cache(maxsize=64)
+def bandas_cierre(acumulado_n: float, acumulado_monto: float, mes_corte_idx: float,
+                  prima_neta: float, n_sim: int = N_SIMULACIONES,
+                  semilla: int = SEMILLA_BOOTSTRAP,
+                  store: Optional[CurvasHistoricas] = None) -> Dict:
+    """Bandas P10/P50/P90 del cierre nacional (casos, monto, siniestralidad).
+
+    Usa el modelo principal (M5) sobre el almacén nacional (o `store`).
+    Cacheado por (acumulados, corte, prima): mismo dataset y mismo corte →
+    mismo resultado sin recalcular. Reproducible por `semilla`.
+    """
+    store = _curvas_store(store)
+    idx = float(mes_corte_idx)
+    p_n = _percentiles_cierre(acumulado_n, _avances_bootstrap(store, "n", idx, n_sim, semilla)["M5_regresion"])
+    p_m = _percentiles_cierre(acumulado_monto,
+                              _avances_bootstrap(store, "monto", idx, n_sim, semilla)["M5_regresion"])
+    return {
+        "casos": _banda(p_n),
+        "monto": _banda(p_m),
+        "siniestralidad": _banda(p_m, 100 / prima_neta) if prima_neta > 0 else None,
+        "modelo": "M5_regresion",
+        "n_simulaciones": n_sim,
+        "semilla": semilla,
+    }
+
+
+def _bandas_dept(store: CurvasHistoricas, metrica: str, mes_corte_idx: float,
+                 modelos: List[str], acumulados: np.ndarray) -> np.ndarray:
+    """(len(PERCENTILES_BANDA), deptos) percentiles del cierre por dept,
+    cada uno con su modelo elegido."""
+    sims = _avances_bootstrap(store, metrica, float(mes_corte_idx))
+    orden = list(sims)
+    todas = np.stack([sims[m] for m in orden])                # (K, n_sim, D)
+    cols = np.arange(len(store.depts))
+    elegidas = todas[[orden.index(m) for m in modelos], :, cols].T  # (n_sim, D)
+    return _percentiles_cierre(acumulados, elegidas)
+
+
 # ============================================================
 # API pública
 # ============================================================
@@ -328,10 +615,11 @@ def predecir_cierre_campana(
           intervalo_n: (min, max), intervalo_monto: (min, max),
           siniestralidad_proyectada (con intervalo),
           modelo_recomendado: el de mejor MAE en validación,
+          bandas: P10/P50/P90 de casos, monto y siniestralidad (bootstrap,
+                  ver bandas_cierre),
           desempeno_validacion: dict con MAE.
     """
-    if curvas_hist is None:
-        curvas_hist = _curvas_historicas()
+    store = _curvas_store(curvas_hist)
 
     # Convención: mes_corte_idx puede ser float. Para el avance histórico
     # interpolamos en el punto fraccional. Para slicing del acumulado actual
@@ -339,14 +627,8 @@ def predecir_cierre_campana(
     mes_idx_int = _mes_idx_int(float(mes_corte_idx))
 
     # Avance histórico interpolado a la posición fraccional del año
-    avances_n_hist = [
-        _avance_en_idx(curvas_hist["n"][c], float(mes_corte_idx))
-        for c in CAMPANAS_HIST
-    ]
-    avances_m_hist = [
-        _avance_en_idx(curvas_hist["monto"][c], float(mes_corte_idx))
-        for c in CAMPANAS_HIST
-    ]
+    avances_n_hist = store.avance_en("n", mes_corte_idx).tolist()
+    avances_m_hist = store.avance_en("monto", mes_corte_idx).tolist()
 
     # Acumulados actuales — incluir hasta el mes vigente inclusive.
     # La serie ya viene limitada por fecha desde serie_actual_desde_df
@@ -389,7 +671,7 @@ def predecir_cierre_campana(
     # cerradas → error real del modelo. Reemplaza los MAE hardcodeados (que
     # resultaron optimistas en media-temporada). MAE_M5_POR_MES queda como
     # fallback documentado si el backtest no es computable en ese punto.
-    bt = backtest_modelo(curvas_hist)
+    bt = backtest_modelo(store)
     mae_actual = _interp_backtest_mae(bt["mae_por_mes"], float(mes_corte_idx), "casos")
     if mae_actual == float("inf"):
         mae_actual = _mae_interpolado(float(mes_corte_idx))
@@ -425,6 +707,8 @@ def predecir_cierre_campana(
                           "El error es mayor en monto que en casos porque hay más variabilidad "
                           "entre campañas en montos. Confiabilidad mejora desde Feb en adelante.",
         },
+        "bandas": bandas_cierre(acu_n, acu_m, float(mes_corte_idx), float(prima_neta_actual),
+                                store=store),
         "MAE_mes_actual": mae_actual,
         "es_confiable": mae_actual <= UMBRAL_MAE_CONFIABLE,
         "mae_fuente": "backtest leave-one-out (en vivo)",
@@ -443,10 +727,34 @@ def predecir_cierre_campana(
 # Predicción POR DEPARTAMENTO
 # ============================================================
 def _curvas_dept() -> Dict:
-    """Carga las series por departamento desde series_temporales_dept.json."""
-    with open(PATH_DEPT, encoding="utf-8") as f:
-        d = json.load(f)
-    return d.get("por_dept", {})
+    """Series por departamento de series_temporales_dept.json (leído una vez)."""
+    return _load_json(PATH_DEPT).get("por_dept", {})
+
+
+MODELO_DEPT_DEFAULT = "M3_ultimas_2"
+
+
+def _modelos_dept(store: CurvasHistoricas, metrica: str,
+                  mes_corte_idx: float) -> Tuple[List[str], np.ndarray, np.ndarray]:
+    """Modelo elegido por dept para `metrica`, su MAE de backtest y su avance.
+
+    Compara el MAE leave-one-out de cada modelo (backtest_tabla sobre el
+    almacén departamental, cacheado) interpolado al corte. Un modelo cuyo
+    avance proyectado es ~0 no sirve para dividir y queda descartado.
+    Returns: (modelos, mae, avance), cada uno alineado con store.depts.
+    """
+    candidatos = (MODELO_DEPT_DEFAULT,) + tuple(m for m in MODELOS if m != MODELO_DEPT_DEFAULT)
+    tabla = backtest_tabla(store)
+    idx = min(max(float(mes_corte_idx), 0.0), 11.0)
+    with np.errstate(invalid="ignore"):
+        mae = np.stack([_interp_fin_de_mes(tabla["mae"][m][metrica], idx) for m in candidatos])
+    w = (store.total[metrica] > 0).astype(float)
+    avances = _avances_modelos(store.avance_en(metrica, mes_corte_idx), w, float(w.shape[-1]))
+    av = np.stack([avances[m] for m in candidatos])
+    mae = np.where(np.isfinite(mae) & (av > 1e-9), mae, np.inf)
+    k = np.argmin(mae, axis=0)  # empate / todo inf → el default (primer candidato)
+    cols = np.arange(len(store.depts))
+    return [candidatos[j] for j in k], mae[k, cols], av[k, cols]
 
 
 def predecir_por_dept(
@@ -459,115 +767,75 @@ def predecir_por_dept(
     Predice el cierre de campaña a nivel departamental.
 
     Para cada dept:
-      - Usa M4 (avance de la última campaña histórica del propio dept) como
-        predictor por defecto, con fallback al promedio dept si no hay datos
-        recientes.
+      - Elige, por métrica (casos / monto), el modelo con menor MAE en el
+        backtest leave-one-out del propio dept al corte actual (ver
+        _modelos_dept). M3 (promedio de las últimas 2 campañas del dept,
+        el predictor fijo anterior) gana empates y deptos sin error medible.
       - Aplica intervalo basado en min/max de las últimas 3 campañas del dept.
+      - Agrega bandas P10/P50/P90 (bootstrap de las campañas del dept con
+        su modelo elegido) en "bandas"; None sin historia.
 
     Returns: lista de dicts ordenados por monto proyectado descendente.
     """
-    import unicodedata as _ud
-
     if today is None:
         from datetime import datetime, timezone, timedelta
         TZ_PERU = timezone(timedelta(hours=-5))
         today = datetime.now(TZ_PERU).date()
 
-    if today.month >= 8:
-        camp_actual = f"{today.year}-{today.year + 1}"
-    else:
-        camp_actual = f"{today.year - 1}-{today.year}"
-
-    curvas = _curvas_dept()
+    store = curvas_departamentales()
     primas_actual_por_dept = primas_actual_por_dept or {}
 
-    # Normalizar dept: quitar tildes, upper
-    def _norm(name):
-        s = str(name).strip().upper()
-        return "".join(c for c in _ud.normalize("NFD", s) if _ud.category(c) != "Mn")
-
     if df_actual is None or df_actual.empty or "DEPARTAMENTO" not in df_actual.columns:
         return []
 
-    df = df_actual.copy()
-    df["_dept"] = df["DEPARTAMENTO"].astype(str).str.strip().str.upper().apply(
-        lambda s: "".join(c for c in _ud.normalize("NFD", s) if _ud.category(c) != "Mn")
-    )
-
-    # Fecha de ajuste para indemnizaciones
-    date_col = None
-    for c in ["FECHA_AJUSTE_ACTA_FINAL", "FECHA_AJUSTE_ACTA_1",
-              "FECHA_PROGRAMACION_AJUSTE", "FECHA_SINIESTRO"]:
-        if c in df.columns:
-            date_col = c
-            break
-    if date_col is None:
+    # Matriz dept × mes de la campaña en curso (una pasada sobre el
+    # consolidado, compartida con serie_actual_desde_df y las páginas)
+    actual = series_campana(df_actual, campana_de(today))
+    if actual.columna_fecha is None:
         return []
-
-    # Filtrar indemnizables
-    if "DICTAMEN" in df.columns:
-        dc = df["DICTAMEN"].astype(str).str.strip().str.upper()
-        is_ind = dc.str.contains("INDEMNIZABLE", na=False) & ~dc.str.contains("NO INDEMNIZABLE", na=False)
-        df_ind = df[is_ind].copy()
-    else:
-        df_ind = df.iloc[0:0].copy()
-
-    if not df_ind.empty:
-        df_ind["_f"] = pd.to_datetime(df_ind[date_col], errors="coerce")
-        df_ind = df_ind[df_ind["_f"].notna()]
-
-        monto_col = None
-        for c in ["INDEMNIZACION", "MONTO_INDEMNIZADO"]:
-            if c in df_ind.columns:
-                monto_col = c
-                break
-        df_ind["_monto"] = (pd.to_numeric(df_ind[monto_col], errors="coerce").fillna(0)
-                            if monto_col else 0)
+    hasta = _mes_idx_int(float(mes_corte_idx)) + 1
+    acu_n_actual = actual.n[:, :hasta].sum(1)
+    acu_m_actual = actual.monto[:, :hasta].sum(1)
 
     # Por cada dept del universo (histórico + actual), predecir
-    todos_depts = set(curvas.keys())
-    if "_dept" in df.columns:
-        todos_depts |= set(df["_dept"].dropna().unique())
+    todos_depts = set(store.depts) | set(actual.depts)
+
+    # Avances históricos de todos los deptos al punto fraccional, de una vez
+    # (deptos × campañas); solo cuentan las campañas con total > 0.
+    av_n_dept = store.avance_en("n", mes_corte_idx)
+    av_m_dept = store.avance_en("monto", mes_corte_idx)
+    con_n = store.total["n"] > 0
+    con_m = store.total["monto"] > 0
+    mod_n, mae_n, av_sel_n = _modelos_dept(store, "n", mes_corte_idx)
+    mod_m, mae_m, av_sel_m = _modelos_dept(store, "monto", mes_corte_idx)
 
     resultados = []
     for dept in sorted(todos_depts):
-        # Acumulado actual del dept
-        if not df_ind.empty:
-            df_d = df_ind[df_ind["_dept"] == dept]
-            acu_n = len(df_d)
-            acu_m = float(df_d["_monto"].sum()) if "_monto" in df_d.columns else 0
-        else:
-            acu_n = 0
-            acu_m = 0
+        # Acumulado actual del dept (meses de campaña hasta el vigente)
+        j = actual.dept_idx.get(dept)
+        acu_n = int(acu_n_actual[j]) if j is not None else 0
+        acu_m = float(acu_m_actual[j]) if j is not None else 0
 
         # Avances históricos del dept en el mes vigente
-        block = curvas.get(dept, {})
-        ind_block = block.get("indemnizaciones", {})
-
-        avs_n_hist = []
-        avs_m_hist = []
-        for c in CAMPANAS_HIST:
-            raw = ind_block.get(c, {})
-            s_n = [0.0] * 12
-            s_m = [0.0] * 12
-            for p, v in raw.items():
-                idx = _period_to_idx(p, c)
-                if idx is not None and isinstance(v, dict):
-                    s_n[idx] = v.get("n", 0)
-                    s_m[idx] = v.get("monto", 0)
-            # Interpolación fraccional del avance al mes_corte_idx (float)
-            if sum(s_n) > 0:
-                avs_n_hist.append(_avance_en_idx(s_n, float(mes_corte_idx)))
-            if sum(s_m) > 0:
-                avs_m_hist.append(_avance_en_idx(s_m, float(mes_corte_idx)))
-
-        # Avance proyectado para el dept usando M4 (más estable con pocos puntos)
-        if len(avs_n_hist) >= 1:
-            av_n = float(np.mean(avs_n_hist[-2:])) if len(avs_n_hist) >= 2 else avs_n_hist[-1]
+        i = store.dept_idx.get(dept)
+        if i is not None:
+            avs_n_hist = av_n_dept[i][con_n[i]].tolist()
+            avs_m_hist = av_m_dept[i][con_m[i]].tolist()
+        else:
+            avs_n_hist = []
+            avs_m_hist = []
+
+        # Avance proyectado con el modelo elegido por backtest para el dept
+        modelo_n = modelo_m = None
+        mae_dept_n = mae_dept_m = None
+        if avs_n_hist:
+            av_n, modelo_n = float(av_sel_n[i]), mod_n[i]
+            mae_dept_n = float(mae_n[i]) if np.isfinite(mae_n[i]) else None
         else:
             av_n = 0.5  # fallback genérico
-        if len(avs_m_hist) >= 1:
-            av_m = float(np.mean(avs_m_hist[-2:])) if len(avs_m_hist) >= 2 else avs_m_hist[-1]
+        if avs_m_hist:
+            av_m, modelo_m = float(av_sel_m[i]), mod_m[i]
+            mae_dept_m = float(mae_m[i]) if np.isfinite(mae_m[i]) else None
         else:
             av_m = 0.4
 
@@ -618,8 +886,34 @@ def predecir_por_dept(
             "confiabilidad": confiabilidad,
             "avance_proyectado_n": av_n,
             "avance_proyectado_monto": av_m,
+            "modelo_n": modelo_n,
+            "modelo_monto": modelo_m,
+            "mae_backtest_n": mae_dept_n,
+            "mae_backtest_monto": mae_dept_m,
         })
 
+    # Bandas bootstrap: todos los deptos con historia en una sola operación
+    con_historia = [r for r in resultados if r["departamento"] in store.dept_idx]
+    for r in resultados:
+        r["bandas"] = None
+    if con_historia:
+        filas = {r["departamento"]: r for r in con_historia}
+        acu_n_d = np.array([filas[d]["acumulado_n"] if d in filas else 0.0 for d in store.depts], dtype=float)
+        acu_m_d = np.array([filas[d]["acumulado_monto"] if d in filas else 0.0 for d in store.depts], dtype=float)
+        p_n = _bandas_dept(store, "n", mes_corte_idx, mod_n, acu_n_d)
+        p_m = _bandas_dept(store, "monto", mes_corte_idx, mod_m, acu_m_d)
+        for r in con_historia:
+            i = store.dept_idx[r["departamento"]]
+            if r["modelo_n"] is None and r["modelo_monto"] is None:
+                continue
+            prima = r["prima_neta"]
+            r["bandas"] = {
+                "casos": _banda(p_n[:, i]) if r["modelo_n"] else None,
+                "monto": _banda(p_m[:, i]) if r["modelo_monto"] else None,
+                "siniestralidad": (_banda(p_m[:, i], 100 / prima)
+                                   if r["modelo_monto"] and prima > 0 else None),
+            }
+
     # Ordenar por monto proyectado descendente
     resultados.sort(key=lambda x: -x["predicho_monto"])
     return resultados
@@ -644,35 +938,12 @@ def evaluar_intensidad_campana(
     campaña actual está fuera del rango histórico → la predicción
     extrapolando puede tener error mayor al MAE base.
     """
-    with open(PATH_NACIONAL, encoding="utf-8") as f:
-        nac = json.load(f)
-
     mes_idx_int = _mes_idx_int(float(mes_corte_idx))
     acu_actual = sum(serie_actual_avisos[: mes_idx_int + 1])
 
     # Acumulados históricos al MISMO punto fraccional del año
     # (interpolación entre fin-de-mes-anterior y fin-de-mes-actual).
-    historicos = []
-    for c in CAMPANAS_HIST:
-        raw = nac.get("avisos", {}).get(c, {})
-        s = [0.0] * 12
-        for p, v in raw.items():
-            idx = _period_to_idx(p, c)
-            if idx is not None and isinstance(v, (int, float)):
-                s[idx] = v
-        cum = np.cumsum(s)
-        # Interpolar el acumulado en el punto fraccional
-        idx_f = float(mes_corte_idx)
-        if idx_f >= 11:
-            historicos.append(float(cum[-1]))
-        elif idx_f <= -1:
-            historicos.append(0.0)
-        else:
-            idx_lo = int(np.floor(idx_f))
-            frac = float(idx_f - idx_lo)
-            cum_lo = float(cum[idx_lo]) if idx_lo >= 0 else 0.0
-            cum_hi = float(cum[idx_lo + 1]) if idx_lo + 1 < 12 else float(cum[-1])
-            historicos.append(cum_lo + frac * (cum_hi - cum_lo))
+    historicos = curvas_nacionales().acumulado_en("avisos", mes_corte_idx).tolist()
 
     if not historicos:
         return {"intensidad": "desconocida", "acumulado_actual": acu_actual,
@@ -719,9 +990,10 @@ def proyectar_serie_mensual(
     gráfico) usamos los avances de fin-de-mes desde el mes vigente en
     adelante.
     """
+    tabla = CurvasHistoricas({"s": np.asarray(curvas_hist_camp, dtype=float).reshape(-1, 12)})
     avances_por_mes = []
     for mes in range(12):
-        avs = [_avance_acumulado(s)[mes] for s in curvas_hist_camp]
+        avs = tabla.avance["s"][:, mes].tolist()
         if metodo == "M5":
             avances_por_mes.append(_predecir_avance_M5(avs))
         elif metodo == "M4":
@@ -733,7 +1005,7 @@ def proyectar_serie_mensual(
     acu_actual = sum(serie_actual[: mes_idx_int + 1])
 
     # Avance proyectado al PUNTO FRACCIONAL actual (no fin de mes)
-    avs_frac = [_avance_en_idx(s, float(mes_corte_idx)) for s in curvas_hist_camp]
+    avs_frac = tabla.avance_en("s", mes_corte_idx).tolist()
     if metodo == "M5":
         avance_corte = _predecir_avance_M5(avs_frac)
     elif metodo == "M4":
@@ -778,11 +1050,7 @@ def serie_actual_desde_df(df, today=None) -> Tuple[List[float], List[float], flo
         TZ_PERU = timezone(timedelta(hours=-5))
         today = datetime.now(TZ_PERU).date()
 
-    # Determinar campaña actual
-    if today.month >= 8:
-        camp_actual = f"{today.year}-{today.year + 1}"
-    else:
-        camp_actual = f"{today.year - 1}-{today.year}"
+    camp_actual = campana_de(today)
 
     # Mes vigente entero (0..11 en Ago→Jul)
     if today.month >= 8:
@@ -797,53 +1065,8 @@ def serie_actual_desde_df(df, today=None) -> Tuple[List[float], List[float], flo
     # Float = posición real entre fin-del-mes-anterior y fin-del-mes-actual
     mes_corte_idx = mes_idx_int_local - 1 + frac_mes
 
-    # Extraer fecha de ajuste de cada aviso indemnizable
-    serie_n = [0.0] * 12
-    serie_m = [0.0] * 12
+    # Serie nacional = suma de la matriz dept × mes (shared/series_campana)
     if df is None or df.empty:
-        return serie_n, serie_m, mes_corte_idx
-
-    # Identificar fecha de ajuste (con prioridad)
-    date_col = None
-    for c in ["FECHA_AJUSTE_ACTA_FINAL", "FECHA_AJUSTE_ACTA_1",
-              "FECHA_PROGRAMACION_AJUSTE", "FECHA_SINIESTRO"]:
-        if c in df.columns:
-            date_col = c
-            break
-    if date_col is None:
-        return serie_n, serie_m, mes_corte_idx
-
-    # Filtrar indemnizables
-    if "DICTAMEN" not in df.columns:
-        return serie_n, serie_m, mes_corte_idx
-    dc = df["DICTAMEN"].astype(str).str.strip().str.upper()
-    is_ind = dc.str.contains("INDEMNIZABLE", na=False) & ~dc.str.contains("NO INDEMNIZABLE", na=False)
-
-    df_i = df[is_ind].copy()
-    if df_i.empty:
-        return serie_n, serie_m, mes_corte_idx
-    df_i["_f"] = pd.to_datetime(df_i[date_col], errors="coerce")
-    df_i = df_i[df_i["_f"].notna()]
-    if df_i.empty:
-        return serie_n, serie_m, mes_corte_idx
-
-    # Asignar a mes de campaña
-    monto_col = None
-    for c in ["INDEMNIZACION", "MONTO_INDEMNIZADO"]:
-        if c in df_i.columns:
-            monto_col = c
-            break
-    if monto_col:
-        df_i["_monto"] = pd.to_numeric(df_i[monto_col], errors="coerce").fillna(0)
-    else:
-        df_i["_monto"] = 0.0
-
-    for _, row in df_i.iterrows():
-        f = row["_f"]
-        period_str = f.strftime("%Y-%m")
-        idx = _period_to_idx(period_str, camp_actual)
-        if idx is not None:
-            serie_n[idx] += 1
-            serie_m[idx] += float(row["_monto"])
-
-    return serie_n, serie_m, mes_corte_idx
+        return [0.0] * 12, [0.0] * 12, mes_corte_idx
+    actual = series_campana(df, camp_actual)
+    return actual.n_nacional.tolist(), actual.monto_nacional.tolist(), mes_corte_idx
@@ -24,7 +24,6 @@ Requiere:
 import os
 import re
 import json
-import duckdb
 import pandas as pd
 import numpy as np
 from datetime import datetime
@@ -67,6 +66,8 @@ def _load_to_duckdb(datos):
     Carga los DataFrames del procesador en una BD DuckDB en memoria.
     Retorna la conexión y el esquema de tablas.
     """
+    import duckdb  # sólo al hacer una consulta LLM, no al abrir la página
+
     conn = duckdb.connect(":memory:")
 
     midagri = datos["midagri"].copy()
@@ -0,0 +1,254 @@
+"""
+reportes_cli.py — Generación de reportes SAC sin interfaz (corrida nocturna)
+============================================================================
+Produce el set de reportes de pages/reportes.py sin pasar por Streamlit,
+para programarlo justo después de la descarga de los portales:
+
+    python reportes_cli.py --snapshot --salida reportes/
+    python reportes_cli.py --lp LP.xlsx --rimac RIMAC.xlsx --salida reportes/ \
+        --solo nacional,eme --workers 4
+
+Flujo:
+  1. Carga los Excel desde el snapshot (shared/data_snapshot.load_snapshot)
+     o desde los archivos indicados.
+  2. Corre process_dynamic_data UNA vez.
+  3. Genera los artefactos elegidos en un pool de procesos (cada worker
+     recibe `datos` una sola vez al arrancar); cada Word departamental es
+     un trabajo aparte.
+  4. Escribe los archivos en --salida y tiempos.json con segundos/bytes/
+     error por artefacto.
+
+Un artefacto que falla no corta la corrida; el código de salida es 1 si
+hubo algún error (para que el scheduler lo marque).
+"""
+import argparse
+import io
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+TIEMPOS_FILENAME = "tiempos.json"
+
+ARTEFACTOS = ["nacional", "departamental", "operatividad", "eme", "pdf", "semaforo"]
+
+
+# ═══════════════════════════════════════════════════════════════
+# GENERADORES (corren en los workers; `datos` llega por _init_worker)
+# ═══════════════════════════════════════════════════════════════
+
+_DATOS = None
+
+
+def _init_worker(datos):
+    global _DATOS
+    _DATOS = datos
+
+
+def _nacional(datos, _):
+    from gen_word_bridge_py import generate_nacional_docx
+    return generate_nacional_docx(datos)
+
+
+def _departamental(datos, depto):
+    from data_processor import get_departamento_data
+    from gen_word_bridge_py import generate_departamental_docx
+    return generate_departamental_docx(get_departamento_data(datos, depto))
+
+
+def _operatividad(datos, _):
+    from gen_word_operatividad import generate_operatividad_docx
+    return generate_operatividad_docx(datos)
+
+
+def _eme(datos, _):
+    from gen_excel_eme import generate_reporte_eme
+    return generate_reporte_eme(datos)
+
+
+def _pdf(datos, _):
+    from gen_pdf_resumen import generate_executive_pdf
+    return generate_executive_pdf(datos)
+
+
+def _semaforo(datos, _):
+    from semaforo_alertas import (
+        check_semaforo_columns, compute_semaforo, export_semaforo_excel,
+        get_kpi_summary, get_pipeline_summary,
+    )
+    df = datos.get("midagri")
+    if df is None or df.empty or not check_semaforo_columns(df):
+        raise ValueError("midagri sin las columnas mínimas del semáforo")
+    df_sem = compute_semaforo(df)
+    return export_semaforo_excel(df_sem, get_pipeline_summary(df_sem), get_kpi_summary(df_sem))
+
+
+_GENERADORES = {
+    "nacional": _nacional,
+    "departamental": _departamental,
+    "operatividad": _operatividad,
+    "eme": _eme,
+    "pdf": _pdf,
+    "semaforo": _semaforo,
+}
+
+
+def _run(artefacto, arg, datos=None):
+    """Genera un artefacto y devuelve (bytes, segundos)."""
+    t0 = time.perf_counter()
+    data = _GENERADORES[artefacto](_DATOS if datos is None else datos, arg)
+    return data, time.perf_counter() - t0
+
+
+# ═══════════════════════════════════════════════════════════════
+# PLAN Y EJECUCIÓN
+# ═══════════════════════════════════════════════════════════════
+
+def plan_jobs(datos, artefactos, hoy):
+    """[(artefacto, arg, nombre_archivo)] con los mismos nombres que la página."""
+    jobs = []
+    for a in artefactos:
+        if a == "nacional":
+            jobs.append((a, None, f"Ayuda_Memoria_Resumen_SAC_2025-2026_{hoy}.docx"))
+        elif a == "departamental":
+            for depto in datos.get("departamentos_list", []):
+                jobs.append((a, depto, f"Ayuda_Memoria_SAC_{depto.title().replace(' ', '_')}_{hoy}.docx"))
+        elif a == "operatividad":
+            jobs.append((a, None, f"AM_Operatividad_SAC_{hoy}.docx"))
+        elif a == "eme":
+            jobs.append((a, None, f"formato_reporte_EME_{hoy}.xlsx"))
+        elif a == "pdf":
+            jobs.append((a, None, f"Resumen_Ejecutivo_SAC_{hoy}.pdf"))
+        elif a == "semaforo":
+            jobs.append((a, None, f"semaforo_alertas_{hoy}.xlsx"))
+    return jobs
+
+
+def generate_reports(datos, salida, artefactos=ARTEFACTOS, workers=None, log=print):
+    """Genera los artefactos en `salida` y devuelve la lista de tiempos.
+
+    Cada entrada: artefacto, archivo, segundos (render en el worker),
+    bytes y error (None si salió bien).
+    """
+    os.makedirs(salida, exist_ok=True)
+    jobs = plan_jobs(datos, artefactos, datetime.now().strftime("%d_%m_%Y"))
+    resultados = []
+
+    def _guardar(job, data, segundos, error=None):
+        artefacto, arg, fname = job
+        entry = {"artefacto": artefacto, "detalle": arg, "archivo": None,
+                 "segundos": round(segundos, 3), "bytes": 0, "error": error}
+        if error is None:
+            with open(os.path.join(salida, fname), "wb") as f:
+                f.write(data)
+            entry.update(archivo=fname, bytes=len(data))
+        resultados.append(entry)
+        log(f"{'OK ' if error is None else 'ERR'} {fname} ({segundos:.2f} s)"
+            + (f": {error}" if error else ""))
+
+    n = workers or min(len(jobs), os.cpu_count() or 1) or 1
+    pendientes = list(jobs)
+    if n > 1:
+        try:
+            with ProcessPoolExecutor(max_workers=n, initializer=_init_worker,
+                                     initargs=(datos,)) as pool:
+                futures = {pool.submit(_run, a, arg): (a, arg, f) for a, arg, f in jobs}
+                for fut in as_completed(futures):
+                    job = futures[fut]
+                    try:
+                        _guardar(job, *fut.result())
+                    except BrokenProcessPool:
+                        raise
+                    except Exception as e:
+                        _guardar(job, None, 0.0, str(e))
+                    pendientes.remove(job)
+        except BrokenProcessPool as e:
+            # Un worker murió (p. ej. OOM): lo que no terminó sigue en este proceso
+            log(f"Pool interrumpido ({e}); generando {len(pendientes)} pendiente(s) en este proceso")
+        except (OSError, RuntimeError, NotImplementedError) as e:
+            # Sin soporte de procesos (sandbox / plataforma): sigue en este proceso
+            log(f"Pool no disponible ({e}); generando en este proceso")
+
+    for job in pendientes:
+        t0 = time.perf_counter()
+        try:
+            _guardar(job, *_run(job[0], job[1], datos))
+        except Exception as e:
+            _guardar(job, None, time.perf_counter() - t0, str(e))
+    return resultados
+
+
+def load_datos(snapshot=False, lp=None, rimac=None):
+    """(datos, fuente, segundos de process_dynamic_data)."""
+    from data_processor import process_dynamic_data
+
+    if snapshot:
+        from shared.data_snapshot import load_snapshot
+        snap = load_snapshot()
+        if snap is None:
+            raise SystemExit("No hay snapshot disponible en data_cache/")
+        buf_rimac, buf_lp, meta = snap
+        fuente = f"snapshot {meta.get('timestamp_display', '')}".strip()
+    else:
+        with open(lp, "rb") as f:
+            buf_lp = io.BytesIO(f.read())
+        with open(rimac, "rb") as f:
+            buf_rimac = io.BytesIO(f.read())
+        fuente = f"archivos {os.path.basename(lp)} + {os.path.basename(rimac)}"
+
+    t0 = time.perf_counter()
+    datos = process_dynamic_data(buf_lp, buf_rimac)
+    return datos, fuente, time.perf_counter() - t0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Genera los reportes SAC sin interfaz.")
+    src = parser.add_mutually_exclusive_group(required=True)
+    src.add_argument("--snapshot", action="store_true",
+                     help="usar la última descarga automática (data_cache/)")
+    src.add_argument("--lp", help="Excel de La Positiva (midagri)")
+    parser.add_argument("--rimac", help="Excel de Rímac (siniestros); requerido con --lp")
+    parser.add_argument("--salida", "-o", required=True, help="directorio de salida")
+    parser.add_argument("--solo", default=",".join(ARTEFACTOS),
+                        help=f"artefactos separados por coma ({','.join(ARTEFACTOS)})")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="procesos en paralelo (default: CPUs; 1 = secuencial)")
+    args = parser.parse_args(argv)
+
+    if args.lp and not args.rimac:
+        parser.error("--lp requiere --rimac")
+    artefactos = [a.strip() for a in args.solo.split(",") if a.strip()]
+    desconocidos = [a for a in artefactos if a not in _GENERADORES]
+    if desconocidos:
+        parser.error(f"artefactos desconocidos: {', '.join(desconocidos)}")
+
+    t0 = time.perf_counter()
+    datos, fuente, t_proc = load_datos(args.snapshot, args.lp, args.rimac)
+    print(f"Datos: {fuente} · corte {datos.get('fecha_corte', '')} · "
+          f"process_dynamic_data {t_proc:.2f} s")
+
+    resultados = generate_reports(datos, args.salida, artefactos, args.workers)
+    reporte = {
+        "generado": datetime.now().isoformat(timespec="seconds"),
+        "fuente": fuente,
+        "fecha_corte": str(datos.get("fecha_corte", "")),
+        "process_dynamic_data_s": round(t_proc, 3),
+        "total_s": round(time.perf_counter() - t0, 3),
+        "artefactos": resultados,
+    }
+    with open(os.path.join(args.salida, TIEMPOS_FILENAME), "w", encoding="utf-8") as f:
+        json.dump(reporte, f, ensure_ascii=False, indent=2)
+
+    errores = [r for r in resultados if r["error"]]
+    print(f"{len(resultados) - len(errores)} archivo(s), {len(errores)} error(es) "
+          f"en {reporte['total_s']:.1f} s → {args.salida}")
+    return 1 if errores else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -11,9 +11,6 @@ import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
 import streamlit as st
-from openpyxl import Workbook
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
-from openpyxl.utils.dataframe import dataframe_to_rows
 
 # Cache decorator con fallback: si Streamlit no está en runtime (tests,
 # CLI), @_cache_data se vuelve un no-op y el cálculo corre directo.
@@ -353,6 +350,11 @@ def generate_sankey_figure(df_sem):
 
 def export_semaforo_excel(df_sem, pipeline, kpis):
     """Genera Excel con formato condicional verde/ámbar/rojo."""
+    # openpyxl sólo hace falta al exportar: no se importa con la página
+    from openpyxl import Workbook
+    from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
+    from openpyxl.utils.dataframe import dataframe_to_rows
+
     wb = Workbook()
 
     # ── Hoja 1: Resumen Pipeline ──
@@ -0,0 +1,136 @@
+"""Caché de imágenes de gráficos (matplotlib) direccionada por contenido.
+
+Los generadores Word/PDF volvían a dibujar los mismos gráficos en cada
+documento aunque los datos no cambiaran dentro de una carga. Acá cada PNG se
+guarda bajo hash(spec del gráfico + series graficadas): si otro documento
+(u otro usuario) pide el mismo gráfico con los mismos datos, se devuelven
+los bytes ya renderizados.
+
+También centraliza la configuración de matplotlib: backend Agg (headless)
+fijado al importar este módulo, y warm_up(), que precarga la fuente por
+defecto para que el primer gráfico del proceso no pague el escaneo/carga
+de fuentes. app.py lo lanza en segundo plano al arrancar.
+
+matplotlib no se importa acá (~130 ms): el backend se fija con
+MPLBACKEND, que pyplot lee al importarse, y la importación la paga el
+hilo de warm_up, fuera del arranque de la app.
+"""
+import hashlib
+import os
+import sys
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+
+if "matplotlib" in sys.modules:
+    sys.modules["matplotlib"].use("Agg")
+else:
+    os.environ["MPLBACKEND"] = "Agg"
+import numpy as np
+import pandas as pd
+
+MAX_BYTES = 64 * 1024 * 1024
+
+_LOCK = threading.Lock()
+# pyplot guarda estado global: los renders de distintos hilos (cola de
+# reportes) se serializan.
+_RENDER_LOCK = threading.RLock()
+_PNGS = OrderedDict()  # clave → bytes (orden = uso reciente)
+_STATS = {"hits": 0, "misses": 0}
+
+
+def _feed(h, obj):
+    """Agrega `obj` al hash de forma estable (Series/DataFrame/arrays/escalares)."""
+    if isinstance(obj, (pd.Series, pd.DataFrame)):
+        h.update(type(obj).__name__.encode())
+        h.update(repr(list(obj.index)).encode())
+        if isinstance(obj, pd.DataFrame):
+            h.update(repr(list(obj.columns)).encode())
+        h.update(np.ascontiguousarray(obj.to_numpy(dtype=object).astype(str)).tobytes())
+    elif isinstance(obj, np.ndarray):
+        h.update(str(obj.dtype).encode())
+        h.update(repr(obj.shape).encode())
+        h.update(np.ascontiguousarray(obj).tobytes())
+    elif isinstance(obj, (list, tuple)):
+        h.update(b"[")
+        for x in obj:
+            _feed(h, x)
+        h.update(b"]")
+    else:
+        h.update(repr(obj).encode())
+    h.update(b"|")
+
+
+def chart_key(spec, *series) -> str:
+    """Clave de contenido: spec (nombre, tamaño, dpi, ...) + datos graficados."""
+    h = hashlib.sha1()
+    _feed(h, sorted(spec.items()) if isinstance(spec, dict) else spec)
+    for s in series:
+        _feed(h, s)
+    return h.hexdigest()
+
+
+def cached_png(spec, series, render) -> bytes:
+    """PNG del gráfico: de la caché si ya se dibujó, si no render() → bytes.
+
+    `series` es una tupla con todo lo que se grafica; `render` no recibe
+    argumentos y debe devolver los bytes del PNG.
+    """
+    key = chart_key(spec, *series)
+    with _LOCK:
+        png = _PNGS.get(key)
+        if png is not None:
+            _PNGS.move_to_end(key)
+            _STATS["hits"] += 1
+            return png
+        _STATS["misses"] += 1
+    with _RENDER_LOCK:
+        warm_up()
+        png = render()
+    with _LOCK:
+        _PNGS[key] = png
+        total = sum(len(b) for b in _PNGS.values())
+        while len(_PNGS) > 1 and total > MAX_BYTES:
+            _, old = _PNGS.popitem(last=False)
+            total -= len(old)
+    return png
+
+
+def cache_stats() -> dict:
+    with _LOCK:
+        return dict(_STATS, entradas=len(_PNGS), bytes=sum(len(b) for b in _PNGS.values()))
+
+
+def clear():
+    with _LOCK:
+        _PNGS.clear()
+        _STATS.update(hits=0, misses=0)
+
+
+@lru_cache(maxsize=1)
+def warm_up():
+    """Carga el font manager y rasteriza texto normal/negrita una vez."""
+    import matplotlib.pyplot as plt
+    from matplotlib import font_manager
+
+    with _RENDER_LOCK:
+        _draw_sample(plt, font_manager)
+    return True
+
+
+def _draw_sample(plt, font_manager):
+    for weight in ("normal", "bold"):
+        font_manager.findfont(font_manager.FontProperties(weight=weight))
+    fig, ax = plt.subplots(figsize=(1, 1), dpi=40)
+    ax.set_title("0", fontweight="bold")
+    ax.text(0.5, 0.5, "Áé 0,9", fontsize=7)
+    fig.canvas.draw()
+    plt.close(fig)
+
+
+@lru_cache(maxsize=1)
+def start_warm_up():
+    """Lanza warm_up() en un hilo daemon (una vez por proceso)."""
+    t = threading.Thread(target=warm_up, name="mpl-warm-up", daemon=True)
+    t.start()
+    return t
@@ -7,7 +7,12 @@ Uso básico:
     apply_theme(fig, title="Avisos por Mes", height=420)
     render_chart(fig, key="avisos_mes", filename="avisos_por_mes")
 """
+import hashlib
 import io
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+
 import streamlit as st
 
 
@@ -248,11 +253,76 @@ def _modebar_config(filename="chart"):
     }
 
 
+# ═══════════════════════════════════════════════════════════════
+#   EXPORTACIÓN HTML / PNG (bajo demanda)
+# ═══════════════════════════════════════════════════════════════
+
+PNG_EXPORT = dict(width=1280, height=720, scale=2)
+_EXPORTS_MAX = 48
+_EXPORTS = OrderedDict()  # (formato, fingerprint) → bytes
+_EXPORTS_LOCK = threading.Lock()
+
+
+def fig_fingerprint(fig):
+    """Hash del contenido del figure (datos + layout)."""
+    return hashlib.sha1(fig.to_json().encode("utf-8")).hexdigest()
+
+
+def _cached_export(fmt, fig, build):
+    key = (fmt, fig_fingerprint(fig))
+    with _EXPORTS_LOCK:
+        hit = _EXPORTS.get(key)
+        if hit is not None:
+            _EXPORTS.move_to_end(key)
+            return hit
+    data = build()
+    with _EXPORTS_LOCK:
+        _EXPORTS[key] = data
+        while len(_EXPORTS) > _EXPORTS_MAX:
+            _EXPORTS.popitem(last=False)
+    return data
+
+
+@lru_cache(maxsize=1)
+def _kaleido_scope():
+    """Renderer kaleido persistente: un solo subproceso Chromium por proceso.
+
+    None si kaleido no está instalado (el PNG queda en el ícono 📷 del chart).
+    """
+    try:
+        from kaleido.scopes.plotly import PlotlyScope
+    except Exception:
+        return None
+    return PlotlyScope()
+
+
+def export_html(fig):
+    """HTML interactivo del figure (bytes), cacheado por fingerprint."""
+    return _cached_export(
+        "html", fig,
+        lambda: fig.to_html(include_plotlyjs="cdn", full_html=True).encode("utf-8"),
+    )
+
+
+def export_png(fig):
+    """PNG 1280x720@2x del figure (bytes), cacheado por fingerprint."""
+    def _build():
+        scope = _kaleido_scope()
+        if scope is None:
+            raise RuntimeError("kaleido no disponible")
+        return scope.transform(fig.to_dict(), format="png", **PNG_EXPORT)
+    return _cached_export("png", fig, _build)
+
+
 def render_chart(fig, key, filename=None, show_downloads=True,
                  download_label="Descargar"):
     """Renderiza un Plotly chart con barra de herramientas limpia + botones
     de descarga HTML y PNG para compartir.
 
+    Los archivos se generan recién cuando el usuario hace clic (data
+    callable de st.download_button), no en cada rerun: el PNG pasa por
+    kaleido (Chromium) y era lo más caro de las páginas con muchos charts.
+
     Args:
         fig: Figure ya estilizado (llamar apply_theme antes)
         key: clave única de Streamlit
@@ -281,25 +351,20 @@ def render_chart(fig, key, filename=None, show_downloads=True,
             )
 
         # HTML interactivo (no requiere dependencias extra)
-        try:
-            html_str = fig.to_html(include_plotlyjs="cdn", full_html=True)
-            cols[1].download_button(
-                "HTML", data=html_str.encode("utf-8"),
-                file_name=f"{fname}.html", mime="text/html",
-                key=f"{key}__dl_html", use_container_width=True,
-            )
-        except Exception:
-            pass
+        cols[1].download_button(
+            "HTML", data=lambda: export_html(fig),
+            file_name=f"{fname}.html", mime="text/html",
+            key=f"{key}__dl_html", use_container_width=True,
+        )
 
         # PNG estático (requiere kaleido). Si no está, mostramos tip.
-        try:
-            png_bytes = fig.to_image(format="png", width=1280, height=720, scale=2)
+        if _kaleido_scope() is not None:
             cols[2].download_button(
-                "PNG", data=png_bytes,
+                "PNG", data=lambda: export_png(fig),
                 file_name=f"{fname}.png", mime="image/png",
                 key=f"{key}__dl_png", use_container_width=True,
             )
-        except Exception:
+        else:
             # Fallback: botón deshabilitado con tooltip sobre el modebar
             cols[2].markdown(
                 f"<div title='Usa el ícono 📷 del chart para descargar PNG' "
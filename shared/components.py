@@ -61,3 +61,56 @@ def footer():
         Sistema automatizado para la gestión de reportes del Seguro Agrícola Catastrófico
     </div>
     """, unsafe_allow_html=True)
+
+
+# ─── Reportes en segundo plano (shared/jobs.py) ───
+
+@st.fragment(run_every=1.0)
+def _poll_report_job(slot):
+    """Barra de avance que se refresca sola mientras el trabajo corre."""
+    from shared.jobs import get_job_queue, PENDIENTE, EN_CURSO
+    job = st.session_state.get(f"job_{slot}")
+    status = get_job_queue().status(job["key"]) if job else None
+    if status is None or status["estado"] not in (PENDIENTE, EN_CURSO):
+        st.rerun()  # terminó: re-render completo para mostrar la descarga
+    st.progress(status["progreso"],
+                text=f"{status['etiqueta']} · {status['segundos']:.0f}s")
+
+
+def report_job_panel(slot, key, build, boton, nombre, mime,
+                     descarga=":material/download: Descargar",
+                     progress_kw=None, primary=True):
+    """Botón de generación + estado/descarga de un reporte encolado.
+
+    `build` es un callable sin argumentos (functools.partial del generador)
+    que corre en la cola compartida; `key` viene de shared.jobs.job_key, así
+    que pedidos idénticos de otros usuarios reutilizan el mismo resultado.
+    Devuelve el status del trabajo de esta sesión (o None).
+    """
+    from shared.jobs import get_job_queue, PENDIENTE, EN_CURSO, LISTO
+
+    queue = get_job_queue()
+    c_gen, c_dl = st.columns([1, 1])
+    with c_gen:
+        if st.button(boton, type="primary" if primary else "secondary",
+                     key=f"gen_{slot}", use_container_width=True):
+            queue.submit(key, build, progress_kw=progress_kw)
+            st.session_state[f"job_{slot}"] = {"key": key, "nombre": nombre}
+
+    job = st.session_state.get(f"job_{slot}")
+    if not job:
+        return None
+    status = queue.status(job["key"])
+    with c_dl:
+        if status is None:
+            st.info("El resultado expiró de la caché; vuelva a generarlo.")
+        elif status["estado"] in (PENDIENTE, EN_CURSO):
+            _poll_report_job(slot)
+        elif status["estado"] == LISTO:
+            st.download_button(descarga, data=queue.result(job["key"]),
+                               file_name=job["nombre"], mime=mime,
+                               use_container_width=True, key=f"dl_{slot}")
+            st.caption(f"{status['nbytes']/1024:,.0f} KB · {status['segundos']:.1f}s")
+        else:
+            st.error(f"Error: {status['error']}")
+    return status
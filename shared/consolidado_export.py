@@ -0,0 +1,144 @@
+"""Exportación del consolidado (datos["midagri"]) en XLSX, CSV.gz y Parquet.
+
+El dashboard armaba la descarga con reordenar_consolidado_export (copia
+completa del frame) + conversión de texto columna a columna + to_excel
+de openpyxl en modo normal (un objeto Cell por celda en memoria), y lo
+hacía en CADA rerun de la página aunque nadie descargara.
+
+Acá el frame se recorre en bloques de CHUNK_ROWS filas; cada bloque se
+reordena/limpia por separado y se escribe en streaming:
+
+  - xlsx: openpyxl en modo write_only (las filas se serializan al
+    agregarlas; memoria ~constante). Hoja "Consolidado SAC" + una hoja por
+    EMPRESA DE SEGUROS, igual que antes.
+  - csv.gz: CSV UTF-8 con BOM (Excel lo abre con acentos) comprimido.
+  - parquet: pyarrow.ParquetWriter, un row group por bloque. pyarrow ya
+    viene con streamlit.
+
+Los bytes no se cachean acá: la página los genera en la cola compartida
+(shared/jobs) con clave dataset_fingerprint + formato, así que descargas
+repetidas (de cualquier usuario) sobre la misma carga no se regeneran.
+"""
+import gzip
+import io
+
+from data_processor import reordenar_consolidado_export
+
+CHUNK_ROWS = 5000
+SHEET_CONSOLIDADO = "Consolidado SAC"
+COL_EMPRESA = "EMPRESA DE SEGUROS"
+
+XLSX_MIME = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+# formato → (extensión, mime, etiqueta)
+FORMATOS = {
+    "xlsx": ("xlsx", XLSX_MIME, "Excel (.xlsx)"),
+    "csv.gz": ("csv.gz", "application/gzip", "CSV comprimido (.csv.gz)"),
+    "parquet": ("parquet", "application/vnd.apache.parquet", "Parquet"),
+}
+
+
+def export_filename(fecha_corte, formato):
+    return f"Consolidado_SAC_2025-2026_{str(fecha_corte).replace('/', '-')}.{FORMATOS[formato][0]}"
+
+
+def export_consolidado(df, formato="xlsx", chunk_rows=CHUNK_ROWS):
+    """Bytes del consolidado en `formato` (ver FORMATOS)."""
+    if formato == "xlsx":
+        return _export_xlsx(df, chunk_rows)
+    if formato == "csv.gz":
+        return _export_csv_gz(df, chunk_rows)
+    if formato == "parquet":
+        return _export_parquet(df, chunk_rows)
+    raise ValueError(f"formato no soportado: {formato}")
+
+
+def iter_chunks(df, chunk_rows=CHUNK_ROWS):
+    """Bloques del consolidado listos para exportar (orden Anexo 12, texto limpio).
+
+    El texto se limpia como en la descarga original: columnas object a str
+    con "nan" → "". Las columnas internas ("_...") no se exportan.
+    """
+    df = df[[c for c in df.columns if not str(c).startswith("_")]]
+    for start in range(0, max(len(df), 1), chunk_rows):
+        chunk = reordenar_consolidado_export(df.iloc[start:start + chunk_rows])
+        for col in chunk.columns:
+            if chunk[col].dtype == "object":
+                chunk[col] = chunk[col].astype(str).replace("nan", "")
+        yield chunk
+
+
+# ─── XLSX ───
+
+def _rows(chunk):
+    """Filas de un bloque como tuplas; NaN/NaT → celda vacía."""
+    vals = chunk.astype(object).where(chunk.notna(), None)
+    return vals.itertuples(index=False, name=None)
+
+
+def _export_xlsx(df, chunk_rows):
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(SHEET_CONSOLIDADO)
+    por_empresa = {}  # aseguradora → hoja (cada hoja write_only escribe a su propio temporal)
+    header = None
+    for chunk in iter_chunks(df, chunk_rows):
+        if header is None:
+            header = list(chunk.columns)
+            ws.append(header)
+        empresas = (chunk[COL_EMPRESA].tolist() if COL_EMPRESA in chunk.columns
+                    else [""] * len(chunk))
+        for row, emp in zip(_rows(chunk), empresas):
+            ws.append(row)
+            if emp is None or str(emp).strip() in ("", "nan"):
+                continue
+            hoja = por_empresa.get(emp)
+            if hoja is None:
+                hoja = por_empresa[emp] = wb.create_sheet(str(emp)[:31])
+                hoja.append(header)
+            hoja.append(row)
+
+    # Hojas por aseguradora en orden alfabético, después del consolidado
+    for i, emp in enumerate(sorted(por_empresa), start=1):
+        hoja = por_empresa[emp]
+        wb.move_sheet(hoja.title, offset=i - wb.index(hoja))
+
+    buf = io.BytesIO()
+    wb.save(buf)
+    return buf.getvalue()
+
+
+# ─── CSV.gz ───
+
+def _export_csv_gz(df, chunk_rows):
+    buf = io.BytesIO()
+    with gzip.GzipFile(fileobj=buf, mode="wb", compresslevel=6, mtime=0) as gz:
+        with io.TextIOWrapper(gz, encoding="utf-8-sig", newline="") as txt:
+            header = True
+            for chunk in iter_chunks(df, chunk_rows):
+                chunk.to_csv(txt, index=False, header=header)
+                header = False
+    return buf.getvalue()
+
+
+# ─── Parquet ───
+
+def _export_parquet(df, chunk_rows):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    buf = io.BytesIO()
+    writer = None
+    try:
+        for chunk in iter_chunks(df, chunk_rows):
+            if writer is None:
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                writer = pq.ParquetWriter(buf, table.schema)
+            else:
+                table = pa.Table.from_pandas(chunk, schema=writer.schema, preserve_index=False)
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+    return buf.getvalue()
@@ -108,10 +108,7 @@ def process_manual_upload(midagri_file, siniestros_file):
 
 
 def build_consolidated_excel(midagri_df):
-    """Construye Excel consolidado para descarga."""
-    buf = io.BytesIO()
-    cols = [c for c in midagri_df.columns if not c.startswith("_")]
-    df_clean = midagri_df[cols]
-    df_clean.to_excel(buf, index=False, sheet_name="Consolidado SAC")
-    buf.seek(0)
-    return buf.getvalue()
+    """Construye Excel consolidado para descarga (escritura en streaming,
+    ver shared/consolidado_export)."""
+    from shared.consolidado_export import export_consolidado
+    return export_consolidado(midagri_df, "xlsx")
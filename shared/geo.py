@@ -0,0 +1,226 @@
+"""Índices geográficos precomputados (centroides distritales/provinciales).
+
+Las coordenadas de provincias y distritos se leen de
+static_data/centroides_distritales.json, generado offline por
+tools/generar_centroides_distritales.py a partir de las geometrías de
+sectores estadísticos (static_data/sectores/*.geojson). Reemplaza el
+jitter pseudo-aleatorio alrededor de DEPT_COORDS, que ubicaba los
+distritos en la celda de clima equivocada.
+
+El índice se carga una sola vez por proceso (lru_cache) y cada consulta
+es un lookup O(1) por clave normalizada "DEPTO|PROV|DIST". No depende de
+Streamlit, así que también lo pueden usar tools/ y los tests.
+"""
+import json
+import math
+import os
+import unicodedata
+from functools import lru_cache
+from typing import Optional, Tuple
+
+_STATIC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                           "static_data")
+CENTROIDES_PATH = os.path.join(_STATIC_DIR, "centroides_distritales.json")
+
+
+def norm_geo(name) -> str:
+    """Normaliza un nombre geográfico: sin tildes/Ñ, mayúsculas, espacios simples."""
+    if name is None:
+        return ""
+    s = "".join(c for c in unicodedata.normalize("NFD", str(name))
+                if unicodedata.category(c) != "Mn")
+    return " ".join(s.upper().split())
+
+
+def geo_key(*parts) -> str:
+    """Clave normalizada "A|B|C" para los índices de centroides."""
+    return "|".join(norm_geo(p) for p in parts)
+
+
+@lru_cache(maxsize=1)
+def load_centroides() -> dict:
+    """Índice de centroides, o {} si el archivo no existe / no se puede leer.
+
+    Estructura (ver tools/generar_centroides_distritales.py):
+        provincias:       {"DEPTO|PROV": [lat, lon]}
+        distritos:        {"DEPTO|PROV|DIST": [lat, lon]}
+        distritos_unicos: {"DEPTO|DIST": [lat, lon]}  (nombre único en el depto)
+    """
+    try:
+        with open(CENTROIDES_PATH, encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        return {}
+
+
+def coords_distrito(dept, prov, dist) -> Optional[Tuple[float, float]]:
+    """(lat, lon) del centroide real del distrito, o None si no está indexado.
+
+    Busca primero por (depto, provincia, distrito); si la provincia no
+    coincide (variantes de escritura) cae a (depto, distrito) cuando el
+    nombre del distrito es único dentro del departamento.
+    """
+    idx = load_centroides()
+    if not idx:
+        return None
+    c = idx.get("distritos", {}).get(geo_key(dept, prov, dist))
+    if c is None:
+        c = idx.get("distritos_unicos", {}).get(geo_key(dept, dist))
+    return (c[0], c[1]) if c else None
+
+
+def coords_provincia(dept, prov) -> Optional[Tuple[float, float]]:
+    """(lat, lon) del centroide de la provincia, o None si no está indexada."""
+    c = load_centroides().get("provincias", {}).get(geo_key(dept, prov))
+    return (c[0], c[1]) if c else None
+
+
+# ═══════════════════════════════════════════════════════════════════
+# GEOMETRÍAS DE SECTORES SIMPLIFICADAS (TopoJSON por nivel de detalle)
+# ═══════════════════════════════════════════════════════════════════
+
+SECTORES_DIR = os.path.join(_STATIC_DIR, "sectores")
+SECTORES_TOPO_DIR = os.path.join(_STATIC_DIR, "sectores_topo")
+
+# Niveles generados por tools/simplificar_geometrias.py, del más fino al más
+# grueso. tolerancia = Douglas-Peucker (grados); cuantizacion = grilla de
+# salida (grados). 0.001° ≈ 110 m.
+NIVELES_SECTORES = {
+    "alto": {"tolerancia": 0.0002, "cuantizacion": 0.00005},
+    "medio": {"tolerancia": 0.001, "cuantizacion": 0.0002},
+    "bajo": {"tolerancia": 0.004, "cuantizacion": 0.0008},
+}
+
+MAPA_SECTORES_PX = 560  # alto del mapa de sectores (escenario_el_nino)
+
+
+def decode_topojson(topo, obj_name=None) -> dict:
+    """TopoJSON (arcos delta-cuantizados) → FeatureCollection GeoJSON.
+
+    Decodificador mínimo para lo que escribe tools/simplificar_geometrias.py:
+    Polygon / MultiPolygon con transform. Los anillos que quedaron
+    degenerados al simplificar (< 4 posiciones) se descartan.
+    """
+    sx, sy = topo["transform"]["scale"]
+    tx, ty = topo["transform"]["translate"]
+    # Decimales justos para la grilla: no reinflar el payload con ruido
+    nd = max(0, int(math.ceil(-math.log10(min(sx, sy)))))
+    arcs = []
+    for arc in topo["arcs"]:
+        x = y = 0
+        pts = []
+        for dx, dy in arc:
+            x += dx
+            y += dy
+            pts.append([round(x * sx + tx, nd), round(y * sy + ty, nd)])
+        arcs.append(pts)
+
+    def _ring(refs):
+        out = []
+        for i in refs:
+            pts = arcs[i] if i >= 0 else arcs[~i][::-1]
+            out.extend(pts if not out else pts[1:])
+        return out if len(out) >= 4 else None
+
+    def _poly(rings_refs):
+        rings = [_ring(r) for r in rings_refs]
+        if not rings or rings[0] is None:
+            return None
+        return [r for r in rings if r is not None]
+
+    name = obj_name or next(iter(topo["objects"]))
+    features = []
+    for g in topo["objects"][name]["geometries"]:
+        geom = None
+        if g.get("type") == "Polygon":
+            p = _poly(g["arcs"])
+            geom = {"type": "Polygon", "coordinates": p} if p else None
+        elif g.get("type") == "MultiPolygon":
+            ps = [p for p in (_poly(rr) for rr in g["arcs"]) if p]
+            geom = {"type": "MultiPolygon", "coordinates": ps} if ps else None
+        features.append({"type": "Feature", "properties": g.get("properties", {}),
+                         "geometry": geom})
+    return {"type": "FeatureCollection", "features": features}
+
+
+@lru_cache(maxsize=1)
+def _sectores_index() -> dict:
+    try:
+        with open(os.path.join(SECTORES_TOPO_DIR, "index.json"), encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        return {}
+
+
+def pick_sector_level(fname, alto_px=MAPA_SECTORES_PX) -> Optional[str]:
+    """Nivel de detalle adecuado para dibujar el departamento en `alto_px`.
+
+    Con fitbounds el departamento ocupa todo el mapa: un píxel equivale a
+    (extensión del bbox / alto_px) grados. Se elige el nivel más grueso cuya
+    tolerancia no supera medio píxel (margen para un zoom 2x sin que se note).
+    """
+    entry = _sectores_index().get(fname)
+    if not entry or not entry.get("niveles"):
+        return None
+    x0, y0, x1, y1 = entry["bbox"]
+    px_deg = max(x1 - x0, y1 - y0) / max(alto_px, 1)
+    elegido = None
+    for nivel, spec in NIVELES_SECTORES.items():
+        if nivel in entry["niveles"] and spec["tolerancia"] <= px_deg / 2:
+            elegido = nivel
+    if elegido is None:
+        elegido = next((n for n in NIVELES_SECTORES if n in entry["niveles"]), None)
+    return elegido
+
+
+@lru_cache(maxsize=96)
+def load_sector_geojson(fname, nivel=None) -> Optional[dict]:
+    """GeoJSON de sectores de un departamento, cacheado por proceso.
+
+    `fname` es el nombre del GeoJSON original (p.ej. "LA_LIBERTAD.geojson").
+    Sin `nivel` se elige con pick_sector_level. Si no hay variante
+    simplificada se cae al GeoJSON completo de static_data/sectores/.
+    El objeto devuelto se comparte entre sesiones: no mutarlo.
+    """
+    nivel = nivel or pick_sector_level(fname)
+    if nivel:
+        path = os.path.join(SECTORES_TOPO_DIR, nivel, fname.replace(".geojson", ".topojson"))
+        try:
+            with open(path, encoding="utf-8") as f:
+                return decode_topojson(json.load(f))
+        except Exception:
+            pass
+    path = os.path.join(SECTORES_DIR, fname)
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+# ═══════════════════════════════════════════════════════════════════
+# CAPA NACIONAL DE DEPARTAMENTOS (choropleth)
+# ═══════════════════════════════════════════════════════════════════
+
+DEPARTAMENTOS_GEOJSON = os.path.join(_STATIC_DIR, "peru_departamentos.geojson")
+DEPARTAMENTOS_TOPO = os.path.join(_STATIC_DIR, "peru_departamentos.topojson")
+
+# Vista nacional: ~18° de alto en ~600 px → 0.03°/px; 0.01° no se nota.
+NIVEL_DEPARTAMENTOS = {"tolerancia": 0.01, "cuantizacion": 0.001}
+
+
+@lru_cache(maxsize=1)
+def load_departamentos_geojson() -> Optional[dict]:
+    """GeoJSON de departamentos pre-simplificado, cacheado por proceso.
+
+    Cae al GeoJSON completo si no se generó la variante TopoJSON. El objeto
+    devuelto se comparte entre sesiones: no mutarlo.
+    """
+    try:
+        with open(DEPARTAMENTOS_TOPO, encoding="utf-8") as f:
+            return decode_topojson(json.load(f))
+    except Exception:
+        pass
+    if not os.path.exists(DEPARTAMENTOS_GEOJSON):
+        return None
+    with open(DEPARTAMENTOS_GEOJSON, encoding="utf-8") as f:
+        return json.load(f)
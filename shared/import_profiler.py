@@ -0,0 +1,176 @@
+"""Costo de importación por módulo (modo perfil, SAC_IMPORT_PROFILE=1).
+
+El arranque en frío de app.py + la primera página llegó a arrastrar
+matplotlib, python-docx, python-pptx, openpyxl y duckdb por imports a
+nivel de módulo en pages/ y en los generadores. Ahora esas librerías se
+importan dentro de las funciones que las usan; este módulo sirve para
+ver (y vigilar) cuánto cuesta lo que queda.
+
+  - SAC_IMPORT_PROFILE=1 streamlit run app.py: app.py activa el perfil
+    antes de sus imports y, tras cada página, imprime la tabla de los
+    módulos importados en esa corrida (costo propio y acumulado, como
+    python -X importtime).
+  - python -m shared.import_profiler [--json] [modulo ...]: importa en
+    frío el grafo de arranque (imports de app.py + la página inicial, o
+    los módulos dados) y muestra la tabla. tests/test_import_budget.py lo
+    usa para fallar si el grafo vuelve a cargar una librería pesada (o
+    supera SAC_IMPORT_BUDGET_S segundos, si está definido).
+
+El perfil envuelve el loader de cada módulo nuevo (un finder al frente de
+sys.meta_path); sin la variable de entorno no se instala nada.
+"""
+import ast
+import importlib.abc
+import json
+import os
+import sys
+import threading
+import time
+
+ENV_FLAG = "SAC_IMPORT_PROFILE"
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PAGINA_INICIAL = os.path.join("pages", "inicio.py")
+
+# Librerías que no deben cargarse al arrancar (sólo al generar / consultar)
+LIBRERIAS_PESADAS = ("matplotlib", "docx", "pptx", "fpdf", "openpyxl", "duckdb", "anthropic")
+
+_REGISTROS = {}  # módulo → (propio_s, acumulado_s), en orden de importación
+_REPORTADOS = set()
+_LOCAL = threading.local()  # pila de tiempos de hijos, por hilo
+_FINDER = None
+
+
+class _LoaderMedido:
+    """Loader que delega en el original y mide exec_module."""
+
+    def __init__(self, loader):
+        self._loader = loader
+
+    def __getattr__(self, attr):
+        return getattr(self._loader, attr)
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        pila = getattr(_LOCAL, "pila", None)
+        if pila is None:
+            pila = _LOCAL.pila = []
+        pila.append(0.0)
+        t0 = time.perf_counter()
+        try:
+            self._loader.exec_module(module)
+        finally:
+            acumulado = time.perf_counter() - t0
+            hijos = pila.pop()
+            if pila:
+                pila[-1] += acumulado
+            _REGISTROS[module.__name__] = (acumulado - hijos, acumulado)
+
+
+class _FinderMedido(importlib.abc.MetaPathFinder):
+    """Busca con los demás finders y envuelve el loader del spec encontrado."""
+
+    def find_spec(self, name, path=None, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(name, path, target)
+            if spec is None:
+                continue
+            if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                spec.loader = _LoaderMedido(spec.loader)
+            return spec
+        return None
+
+
+def activar():
+    """Instala el perfil (idempotente). Sólo mide módulos importados después."""
+    global _FINDER
+    if _FINDER is None:
+        _FINDER = _FinderMedido()
+        sys.meta_path.insert(0, _FINDER)
+
+
+def desactivar():
+    global _FINDER
+    if _FINDER is not None:
+        sys.meta_path.remove(_FINDER)
+        _FINDER = None
+
+
+def activo() -> bool:
+    return _FINDER is not None
+
+
+def desde_entorno() -> bool:
+    """Activa el perfil si SAC_IMPORT_PROFILE está definida (≠ "", "0")."""
+    if os.environ.get(ENV_FLAG, "") not in ("", "0"):
+        activar()
+    return activo()
+
+
+def registros():
+    """[(módulo, propio_s, acumulado_s)] de lo medido, en orden de importación."""
+    return [(m, p, a) for m, (p, a) in list(_REGISTROS.items())]
+
+
+def tabla(filas, top=30) -> str:
+    """Tabla de texto de `filas` (ver registros), ordenada por costo acumulado."""
+    filas = sorted(filas, key=lambda r: r[2], reverse=True)
+    total = sum(p for _, p, _ in filas)
+    lineas = [f"{'módulo':<48} {'propio ms':>10} {'acum. ms':>10}"]
+    lineas += [f"{m[:48]:<48} {p * 1e3:>10.1f} {a * 1e3:>10.1f}" for m, p, a in filas[:top]]
+    lineas.append(f"{len(filas)} módulos · {total * 1e3:.0f} ms en total")
+    return "\n".join(lineas)
+
+
+def reportar(titulo, top=30):
+    """Imprime la tabla de los módulos aún no reportados (p. ej. una página)."""
+    nuevas = [r for r in registros() if r[0] not in _REPORTADOS]
+    _REPORTADOS.update(m for m, _, _ in nuevas)
+    if nuevas:
+        print(f"[IMPORTS] {titulo}\n{tabla(nuevas, top)}", flush=True)
+
+
+def modulos_de(path):
+    """Módulos importados a nivel de módulo (no dentro de funciones) por `path`."""
+    with open(path, encoding="utf-8") as f:
+        arbol = ast.parse(f.read(), filename=path)
+    mods = []
+    for nodo in arbol.body:
+        if isinstance(nodo, ast.Import):
+            mods += [a.name for a in nodo.names]
+        elif isinstance(nodo, ast.ImportFrom) and nodo.module and not nodo.level:
+            mods.append(nodo.module)
+    return list(dict.fromkeys(mods))
+
+
+def modulos_arranque():
+    """Grafo de arranque: imports de app.py y de la página inicial."""
+    return list(dict.fromkeys(modulos_de(os.path.join(RAIZ, "app.py"))
+                              + modulos_de(os.path.join(RAIZ, PAGINA_INICIAL))))
+
+
+def main(argv=None):
+    argv = list(sys.argv[1:] if argv is None else argv)
+    como_json = "--json" in argv
+    modulos = [a for a in argv if a != "--json"] or modulos_arranque()
+    if RAIZ not in sys.path:
+        sys.path.insert(0, RAIZ)
+    activar()
+    t0 = time.perf_counter()
+    for m in modulos:
+        importlib.import_module(m)
+    total = time.perf_counter() - t0
+    pesadas = sorted(lib for lib in LIBRERIAS_PESADAS if lib in sys.modules)
+    if como_json:
+        print(json.dumps({"total_s": total, "modulos": modulos, "pesadas": pesadas}))
+    else:
+        print(tabla(registros()))
+        print(f"grafo de arranque: {total * 1e3:.0f} ms · librerías pesadas cargadas: "
+              f"{', '.join(pesadas) or 'ninguna'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""Cola de generación de reportes en segundo plano.
+
+Los generadores (Word/Excel/PPT) tardan segundos y antes corrían dentro de
+st.spinner, bloqueando la sesión del usuario. Acá se encolan en un pool de
+hilos compartido por todo el proceso:
+
+  - Deduplicación: la clave de un trabajo es hash(dataset + tipo + params).
+    Si dos usuarios piden el mismo reporte sobre el mismo corte de datos,
+    se genera una sola vez y ambos reciben el mismo resultado.
+  - Progreso: cada trabajo expone estado, fracción y etiqueta; los
+    generadores que aceptan progress_callback(actual, total, etiqueta)
+    (p.ej. batch_reports.build_batch_zip) lo reportan paso a paso.
+  - Caché acotada: los resultados terminados se guardan en un LRU limitado
+    por cantidad y por bytes. Los trabajos pendientes nunca se desalojan.
+
+La página sólo consulta status()/result() — no bloquea esperando.
+No depende de Streamlit (se puede usar desde tests y scripts).
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+import pandas as pd
+
+PENDIENTE = "pendiente"
+EN_CURSO = "en_curso"
+LISTO = "listo"
+ERROR = "error"
+
+MAX_WORKERS = 2
+MAX_RESULTADOS = 48
+MAX_BYTES = 256 * 1024 * 1024
+
+# Fingerprint por objeto `datos` (id → (datos, hash)). Guarda la referencia
+# para que el id no se recicle mientras la entrada siga en la tabla.
+_FP_CACHE = OrderedDict()
+_FP_LOCK = threading.Lock()
+
+
+def dataset_fingerprint(datos) -> str:
+    """Hash estable del dataset: fecha de corte + contenido de midagri.
+
+    hash_pandas_object sobre ~30k filas tarda unos ms; se memoiza por
+    objeto para que cada rerun de la página no lo recalcule.
+    """
+    with _FP_LOCK:
+        hit = _FP_CACHE.get(id(datos))
+        if hit is not None and hit[0] is datos:
+            return hit[1]
+    h = hashlib.sha1(str(datos.get("fecha_corte", "")).encode())
+    df = datos.get("midagri")
+    if isinstance(df, pd.DataFrame):
+        h.update(repr(df.shape).encode())
+        h.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+    h.update(repr(sorted(datos.get("departamentos_list", []) or [])).encode())
+    fp = h.hexdigest()[:16]
+    with _FP_LOCK:
+        _FP_CACHE[id(datos)] = (datos, fp)
+        while len(_FP_CACHE) > 8:
+            _FP_CACHE.popitem(last=False)
+    return fp
+
+
+def job_key(fingerprint, tipo, params=None) -> str:
+    """Clave de deduplicación: mismo dataset + tipo + parámetros → misma clave."""
+    items = sorted((str(k), repr(v)) for k, v in (params or {}).items())
+    raw = f"{fingerprint}|{tipo}|{items!r}"
+    return f"{tipo}-{hashlib.sha1(raw.encode()).hexdigest()[:12]}"
+
+
+class ReportJobQueue:
+    """Registro de trabajos + pool de hilos + LRU de resultados."""
+
+    def __init__(self, max_workers=MAX_WORKERS, max_resultados=MAX_RESULTADOS,
+                 max_bytes=MAX_BYTES):
+        self._pool = ThreadPoolExecutor(max_workers=max_workers,
+                                        thread_name_prefix="sac-report")
+        self._lock = threading.Lock()
+        self._jobs = OrderedDict()  # key → dict (orden = uso reciente)
+        self.max_resultados = max_resultados
+        self.max_bytes = max_bytes
+
+    def submit(self, key, fn, *args, progress_kw=None, **kwargs) -> str:
+        """Encola fn(*args, **kwargs) bajo `key` y devuelve la clave.
+
+        Si ya existe un trabajo con la misma clave (pendiente, en curso o
+        terminado) no se vuelve a generar; si había fallado, se reintenta.
+        progress_kw: nombre del kwarg donde inyectar un callback
+        (actual, total, etiqueta) para generadores que reportan avance.
+        """
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None and job["estado"] != ERROR:
+                self._jobs.move_to_end(key)
+                return key
+            job = {"estado": PENDIENTE, "progreso": 0.0, "etiqueta": "En cola",
+                   "creado": time.time(), "inicio": None, "fin": None,
+                   "resultado": None, "error": None, "nbytes": 0}
+            self._jobs[key] = job
+        if progress_kw:
+            kwargs[progress_kw] = self._progress_callback(job)
+        self._pool.submit(self._run, key, job, fn, args, kwargs)
+        return key
+
+    @staticmethod
+    def _progress_callback(job):
+        def _cb(actual, total, etiqueta=""):
+            job["progreso"] = min(actual / total, 1.0) if total else 1.0
+            if etiqueta:
+                job["etiqueta"] = etiqueta
+        return _cb
+
+    def _run(self, key, job, fn, args, kwargs):
+        job["estado"] = EN_CURSO
+        job["etiqueta"] = "Generando..."
+        job["inicio"] = time.time()
+        try:
+            res = fn(*args, **kwargs)
+            job["resultado"] = res
+            job["nbytes"] = len(res) if isinstance(res, (bytes, bytearray)) else 0
+            job["progreso"] = 1.0
+            job["etiqueta"] = "Listo"
+            job["estado"] = LISTO
+        except Exception as e:
+            job["error"] = str(e)
+            job["etiqueta"] = "Error"
+            job["estado"] = ERROR
+        finally:
+            job["fin"] = time.time()
+            self._evict()
+
+    def _evict(self):
+        """Desaloja resultados terminados (LRU) hasta entrar en los límites."""
+        with self._lock:
+            terminados = [k for k, j in self._jobs.items() if j["estado"] in (LISTO, ERROR)]
+            total = sum(self._jobs[k]["nbytes"] for k in terminados)
+            while terminados and (len(terminados) > self.max_resultados
+                                  or total > self.max_bytes):
+                k = terminados.pop(0)
+                total -= self._jobs.pop(k)["nbytes"]
+
+    def status(self, key):
+        """Snapshot del trabajo (sin el resultado), o None si no existe."""
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is None:
+                return None
+            self._jobs.move_to_end(key)
+            snap = {k: v for k, v in job.items() if k != "resultado"}
+        fin = snap["fin"] or time.time()
+        snap["segundos"] = fin - snap["inicio"] if snap["inicio"] else 0.0
+        return snap
+
+    def result(self, key):
+        """Resultado del trabajo si terminó bien; None en otro caso."""
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is None or job["estado"] != LISTO:
+                return None
+            self._jobs.move_to_end(key)
+            return job["resultado"]
+
+    def forget(self, key):
+        """Descarta un trabajo terminado (p.ej. para forzar regeneración)."""
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None and job["estado"] in (LISTO, ERROR):
+                del self._jobs[key]
+
+    def stats(self):
+        with self._lock:
+            estados = [j["estado"] for j in self._jobs.values()]
+            return {"trabajos": len(estados),
+                    "activos": sum(e in (PENDIENTE, EN_CURSO) for e in estados),
+                    "bytes": sum(j["nbytes"] for j in self._jobs.values())}
+
+
+@lru_cache(maxsize=1)
+def get_job_queue() -> ReportJobQueue:
+    """Cola única por proceso, compartida entre sesiones."""
+    return ReportJobQueue()
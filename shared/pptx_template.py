@@ -0,0 +1,189 @@
+"""Plantilla de mazo y fábrica de shapes para los generadores PowerPoint (python-pptx).
+
+gen_ppt_dinamico y gen_ppt_historico dibujaban todo en cada slide sobre el
+layout en blanco: rectángulo de fondo, líneas de marco, logo y cada tarjeta
+KPI / tabla formateada propiedad por propiedad (python-pptx valida el orden
+de hijos en cada setter: fill.solid(), fore_color.rgb, font.*). En un mazo
+de 40+ slides eso era casi todo el tiempo de generación.
+
+Igual que shared/docx_template.py, las partes estáticas se construyen UNA
+vez por proceso:
+
+  - deck_template(nombre, setup): presentación base (tamaño, metadatos y
+    layouts propios) serializada; cada mazo abre una copia desde los bytes.
+  - add_layout(prs, nombre, fondo, cromo): layout propio del slide master
+    con el fondo como <p:bg> y el cromo estático (líneas de marco, ...).
+    Las slides que lo usan ya no repiten esas shapes. prune_layouts quita
+    después los layouts de fábrica que el mazo no usa.
+  - shape_prototype(clave, build) + place(slide, proto, x, y, textos):
+    grupo de shapes (tarjeta KPI, tabla, logo) dibujado una vez en una
+    slide de borrador; cada uso es un deepcopy desplazado a (x, y) con el
+    texto reemplazado.
+
+Sólo para shapes sin relaciones (autoshapes, cuadros de texto, tablas):
+gráficos e imágenes siguen agregándose con la API de python-pptx.
+Todo lo cacheado se comparte entre hilos/sesiones: se clona, nunca se muta.
+"""
+import copy
+import threading
+from functools import lru_cache
+from io import BytesIO
+
+from pptx import Presentation
+from pptx.opc.constants import CONTENT_TYPE as CT
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+from pptx.oxml.ns import qn
+from pptx.parts.slide import SlideLayoutPart
+
+# Texto provisorio de los prototipos: python-pptx no crea <a:r> para "".
+PLACEHOLDER = "0"
+
+# Reentrante: add_layout dibuja el cromo dentro del setup de deck_template.
+_LOCK = threading.RLock()
+_DECKS = {}   # nombre → bytes del .pptx base
+_SHAPES = {}  # clave → tupla de elementos de shape (origen en 0, 0)
+
+_OFFSETS = "./p:spPr/a:xfrm/a:off | ./p:xfrm/a:off | ./p:grpSpPr/a:xfrm/a:off"
+
+
+def deck_template(name, setup):
+    """Presentation nueva a partir de la plantilla `name`.
+
+    setup(prs) aplica la parte estática (tamaño, propiedades, layouts con
+    add_layout) y corre sólo la primera vez; después se reabre desde los
+    bytes.
+    """
+    data = _DECKS.get(name)
+    if data is None:
+        with _LOCK:
+            data = _DECKS.get(name)
+            if data is None:
+                prs = Presentation()
+                setup(prs)
+                buf = BytesIO()
+                prs.save(buf)
+                data = _DECKS[name] = buf.getvalue()
+    return Presentation(BytesIO(data))
+
+
+def add_layout(prs, name, fill=None, chrome=None):
+    """Agrega al slide master un layout `name` (copia del layout en blanco).
+
+    fill: RGBColor del fondo del layout. chrome(slide): dibuja las shapes
+    estáticas (en coordenadas de la slide) que heredan todas las slides
+    del layout.
+    """
+    master = prs.slide_master
+    blank = next(lo for lo in prs.slide_layouts if lo.name == "Blank")
+    package = prs.part.package
+    element = copy.deepcopy(blank._element)
+    element.cSld.set("name", name)
+    part = SlideLayoutPart(package.next_partname("/ppt/slideLayouts/slideLayout%d.xml"),
+                           CT.PML_SLIDE_LAYOUT, package, element)
+    part.relate_to(master.part, RT.SLIDE_MASTER)
+    rId = master.part.relate_to(part, RT.SLIDE_LAYOUT)
+
+    # Los id de master y layouts comparten espacio (>= 2^31) y no se repiten
+    ids = [int(i) for i in prs.part._element.xpath("//p:sldMasterId/@id")]
+    ids += [int(i) for i in master._element.xpath("//p:sldLayoutId/@id")]
+    entry = master._element.get_or_add_sldLayoutIdLst()._add_sldLayoutId(rId=rId)
+    entry.set("id", str(max(ids) + 1))
+
+    layout = part.slide_layout
+    if fill is not None:
+        layout.background.fill.solid()
+        layout.background.fill.fore_color.rgb = fill
+    if chrome is not None:
+        with _LOCK:
+            place(layout, _draw(chrome))
+    return layout
+
+
+def prune_layouts(prs, keep):
+    """Quita del master los layouts de fábrica cuyo nombre no está en `keep`.
+
+    Se llama al final del setup: el mazo sólo usa sus layouts propios y los
+    11 de la plantilla por defecto de python-pptx pesan en cada archivo.
+    """
+    for lo in list(prs.slide_layouts):
+        if lo.name not in keep:
+            prs.slide_layouts.remove(lo)
+
+
+def layout(prs, name):
+    """Layout propio `name` de la presentación (ver add_layout)."""
+    for lo in prs.slide_layouts:
+        if lo.name == name:
+            return lo
+    raise KeyError(name)
+
+
+# ─── Fábrica de shapes ───
+
+@lru_cache(maxsize=1)
+def _scratch_slide():
+    prs = Presentation()
+    return prs.slides.add_slide(prs.slide_layouts[6])
+
+
+def shape_prototype(key, build):
+    """Shapes que dibuja build(slide) en el origen, construidas una vez por clave.
+
+    `key` debe identificar todo lo que cambia el dibujo (tamaño, colores,
+    fuente). build dibuja con x, y relativos a (0, 0) y con el texto
+    provisorio PLACEHOLDER donde después van los textos reales (place).
+    """
+    proto = _SHAPES.get(key)
+    if proto is not None:
+        return proto
+    with _LOCK:
+        proto = _SHAPES.get(key)
+        if proto is None:
+            proto = _SHAPES[key] = _draw(build)
+    return proto
+
+
+def _draw(build):
+    """Elementos que build(slide) agrega a la slide de borrador (que queda vacía)."""
+    slide = _scratch_slide()
+    tree = slide.shapes._spTree
+    n = len(tree)
+    try:
+        build(slide)
+    finally:
+        nuevos = tuple(tree[n:])
+        for el in nuevos:
+            tree.remove(el)
+    return nuevos
+
+
+def place(slide, proto, left=0, top=0, texts=()):
+    """Agrega a `slide` una copia de `proto` desplazada a (left, top).
+
+    texts reemplaza, en orden de documento, el texto de cada <a:t> del
+    prototipo (los que sobran quedan con su texto). Devuelve los elementos
+    agregados.
+    """
+    tree = slide.shapes._spTree
+    next_id = max((int(i) for i in tree.xpath("//p:cNvPr/@id")), default=1) + 1
+    texts = iter(texts)
+    pendientes = True
+    out = []
+    for el in proto:
+        el = copy.deepcopy(el)
+        for off in el.xpath(_OFFSETS):
+            off.set("x", str(int(off.get("x")) + int(left)))
+            off.set("y", str(int(off.get("y")) + int(top)))
+        for c in el.iter(qn("p:cNvPr")):
+            c.set("id", str(next_id))
+            next_id += 1
+        if pendientes:
+            for t in el.iter(qn("a:t")):
+                txt = next(texts, None)
+                if txt is None:
+                    pendientes = False
+                    break
+                t.text = str(txt)
+        tree.insert_element_before(el, "p:extLst")
+        out.append(el)
+    return out
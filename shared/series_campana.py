@@ -0,0 +1,185 @@
+"""Series mensuales de la campaña en curso por departamento (vectorizado).
+
+predecir_por_dept copiaba el consolidado, normalizaba DEPARTAMENTO con un
+lambda de unicodedata fila por fila (.apply), filtraba indemnizables y
+después recorría los deptos filtrando el frame en cada vuelta;
+serie_actual_desde_df repetía el filtro para la serie nacional y la
+armaba con iterrows. La página comparativo volvía a hacer lo mismo para
+el dept elegido.
+
+Acá el consolidado se recorre una vez:
+  - DEPARTAMENTO se normaliza por valor único (factorize) → código entero
+    por fila; DICTAMEN igual (el str.contains corre sobre ~10 valores).
+  - La fecha de ajuste se pasa a índice de mes de campaña (0=Ago … 11=Jul)
+    con aritmética sobre año*12+mes.
+  - Un solo np.bincount sobre código*12 + mes da la matriz
+    (deptos × 12) de casos y otra de montos; otro igual, por fecha de
+    aviso y sin filtro de dictamen, la de avisos. La serie nacional es la
+    suma de todas las filas (incluye las que no tienen departamento).
+
+El resultado se memoiza por objeto DataFrame (id → (df, resultado), como
+dataset_fingerprint) para que predicción nacional, por dept y las páginas
+que lo comparten no lo recalculen en el mismo rerun. No depende de
+Streamlit.
+"""
+import threading
+import unicodedata
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# Fecha con la que se ubica cada indemnización (prioridad: acta > programación)
+FECHAS_AJUSTE = ("FECHA_AJUSTE_ACTA_FINAL", "FECHA_AJUSTE_ACTA_1",
+                 "FECHA_PROGRAMACION_AJUSTE", "FECHA_SINIESTRO")
+COLUMNAS_MONTO = ("INDEMNIZACION", "MONTO_INDEMNIZADO")
+# Fecha de los avisos (FECHA_SINIESTRO como proxy si falta)
+FECHAS_AVISO = ("FECHA_AVISO", "FECHA_SINIESTRO")
+
+_CACHE = OrderedDict()  # (id(df), campaña) → (df, SeriesCampana)
+_CACHE_LOCK = threading.Lock()
+_CACHE_MAX = 8
+
+
+def norm_dept(name) -> str:
+    """Nombre de departamento sin tildes, en mayúsculas y sin espacios extremos."""
+    s = str(name).strip().upper()
+    return "".join(c for c in unicodedata.normalize("NFD", s) if unicodedata.category(c) != "Mn")
+
+
+def campana_de(fecha) -> str:
+    """Campaña agrícola (Ago→Jul) a la que pertenece `fecha`: 'YYYY-YYYY'."""
+    if fecha.month >= 8:
+        return f"{fecha.year}-{fecha.year + 1}"
+    return f"{fecha.year - 1}-{fecha.year}"
+
+
+def primera_columna(df, candidatas):
+    """Primera de `candidatas` presente en df (None si ninguna)."""
+    return next((c for c in candidatas if c in df.columns), None)
+
+
+def codigos_dept(serie: pd.Series):
+    """(código por fila, nombres normalizados). Vacíos / NaN → código -1.
+
+    La normalización corre una vez por valor único; variantes con y sin
+    tilde ("HUÁNUCO" / "HUANUCO") quedan con el mismo código.
+    """
+    codes, uniques = pd.factorize(serie)
+    normalizados = [norm_dept(u) for u in uniques]
+    normalizados = [n if n not in ("", "NAN") else None for n in normalizados] + [None]
+    codes_norm, nombres = pd.factorize(pd.Series(normalizados, dtype=object))
+    return codes_norm[codes], list(nombres)
+
+
+def es_indemnizable(df) -> np.ndarray:
+    """Máscara DICTAMEN = INDEMNIZABLE (y no "NO INDEMNIZABLE"), por valor único."""
+    if "DICTAMEN" not in df.columns:
+        return np.zeros(len(df), dtype=bool)
+    codes, uniques = pd.factorize(df["DICTAMEN"].astype(str).str.strip().str.upper())
+    marca = np.array([("INDEMNIZABLE" in u) and ("NO INDEMNIZABLE" not in u) for u in uniques]
+                     + [False])
+    return marca[codes]
+
+
+def mes_campana(fechas: pd.Series, campana: str) -> np.ndarray:
+    """Índice 0..11 (Ago→Jul) de cada fecha dentro de `campana`; -1 fuera / NaT."""
+    f = pd.to_datetime(fechas, errors="coerce")
+    ym = (f.dt.year * 12 + f.dt.month - 1).to_numpy(dtype=float, na_value=np.nan)
+    idx = ym - (int(campana[:4]) * 12 + 7)  # agosto del año inicial
+    ok = np.isfinite(idx) & (idx >= 0) & (idx < 12)
+    return np.where(ok, np.nan_to_num(idx), -1).astype(np.int64)
+
+
+class SeriesCampana:
+    """Avisos, casos y montos indemnizados por mes de la campaña, por dept y nacional.
+
+    n, monto, avisos: (deptos × 12) float, filas alineadas con `depts`
+    n_nacional, monto_nacional,
+    avisos_nacional:  (12,) todas las filas, tengan o no departamento
+    columna_fecha:    fecha de ajuste usada (None si el consolidado no trae)
+    columna_fecha_avisos: idem para los avisos
+    """
+
+    def __init__(self, campana, depts, n, monto, n_nacional, monto_nacional, columna_fecha,
+                 avisos=None, avisos_nacional=None, columna_fecha_avisos=None):
+        self.campana = campana
+        self.depts = tuple(depts)
+        self.dept_idx = {d: i for i, d in enumerate(self.depts)}
+        self.n = n
+        self.monto = monto
+        self.n_nacional = n_nacional
+        self.monto_nacional = monto_nacional
+        self.columna_fecha = columna_fecha
+        self.avisos = avisos if avisos is not None else np.zeros_like(n)
+        self.avisos_nacional = avisos_nacional if avisos_nacional is not None else np.zeros(12)
+        self.columna_fecha_avisos = columna_fecha_avisos
+
+    def dept(self, nombre):
+        """(casos, montos) de 12 meses de un dept (nombre en cualquier grafía)."""
+        i = self.dept_idx.get(norm_dept(nombre))
+        if i is None:
+            return np.zeros(12), np.zeros(12)
+        return self.n[i], self.monto[i]
+
+
+def _por_dept_mes(fila, mes, usa, n_dept, pesos=None):
+    """bincount de (fila, mes) → matriz (n_dept + 1) × 12; la última fila
+    junta lo que no tiene departamento."""
+    clave = fila[usa] * 12 + mes[usa]
+    largo = (n_dept + 1) * 12
+    w = pesos[usa] if pesos is not None else None
+    return np.bincount(clave, weights=w, minlength=largo).astype(float).reshape(n_dept + 1, 12)
+
+
+def _construir(df, campana) -> SeriesCampana:
+    if "DEPARTAMENTO" in df.columns:
+        codes, depts = codigos_dept(df["DEPARTAMENTO"])
+    else:
+        codes, depts = np.full(len(df), -1, dtype=np.int64), []
+    n_dept = len(depts)
+    fila = np.where(codes >= 0, codes, n_dept)
+
+    aviso_col = primera_columna(df, FECHAS_AVISO)
+    if aviso_col is not None:
+        mes_av = mes_campana(df[aviso_col], campana)
+        av = _por_dept_mes(fila, mes_av, mes_av >= 0, n_dept)
+    else:
+        av = np.zeros((n_dept + 1, 12))
+
+    date_col = primera_columna(df, FECHAS_AJUSTE)
+    if date_col is None:
+        ceros = np.zeros((n_dept, 12))
+        return SeriesCampana(campana, depts, ceros, ceros.copy(), np.zeros(12), np.zeros(12), None,
+                             av[:n_dept], av.sum(0), aviso_col)
+
+    ind = es_indemnizable(df)
+    mes = mes_campana(df[date_col], campana)
+    usa = ind & (mes >= 0)
+    monto_col = primera_columna(df, COLUMNAS_MONTO)
+    montos = (pd.to_numeric(df[monto_col], errors="coerce").fillna(0).to_numpy(dtype=float)
+              if monto_col else np.zeros(len(df)))
+    n = _por_dept_mes(fila, mes, usa, n_dept)
+    m = _por_dept_mes(fila, mes, usa, n_dept, montos)
+    return SeriesCampana(campana, depts, n[:n_dept], m[:n_dept], n.sum(0), m.sum(0), date_col,
+                         av[:n_dept], av.sum(0), aviso_col)
+
+
+def series_campana(df, campana: str) -> SeriesCampana:
+    """Matriz (dept × mes de campaña) de indemnizaciones de `campana`.
+
+    Memoizada por objeto `df`: mismo DataFrame y campaña → mismo resultado.
+    Los arrays devueltos son compartidos; no modificarlos.
+    """
+    key = (id(df), campana)
+    with _CACHE_LOCK:
+        hit = _CACHE.get(key)
+        if hit is not None and hit[0] is df:
+            _CACHE.move_to_end(key)
+            return hit[1]
+    res = _construir(df, campana)
+    with _CACHE_LOCK:
+        _CACHE[key] = (df, res)
+        while len(_CACHE) > _CACHE_MAX:
+            _CACHE.popitem(last=False)
+    return res
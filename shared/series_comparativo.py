@@ -0,0 +1,140 @@
+"""Series mensuales de las 6 campañas (5 históricas + en curso) del comparativo.
+
+pages/comparativo.py armaba cada serie en el rerun: por cada campaña
+histórica recorría el dict {'YYYY-MM': valor} del JSON con
+_period_to_campana_month/build_campaign_series (listas de Python), la
+campaña actual la sacaba con to_period + value_counts sobre el
+consolidado, y al elegir un departamento repetía todo (JSON por dept +
+consolidado filtrado) para ese dept.
+
+Acá las 6 campañas × 12 meses se precomputan una vez por dataset, como
+arrays NumPy listos para graficar:
+  - Históricas: los almacenes curvas_nacionales / curvas_departamentales
+    de prediccion_siniestralidad (JSON leído y alineado una vez por proceso).
+  - En curso: la matriz dept × mes de shared/series_campana (avisos, casos
+    y montos en una pasada sobre el consolidado).
+  - Los meses posteriores al vigente de la campaña en curso quedan en NaN:
+    Plotly corta la línea y cumsum no inventa meses que no ocurrieron.
+
+Se memoiza por (objeto DataFrame, mes vigente), como series_campana. No
+depende de Streamlit.
+"""
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from prediccion_siniestralidad import CAMPANAS_HIST, curvas_departamentales, curvas_nacionales
+from shared.series_campana import norm_dept, series_campana
+
+TZ_PERU = timezone(timedelta(hours=-5))
+
+CAMPANA_ACTUAL = "2025-2026"
+CAMPANAS = tuple(CAMPANAS_HIST) + (CAMPANA_ACTUAL,)
+METRICAS = ("avisos", "n", "monto")
+
+_CACHE = OrderedDict()  # (id(df), mes vigente) → (df, SeriesComparativo)
+_CACHE_LOCK = threading.Lock()
+_CACHE_MAX = 8
+
+
+def mes_vigente(campana, today=None):
+    """Índice 0..11 del mes vigente si `campana` está en curso; None si no.
+
+    Campaña terminada o aún no empezada → None (se usa el dato completo).
+    """
+    if today is None:
+        today = datetime.now(TZ_PERU).date()
+    start_year = int(campana[:4])
+    if today.year == start_year and 8 <= today.month <= 12:
+        return today.month - 8
+    if today.year == start_year + 1 and 1 <= today.month <= 7:
+        return today.month + 4
+    return None
+
+
+class SeriesComparativo:
+    """Series (campañas × 12) por métrica, nacionales y por departamento.
+
+    nacional: {métrica: (6, 12)} filas en el orden de CAMPANAS
+    depts:    unión ordenada de deptos históricos y de la campaña en curso
+    mes_vigente: corte aplicado a la campaña en curso (None = sin corte)
+    """
+
+    def __init__(self, nacional, depts, por_dept, mes_vigente_idx):
+        self.campanas = CAMPANAS
+        self.nacional = nacional
+        self.depts = tuple(depts)
+        self.dept_idx = {d: i for i, d in enumerate(self.depts)}
+        self._por_dept = por_dept
+        self.mes_vigente = mes_vigente_idx
+
+    def dept(self, nombre):
+        """{métrica: (6, 12)} de un dept (nombre en cualquier grafía); ceros si no hay."""
+        i = self.dept_idx.get(norm_dept(nombre))
+        if i is None:
+            return {k: np.zeros((len(CAMPANAS), 12)) for k in METRICAS}
+        return {k: self._por_dept[k][i] for k in METRICAS}
+
+    @staticmethod
+    def por_campana(tabla):
+        """(6, 12) → {campaña: fila}, el formato que consumen los gráficos."""
+        return dict(zip(CAMPANAS, tabla))
+
+
+def _construir(df, corte) -> SeriesComparativo:
+    nac_hist = curvas_nacionales()
+    dep_hist = curvas_departamentales()
+    actual = series_campana(df, CAMPANA_ACTUAL)
+    actual_por_metrica = {
+        "avisos": (actual.avisos_nacional, actual.avisos),
+        "n": (actual.n_nacional, actual.n),
+        "monto": (actual.monto_nacional, actual.monto),
+    }
+
+    hist_norm = [norm_dept(d) for d in dep_hist.depts]
+    depts = sorted(set(hist_norm) | set(actual.depts))
+    pos = {d: i for i, d in enumerate(depts)}
+    fila_hist = np.array([pos[d] for d in hist_norm], dtype=np.int64)
+    fila_act = np.array([pos[d] for d in actual.depts], dtype=np.int64)
+
+    nacional, por_dept = {}, {}
+    for k in METRICAS:
+        act_nac, act_dept = actual_por_metrica[k]
+        nac = np.vstack([nac_hist.series[k], act_nac[None, :]])
+
+        dep = np.zeros((len(depts), len(CAMPANAS), 12))
+        if len(fila_hist):
+            # np.add.at: dos claves del JSON que normalizan igual se suman
+            np.add.at(dep, (fila_hist, slice(0, len(CAMPANAS_HIST))), dep_hist.series[k])
+        if len(fila_act):
+            dep[fila_act, -1] = act_dept
+
+        if corte is not None:
+            nac[-1, corte + 1:] = np.nan
+            dep[:, -1, corte + 1:] = np.nan
+        nacional[k] = nac
+        por_dept[k] = dep
+    return SeriesComparativo(nacional, depts, por_dept, corte)
+
+
+def series_comparativo(df, today=None) -> SeriesComparativo:
+    """Series de las 6 campañas para el consolidado `df`.
+
+    Memoizada por objeto `df` y mes vigente. Los arrays devueltos son
+    compartidos; no modificarlos.
+    """
+    corte = mes_vigente(CAMPANA_ACTUAL, today)
+    key = (id(df), corte)
+    with _CACHE_LOCK:
+        hit = _CACHE.get(key)
+        if hit is not None and hit[0] is df:
+            _CACHE.move_to_end(key)
+            return hit[1]
+    res = _construir(df, corte)
+    with _CACHE_LOCK:
+        _CACHE[key] = (df, res)
+        while len(_CACHE) > _CACHE_MAX:
+            _CACHE.popitem(last=False)
+    return res
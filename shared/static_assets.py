@@ -0,0 +1,129 @@
+"""Registro de assets estáticos (static_data/) cargados a demanda.
+
+calendario_agricola leía calendario_cultivos_historico.json (508 KB) y
+clima_riesgo perfil_riesgo_distrital.json (1.5 MB) al importarse: el
+costo se pagaba en el arranque de cualquier página que los importara,
+aunque el usuario nunca abriera Calendario ni Clima.
+
+Acá cada asset se registra por nombre (ASSETS) y se lee en el primer
+cargar(nombre); el objeto queda una vez por proceso y cada carga anota
+cuánto tardó y de dónde salió (tiempos_carga). Si junto al JSON hay una
+versión binaria compacta (mismo nombre con .msgpack, generada por
+tools/convertir_assets_msgpack.py), no más vieja que el JSON, y msgpack
+está instalado, se lee esa. msgpack es opcional: sin él se lee el JSON.
+
+No depende de Streamlit, así que también lo pueden usar tools/ y los tests.
+"""
+import json
+import os
+import threading
+import time
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                          "static_data")
+
+# nombre → archivo JSON dentro de static_data/
+ASSETS = {
+    "calendario_cultivos": "calendario_cultivos_historico.json",
+    "perfil_riesgo_distrital": "perfil_riesgo_distrital.json",
+}
+
+_CARGADOS = {}  # nombre → objeto leído
+_TIEMPOS = {}   # nombre → {"segundos": float, "fuente": ruta}
+_DERIVADOS = {}  # (nombre, construir) → objeto armado desde el asset
+_LOCK = threading.RLock()
+
+
+def ruta_json(nombre) -> str:
+    return os.path.join(STATIC_DIR, ASSETS[nombre])
+
+
+def ruta_binaria(nombre) -> str:
+    """Ruta de la versión msgpack del asset (exista o no)."""
+    return os.path.splitext(ruta_json(nombre))[0] + ".msgpack"
+
+
+def _leer_msgpack(path):
+    """Objeto del .msgpack, o None si no hay msgpack o el archivo no sirve."""
+    try:
+        import msgpack
+    except ImportError:
+        return None
+    try:
+        with open(path, "rb") as f:
+            return msgpack.unpackb(f.read(), raw=False, strict_map_key=False)
+    except Exception:
+        return None
+
+
+def _leer(nombre):
+    """(objeto, ruta usada). {} si no hay archivo o no se puede leer."""
+    path_json = ruta_json(nombre)
+    path_bin = ruta_binaria(nombre)
+    if os.path.exists(path_bin) and (
+            not os.path.exists(path_json)
+            or os.path.getmtime(path_bin) >= os.path.getmtime(path_json)):
+        obj = _leer_msgpack(path_bin)
+        if obj is not None:
+            return obj, path_bin
+    try:
+        with open(path_json, "r", encoding="utf-8") as f:
+            return json.load(f), path_json
+    except Exception:
+        return {}, None
+
+
+def cargar(nombre):
+    """Objeto del asset `nombre` (ver ASSETS), leído en el primer acceso.
+
+    El resultado es compartido por todo el proceso; no modificarlo.
+    """
+    obj = _CARGADOS.get(nombre)
+    if obj is not None:
+        return obj
+    with _LOCK:
+        obj = _CARGADOS.get(nombre)
+        if obj is None:
+            t0 = time.perf_counter()
+            obj, fuente = _leer(nombre)
+            _TIEMPOS[nombre] = {"segundos": round(time.perf_counter() - t0, 4), "fuente": fuente}
+            _CARGADOS[nombre] = obj
+    return obj
+
+
+def derivado(nombre, construir):
+    """construir(cargar(nombre)), armado una vez por proceso.
+
+    Para estructuras que un módulo arma a partir del asset (p. ej. el
+    calendario de cultivos): quedan en este mismo registro, así limpiar()
+    también las descarta.
+    """
+    clave = (nombre, construir)
+    obj = _DERIVADOS.get(clave)
+    if obj is not None:
+        return obj
+    with _LOCK:
+        obj = _DERIVADOS.get(clave)
+        if obj is None:
+            obj = _DERIVADOS[clave] = construir(cargar(nombre))
+    return obj
+
+
+def cargado(nombre) -> bool:
+    """True si el asset ya se leyó en este proceso."""
+    return nombre in _CARGADOS
+
+
+def tiempos_carga() -> dict:
+    """{nombre: {"segundos", "fuente"}} de los assets leídos hasta ahora."""
+    with _LOCK:
+        return {k: dict(v) for k, v in _TIEMPOS.items()}
+
+
+def limpiar():
+    """Olvida los assets leídos y lo derivado de ellos (tests / después de
+    regenerar static_data)."""
+    with _LOCK:
+        _CARGADOS.clear()
+        _DERIVADOS.clear()
+        _TIEMPOS.clear()
@@ -0,0 +1,64 @@
+"""Conversión columnar de tablas (DataFrame) a payloads de los generadores Word.
+
+gen_word_bridge_py pasaba cada cuadro a dicts con .iterrows() y
+float(row.get(...) or 0) celda por celda: una Series por fila y la
+coerción en Python puro, en cada uno de los 25 documentos del lote.
+
+Acá cada columna se convierte una vez sobre el array completo (ndarray
+float o lista de str) y las filas se arman con zip sobre las columnas ya
+convertidas/formateadas. Los cuadros tienen ~25 filas: armar un DataFrame
+intermedio + to_dict("records") costaba más que el iterrows original, el
+zip no. Los valores quedan como tipos nativos de Python: el payload sigue
+siendo picklable para el pool de batch_reports.
+"""
+import numpy as np
+import pandas as pd
+
+
+def numeric(df, col):
+    """Columna `col` como array float (ceros si no existe; texto no numérico → NaN)."""
+    if col not in df.columns:
+        return np.zeros(len(df))
+    s = df[col]
+    if s.dtype.kind in "biuf":
+        return s.to_numpy(dtype=float)
+    return pd.to_numeric(s, errors="coerce").to_numpy(dtype=float)
+
+
+def text(df, col, default=""):
+    """Columna `col` como lista de str (`default` si no existe)."""
+    if col not in df.columns:
+        return [default] * len(df)
+    return df[col].astype(str).tolist()
+
+
+def dates(df, col, fmt="%d/%m/%Y"):
+    """Columna de fechas formateada con `fmt`; vacíos → ""."""
+    if col not in df.columns:
+        return [""] * len(df)
+    s = df[col]
+    if pd.api.types.is_datetime64_any_dtype(s):
+        return s.dt.strftime(fmt).fillna("").tolist()
+    return ["" if pd.isna(v) else v.strftime(fmt) if hasattr(v, "strftime") else str(v)
+            for v in s]
+
+
+def table_records(df, spec, label_col="Departamento", skip=("TOTAL",)):
+    """Filas de `df` como dicts {clave: valor} tras un pase de tipos por columna.
+
+    spec: {clave del payload: (columna, tipo)} con tipo float o str. Las
+    filas cuya `label_col` (en mayúsculas) está en `skip` se descartan: el
+    generador agrega sus propios totales.
+    """
+    claves = list(spec)
+    cols = [numeric(df, col).tolist() if tipo is float else text(df, col)
+            for col, tipo in spec.values()]
+    etiquetas = text(df, label_col) if label_col is not None else [""] * len(df)
+    return [dict(zip(claves, valores))
+            for etiqueta, *valores in zip(etiquetas, *cols)
+            if etiqueta.upper() not in skip]
+
+
+def rows(*columns):
+    """Filas (listas) a partir de columnas ya formateadas del mismo largo."""
+    return [list(r) for r in zip(*columns)]
@@ -0,0 +1,41 @@
+"""Tests de la caché de gráficos por contenido (shared/chart_cache.py)."""
+import pandas as pd
+import pytest
+
+pytest.importorskip("matplotlib")
+
+from shared import chart_cache
+
+
+def test_clave_depende_de_datos_e_indice():
+    s = pd.Series([3, 2, 1], index=["LIMA", "PIURA", "CUSCO"])
+    spec = {"chart": "x", "dpi": 180}
+    k = chart_cache.chart_key(spec, s)
+    assert k == chart_cache.chart_key(spec, s.copy())
+    assert k != chart_cache.chart_key(spec, s.rename({"CUSCO": "PUNO"}))
+    assert k != chart_cache.chart_key(spec, s.replace(1, 4))
+    assert k != chart_cache.chart_key({"chart": "x", "dpi": 150}, s)
+
+
+def test_mismo_grafico_se_dibuja_una_vez():
+    chart_cache.clear()
+    llamadas = []
+
+    def render():
+        llamadas.append(1)
+        return b"\x89PNG fake"
+
+    s = pd.Series([1.0, 2.0], index=["A", "B"])
+    a = chart_cache.cached_png({"chart": "t"}, (s,), render)
+    b = chart_cache.cached_png({"chart": "t"}, (s.copy(),), render)
+    assert a == b and len(llamadas) == 1
+    assert chart_cache.cache_stats()["hits"] == 1
+
+
+def test_grafico_operatividad_png_valido():
+    pytest.importorskip("docx")
+    from gen_word_operatividad import _chart_avisos_tipo
+    s = pd.Series([10, 5, 1], index=["HELADA", "SEQUIA", "HUAYCO"])
+    png = _chart_avisos_tipo(s).getvalue()
+    assert png[:4] == b"\x89PNG"
+    assert _chart_avisos_tipo(s).getvalue() == png
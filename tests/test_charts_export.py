@@ -0,0 +1,20 @@
+"""Exportación HTML/PNG bajo demanda de shared/charts.py."""
+import pytest
+
+go = pytest.importorskip("plotly.graph_objects")
+pytest.importorskip("streamlit")
+
+from shared import charts
+
+
+def test_export_html_cacheado_por_fingerprint(monkeypatch):
+    fig = go.Figure(go.Bar(x=["A", "B"], y=[1, 2]))
+    html = charts.export_html(fig)
+    assert b"<html>" in html
+
+    # Mismo contenido (otro objeto) → sale de la caché sin re-serializar
+    monkeypatch.setattr(go.Figure, "to_html", lambda *a, **k: pytest.fail("re-render"))
+    assert charts.export_html(go.Figure(go.Bar(x=["A", "B"], y=[1, 2]))) == html
+
+    otro = go.Figure(go.Bar(x=["A", "B"], y=[1, 3]))
+    assert charts.fig_fingerprint(otro) != charts.fig_fingerprint(fig)
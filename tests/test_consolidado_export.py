@@ -0,0 +1,49 @@
+"""Tests de la exportación en streaming del consolidado (shared/consolidado_export.py)."""
+import gzip
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from shared import consolidado_export as ce
+
+
+def _df():
+    return pd.DataFrame({
+        "DISTRITO": ["PISAC", "MARAS", None, "IMAZA", "ACORA"],
+        "CAMPAÑA": ["2025-2026"] * 5,
+        "EMPRESA": ["RIMAC", "RIMAC", "LA POSITIVA", "LA POSITIVA", "RIMAC"],
+        "INDEMNIZACION": [1500.5, np.nan, 0.0, 20.0, 7.0],
+        "FECHA_AVISO": pd.to_datetime(["2025-10-05", None, "2026-01-15", "2025-12-01", "2026-02-20"]),
+        "_INTERNA": [1, 2, 3, 4, 5],
+    })
+
+
+def test_xlsx_por_bloques_igual_a_la_descarga_original():
+    pytest.importorskip("openpyxl")
+    df = _df()
+    hojas = pd.read_excel(io.BytesIO(ce.export_consolidado(df, "xlsx", chunk_rows=2)),
+                          sheet_name=None)
+    assert list(hojas) == [ce.SHEET_CONSOLIDADO, "LA POSITIVA", "RIMAC"]
+    todo = hojas[ce.SHEET_CONSOLIDADO]
+    assert list(todo.columns[:2]) == ["CAMPAÑA", "EMPRESA DE SEGUROS"]  # Anexo 12
+    assert "_INTERNA" not in todo.columns
+    assert len(todo) == 5 and len(hojas["RIMAC"]) == 3 and len(hojas["LA POSITIVA"]) == 2
+    assert todo["INDEMNIZACION"].isna().sum() == 1
+    assert todo["FECHA_AVISO"].isna().sum() == 1
+
+
+def test_csv_gz_y_parquet_mismas_filas_y_columnas():
+    pytest.importorskip("pyarrow")
+    df = _df()
+    csv = pd.read_csv(io.BytesIO(gzip.decompress(ce.export_consolidado(df, "csv.gz", chunk_rows=2))),
+                      encoding="utf-8-sig")
+    pq = pd.read_parquet(io.BytesIO(ce.export_consolidado(df, "parquet", chunk_rows=2)))
+    assert list(csv.columns) == list(pq.columns)
+    assert len(csv) == len(pq) == 5
+    assert pq["INDEMNIZACION"].tolist()[0] == 1500.5
+    assert ce.export_filename("12/03/2026", "csv.gz").endswith("12-03-2026.csv.gz")
+
+    with pytest.raises(ValueError):
+        ce.export_consolidado(df, "json")
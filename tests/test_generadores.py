@@ -39,6 +39,32 @@ def test_excel_eme(datos_demo):
     _assert_office(generate_reporte_eme(datos_demo))
 
 
+def test_excel_eme_texto_distritos_vectorizado(datos_demo):
+    pytest.importorskip("openpyxl")
+    import io
+
+    import pandas as pd
+    from openpyxl import load_workbook
+
+    from gen_excel_eme import _district_names, _district_text, generate_reporte_eme
+
+    df = pd.DataFrame({
+        "DEPARTAMENTO": ["CUSCO"] * 5 + ["PUNO"] * 2,
+        "PROVINCIA": ["CALCA", "CALCA", "CALCA", "URUBAMBA", None, "PUNO", "PUNO"],
+        "DISTRITO": ["PISAC", "TARAY", "PISAC", "MARAS", "X", "ACORA", None],
+    })
+    assert _district_text(df).to_dict() == {
+        "CUSCO": "4 distritos en 2 provincias: Calca (2), Urubamba (1)",
+        "PUNO": "1 distritos en 1 provincias: Puno (1)",
+    }
+    assert _district_names(df)["CUSCO"] == "Calca: Pisac, Taray; Urubamba: Maras"
+
+    ws = load_workbook(io.BytesIO(generate_reporte_eme(datos_demo, nivel="distrito")))["Hoja1"]
+    assert ws["A1"].value == "REGIÓN" and ws["A1"].style == "eme_header"
+    assert ws["D2"].style == "eme_soles" and ws["D2"].number_format == "#,##0.00"
+    assert ":" in ws["B2"].value
+
+
 # NOTA: gen_excel_enhanced.generate_enhanced_excel NO se testea: es código
 # muerto (no se importa en ningún lado; el dashboard usa df.to_excel inline).
 # Además crashea al escribir fechas datetime64 a Excel — bug latente sin
@@ -60,12 +86,90 @@ def test_word_departamental(datos_demo):
     _assert_office(generate_departamental_docx(depto_data))
 
 
+def test_word_payload_columnar():
+    import numpy as np
+    import pandas as pd
+
+    from gen_word_bridge_py import build_departamental_payload, build_nacional_payload
+
+    cuadro2 = pd.DataFrame({
+        "Departamento": ["CUSCO", "PUNO", "TOTAL"],
+        "Hectáreas Indemnizadas": [1, 2, 3],
+        "Monto Indemnizado (S/)": ["10.5", "x", None],  # texto → float / NaN
+    })
+    p = build_nacional_payload({"cuadro1": [{"departamento": "X"}], "cuadro2": cuadro2})
+    assert p["cuadro1"] == [{"departamento": "X"}]  # listas ya armadas pasan tal cual
+    assert [r["departamento"] for r in p["cuadro2"]] == ["CUSCO", "PUNO"]
+    assert p["cuadro2"][0] == {"departamento": "CUSCO", "ha_indemnizadas": 1.0,
+                               "monto_indemnizado": 10.5, "monto_desembolsado": 0.0,
+                               "productores": 0.0}
+    assert np.isnan(p["cuadro2"][1]["monto_indemnizado"])
+    assert type(p["cuadro2"][0]["ha_indemnizadas"]) is float
+
+    eventos = pd.DataFrame({
+        "_fecha": pd.to_datetime(["2026-03-01", None]),
+        "PROVINCIA": ["CALCA", "URUBAMBA"], "DISTRITO": ["PISAC", "MARAS"],
+        "SECTOR_ESTADISTICO": ["SECTOR A", "-"],
+    })
+    dist = pd.DataFrame({"PROVINCIA": ["CALCA"], "avisos": [3], "sup_indemn": [1.5],
+                         "productores": [2.0], "indemniz": [1200.0], "desembolso": [600]})
+    d = build_departamental_payload({"total_avisos": 3, "eventos_recientes": eventos,
+                                     "dist_provincia": dist})
+    assert d["eventos_recientes"] == [["01/03/2026", "Calca", "Pisac / Sector A", "", ""],
+                                      ["", "Urubamba", "Maras", "", ""]]
+    assert d["dist_provincia"] == [["Calca", "3", "1.50 ha", "2", "S/ 1,200", "S/ 600", "0%"]]
+
+
 def test_word_operatividad(datos_demo):
     pytest.importorskip("docx")
     from gen_word_operatividad import generate_operatividad_docx
     _assert_office(generate_operatividad_docx(datos_demo))
 
 
+def test_operatividad_agregado_unico():
+    pytest.importorskip("docx")
+    import pandas as pd
+
+    from gen_word_operatividad import _prepare_operatividad_data
+
+    midagri = pd.DataFrame({
+        "DEPARTAMENTO": ["CUSCO", "PUNO", "CUSCO", "LIMA", "PUNO", None],
+        "TIPO_SINIESTRO": ["HELADA", "SEQUIA", "SEQUIA", "HELADA", "HUAYCO", None],
+        "ESTADO_INSPECCION": ["Cerrado", "CERRADO", "notificado", None, "cerrado", "CERRADO"],
+        "TIPO_COBERTURA": ["Complementaria", "Catastrófica", "COMPLEMENTARIA", None, "CATASTROFICA", None],
+        "PRIORIZADO": ["SI", "NO", None, "SI", float("nan"), "NO"],
+        "INDEMNIZACION": [100.0, 50.0, 0.0, 30.0, 20.0, 5.0],
+        "SUP_INDEMNIZADA": [1.0, 2.0, 0.0, 3.0, 4.0, 0.5],
+        "MONTO_DESEMBOLSADO": [100.0, 25.0, 0.0, 0.0, 20.0, 0.0],
+        "N_PRODUCTORES": [1, 2, 0, 1, 1, 0],
+    })
+    materia = pd.DataFrame({
+        "DEPARTAMENTO": ["Cusco ", "PUNO", "LIMA"],
+        "EMPRESA_ASEGURADORA": ["La Positiva Seguros", "RIMAC", "otra"],
+        "PRIMA_NETA": [1000.0, 500.0, None],
+    })
+    d = _prepare_operatividad_data({"midagri": midagri, "materia": materia,
+                                    "fecha_corte": "01/03/2026", "prima_neta": 1500.0})
+
+    assert (d["total_avisos"], d["avisos_lp"], d["avisos_rimac"]) == (6, 2, 2)
+    assert (d["total_ajustados"], d["ajust_lp"], d["ajust_rimac"]) == (4, 1, 2)
+    assert d["avisos_by_depto"].to_dict() == {"CUSCO": 2, "PUNO": 2, "LIMA": 1}
+    # empates en orden de aparición, sin los tipos vacíos
+    assert list(d["avisos_by_tipo"].items()) == [("HELADA", 2), ("SEQUIA", 2), ("HUAYCO", 1)]
+    assert d["indemn_lp"] == 100.0 and d["idx_rimac"] == pytest.approx(14.0)
+
+    cob = {r["empresa"] + r["departamento"]: r for r in d["tabla_coberturas"]}
+    assert (cob["RÍMACPuno"]["catastrofica"], cob["RÍMACPuno"]["complementaria"]) == (70.0, 0.0)
+    assert cob["Total general"]["total"] == 170.0
+    # "None" contiene "NO": cuenta como no priorizado; NaN como priorizado
+    prio = {(r["empresa"], r["cultivo"]): r["indemnizacion"] for r in d["tabla_priorizados"]}
+    assert prio[("LA POSITIVA", "NO PRIORIZADO")] == 0.0
+    assert prio[("RÍMAC", "PRIORIZADO")] == 20.0 and prio[("RÍMAC", "NO PRIORIZADO")] == 50.0
+    desemb = [r for r in d["tabla_desembolsos"] if r["empresa"] == "RÍMAC"]
+    assert desemb[0]["pct_desembolso"] == pytest.approx(45 / 70 * 100)
+    assert desemb[0]["productores"] == 3
+
+
 # ─── PDF (fpdf2) ───
 def test_pdf_ejecutivo(datos_demo):
     pytest.importorskip("fpdf")
@@ -73,6 +177,76 @@ def test_pdf_ejecutivo(datos_demo):
     _assert_pdf(generate_executive_pdf(datos_demo))
 
 
+def test_pdf_por_departamento_zip(datos_demo):
+    pytest.importorskip("fpdf")
+    import io
+    import zipfile
+
+    import gen_pdf_resumen as g
+    from batch_reports import build_pdf_zip
+
+    datos = dict(datos_demo, departamentos_list=datos_demo["departamentos_list"][:3])
+    g._png_info.cache_clear()
+    zip_bytes, manifest = build_pdf_zip(datos)
+    assert not manifest["errores"] and len(manifest["archivos"]) == 3
+    assert set(manifest["tiempos"]) == set(datos["departamentos_list"])
+    with zipfile.ZipFile(io.BytesIO(zip_bytes)) as zf:
+        for n in manifest["archivos"]:
+            _assert_pdf(zf.read(n))
+
+    # Segunda corrida: imagen y observaciones salen de las cachés del proceso
+    obs_hits = g._observations.cache_info().hits
+    build_pdf_zip(datos)
+    assert g._png_info.cache_info().hits >= 3
+    assert g._observations.cache_info().hits >= obs_hits + 3
+
+
+
+@pytest.mark.parametrize("forzar", ["sin_image_cache", "info_incompatible"])
+def test_pdf_sin_cache_interna_de_fpdf2(datos_demo, monkeypatch, forzar):
+    """Otra versión de fpdf2 (p. ej. 2.7, sin image_cache) → pdf.image normal."""
+    pytest.importorskip("fpdf")
+    import gen_pdf_resumen as g
+
+    if forzar == "sin_image_cache":
+        monkeypatch.setattr(g, "_image_cache", lambda pdf: None)
+        monkeypatch.setattr(g, "_png_info", lambda png: pytest.fail("no debe sembrar"))
+    else:
+        def _roto(png):
+            raise TypeError("get_img_info() con otra firma")
+        monkeypatch.setattr(g, "_png_info", _roto)
+    pdf = g.generate_executive_pdf(datos_demo)
+    _assert_pdf(pdf)
+    assert b"/Subtype /Image" in bytes(pdf)
+
+
+def _render_o_morir(pid_padre, texto):
+    """En un worker del pool muere como un OOM kill; en el proceso padre renderiza."""
+    import os
+    if os.getpid() != pid_padre:
+        os._exit(1)
+    return texto.encode()
+
+
+def test_render_pool_worker_muerto_renderiza_lo_pendiente():
+    pytest.importorskip("streamlit")
+    import io
+    import os
+    import zipfile
+
+    from batch_reports import _render_pool
+
+    jobs = [(f"r{i}", f"r{i}.txt", (os.getpid(), f"x{i}")) for i in range(4)]
+    manifest = {"archivos": [], "errores": []}
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w") as zf:
+        _render_pool(_render_o_morir, jobs, zf, manifest, lambda *a: None, max_workers=2)
+    assert not manifest["errores"]
+    assert sorted(manifest["archivos"]) == [f"r{i}.txt" for i in range(4)]
+    assert "interrumpido" in manifest["modo"]
+    with zipfile.ZipFile(buf) as zf:
+        assert zf.read("r3.txt") == b"x3"
+
 # ─── PowerPoint (python-pptx) ───
 def test_ppt_historico(datos_demo):
     pytest.importorskip("pptx")
@@ -95,3 +269,198 @@ def test_ppt_dinamico(datos_demo):
     }
     df_ppt = datos_demo["midagri"]
     _assert_office(generar_ppt_dinamico(df_ppt, filtros, datos_demo["fecha_corte"]))
+
+
+# ─── Referencia por DataFrame para el planificador de gen_ppt_dinamico ───
+# Cálculo directo (una sección = un DataFrame filtrado) contra el que se
+# compara la pasada única de _planificar_secciones.
+def _ref_pipeline(df):
+    if "ESTADO_INSPECCION" not in df.columns:
+        return []
+    raw = df["ESTADO_INSPECCION"].astype(str).str.upper().value_counts().to_dict()
+    order = ["NOTIFICADO", "PROGRAMADO", "REPROGRAMADO", "CERRADO"]
+    result = [{"label": e.title(), "val": int(raw[e])} for e in order if raw.get(e, 0) > 0]
+    result += [{"label": k.title(), "val": int(v)} for k, v in raw.items() if k not in order and v > 0]
+    return result
+
+
+def _ref_top(df, col, n):
+    import pandas as pd
+    prods = pd.to_numeric(df["N_PRODUCTORES"], errors="coerce").fillna(0)
+    ind = pd.to_numeric(df["INDEMNIZACION"], errors="coerce").fillna(0)
+    prod_by_geo = prods.where(ind > 0, 0).groupby(df[col]).sum()
+    res = df.groupby(col).agg(Avisos=(col, "count"), Indem=("INDEMNIZACION", "sum"),
+                              Desemb=("MONTO_DESEMBOLSADO", "sum"), Ha=("SUP_INDEMNIZADA", "sum"))
+    res = res.reset_index().sort_values("Avisos", ascending=False).head(n)
+    return [{"name": str(r[col]), "avisos": int(r["Avisos"]), "indem": float(r["Indem"]),
+             "desemb": float(r["Desemb"]), "ha": round(float(r["Ha"]), 2),
+             "prod": int(prod_by_geo[r[col]])} for _, r in res.iterrows()]
+
+
+def _ref_empresas(df, metricas):
+    return [{"empresa": str(e), **metricas(df[df["EMPRESA"] == e])}
+            for e in df["EMPRESA"].dropna().unique()]
+
+
+def _ref_dictamen(df):
+    for col in ["DICTAMEN", "RESULTADO_AJUSTE", "RESULTADO_INSPECCION"]:
+        if col in df.columns:
+            counts = df[col].astype(str).str.upper().value_counts().to_dict()
+            return {k: int(v) for k, v in counts.items() if k not in ("NAN", "NONE", "")}
+    return {}
+
+
+def _ref_empresa_comp(df):
+    counts = df["EMPRESA"].value_counts()
+    if len(counts) == 1:
+        return f"Opera exclusivamente con {counts.index[0]}"
+    return " · ".join(f"{e}: {c / counts.sum() * 100:.0f}%" for e, c in counts.items())
+
+
+def test_ppt_dinamico_planificador_equivale_por_seccion(datos_demo):
+    pytest.importorskip("pptx")
+    import gen_ppt_dinamico as g
+
+    df = datos_demo["midagri"]
+    filtros = {"departamentos": ["CUSCO", "PUNO", "LIMA"], "provincias": ["CALCA"],
+               "distritos": ["PISAC"], "tipos_siniestro": ["SEQUIA", "GRANIZO"]}
+    data = g._prepare_data(df, filtros, datos_demo["fecha_corte"])
+    n1 = {(s["type"], s.get("name")): s for s in data["nivel1_sections"]}
+    # LIMA no tiene avisos → sin sección
+    assert set(n1) == {("nacional", None), ("departamental", "CUSCO"),
+                       ("departamental", "PUNO"), ("provincial", "CALCA"),
+                       ("distrital", "PISAC")}
+
+    cusco = df[df["DEPARTAMENTO"] == "CUSCO"]
+    sec = n1[("departamental", "CUSCO")]
+    assert sec["metricas"] == g._calcular_metricas(cusco)
+    assert sec["pipeline"] == _ref_pipeline(cusco)
+    assert sec["dictamen"] == _ref_dictamen(cusco)
+    assert sec["empresa_comp"] == _ref_empresa_comp(cusco)
+    key = lambda r: r["name"]
+    assert sorted(sec["provincias"], key=key) == sorted(_ref_top(cusco, "PROVINCIA", 20), key=key)
+    nac = n1[("nacional", None)]
+    assert nac["empresas"] == _ref_empresas(df, g._calcular_metricas)
+    assert nac["n_deptos"] == df["DEPARTAMENTO"].nunique()
+    assert n1[("distrital", "PISAC")]["prov"] == "CALCA"
+
+    df2 = df[df["TIPO_SINIESTRO"].isin(filtros["tipos_siniestro"])]
+    n2 = {(s["type"], s.get("name")): s for s in data["nivel2_sections"]}
+    assert n2[("nacional", None)]["metricas"] == g._calcular_metricas(df2)
+    assert ("departamental", "CUSCO") in n2 and ("departamental", "PUNO") in n2
+
+
+def test_batch_zip_paralelo(datos_demo):
+    pytest.importorskip("docx")
+    import io
+    import json
+    import zipfile
+
+    from batch_reports import MANIFEST_FILENAME, build_batch_zip
+
+    datos = dict(datos_demo, departamentos_list=["CUSCO", "PIURA"])
+    zip_bytes, manifest = build_batch_zip(datos, parallel=True, max_workers=2)
+    with zipfile.ZipFile(io.BytesIO(zip_bytes)) as zf:
+        nombres = set(zf.namelist())
+        assert json.loads(zf.read(MANIFEST_FILENAME))["archivos"] == manifest["archivos"]
+        for n in manifest["archivos"]:
+            _assert_office(zf.read(n))
+    assert "Ayuda_Memoria_CUSCO_SAC.docx" in nombres
+    assert len(manifest["archivos"]) + len(manifest["errores"]) == 3
+
+
+def test_word_esqueleto_filas_clonadas_independientes(datos_demo):
+    # Las filas de tabla son copias de un prototipo cacheado: dos documentos
+    # seguidos no deben compartir ni arrastrar texto entre sí.
+    pytest.importorskip("docx")
+    import io
+
+    from docx import Document
+
+    from data_processor import get_departamento_data
+    from gen_word_bridge_py import generate_departamental_docx
+
+    deptos = datos_demo["departamentos_list"][:2]
+    docs = [Document(io.BytesIO(generate_departamental_docx(
+        get_departamento_data(datos_demo, d)))) for d in deptos]
+    for depto, doc in zip(deptos, docs):
+        assert any(depto.upper() in p.text.upper() for p in doc.paragraphs)
+        assert doc.tables[0].rows[0].cells[1].text == "Etapa"
+    tablas = [[[c.text for c in r.cells] for r in doc.tables[2].rows] for doc in docs]
+    assert tablas[0] != tablas[1]
+
+
+def test_ppt_historico_layouts_y_prototipos(datos_demo):
+    # Fondo/marco vienen del layout del master; tarjetas y filas son clones
+    # de prototipos cacheados, con ids de shape únicos y su propio texto.
+    pytest.importorskip("pptx")
+    import io
+
+    from pptx import Presentation
+
+    from data_processor import load_primas_historicas
+    from gen_ppt_historico import LAYOUT_CONTENIDO, LAYOUT_PORTADA, generar_ppt_historico
+
+    primas = load_primas_historicas()
+    decks = [Presentation(io.BytesIO(generar_ppt_historico(d, datos_demo, primas)))
+             for d in ("CUSCO", "PUNO")]
+    for prs in decks:
+        assert {lo.name for lo in prs.slide_layouts} == {LAYOUT_PORTADA, LAYOUT_CONTENIDO}
+        assert prs.slides[0].slide_layout.name == LAYOUT_PORTADA
+        for slide in prs.slides:
+            ids = [sh.shape_id for sh in slide.shapes]
+            assert len(ids) == len(set(ids))
+    textos = [[sh.text_frame.text for sh in prs.slides[1].shapes if sh.has_text_frame]
+              for prs in decks]
+    assert "PRIMA NETA ACUMULADA" in textos[0]
+    assert textos[0] != textos[1]
+
+
+def test_historico_zip_todos_los_departamentos(datos_demo):
+    pytest.importorskip("pptx")
+    import io
+    import zipfile
+
+    from batch_reports import build_historico_zip
+    from data_processor import load_primas_historicas
+    from gen_ppt_historico import extract_current_campaigns
+
+    # Una pasada sobre midagri reparte todas las filas entre los departamentos
+    deptos = datos_demo["departamentos_list"]
+    actuales = extract_current_campaigns(datos_demo, [d.title() for d in deptos])
+    assert sum(a["avisos"] for a in actuales.values() if a) == len(datos_demo["midagri"])
+
+    datos = dict(datos_demo, departamentos_list=deptos[:2])
+    zip_bytes, manifest = build_historico_zip(datos, load_primas_historicas(),
+                                              parallel=True, max_workers=2)
+    assert not manifest["errores"]
+    with zipfile.ZipFile(io.BytesIO(zip_bytes)) as zf:
+        assert sorted(manifest["archivos"]) == sorted(
+            f"Historico_SAC_{d.replace(' ', '_')}.pptx" for d in deptos[:2])
+        for n in manifest["archivos"]:
+            _assert_office(zf.read(n))
+
+
+def test_paquete_departamento(datos_demo):
+    for mod in ("docx", "pptx", "fpdf", "openpyxl"):
+        pytest.importorskip(mod)
+    import io
+    import zipfile
+
+    from batch_reports import BUNDLE_FORMATOS, build_departamento_bundle, read_manifest
+
+    depto = datos_demo["departamentos_list"][0]
+    zip_bytes, manifest = build_departamento_bundle(datos_demo, depto, parallel=True,
+                                                    max_workers=2)
+    assert not manifest["errores"]
+    assert read_manifest(zip_bytes)["departamento"] == depto
+    labels = [label for label, _ in BUNDLE_FORMATOS.values()]
+    assert set(manifest["tiempos"]) == {"Preparación", *labels}
+    with zipfile.ZipFile(io.BytesIO(zip_bytes)) as zf:
+        assert len(manifest["archivos"]) == len(BUNDLE_FORMATOS)
+        for n in manifest["archivos"]:
+            data = zf.read(n)
+            if n.endswith(".pdf"):
+                _assert_pdf(data)
+            else:
+                _assert_office(data)
@@ -0,0 +1,114 @@
+"""Tests del índice de centroides distritales (shared/geo.py).
+
+Fijan que el índice generado por tools/generar_centroides_distritales.py
+ubica los distritos DENTRO de su departamento (no en un jitter arbitrario)
+y que la búsqueda tolera tildes/Ñ y variantes de provincia.
+"""
+import pytest
+
+from shared import geo
+from tools.generar_centroides_distritales import geometry_area_centroid
+
+
+@pytest.fixture(scope="module")
+def idx():
+    data = geo.load_centroides()
+    if not data:
+        pytest.skip("centroides_distritales.json no generado")
+    return data
+
+
+def test_centroide_cuadrado():
+    sq = {"type": "Polygon", "coordinates": [[[0, 0], [2, 0], [2, 2], [0, 2], [0, 0]]]}
+    area, lon, lat = geometry_area_centroid(sq)
+    assert area == pytest.approx(4.0)
+    assert (lon, lat) == pytest.approx((1.0, 1.0))
+
+
+def test_centroide_con_hueco():
+    # Cuadrado 4x4 con hueco 2x2 pegado a la izquierda → centroide corrido a la derecha
+    geom = {"type": "Polygon", "coordinates": [
+        [[0, 0], [4, 0], [4, 4], [0, 4], [0, 0]],
+        [[0, 1], [2, 1], [2, 3], [0, 3], [0, 1]],
+    ]}
+    area, lon, lat = geometry_area_centroid(geom)
+    assert area == pytest.approx(12.0)
+    assert lon > 2.0
+    assert lat == pytest.approx(2.0)
+
+
+def test_norm_geo_tildes_y_enie():
+    assert geo.norm_geo("  Ñahuimpuquio ") == "NAHUIMPUQUIO"
+    assert geo.geo_key("Cusco", "Calca", "Písac") == "CUSCO|CALCA|PISAC"
+
+
+def test_distrito_dentro_del_departamento(idx):
+    lat, lon = geo.coords_distrito("CUSCO", "CALCA", "PISAC")
+    # Bounding box aproximado del Cusco
+    assert -15.5 < lat < -11.0 and -74.0 < lon < -70.3
+
+
+def test_homonimos_se_distinguen_por_provincia(idx):
+    # MIRAFLORES existe en Lima Metropolitana y en Yauyos
+    a = geo.coords_distrito("LIMA", "LIMA", "MIRAFLORES")
+    b = geo.coords_distrito("LIMA", "YAUYOS", "MIRAFLORES")
+    assert a and b and a != b
+
+
+def test_fallback_sin_provincia(idx):
+    # Provincia mal escrita → cae a (depto, distrito) si el nombre es único
+    assert geo.coords_distrito("CUSCO", "XXX", "PISAC") == geo.coords_distrito("CUSCO", "CALCA", "PISAC")
+    assert geo.coords_distrito("CUSCO", "XXX", "NO EXISTE") is None
+
+
+# ─── Geometrías de sectores simplificadas (TopoJSON) ───
+def _sq(x0, y0, x1, y1, key):
+    return {"type": "Feature", "properties": {"key": key}, "geometry": {
+        "type": "Polygon",
+        "coordinates": [[[x0, y0], [x1, y0], [x1, y1], [x0, y1], [x0, y0]]]}}
+
+
+def test_topologia_borde_compartido_una_vez():
+    from tools.simplificar_geometrias import build_topology, encode_level
+    feats = [_sq(0, 0, 1, 1, "A"), _sq(1, 0, 2, 1, "B")]
+    arcs, geoms = build_topology(feats)
+    # 2 bordes propios + 1 compartido (x=1) — el compartido no se duplica
+    assert len(arcs) == 3
+    topo = encode_level(arcs, geoms, tol_deg=0.0, quantum_deg=0.001)
+    gj = geo.decode_topojson(topo)
+    assert [f["properties"]["key"] for f in gj["features"]] == ["A", "B"]
+    a = {tuple(p) for p in gj["features"][0]["geometry"]["coordinates"][0]}
+    b = {tuple(p) for p in gj["features"][1]["geometry"]["coordinates"][0]}
+    assert a & b == {(1.0, 0.0), (1.0, 1.0)}
+
+
+def test_sector_geojson_simplificado_conserva_sectores():
+    if not geo.pick_sector_level("CUSCO.geojson"):
+        pytest.skip("sectores_topo no generado")
+    import json
+    import os
+    with open(os.path.join(geo.SECTORES_DIR, "CUSCO.geojson"), encoding="utf-8") as f:
+        orig = json.load(f)
+    simp = geo.load_sector_geojson("CUSCO.geojson")
+    assert len(simp["features"]) == len(orig["features"])
+    assert all(f["geometry"] is not None for f in simp["features"])
+    # cacheado por proceso: misma instancia en la segunda llamada
+    assert geo.load_sector_geojson("CUSCO.geojson") is simp
+
+
+def test_choropleth_reusa_capa_base_sin_mutarla():
+    pytest.importorskip("plotly")
+    pytest.importorskip("streamlit")
+    import gen_mapa_coropleta as gmc
+    if gmc._load_geojson() is None:
+        pytest.skip("peru_departamentos no disponible")
+    fig = gmc.choropleth_figure(["Cusco", "Junín"], [10.0, 20.0], colorbar_title="X")
+    assert list(fig.data[0].locations) == ["CUSCO", "JUNIN"]
+    assert list(fig.data[0].z) == [10.0, 20.0]
+    # La geometría se comparte (sin deepcopy ni revalidación por figura)
+    assert fig.data[0].geojson is gmc._load_geojson()
+    # La figura base cacheada no cambia al armar una métrica
+    base = gmc._base_figure()
+    assert len(base.data[0].locations) == len(gmc._load_geojson()["features"])
+    assert base.data[0].geojson is None
+    assert gmc._base_figure() is base
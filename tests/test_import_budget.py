@@ -0,0 +1,65 @@
+"""Presupuesto de importación en frío del arranque (shared/import_profiler)."""
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from shared import import_profiler
+
+# Presupuesto opcional (segundos) para importar en frío el grafo de arranque
+# (app.py + página inicial; hoy ~0.9 s). Sólo se verifica si está definido:
+# el tiempo de pared no es confiable en runners compartidos. La condición
+# dura es que no se carguen librerías pesadas.
+PRESUPUESTO_S = os.environ.get("SAC_IMPORT_BUDGET_S")
+
+
+def _importar_en_frio(*modulos):
+    out = subprocess.run(
+        [sys.executable, "-m", "shared.import_profiler", "--json", *modulos],
+        cwd=import_profiler.RAIZ, capture_output=True, text=True, check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def test_grafo_de_arranque_dentro_del_presupuesto():
+    pytest.importorskip("streamlit")
+    pytest.importorskip("plotly")
+    res = _importar_en_frio()
+    assert "data_processor" in res["modulos"] and "shared.components" in res["modulos"]
+    assert res["pesadas"] == []
+    if PRESUPUESTO_S:
+        assert res["total_s"] < float(PRESUPUESTO_S), (
+            f"importar el arranque tomó {res['total_s']:.2f} s (presupuesto {PRESUPUESTO_S} s); "
+            f"ver python -m shared.import_profiler")
+
+
+def test_pagina_reportes_no_importa_generadores_pesados():
+    pytest.importorskip("streamlit")
+    pytest.importorskip("plotly")
+    mods = import_profiler.modulos_de(os.path.join(import_profiler.RAIZ, "pages", "reportes.py"))
+    assert _importar_en_frio(*mods)["pesadas"] == []
+
+
+@pytest.fixture
+def perfil(tmp_path, monkeypatch):
+    monkeypatch.syspath_prepend(str(tmp_path))
+    import_profiler.activar()
+    yield tmp_path
+    import_profiler.desactivar()
+    for m in ("_perfil_hijo", "_perfil_padre"):
+        sys.modules.pop(m, None)
+
+
+def test_perfil_mide_propio_y_acumulado(perfil):
+    (perfil / "_perfil_hijo.py").write_text("import time\ntime.sleep(0.02)\n")
+    (perfil / "_perfil_padre.py").write_text(
+        "import _perfil_hijo\n\ndef f():\n    import json\n")
+    import _perfil_padre  # noqa: F401
+
+    reg = {m: (p, a) for m, p, a in import_profiler.registros()}
+    assert reg["_perfil_hijo"][1] >= 0.02
+    assert reg["_perfil_padre"][1] >= reg["_perfil_hijo"][1] > reg["_perfil_padre"][0]
+    assert import_profiler.modulos_de(str(perfil / "_perfil_padre.py")) == ["_perfil_hijo"]
+    assert "_perfil_padre" in import_profiler.tabla(import_profiler.registros())
@@ -0,0 +1,68 @@
+"""Tests de la cola de reportes en segundo plano (shared/jobs.py)."""
+import threading
+import time
+
+import pandas as pd
+
+from shared import jobs
+
+
+def _wait(q, key, timeout=5.0):
+    t0 = time.time()
+    while q.status(key)["estado"] in (jobs.PENDIENTE, jobs.EN_CURSO):
+        assert time.time() - t0 < timeout, "el trabajo no terminó"
+        time.sleep(0.01)
+    return q.status(key)
+
+
+def test_fingerprint_estable_y_sensible_al_contenido():
+    df = pd.DataFrame({"A": [1, 2, 3]})
+    d1 = {"fecha_corte": "01/03/2026", "midagri": df}
+    d2 = {"fecha_corte": "01/03/2026", "midagri": df.copy()}
+    d3 = {"fecha_corte": "01/03/2026", "midagri": df.assign(A=[1, 2, 4])}
+    assert jobs.dataset_fingerprint(d1) == jobs.dataset_fingerprint(d2)
+    assert jobs.dataset_fingerprint(d1) != jobs.dataset_fingerprint(d3)
+    assert jobs.job_key("x", "eme", {"b": 1, "a": 2}) == jobs.job_key("x", "eme", {"a": 2, "b": 1})
+
+
+def test_pedidos_identicos_se_generan_una_vez():
+    q = jobs.ReportJobQueue(max_workers=2)
+    llamadas = []
+    gate = threading.Event()
+
+    def gen():
+        llamadas.append(1)
+        gate.wait(2)
+        return b"DOC"
+
+    k1 = q.submit("k", gen)
+    k2 = q.submit("k", gen)  # otro usuario, mismo reporte
+    gate.set()
+    assert k1 == k2
+    assert _wait(q, k1)["estado"] == jobs.LISTO
+    assert q.result(k1) == b"DOC"
+    assert len(llamadas) == 1
+
+
+def test_progreso_y_error_con_reintento():
+    q = jobs.ReportJobQueue(max_workers=1)
+
+    def gen(progress_callback=None):
+        progress_callback(1, 2, "mitad")
+        raise ValueError("boom")
+
+    k = q.submit("e", gen, progress_kw="progress_callback")
+    st = _wait(q, k)
+    assert st["estado"] == jobs.ERROR and st["error"] == "boom"
+    assert st["progreso"] == 0.5
+    q.submit("e", lambda: b"ok")  # los fallidos se reintentan
+    assert _wait(q, "e")["estado"] == jobs.LISTO
+
+
+def test_cache_acotada_por_cantidad_y_bytes():
+    q = jobs.ReportJobQueue(max_workers=1, max_resultados=2, max_bytes=10)
+    for k in "abc":
+        _wait(q, q.submit(k, lambda: b"1234"))
+    assert q.status("a") is None  # el más antiguo se desalojó
+    _wait(q, q.submit("grande", lambda: b"x" * 8))
+    assert q.stats()["bytes"] <= 10
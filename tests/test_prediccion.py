@@ -183,3 +183,81 @@ def test_predecir_cierre_incluye_backtest():
     assert res["mae_fuente"].startswith("backtest")
     # MAE reportado debe ser un número finito y no negativo
     assert res["MAE_mes_actual"] >= 0
+
+
+# ─── Almacén de curvas históricas ───
+def test_curvas_store_carga_unica_y_tablas_equivalentes():
+    store = p.curvas_nacionales()
+    assert p.curvas_nacionales() is store  # un solo armado por proceso
+    assert store.series["n"].shape == (len(p.CAMPANAS_HIST), 12)
+    curvas = p._curvas_historicas()
+    for i, c in enumerate(p.CAMPANAS_HIST):
+        assert store.avance["monto"][i].tolist() == pytest.approx(p._avance_acumulado(curvas["monto"][c]))
+        assert store.avance_en("n", 9.33)[i] == pytest.approx(p._avance_en_idx(curvas["n"][c], 9.33))
+
+    dept = p.curvas_departamentales()
+    assert dept.series["n"].shape == (len(dept.depts), len(p.CAMPANAS_HIST), 12)
+    assert set(dept.depts) == set(p._curvas_dept())
+
+
+def test_backtest_acepta_store_o_dict():
+    fake = _curvas_fake()
+    desde_dict = p.backtest_modelo(fake)
+    desde_store = p.backtest_modelo(p.CurvasHistoricas.desde_dict(fake))
+    assert desde_dict["mae_por_mes"] == desde_store["mae_por_mes"]
+
+
+def test_loo_forma_cerrada_igual_a_polyfit():
+    # La regresión en lote (backtest_tabla) reproduce _avance_loo (np.polyfit)
+    import numpy as np
+    rng = np.random.default_rng(7)
+    avances = rng.random((12, 5))
+    w = np.ones(5)
+    hold = np.arange(5)
+    entren = w * (hold[:, None] != hold[None, :])
+    lote = p._ajuste_lineal(avances[:, None, :], entren[None, :, :], hold)
+    for m in range(12):
+        for i in range(5):
+            assert lote[m, i] == pytest.approx(p._avance_loo(list(avances[m]), i), abs=1e-12)
+
+
+def test_predecir_por_dept_elige_modelo_por_backtest():
+    depts = list(p.curvas_departamentales().depts)
+    df = pd.DataFrame({
+        "DEPARTAMENTO": depts * 3,
+        "DICTAMEN": ["INDEMNIZABLE"] * (3 * len(depts)),
+        "FECHA_AJUSTE_ACTA_FINAL": [pd.Timestamp("2026-03-10")] * (3 * len(depts)),
+        "INDEMNIZACION": [1000.0] * (3 * len(depts)),
+    })
+    res = p.predecir_por_dept(df, 8.0, today=date(2026, 4, 1))
+    assert res and all(r["modelo_n"] in p.MODELOS for r in res)
+    tabla = p.backtest_tabla(p.curvas_departamentales())
+    for r in res:
+        i = depts.index(r["departamento"])
+        mae_default = tabla["mae"][p.MODELO_DEPT_DEFAULT]["n"][i, 8]
+        if r["mae_backtest_n"] is not None:
+            # el modelo elegido nunca es peor que el default fijo anterior
+            assert r["mae_backtest_n"] <= mae_default + 1e-9
+
+
+# ─── Bandas bootstrap ───
+def test_bandas_cierre_reproducibles_y_ordenadas():
+    b1 = p.bandas_cierre(500.0, 5e6, 8.0, 5e7)
+    p.bandas_cierre.cache_clear()
+    p._avances_bootstrap.cache_clear()
+    b2 = p.bandas_cierre(500.0, 5e6, 8.0, 5e7)
+    assert b1 == b2  # misma semilla → mismas bandas
+    for clave in ("casos", "monto", "siniestralidad"):
+        assert b1[clave]["P10"] <= b1[clave]["P50"] <= b1[clave]["P90"]
+    assert b1["casos"]["P10"] >= 500.0  # el cierre nunca baja del acumulado
+    assert b1["siniestralidad"]["P50"] == pytest.approx(b1["monto"]["P50"] / 5e7 * 100)
+
+
+def test_pesos_bootstrap_solo_campanas_validas():
+    import numpy as np
+    valida = np.array([[True, False, True, True, False], [False] * 5])
+    u = np.random.default_rng(0).random((200,) + valida.shape)
+    pesos = p._pesos_bootstrap(valida, u)
+    assert (pesos[:, 0].sum(-1) == 3).all()      # k extracciones
+    assert (pesos[:, 0, [1, 4]] == 0).all()      # nunca campañas sin datos
+    assert (pesos[:, 1] == 0).all()              # dept sin historia → sin pesos
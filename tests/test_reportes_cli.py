@@ -0,0 +1,52 @@
+"""Tests de la generación de reportes sin interfaz (reportes_cli.py)."""
+import json
+import os
+
+import pytest
+
+import reportes_cli as cli
+
+
+def test_generate_reports_escribe_archivos_y_tiempos(datos_demo, tmp_path):
+    pytest.importorskip("docx")
+    res = cli.generate_reports(datos_demo, str(tmp_path), ["nacional", "departamental", "eme"],
+                               workers=2, log=lambda *_: None)
+    assert [r["error"] for r in res] == [None] * len(res)
+    assert len(res) == 2 + len(datos_demo["departamentos_list"])
+    for r in res:
+        assert os.path.getsize(tmp_path / r["archivo"]) == r["bytes"] > 1024
+        assert r["segundos"] >= 0
+
+
+def test_main_argumentos_y_tiempos(datos_demo, tmp_path, monkeypatch):
+    # load_datos se reemplaza: el test cubre argumentos, tiempos.json y código de salida
+    monkeypatch.setattr(cli, "load_datos", lambda *a: (datos_demo, "test", 0.0))
+    out = tmp_path / "out"
+    rc = cli.main(["--lp", "lp.xlsx", "--rimac", "r.xlsx", "-o", str(out),
+                   "--solo", "eme", "--workers", "1"])
+    assert rc == 0
+    tiempos = json.loads((out / cli.TIEMPOS_FILENAME).read_text(encoding="utf-8"))
+    assert [a["artefacto"] for a in tiempos["artefactos"]] == ["eme"]
+
+    with pytest.raises(SystemExit):
+        cli.main(["--snapshot", "-o", str(out), "--solo", "eme,xyz"])
+
+
+_PID_TESTS = os.getpid()
+
+
+def _generar_o_morir(datos, arg):
+    """En un worker muere como un OOM kill; en el proceso de los tests genera."""
+    if os.getpid() != _PID_TESTS:
+        os._exit(1)
+    return f"x{arg}".encode()
+
+
+def test_worker_muerto_genera_lo_pendiente_en_este_proceso(tmp_path, monkeypatch):
+    monkeypatch.setitem(cli._GENERADORES, "morir", _generar_o_morir)
+    monkeypatch.setattr(cli, "plan_jobs", lambda datos, artefactos, hoy:
+                        [("morir", i, f"r{i}.txt") for i in range(4)])
+    res = cli.generate_reports({}, str(tmp_path), ["morir"], workers=2, log=lambda *_: None)
+    assert [r["error"] for r in res] == [None] * 4
+    assert sorted(r["archivo"] for r in res) == [f"r{i}.txt" for i in range(4)]
+    assert (tmp_path / "r3.txt").read_bytes() == b"x3"
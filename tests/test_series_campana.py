@@ -0,0 +1,48 @@
+"""Tests de la matriz dept × mes de la campaña en curso (shared/series_campana)."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from shared.series_campana import codigos_dept, mes_campana, series_campana
+
+
+def test_codigos_dept_unifica_tildes_y_descarta_vacios():
+    codes, nombres = codigos_dept(pd.Series(["Huánuco", " HUANUCO", "cusco", None, "", "CUSCO"]))
+    assert nombres == ["HUANUCO", "CUSCO"]
+    assert codes.tolist() == [0, 0, 1, -1, -1, 1]
+
+
+def test_mes_campana_fuera_de_rango():
+    fechas = pd.Series(["2025-07-31", "2025-08-01", "2026-07-15", "2026-08-01", None])
+    assert mes_campana(fechas, "2025-2026").tolist() == [-1, 0, 11, -1, -1]
+
+
+def test_matriz_dept_y_nacional():
+    df = pd.DataFrame({
+        "DEPARTAMENTO": ["Cusco", "CUSCO", "Puno", None, "Puno"],
+        "DICTAMEN": ["INDEMNIZABLE", "INDEMNIZABLE", "INDEMNIZABLE", "INDEMNIZABLE", "NO INDEMNIZABLE"],
+        "FECHA_AJUSTE_ACTA_FINAL": pd.to_datetime(
+            ["2025-09-10", "2026-03-02", "2026-03-20", "2026-03-05", "2026-03-05"]),
+        "INDEMNIZACION": [100.0, 200.0, 50.0, 10.0, 999.0],
+    })
+    s = series_campana(df, "2025-2026")
+    assert s.depts == ("CUSCO", "PUNO")
+    assert s.n[0].tolist() == [0, 1, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0]
+    assert s.dept("Cusco")[1].sum() == pytest.approx(300.0)
+    # La serie nacional incluye la fila sin departamento; NO INDEMNIZABLE no cuenta
+    assert s.n_nacional.sum() == 4
+    assert s.monto_nacional[7] == pytest.approx(260.0)
+    assert series_campana(df, "2025-2026") is s  # memoizado por DataFrame
+    assert np.array_equal(s.dept("Ayacucho")[0], np.zeros(12))
+
+
+def test_avisos_sin_fecha_de_ajuste():
+    df = pd.DataFrame({
+        "DEPARTAMENTO": ["Cusco", "Puno", None, "Puno"],
+        "FECHA_AVISO": pd.to_datetime(["2025-08-03", "2025-08-20", "2025-10-01", "2024-12-01"]),
+    })
+    s = series_campana(df, "2025-2026")
+    assert s.columna_fecha is None and s.columna_fecha_avisos == "FECHA_AVISO"
+    assert s.n_nacional.sum() == 0
+    assert s.avisos[s.dept_idx["PUNO"]].tolist() == [1] + [0] * 11
+    assert s.avisos_nacional.tolist() == [2, 0, 1] + [0] * 9
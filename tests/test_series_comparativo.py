@@ -0,0 +1,49 @@
+"""Tests de las series de 6 campañas del comparativo (shared/series_comparativo)."""
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from prediccion_siniestralidad import curvas_departamentales, curvas_nacionales
+from shared.series_comparativo import CAMPANAS, mes_vigente, series_comparativo
+
+
+def _df():
+    return pd.DataFrame({
+        "DEPARTAMENTO": ["Huánuco", "HUANUCO", "Cusco"],
+        "FECHA_AVISO": pd.to_datetime(["2025-08-05", "2026-02-10", "2025-09-01"]),
+        "FECHA_AJUSTE_ACTA_FINAL": pd.to_datetime(["2025-09-01", "2026-03-01", "2025-10-01"]),
+        "DICTAMEN": ["INDEMNIZABLE"] * 3,
+        "INDEMNIZACION": [100.0, 200.0, 300.0],
+    })
+
+
+def test_mes_vigente():
+    assert mes_vigente("2025-2026", date(2025, 8, 1)) == 0
+    assert mes_vigente("2025-2026", date(2026, 7, 31)) == 11
+    assert mes_vigente("2025-2026", date(2026, 8, 1)) is None
+
+
+def test_seis_campanas_nacional_y_dept():
+    df = _df()
+    sc = series_comparativo(df, today=date(2026, 10, 1))  # campaña cerrada: sin corte
+    assert sc.nacional["avisos"].shape == (len(CAMPANAS), 12)
+    np.testing.assert_array_equal(sc.nacional["n"][:-1], curvas_nacionales().series["n"])
+    assert sc.nacional["monto"][-1].sum() == 600.0
+    assert series_comparativo(df, today=date(2026, 10, 2)) is sc
+
+    hist = curvas_departamentales()
+    if hist.depts:
+        d = hist.depts[0]
+        np.testing.assert_array_equal(sc.dept(d)["avisos"][:-1], hist.series["avisos"][0])
+    huanuco = sc.dept("huánuco")
+    assert huanuco["avisos"][-1].tolist() == [1, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0]
+    assert list(sc.por_campana(huanuco["n"])) == list(CAMPANAS)
+
+
+def test_campana_en_curso_cortada_en_mes_vigente():
+    sc = series_comparativo(_df(), today=date(2026, 1, 15))  # Ene → índice 5
+    actual = sc.nacional["avisos"][-1]
+    assert np.isnan(actual[6:]).all() and actual[:6].tolist() == [1, 1, 0, 0, 0, 0]
+    assert not np.isnan(sc.nacional["avisos"][:-1]).any()
+    assert np.isnan(sc.dept("CUSCO")["monto"][-1, 6:]).all()
@@ -0,0 +1,91 @@
+"""Tests del registro de assets estáticos a demanda (shared/static_assets)."""
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from shared import static_assets
+
+
+@pytest.fixture
+def assets(tmp_path, monkeypatch):
+    monkeypatch.setattr(static_assets, "STATIC_DIR", str(tmp_path))
+    monkeypatch.setattr(static_assets, "ASSETS", {"demo": "demo.json"})
+    static_assets.limpiar()
+    yield tmp_path
+    static_assets.limpiar()
+
+
+def test_importar_modulos_no_lee_los_assets():
+    pytest.importorskip("streamlit")
+    pytest.importorskip("plotly")
+    raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    out = subprocess.run(
+        [sys.executable, "-c",
+         "import calendario_agricola, clima_riesgo; from shared import static_assets; "
+         "print(sorted(static_assets.tiempos_carga()))"],
+        cwd=raiz, capture_output=True, text=True, check=True,
+    )
+    assert out.stdout.strip().splitlines()[-1] == "[]"
+
+
+def test_calendario_se_lee_en_el_primer_uso():
+    pytest.importorskip("streamlit")
+    pytest.importorskip("plotly")
+    import calendario_agricola
+    static_assets.limpiar()
+    assert calendario_agricola.get_department_list()
+    assert static_assets.cargado("calendario_cultivos")
+    cal = calendario_agricola.calendario_cultivos()
+    assert calendario_agricola.CALENDARIO_CULTIVOS is cal
+    static_assets.limpiar()  # limpiar() también descarta el calendario armado
+    assert calendario_agricola.calendario_cultivos() is not cal
+
+
+def test_carga_una_vez_y_registra_tiempo(assets):
+    (assets / "demo.json").write_text(json.dumps({"a": 1}), encoding="utf-8")
+    obj = static_assets.cargar("demo")
+    assert obj == {"a": 1}
+    assert static_assets.cargar("demo") is obj
+    t = static_assets.tiempos_carga()["demo"]
+    assert t["fuente"].endswith("demo.json") and t["segundos"] >= 0
+
+
+def test_derivado_se_arma_una_vez_y_limpiar_lo_descarta(assets):
+    (assets / "demo.json").write_text(json.dumps({"a": 1}), encoding="utf-8")
+    llamadas = []
+
+    def construir(raw):
+        llamadas.append(raw)
+        return {k.upper(): v for k, v in raw.items()}
+
+    assert static_assets.derivado("demo", construir) == {"A": 1}
+    assert static_assets.derivado("demo", construir) == {"A": 1}
+    assert len(llamadas) == 1
+    static_assets.limpiar()
+    static_assets.derivado("demo", construir)
+    assert len(llamadas) == 2
+
+
+def test_sin_archivo_devuelve_vacio(assets):
+    assert static_assets.cargar("demo") == {}
+    assert static_assets.tiempos_carga()["demo"]["fuente"] is None
+
+
+def test_prefiere_msgpack_si_no_es_mas_viejo(assets):
+    msgpack = pytest.importorskip("msgpack")
+    path_json = assets / "demo.json"
+    path_json.write_text(json.dumps({"de": "json"}), encoding="utf-8")
+    path_bin = assets / "demo.msgpack"
+    path_bin.write_bytes(msgpack.packb({"de": "msgpack"}))
+
+    os.utime(path_bin, (1, 1))  # binario desactualizado → JSON
+    assert static_assets.cargar("demo") == {"de": "json"}
+
+    static_assets.limpiar()
+    os.utime(path_bin, None)
+    os.utime(path_json, (1, 1))
+    assert static_assets.cargar("demo") == {"de": "msgpack"}
+    assert static_assets.tiempos_carga()["demo"]["fuente"].endswith(".msgpack")
@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+"""Convierte los assets JSON de shared/static_assets a msgpack.
+
+Por cada asset registrado en static_assets.ASSETS escribe, junto al JSON,
+el mismo objeto serializado con msgpack (<archivo>.msgpack). Es más chico
+y se decodifica varias veces más rápido que el JSON; static_assets lo usa
+cuando existe, no es más viejo que el JSON y msgpack está instalado.
+
+Requiere msgpack (pip install msgpack). Correr cuando cambien los JSON:
+    python tools/convertir_assets_msgpack.py
+"""
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from shared.static_assets import ASSETS, ruta_binaria, ruta_json
+
+
+def main():
+    import msgpack
+
+    for nombre in ASSETS:
+        path_json = ruta_json(nombre)
+        if not os.path.exists(path_json):
+            print(f"  {nombre}: no existe {path_json}, se omite")
+            continue
+        with open(path_json, "r", encoding="utf-8") as f:
+            obj = json.load(f)
+        data = msgpack.packb(obj, use_bin_type=True)
+        path_bin = ruta_binaria(nombre)
+        with open(path_bin, "wb") as f:
+            f.write(data)
+
+        t0 = time.perf_counter()
+        with open(path_json, "r", encoding="utf-8") as f:
+            json.load(f)
+        t_json = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        msgpack.unpackb(data, raw=False, strict_map_key=False)
+        t_bin = time.perf_counter() - t0
+        print(f"  {nombre}: {os.path.getsize(path_json) / 1024:.0f} KB → "
+              f"{len(data) / 1024:.0f} KB  (lectura {t_json * 1e3:.1f} ms → {t_bin * 1e3:.1f} ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+"""Genera static_data/centroides_distritales.json desde las geometrías de sectores.
+
+Cada sector estadístico de static_data/sectores/*.geojson trae su ID_SE
+(UBIGEO de 6 dígitos + correlativo de sector), así que el distrito se
+identifica por código y no por nombre (hay ~30 nombres de distrito
+repetidos dentro de un mismo departamento). Para cada distrito se calcula
+el centroide ponderado por área de sus sectores; para cada provincia, el
+centroide ponderado de sus distritos.
+
+Las geometrías no traen el nombre de provincia: se resuelve por mayoría de
+votos cruzando (depto, distrito) contra las claves DEPTO|PROV|DIST de
+perfil_riesgo_distrital.json. Todas las variantes de nombre que votan por
+el mismo código (p.ej. NASCA/NAZCA) quedan como alias en el índice.
+
+Correr cuando cambien las geometrías o el perfil distrital:
+    python tools/generar_centroides_distritales.py
+"""
+import glob
+import json
+import os
+import sys
+from collections import Counter, defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from shared.geo import CENTROIDES_PATH, geo_key, norm_geo
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SECTORES_DIR = os.path.join(ROOT, "static_data", "sectores")
+PERFIL_PATH = os.path.join(ROOT, "static_data", "perfil_riesgo_distrital.json")
+DECIMALES = 4  # ~11 m: de sobra para snap a la grilla de 0.25°
+
+
+def _ring_area_centroid(ring):
+    """Área (con signo) y centroide de un anillo por la fórmula del polígono."""
+    a = cx = cy = 0.0
+    n = len(ring)
+    for i in range(n - 1):
+        x0, y0 = ring[i][0], ring[i][1]
+        x1, y1 = ring[i + 1][0], ring[i + 1][1]
+        cross = x0 * y1 - x1 * y0
+        a += cross
+        cx += (x0 + x1) * cross
+        cy += (y0 + y1) * cross
+    a *= 0.5
+    if a == 0:
+        xs = [p[0] for p in ring] or [0.0]
+        ys = [p[1] for p in ring] or [0.0]
+        return 0.0, sum(xs) / len(xs), sum(ys) / len(ys)
+    return a, cx / (6 * a), cy / (6 * a)
+
+
+def geometry_area_centroid(geom):
+    """(área, lon, lat) de un Polygon/MultiPolygon GeoJSON (plano lon/lat).
+
+    Los huecos (anillos interiores) restan área. A la escala de un distrito
+    la distorsión de usar grados como plano es despreciable para el snap.
+    """
+    if not geom:
+        return 0.0, None, None
+    if geom["type"] == "Polygon":
+        polys = [geom["coordinates"]]
+    elif geom["type"] == "MultiPolygon":
+        polys = geom["coordinates"]
+    else:
+        return 0.0, None, None
+    tot = sx = sy = 0.0
+    fallback = None
+    for rings in polys:
+        for j, ring in enumerate(rings):
+            a, x, y = _ring_area_centroid(ring)
+            a = abs(a) if j == 0 else -abs(a)
+            tot += a
+            sx += a * x
+            sy += a * y
+            if fallback is None:
+                fallback = (x, y)
+    if tot <= 0:
+        if fallback is None:
+            return 0.0, None, None
+        return 0.0, fallback[0], fallback[1]
+    return tot, sx / tot, sy / tot
+
+
+def _weighted(items):
+    """Centroide ponderado de [(área, lon, lat)]; promedio simple si área 0."""
+    tot = sum(a for a, _, _ in items)
+    if tot > 0:
+        return (tot, sum(a * x for a, x, _ in items) / tot,
+                sum(a * y for a, _, y in items) / tot)
+    return (0.0, sum(x for _, x, _ in items) / len(items),
+            sum(y for _, _, y in items) / len(items))
+
+
+def _prov_votes():
+    """{(DEPTO, DIST): {PROV, ...}} desde las claves del perfil distrital."""
+    votes = defaultdict(set)
+    if not os.path.exists(PERFIL_PATH):
+        return votes
+    with open(PERFIL_PATH, encoding="utf-8") as f:
+        for k in json.load(f):
+            parts = k.split("|")
+            if len(parts) == 3:
+                votes[(norm_geo(parts[0]), norm_geo(parts[2]))].add(norm_geo(parts[1]))
+    return votes
+
+
+def build_index():
+    # 1. Centroide por distrito (código UBIGEO) sumando sus sectores
+    por_distrito = defaultdict(list)
+    nombre_dist = {}
+    for path in sorted(glob.glob(os.path.join(SECTORES_DIR, "*.geojson"))):
+        with open(path, encoding="utf-8") as f:
+            gj = json.load(f)
+        for feat in gj.get("features", []):
+            props = feat.get("properties", {})
+            ubigeo = str(props.get("ID_SE", ""))[:6]
+            dept = props.get("key", "").split("|")[0]
+            if len(ubigeo) != 6 or not dept:
+                continue
+            a, x, y = geometry_area_centroid(feat.get("geometry"))
+            if x is None:
+                continue
+            por_distrito[ubigeo].append((a, x, y))
+            nombre_dist[ubigeo] = (norm_geo(dept), norm_geo(props.get("NOMBDIST", "")))
+    dist_c = {u: _weighted(items) for u, items in por_distrito.items()}
+    dept_prov = {u[:4]: dept for u, (dept, _) in nombre_dist.items()}
+
+    # 2. Nombre(s) de provincia por código de provincia (mayoría de votos)
+    votes = _prov_votes()
+    prov_votes = defaultdict(Counter)
+    for u, (dept, dist) in nombre_dist.items():
+        for prov in votes.get((dept, dist), ()):
+            prov_votes[u[:4]][prov] += 1
+    # Cada nombre de provincia se asigna al código donde más votos tiene
+    name_best = {}
+    for code, cnt in prov_votes.items():
+        dept = dept_prov[code]
+        for prov, n in cnt.items():
+            k = (dept, prov)
+            if k not in name_best or n > name_best[k][1]:
+                name_best[k] = (code, n)
+    alias = defaultdict(list)
+    for (dept, prov), (code, _) in name_best.items():
+        alias[code].append(prov)
+
+    # 3. Índices finales
+    provincias, distritos, unicos = {}, {}, {}
+    por_prov = defaultdict(list)
+    for u, c in dist_c.items():
+        por_prov[u[:4]].append(c)
+    for code, items in por_prov.items():
+        _, x, y = _weighted(items)
+        dept = dept_prov[code]
+        for prov in alias.get(code, []):
+            provincias[geo_key(dept, prov)] = [round(y, DECIMALES), round(x, DECIMALES)]
+
+    repetidos = Counter(nombre_dist.values())
+    for u, (_, x, y) in dist_c.items():
+        dept, dist = nombre_dist[u]
+        latlon = [round(y, DECIMALES), round(x, DECIMALES)]
+        for prov in alias.get(u[:4], []):
+            distritos[geo_key(dept, prov, dist)] = latlon
+        if repetidos[(dept, dist)] == 1:
+            unicos[geo_key(dept, dist)] = latlon
+
+    meta = {
+        "fuente": "static_data/sectores/*.geojson + perfil_riesgo_distrital.json",
+        "n_distritos": len(dist_c),
+        "n_provincias": len(por_prov),
+        "orden_coordenadas": "lat, lon",
+    }
+    return {"meta": meta, "provincias": dict(sorted(provincias.items())),
+            "distritos": dict(sorted(distritos.items())),
+            "distritos_unicos": dict(sorted(unicos.items()))}
+
+
+def main():
+    idx = build_index()
+    with open(CENTROIDES_PATH, "w", encoding="utf-8") as f:
+        json.dump(idx, f, ensure_ascii=False, separators=(",", ":"))
+    size_kb = os.path.getsize(CENTROIDES_PATH) / 1024
+    print(f"Índice : {CENTROIDES_PATH} ({size_kb:,.0f} KB)")
+    print(f"Distritos geometría : {idx['meta']['n_distritos']}")
+    print(f"Claves DEPTO|PROV|DIST: {len(idx['distritos'])}  "
+          f"| DEPTO|DIST únicas: {len(idx['distritos_unicos'])}  "
+          f"| provincias: {len(idx['provincias'])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,331 @@
+# -*- coding: utf-8 -*-
+"""Genera variantes simplificadas y cuantizadas (TopoJSON) de las geometrías.
+
+Los GeoJSON de static_data/sectores/ (7 MB) traen coordenadas con 15
+decimales y toda la resolución original; el mapa de sectores del Escenario
+El Niño los mandaba completos al navegador en cada cambio de departamento.
+
+Este paso offline produce, por departamento y por nivel de detalle, un
+TopoJSON en static_data/sectores_topo/<nivel>/<DEPTO>.topojson:
+
+- Topología: los anillos se cortan en arcos en los puntos de unión y cada
+  borde compartido entre dos sectores se guarda UNA sola vez. Como se
+  simplifica el arco (Douglas-Peucker) y no el polígono, los vecinos siguen
+  encajando sin huecos ni solapes después de simplificar.
+- Cuantización: coordenadas enteras sobre una grilla por nivel + codificación
+  delta de los arcos (formato TopoJSON estándar, transform scale/translate).
+
+Lo mismo, en un solo nivel, para la capa nacional de departamentos
+(static_data/peru_departamentos.topojson) que usan los choropleth.
+
+También escribe static_data/sectores_topo/index.json con el bbox de cada
+departamento y el tamaño de cada variante; shared/geo.py lo usa para elegir
+el nivel según la extensión del departamento en pantalla.
+
+Correr cuando cambien las geometrías de sectores:
+    python tools/simplificar_geometrias.py
+"""
+import glob
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from shared.geo import (DEPARTAMENTOS_GEOJSON, DEPARTAMENTOS_TOPO, NIVEL_DEPARTAMENTOS,
+                        NIVELES_SECTORES, SECTORES_DIR, SECTORES_TOPO_DIR)
+
+BASE_Q = 1e-6  # grilla fina para detectar vértices compartidos (~0.1 m)
+
+
+# ═══════════════════════════════════════════════════════════════════
+# TOPOLOGÍA: anillos → arcos compartidos
+# ═══════════════════════════════════════════════════════════════════
+
+def _polygons(geom):
+    if not geom:
+        return []
+    if geom["type"] == "Polygon":
+        return [geom["coordinates"]]
+    if geom["type"] == "MultiPolygon":
+        return geom["coordinates"]
+    return []
+
+
+def _quantize_ring(ring):
+    """Anillo → lista cíclica de puntos enteros (sin el punto de cierre)."""
+    out = []
+    for p in ring:
+        q = (int(round(p[0] / BASE_Q)), int(round(p[1] / BASE_Q)))
+        if not out or out[-1] != q:
+            out.append(q)
+    if len(out) > 1 and out[0] == out[-1]:
+        out.pop()
+    return out
+
+
+def _junctions(rings):
+    """Puntos donde se unen 3+ bordes o cambia el vecino compartido.
+
+    Criterio TopoJSON: un punto es unión si aparece con pares de vecinos
+    (anterior, siguiente) distintos en sus apariciones. Un punto interior
+    de un borde compartido tiene siempre el mismo par (recorrido en sentido
+    opuesto por el vecino) y por lo tanto NO es unión.
+    """
+    vecinos = {}
+    junct = set()
+    for ring in rings:
+        n = len(ring)
+        for i, pt in enumerate(ring):
+            par = frozenset((ring[i - 1], ring[(i + 1) % n]))
+            prev = vecinos.get(pt)
+            if prev is None:
+                vecinos[pt] = par
+            elif prev != par:
+                junct.add(pt)
+    return junct
+
+
+def _cut_ring(ring, junct):
+    """Corta un anillo cíclico en arcos abiertos entre uniones.
+
+    Un anillo sin uniones devuelve un solo arco cerrado, rotado para empezar
+    en su punto mínimo (forma canónica, así un hueco y la isla que lo llena
+    comparten el arco).
+    """
+    idx = [i for i, p in enumerate(ring) if p in junct]
+    if not idx:
+        k = ring.index(min(ring))
+        r = ring[k:] + ring[:k]
+        return [r + [r[0]]]
+    r = ring[idx[0]:] + ring[:idx[0]]
+    starts = [i for i, p in enumerate(r) if p in junct]
+    arcs = []
+    for a, b in zip(starts, starts[1:] + [len(r)]):
+        arc = r[a:b + 1] if b < len(r) else r[a:] + [r[0]]
+        arcs.append(arc)
+    return arcs
+
+
+def _closed_canonical(arc):
+    body = arc[:-1]
+    k = body.index(min(body))
+    r = body[k:] + body[:k]
+    return tuple(r + [r[0]])
+
+
+# ═══════════════════════════════════════════════════════════════════
+# SIMPLIFICACIÓN (Douglas-Peucker por arco)
+# ═══════════════════════════════════════════════════════════════════
+
+def _dp(points, tol):
+    """Douglas-Peucker iterativo; conserva siempre el primer y último punto."""
+    n = len(points)
+    if n < 3:
+        return list(points)
+    keep = [False] * n
+    keep[0] = keep[-1] = True
+    stack = [(0, n - 1)]
+    tol2 = tol * tol
+    while stack:
+        a, b = stack.pop()
+        ax, ay = points[a]
+        bx, by = points[b]
+        dx, dy = bx - ax, by - ay
+        seg2 = dx * dx + dy * dy
+        best, best_d = -1, tol2
+        for i in range(a + 1, b):
+            px, py = points[i]
+            if seg2 == 0:
+                d = (px - ax) ** 2 + (py - ay) ** 2
+            else:
+                cross = (px - ax) * dy - (py - ay) * dx
+                d = cross * cross / seg2
+            if d > best_d:
+                best, best_d = i, d
+        if best >= 0:
+            keep[best] = True
+            stack.append((a, best))
+            stack.append((best, b))
+    return [p for p, k in zip(points, keep) if k]
+
+
+def _simplify_arc(arc, tol):
+    if arc[0] != arc[-1]:
+        return _dp(arc, tol)
+    # Arco cerrado: DP lo colapsaría a 2 puntos. Se parte en el punto más
+    # lejano al inicio y se simplifican las dos mitades; si aun así queda
+    # degenerado, se conserva un cuadrilátero mínimo para no perder el sector.
+    x0, y0 = arc[0]
+    far = max(range(len(arc)), key=lambda i: (arc[i][0] - x0) ** 2 + (arc[i][1] - y0) ** 2)
+    out = _dp(arc[:far + 1], tol)[:-1] + _dp(arc[far:], tol)
+    if len(out) < 4 and len(arc) >= 4:
+        n = len(arc) - 1
+        out = [arc[0], arc[n // 3], arc[2 * n // 3], arc[0]]
+    return out
+
+
+# ═══════════════════════════════════════════════════════════════════
+# CONSTRUCCIÓN DEL TOPOJSON
+# ═══════════════════════════════════════════════════════════════════
+
+def build_topology(features, props_keep=None):
+    """Extrae arcos compartidos de una lista de Features GeoJSON.
+
+    Returns:
+        arcs: lista de arcos (puntos enteros en BASE_Q)
+        geoms: [(tipo, arcos_por_poligono, properties)] con índices TopoJSON
+               (i = arco tal cual, ~i = arco invertido)
+    """
+    rings_q = []
+    shapes = []
+    for feat in features:
+        polys = []
+        for poly in _polygons(feat.get("geometry")):
+            rs = []
+            for ring in poly:
+                q = _quantize_ring(ring)
+                if len(q) >= 3:
+                    rs.append(len(rings_q))
+                    rings_q.append(q)
+            if rs:
+                polys.append(rs)
+        props = feat.get("properties", {})
+        if props_keep:
+            props = {k: props[k] for k in props_keep if k in props}
+        shapes.append((polys, props))
+
+    junct = _junctions(rings_q)
+    arcs, lookup = [], {}
+    ring_arcs = []
+    for ring in rings_q:
+        refs = []
+        for arc in _cut_ring(ring, junct):
+            if arc[0] == arc[-1] and arc[0] not in junct:
+                key = _closed_canonical(arc)
+                rkey = _closed_canonical(arc[::-1])
+            else:
+                key, rkey = tuple(arc), tuple(arc[::-1])
+            if key in lookup:
+                refs.append(lookup[key])
+            elif rkey in lookup:
+                refs.append(~lookup[rkey])
+            else:
+                lookup[key] = len(arcs)
+                arcs.append(list(key))
+                refs.append(len(arcs) - 1)
+        ring_arcs.append(refs)
+
+    geoms = []
+    for polys, props in shapes:
+        arcs_polys = [[ring_arcs[r] for r in rs] for rs in polys]
+        tipo = "Polygon" if len(arcs_polys) == 1 else "MultiPolygon"
+        geoms.append((tipo, arcs_polys, props))
+    return arcs, geoms
+
+
+def encode_level(arcs, geoms, tol_deg, quantum_deg):
+    """Simplifica los arcos y los serializa como TopoJSON cuantizado."""
+    tol = tol_deg / BASE_Q
+    factor = quantum_deg / BASE_Q
+    all_pts = [p for a in arcs for p in a]
+    if not all_pts:
+        return None
+    min_x = min(p[0] for p in all_pts)
+    min_y = min(p[1] for p in all_pts)
+    max_x = max(p[0] for p in all_pts)
+    max_y = max(p[1] for p in all_pts)
+
+    out_arcs = []
+    for arc in arcs:
+        simp = _simplify_arc(arc, tol) if tol > 0 else arc
+        q = []
+        for x, y in simp:
+            pt = (int(round((x - min_x) / factor)), int(round((y - min_y) / factor)))
+            if not q or q[-1] != pt:
+                q.append(pt)
+        if len(q) == 1:
+            q.append(q[0])
+        # Codificación delta (TopoJSON)
+        enc, px, py = [], 0, 0
+        for x, y in q:
+            enc.append([x - px, y - py])
+            px, py = x, y
+        out_arcs.append(enc)
+
+    geometries = []
+    for tipo, arcs_polys, props in geoms:
+        if not arcs_polys:
+            geometries.append({"type": None, "properties": props})
+            continue
+        geometries.append({"type": tipo, "properties": props,
+                           "arcs": arcs_polys[0] if tipo == "Polygon" else arcs_polys})
+
+    return {
+        "type": "Topology",
+        "bbox": [round(min_x * BASE_Q, 6), round(min_y * BASE_Q, 6),
+                 round(max_x * BASE_Q, 6), round(max_y * BASE_Q, 6)],
+        "transform": {"scale": [quantum_deg, quantum_deg],
+                      "translate": [round(min_x * BASE_Q, 6), round(min_y * BASE_Q, 6)]},
+        "objects": {"sectores": {"type": "GeometryCollection", "geometries": geometries}},
+        "arcs": out_arcs,
+    }
+
+
+def simplificar_departamentos():
+    """Capa nacional de departamentos (choropleth) en un solo nivel."""
+    if not os.path.exists(DEPARTAMENTOS_GEOJSON):
+        return
+    with open(DEPARTAMENTOS_GEOJSON, encoding="utf-8") as f:
+        gj = json.load(f)
+    arcs, geoms = build_topology(gj.get("features", []))
+    topo = encode_level(arcs, geoms, NIVEL_DEPARTAMENTOS["tolerancia"],
+                        NIVEL_DEPARTAMENTOS["cuantizacion"])
+    topo["objects"] = {"departamentos": topo["objects"].pop("sectores")}
+    with open(DEPARTAMENTOS_TOPO, "w", encoding="utf-8") as f:
+        json.dump(topo, f, ensure_ascii=False, separators=(",", ":"))
+    print(f"{os.path.basename(DEPARTAMENTOS_GEOJSON):<24}"
+          f"{os.path.getsize(DEPARTAMENTOS_GEOJSON) / 1024:>8.0f} KB  →  "
+          f"{os.path.getsize(DEPARTAMENTOS_TOPO) / 1024:,.0f} KB")
+
+
+def main():
+    simplificar_departamentos()
+    os.makedirs(SECTORES_TOPO_DIR, exist_ok=True)
+    index = {}
+    tot_src = 0
+    tot_lvl = {n: 0 for n in NIVELES_SECTORES}
+    for path in sorted(glob.glob(os.path.join(SECTORES_DIR, "*.geojson"))):
+        fname = os.path.basename(path)
+        with open(path, encoding="utf-8") as f:
+            gj = json.load(f)
+        arcs, geoms = build_topology(gj.get("features", []),
+                                     props_keep=("NOMBDIST", "NOM_SE", "key"))
+        entry = {"origen_bytes": os.path.getsize(path), "niveles": {}}
+        tot_src += entry["origen_bytes"]
+        for nivel, spec in NIVELES_SECTORES.items():
+            topo = encode_level(arcs, geoms, spec["tolerancia"], spec["cuantizacion"])
+            if topo is None:
+                continue
+            dest_dir = os.path.join(SECTORES_TOPO_DIR, nivel)
+            os.makedirs(dest_dir, exist_ok=True)
+            dest = os.path.join(dest_dir, fname.replace(".geojson", ".topojson"))
+            with open(dest, "w", encoding="utf-8") as f:
+                json.dump(topo, f, ensure_ascii=False, separators=(",", ":"))
+            size = os.path.getsize(dest)
+            entry["bbox"] = topo["bbox"]
+            entry["niveles"][nivel] = size
+            tot_lvl[nivel] += size
+        index[fname] = entry
+        print(f"{fname:<24}{entry['origen_bytes'] / 1024:>8.0f} KB  →  "
+              + "  ".join(f"{n}: {s / 1024:,.0f} KB" for n, s in entry["niveles"].items()))
+
+    with open(os.path.join(SECTORES_TOPO_DIR, "index.json"), "w", encoding="utf-8") as f:
+        json.dump(index, f, ensure_ascii=False, indent=1)
+    print("-" * 60)
+    print(f"{'TOTAL':<24}{tot_src / 1024:>8.0f} KB  →  "
+          + "  ".join(f"{n}: {s / 1024:,.0f} KB" for n, s in tot_lvl.items()))
+
+
+if __name__ == "__main__":
+    main()